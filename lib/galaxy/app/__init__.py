@@ -406,7 +406,12 @@ class MinimalGalaxyApplication(BasicSharedApp, HaltableContainer, SentryClientMi
             mulled_resolution_cache = CacheManager(**parse_cache_config_options(cache_opts)).get_cache(
                 "mulled_resolution"
             )
-        self.container_finder = containers.ContainerFinder(app_info, mulled_resolution_cache=mulled_resolution_cache)
+        self.container_finder = containers.ContainerFinder(
+            app_info,
+            mulled_resolution_cache=mulled_resolution_cache,
+            container_resolution_cache_size=self.config.container_resolution_cache_size,
+            container_resolution_cache_expire=self.config.container_resolution_cache_expire,
+        )
         self._set_enabled_container_types()
         index_help = getattr(self.config, "index_tool_help", True)
         self.toolbox_search = self._register_singleton(
@@ -1,6 +1,7 @@
 import datetime
 import json
 import shutil
+from collections import defaultdict
 from collections.abc import Callable
 from concurrent.futures import TimeoutError
 from functools import lru_cache
@@ -35,7 +36,10 @@ from galaxy.managers.datasets import (
     DatasetManager,
 )
 from galaxy.managers.hdas import HDAManager
-from galaxy.managers.jobs import JobSubmitter
+from galaxy.managers.jobs import (
+    get_active_job_input_datasets,
+    JobSubmitter,
+)
 from galaxy.managers.lddas import LDDAManager
 from galaxy.managers.markdown_util import generate_branded_pdf
 from galaxy.managers.model_stores import ModelStoreManager
@@ -117,6 +121,18 @@ def recalculate_user_disk_usage(
         log.error("Recalculate user disk usage task received without user_id.")
 
 
+@galaxy_task(action="reconcile users' disk usage")
+def reconcile_user_disk_usage(
+    sa_session: galaxy_scoped_session, object_store: BaseObjectStore, config: GalaxyAppConfiguration
+):
+    """Recalculate the disk usage of users whose usage drifted, and of a batch of users whose usage changed."""
+    reconciled = model.UserDiskUsageLedgerEntry.reconcile(
+        sa_session, object_store, config.disk_usage_reconcile_batch_size
+    )
+    if reconciled:
+        log.debug("Reconciled disk usage of %d users", reconciled)
+
+
 @galaxy_task(ignore_result=True, action="purge a history dataset")
 def purge_hda(
     hda_manager: HDAManager, hda_id: int, task_user_id: Optional[int] = None, preserve_owner_update_time: bool = False
@@ -142,8 +158,9 @@ def purge_history_datasets(
 ):
     """Batch purge all HDAs in a history in a single task.
 
-    Bulk-marks all unpurged HDAs as deleted/purged, recalculates user quota,
-    and removes underlying dataset files from the object store.
+    Bulk-marks all unpurged HDAs as deleted/purged, subtracts the freed space
+    from the user's disk usage, and removes underlying dataset files from the
+    object store.
     """
     history = sa_session.get(model.History, request.history_id)
     if not history:
@@ -175,6 +192,11 @@ def purge_history_datasets(
     if not dataset_ids:
         sa_session.commit()
         return
+    user = history.user
+    # Usage freed by the purge, computed before the HDAs are marked purged
+    released_usage = (
+        model.calculate_history_exclusive_disk_usage_per_objectstore(sa_session, user.id, history.id) if user else []
+    )
     # Bulk mark all unpurged HDAs as deleted and purged
     sa_session.execute(
         update(model.HistoryDatasetAssociation)
@@ -187,13 +209,19 @@ def purge_history_datasets(
         .values(deleted=True, purged=True)
     )
     sa_session.commit()
-    # Recalculate user disk usage from scratch
-    user = history.user
     if user:
-        user.calculate_and_set_disk_usage(object_store)
+        # Adjust the usage incrementally, the disk usage reconciler corrects any drift
+        quota_source_map = object_store.get_quota_source_map()
+        released_per_source: dict[Optional[str], int] = defaultdict(int)
+        for row in released_usage:
+            quota_source_info = quota_source_map.get_quota_source_info(row.object_store_id)
+            if quota_source_info.use:
+                released_per_source[quota_source_info.label] += int(row.usage or 0)
+        for label, amount in released_per_source.items():
+            user.adjust_total_disk_usage(-amount, label, preserve_update_time=request.preserve_owner_update_time)
         if not request.preserve_owner_update_time:
             user.update_time = now()
-            sa_session.commit()
+        sa_session.commit()
     # Remove underlying dataset files from object store
     dataset_manager.purge_datasets(PurgeDatasetsTaskRequest(dataset_ids=dataset_ids))
 
@@ -557,6 +585,13 @@ def compute_dataset_hash(
     dataset_manager.compute_hash(request)
 
 
+@galaxy_task(ignore_result=True, action="share dataset contents with identical datasets")
+def deduplicate_dataset(sa_session: galaxy_scoped_session, object_store: BaseObjectStore, dataset_id: int):
+    dataset = sa_session.get(model.Dataset, dataset_id)
+    if dataset is not None and not dataset.purged:
+        object_store.deduplicate(dataset)
+
+
 @galaxy_task(action="import a data bundle")
 def import_data_bundle(
     app: MinimalManagerApp,
@@ -606,9 +641,31 @@ def cleanup_expired_notifications(notification_manager: NotificationManager):
     )
 
 
+def _active_job_cache_paths(object_store: BaseObjectStore, sa_session: galaxy_scoped_session) -> list[str]:
+    """Cache paths of the inputs of queued and running jobs, these are kept when pruning caches."""
+    paths = []
+    for dataset in get_active_job_input_datasets(sa_session):
+        try:
+            paths.append(object_store.get_filename(dataset, sync_cache=False))
+            paths.append(
+                object_store.get_filename(
+                    dataset, dir_only=True, extra_dir=dataset._extra_files_rel_path, sync_cache=False
+                )
+            )
+        except ObjectNotFound:
+            continue
+        except Exception:
+            # One broken dataset must not stop cache pruning
+            log.exception("Failed to locate cache paths of active job input dataset %s", dataset.id)
+            continue
+    return paths
+
+
 @galaxy_task(action="prune object store cache directories")
-def clean_object_store_caches(object_store: BaseObjectStore):
-    check_caches(object_store.cache_targets())
+def clean_object_store_caches(object_store: BaseObjectStore, sa_session: galaxy_scoped_session):
+    cache_targets = object_store.cache_targets()
+    if cache_targets:
+        check_caches(cache_targets, _active_job_cache_paths(object_store, sa_session))
 
 
 @galaxy_task(action="send notifications to all recipients")
@@ -84,6 +84,8 @@ valid_strand = ["+", "-", "."]
 DOWNLOAD_FILENAME_PATTERN_DATASET = "Galaxy${hid}-[${name}].${ext}"
 DOWNLOAD_FILENAME_PATTERN_COLLECTION_ELEMENT = "Galaxy${hdca_hid}-[${hdca_name}__${element_identifier}].${ext}"
 DEFAULT_MAX_PEEK_SIZE = 1000000  # 1 MB
+# leading bytes of compressed files, which can only be read decompressed from the start
+COMPRESSED_MAGICS = (util.gzip_magic, util.bz2_magic, util.xz_magic, b"PK\x03\x04")
 
 Headers = dict[str, Any]
 
@@ -514,8 +516,7 @@ class Data(metaclass=DataMeta):
         headers["content-type"] = "text/plain; charset=utf-8"
         if file_size > max_peek_size:
             headers["x-content-truncated"] = str(max_peek_size)
-        with open(data.get_file_name(), "rb") as fh:
-            return unicodify(fh.read(max_peek_size)), headers
+        return unicodify(data.get_range(0, max_peek_size)), headers
 
     def _serve_file_contents(self, trans, data, headers, preview, file_size, max_peek_size):
         from galaxy.datatypes import images
@@ -524,12 +525,16 @@ class Data(metaclass=DataMeta):
         if not preview or isinstance(data.datatype, images.Image) or file_size < max_peek_size:
             return self._yield_user_file_content(trans, data, data.get_file_name(), headers), headers
 
-        with compression_utils.get_fileobj(data.get_file_name(), "rb") as fh:
-            # preview large text file - serve as text/plain so the browser
-            # preserves whitespace/newlines and does not interpret content as HTML.
-            headers["content-type"] = "text/plain; charset=utf-8"
-            headers["x-content-truncated"] = str(max_peek_size)
-            return unicodify(fh.read(max_peek_size)), headers
+        # preview large text file - serve as text/plain so the browser
+        # preserves whitespace/newlines and does not interpret content as HTML.
+        headers["content-type"] = "text/plain; charset=utf-8"
+        headers["x-content-truncated"] = str(max_peek_size)
+        peek = data.get_range(0, max_peek_size)
+        if peek.startswith(COMPRESSED_MAGICS):
+            # compressed datasets are previewed decompressed, which needs the whole file
+            with compression_utils.get_fileobj(data.get_file_name(), "rb") as fh:
+                peek = fh.read(max_peek_size)
+        return unicodify(peek), headers
 
     def display_data(
         self,
@@ -11,6 +11,7 @@ import re
 import shutil
 import subprocess
 import tempfile
+from collections.abc import Callable
 from json import dumps
 from typing import (
     cast,
@@ -29,6 +30,7 @@ from galaxy.datatypes import (
 )
 from galaxy.datatypes.binary import _BamOrSam
 from galaxy.datatypes.data import (
+    COMPRESSED_MAGICS,
     DatatypeValidation,
     Text,
 )
@@ -78,6 +80,25 @@ from . import dataproviders
 log = logging.getLogger(__name__)
 
 MAX_DATA_LINES = 100000
+# bytes fetched at once to complete the last line of a chunk read as a range
+CHUNK_LINE_READ_SIZE = 4096
+# dataset contents don't change once displayed, so remember which datasets are compressed
+# instead of checking their leading bytes for every chunk
+_compressed_dataset_ids: dict[int, bool] = {}
+COMPRESSED_DATASET_IDS_MAX_SIZE = 10000
+
+
+def _is_compressed(dataset: HasFileName, get_range: Callable[[int, int], bytes]) -> bool:
+    dataset_id = getattr(getattr(dataset, "dataset", dataset), "id", None)
+    if dataset_id is None:
+        return get_range(0, 6).startswith(COMPRESSED_MAGICS)
+    compressed = _compressed_dataset_ids.get(dataset_id)
+    if compressed is None:
+        compressed = get_range(0, 6).startswith(COMPRESSED_MAGICS)
+        if len(_compressed_dataset_ids) >= COMPRESSED_DATASET_IDS_MAX_SIZE:
+            _compressed_dataset_ids.clear()
+        _compressed_dataset_ids[dataset_id] = compressed
+    return compressed
 
 
 @dataproviders.decorators.has_dataproviders
@@ -154,10 +175,15 @@ class TabularData(Text):
         )
 
     def _read_chunk(self, trans, dataset: HasFileName, offset: int, ck_size: Optional[int] = None):
+        ck_size = ck_size or trans.app.config.display_chunk_size
+        # datasets in remote object stores can read ranges without fetching the whole file first
+        get_range = getattr(dataset, "get_range", None)
+        if get_range is not None and not _is_compressed(dataset, get_range):
+            return self._read_chunk_range(get_range, offset, ck_size)
         with compression_utils.get_fileobj(dataset.get_file_name()) as f:
             f.seek(offset)
             try:
-                ck_data = f.read(ck_size or trans.app.config.display_chunk_size)
+                ck_data = f.read(ck_size)
                 if ck_data and ck_data[-1] != "\n":
                     cursor = f.read(1)
                     while cursor and cursor != "\n":
@@ -168,6 +194,29 @@ class TabularData(Text):
             last_read = f.tell()
         return ck_data, last_read
 
+    def _read_chunk_range(self, get_range: Callable[[int, int], bytes], offset: int, ck_size: int):
+        ck_bytes = get_range(offset, ck_size)
+        last_read = offset + len(ck_bytes)
+        if ck_bytes and not ck_bytes.endswith(b"\n"):
+            # complete the last line, the newline ending it is skipped like when reading the file
+            while True:
+                more = get_range(last_read, CHUNK_LINE_READ_SIZE)
+                newline = more.find(b"\n")
+                if newline != -1:
+                    ck_bytes += more[:newline]
+                    last_read += newline + 1
+                    break
+                ck_bytes += more
+                last_read += len(more)
+                if len(more) < CHUNK_LINE_READ_SIZE:
+                    break
+        try:
+            ck_data = ck_bytes.decode("utf-8")
+        except UnicodeDecodeError:
+            raise InvalidFileFormatError("Dataset appears to contain binary data, cannot display.")
+        # universal newlines, like the text mode file read
+        return ck_data.replace("\r\n", "\n").replace("\r", "\n"), last_read
+
     def display_data(
         self,
         trans,
@@ -2245,9 +2245,14 @@ class MinimalJobWrapper(HasResourceParameters):
 
         # Calculate dataset hash - only if the job completed successfully,
         # otherwise dataset files may be missing/invalid (e.g. failed fetch from 404 URL).
+        deduplicate_dataset_ids: list[int] = []
         if final_job_state == job.states.OK:
             for dataset_assoc in output_dataset_associations:
                 dataset = dataset_assoc.dataset.dataset
+                if not dataset.purged and dataset.state == Dataset.states.OK and dataset.hashes:
+                    # hashes recorded by the job (e.g. verified while fetching the data), share identical contents
+                    # once the job is finished, comparing contents can take a while for large datasets
+                    deduplicate_dataset_ids.append(dataset.id)
                 if not dataset.purged and dataset.state == Dataset.states.OK and not dataset.hashes:
                     if self.app.config.calculate_dataset_hash == "always" or (
                         self.app.config.calculate_dataset_hash == "upload"
@@ -2318,6 +2323,12 @@ class MinimalJobWrapper(HasResourceParameters):
             # Only task is setting metadata (if necessary) on expression tool output.
             # The dataset state is SETTING_METADATA, which delays dependent jobs until the task completes.
             task_wrapper.delay()
+        if deduplicate_dataset_ids and self.app.config.enable_celery_tasks:
+            from galaxy.celery.tasks import deduplicate_dataset
+
+            for dataset_id in deduplicate_dataset_ids:
+                deduplicate_dataset.delay(dataset_id=dataset_id)
+        self._notify_dependent_jobs(job)
         cleanup_job = self.cleanup_job
         delete_files = cleanup_job == "always" or (job.state == job.states.OK and cleanup_job == "onsuccess")
         self.cleanup(delete_files=delete_files)
@@ -2372,6 +2383,15 @@ class MinimalJobWrapper(HasResourceParameters):
 
         return state
 
+    def _notify_dependent_jobs(self, job: Job) -> None:
+        if not self.app.config.job_handler_notifications:
+            return
+        # Wake handlers of jobs waiting on this job's outputs so they don't wait for the next monitor iteration
+        try:
+            self.app.job_manager.notify_dependent_jobs([job.id])
+        except Exception:
+            log.exception("(%s) Failed to notify job handlers of dependent jobs", self.job_id)
+
     def cleanup(self, delete_files: bool = True) -> None:
         # At least one of these tool cleanup actions (job import), is needed
         # for the tool to work properly, that is why one might want to run
@@ -2858,6 +2878,37 @@ class JobWrapper(MinimalJobWrapper):
     def set_cached_job_destination(self, job_destination: JobDestination) -> JobDestination:
         return self.job_runner_mapper.cache_job_destination(job_destination)
 
+    def prepare(self, compute_environment=None):
+        if input_prefetcher := self.queue.input_prefetcher:
+            # the inputs are needed now, record how far ahead they were prefetched
+            input_prefetcher.inputs_needed(self.job_id)
+        return super().prepare(compute_environment=compute_environment)
+
+    def fail(
+        self,
+        message,
+        exception=False,
+        tool_stdout="",
+        tool_stderr="",
+        exit_code=None,
+        job_stdout=None,
+        job_stderr=None,
+        job_metrics_directory=None,
+    ) -> None:
+        if input_prefetcher := self.queue.input_prefetcher:
+            # jobs failing before they are prepared, e.g. when they can't be dispatched, won't need their inputs
+            input_prefetcher.discard(self.job_id)
+        super().fail(
+            message,
+            exception=exception,
+            tool_stdout=tool_stdout,
+            tool_stderr=tool_stderr,
+            exit_code=exit_code,
+            job_stdout=job_stdout,
+            job_stderr=job_stderr,
+            job_metrics_directory=job_metrics_directory,
+        )
+
 
 class TaskWrapper(JobWrapper):
     """
@@ -3067,6 +3118,10 @@ class JobQueueI:
     @abc.abstractmethod
     def put(self, *args, **kwargs): ...
 
+    @abc.abstractmethod
+    def notify(self, job_ids: Iterable[int]) -> None:
+        """Wake the queue because the state of the given jobs (or of their inputs) may have changed."""
+
     @abc.abstractmethod
     def shutdown(self): ...
 
@@ -3079,6 +3134,9 @@ class NoopQueue(JobQueueI):
     def put(self, *args, **kwargs):
         return
 
+    def notify(self, job_ids: Iterable[int]) -> None:
+        return
+
     def shutdown(self):
         return
 
@@ -3,10 +3,13 @@ Galaxy job handler, prepares, runs, tracks, and finishes Galaxy jobs
 """
 
 import abc
+import copy
 import datetime
 import os
+import threading
 import time
 from collections import defaultdict
+from collections.abc import Iterable
 from queue import (
     Empty,
     Queue,
@@ -19,6 +22,7 @@ from typing import (
 )
 
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import selectinload
 from sqlalchemy.sql.expression import (
     and_,
     func,
@@ -33,13 +37,23 @@ from galaxy import model
 from galaxy.exceptions import ObjectNotFound
 from galaxy.job_execution.actions.post import ActionBox
 from galaxy.jobs import (
+    JobConfiguration,
     JobQueueI,
     JobWrapper,
     TaskWrapper,
 )
+from galaxy.jobs.input_prefetch import JobInputPrefetcher
+from galaxy.jobs.job_counts import JobCountLedger
 from galaxy.jobs.job_destination import JobDestination
-from galaxy.jobs.mapper import JobNotReadyException
-from galaxy.managers.jobs import get_jobs_to_check_at_startup
+from galaxy.jobs.mapper import (
+    DYNAMIC_RUNNER_NAME,
+    JobNotReadyException,
+)
+from galaxy.managers.jobs import (
+    get_jobs_to_check_at_startup,
+    get_session_active_job_counts,
+    get_total_walltime_by_owner,
+)
 from galaxy.model.base import check_database_connection
 from galaxy.structured_app import MinimalManagerApp
 from galaxy.util import unicodify
@@ -237,8 +251,43 @@ class StopSignalException(Exception):
     """Exception raised when queue returns a stop signal."""
 
 
+class StaticJobDestinations:
+    """Destinations of tools that are mapped to a single, static destination.
+
+    The destination of such a tool is resolved once and shared by all of its jobs evaluated in a monitor step. Tags,
+    dynamic destinations and tool configurations selected by job params can map each job differently, jobs of these
+    tools are mapped by their job wrapper.
+    """
+
+    def __init__(self, job_config: JobConfiguration) -> None:
+        self.job_config = job_config
+        self._destinations: dict[Optional[str], Optional[JobDestination]] = {}
+
+    def clear(self) -> None:
+        self._destinations = {}
+
+    def map(self, job_wrapper: JobWrapper) -> bool:
+        """Set the destination of ``job_wrapper`` if its tool is mapped to a static destination."""
+        if job_wrapper.tool is None or len(job_wrapper.tool.job_tool_configurations) != 1:
+            return False
+        destination_id = job_wrapper.tool.get_configured_job_destination() or self.job_config.default_destination_id
+        if destination_id not in self._destinations:
+            destinations = list(self.job_config.get_destinations(destination_id))
+            if len(destinations) == 1 and destinations[0].runner != DYNAMIC_RUNNER_NAME:
+                self._destinations[destination_id] = destinations[0]
+            else:
+                self._destinations[destination_id] = None
+        destination = self._destinations[destination_id]
+        if destination is None:
+            return False
+        # runners modify the destinations of their jobs
+        job_wrapper.set_cached_job_destination(copy.deepcopy(destination))
+        return True
+
+
 class BaseJobHandlerQueue(JobQueueI, Monitors):
     STOP_SIGNAL = object()
+    input_prefetcher: Optional[JobInputPrefetcher] = None
 
     def __init__(self, app: MinimalManagerApp, dispatcher: "DefaultJobDispatcher"):
         """
@@ -252,6 +301,31 @@ class BaseJobHandlerQueue(JobQueueI, Monitors):
         self.parent_pid = os.getpid()
         # This queue is not used if track_jobs_in_database is True.
         self.queue: Queue[tuple[int, Optional[str]]] = Queue()
+        # Job ids named in notifications received since the last monitor step
+        self._notified_job_ids: set[int] = set()
+        self._notified = False
+        self._notification_lock = threading.Lock()
+
+    def notify(self, job_ids: Iterable[int]) -> None:
+        """Wake the monitor thread because the state of the given jobs (or of their inputs) may have changed."""
+        with self._notification_lock:
+            self._notified_job_ids.update(job_ids)
+            self._notified = True
+        self.sleeper.wake()
+
+    def _pop_notified_job_ids(self) -> Optional[set[int]]:
+        """Return the job ids notified since the last call, or ``None`` if no notification was received."""
+        with self._notification_lock:
+            if not self._notified:
+                return None
+            job_ids = self._notified_job_ids
+            self._notified_job_ids = set()
+            self._notified = False
+        return job_ids
+
+    def _wait_for_notification(self, timeout: float) -> None:
+        if not self._notified:
+            self._monitor_sleep(timeout)
 
 
 class JobHandlerQueue(BaseJobHandlerQueue):
@@ -265,11 +339,19 @@ class JobHandlerQueue(BaseJobHandlerQueue):
         # self.queue contains tuples: (job_id, tool_id)
 
         # Initialize structures for handling job limits
+        self.job_count_ledger = JobCountLedger(app.config.job_count_reconcile_interval)
         self.__clear_job_count()
         # Contains job ids for jobs that are waiting (only use from monitor thread)
         self.waiting_jobs: list[int] = []
         # Contains wrappers of jobs that are limited or ready (so they aren't created unnecessarily/multiple times)
         self.job_wrappers: dict[int, JobWrapper] = {}
+        self.static_job_destinations = StaticJobDestinations(app.job_config)
+        if app.config.job_input_prefetch_concurrency > 0:
+            self.input_prefetcher = JobInputPrefetcher(
+                app.object_store,
+                app.config.job_input_prefetch_concurrency,
+                app.execution_timer_factory.galaxy_statsd_client,
+            )
         name = "JobHandlerQueue.monitor_thread"
         self._init_monitor_thread(name, target=self.__monitor, config=app.config)
         self.job_grabber = None
@@ -390,45 +472,65 @@ class JobHandlerQueue(BaseJobHandlerQueue):
         """
         Continually iterate the waiting jobs, checking is each is ready to
         run and dispatching if so.
+
+        When woken by a notification before ``job_handler_monitor_sleep`` has
+        elapsed, only the jobs named in the notification are re-evaluated.
         """
+        monitor_sleep = self.app.config.job_handler_monitor_sleep
+        next_full_step = time.monotonic()
         while self.monitor_running:
             try:
                 # If jobs are locked, there's nothing to monitor and we skip
                 # to the sleep.
-                if not self.app.job_manager.job_lock:
-                    self.__monitor_step()
+                if self.app.job_manager.job_lock:
+                    next_full_step = time.monotonic() + monitor_sleep
+                else:
+                    notified_job_ids = self._pop_notified_job_ids()
+                    if not self.track_jobs_in_database or time.monotonic() >= next_full_step:
+                        try:
+                            self.__monitor_step()
+                        finally:
+                            next_full_step = time.monotonic() + monitor_sleep
+                    elif notified_job_ids:
+                        self.__monitor_step(notified_job_ids)
             except Exception:
                 log.exception("Exception in monitor_step")
                 # With sqlite backends we can run into locked databases occasionally
                 # To avoid that the monitor step locks again we backoff a little longer.
                 self._monitor_sleep(5)
-            self._monitor_sleep(self.app.config.job_handler_monitor_sleep)
+            self._wait_for_notification(max(next_full_step - time.monotonic(), 0.0))
 
-    def __monitor_step(self):
+    def __monitor_step(self, job_ids: Optional[set[int]] = None):
         """
         Called repeatedly by `monitor` to process waiting jobs.
         """
         monitor_step_timer = self.app.execution_timer_factory.get_timer(
             "internal.galaxy.jobs.handlers.monitor_step", "Job handler monitor step complete."
         )
-        if self.job_grabber is not None:
+        if self.job_grabber is not None and job_ids is None:
             self.job_grabber.grab_unhandled_items()
         try:
-            self.__handle_waiting_jobs()
+            self.__handle_waiting_jobs(job_ids)
         except StopSignalException:
             pass
         finally:
             self.sa_session.remove()
         log.trace(monitor_step_timer.to_str())
 
-    def __handle_waiting_jobs(self) -> None:
+    def __handle_waiting_jobs(self, job_ids: Optional[set[int]] = None) -> None:
         """
         Gets any new jobs (either from the database or from its own queue), then iterates over all new and waiting jobs
         to check the state of the jobs each depends on. If the job has dependencies that have not finished, it goes to
         the waiting queue. If the job has dependencies with errors, it is marked as having errors and removed from the
         queue. If the job belongs to an inactive user it is ignored.  Otherwise, the job is dispatched.
+
+        If ``job_ids`` is set (and jobs are tracked in the database), only those jobs are considered.
         """
         check_database_connection(self.sa_session)
+        self.static_job_destinations.clear()
+        ready_jobs_timer = self.app.execution_timer_factory.get_timer(
+            "internal.galaxy.jobs.handlers.ready_jobs_query", "Fetched ${job_count} new jobs with ready inputs."
+        )
         # Pull all new jobs from the queue at once
         jobs_to_check: list[model.Job] = []
         resubmit_jobs = []
@@ -474,6 +576,8 @@ class JobHandlerQueue(BaseJobHandlerQueue):
             )
             if self.app.config.user_activation_on:
                 job_filter_conditions += (or_((model.Job.user_id == null()), (model.User.active == true())),)
+            if job_ids is not None:
+                job_filter_conditions += (model.Job.table.c.id.in_(job_ids),)
             assert self.sa_session.bind is not None
             if self.sa_session.bind.dialect.name == "sqlite":
                 query_objects: tuple[_ColumnsClauseArgument, ...] = (model.Job,)
@@ -486,16 +590,21 @@ class JobHandlerQueue(BaseJobHandlerQueue):
                 .filter(and_(*job_filter_conditions))
                 .order_by(model.Job.id)
             )
+            # Input associations are needed for every job that becomes ready, load them for the whole window at once
+            # instead of lazily per job.
+            load_inputs = selectinload(model.Job.input_datasets).joinedload(model.JobToInputDatasetAssociation.dataset)
             if self.sa_session.bind.dialect.name == "sqlite":
-                jobs_to_check = ready_query.all()
+                jobs_to_check = ready_query.options(load_inputs).all()
             else:
                 ranked = ready_query.subquery()
                 jobs_to_check = (
                     self.sa_session.query(model.Job)
+                    .options(load_inputs)
                     .join(ranked, model.Job.id == ranked.c.id)
                     .filter(ranked.c.rank <= self.app.job_config.handler_ready_window_size)
                     .all()
                 )
+            log.trace(ready_jobs_timer.to_str(job_count=len(jobs_to_check)))
             # Filter jobs with invalid input states
             jobs_to_check = self.__filter_jobs_with_invalid_input_states(jobs_to_check)
             # Fetch all "resubmit" jobs
@@ -532,21 +641,32 @@ class JobHandlerQueue(BaseJobHandlerQueue):
             except Empty:
                 pass
         # Ensure that we get new job counts on each iteration
+        limits_timer = self.app.execution_timer_factory.get_timer(
+            "internal.galaxy.jobs.handlers.cache_job_limits", "Cached job limit state for ${job_count} jobs."
+        )
         self.__clear_job_count()
-        self.__cache_total_job_count_per_destination()
-        self.__cache_user_job_count_per_destination()
-        self.__cache_user_job_count()
+        self.__update_job_counts()
+        self.__cache_session_job_count(jobs_to_check)
+        self.__cache_total_walltime(jobs_to_check)
+        self.__cache_quotas(jobs_to_check)
+        log.trace(limits_timer.to_str(job_count=len(jobs_to_check)))
+        evaluate_timer = self.app.execution_timer_factory.get_timer(
+            "internal.galaxy.jobs.handlers.evaluate_jobs",
+            "Evaluated ${job_count} jobs: ${dispatched} dispatched, ${waiting} waiting.",
+        )
+        dispatched = 0
         # Check resubmit jobs first so that limits of new jobs will still be enforced
         for job in resubmit_jobs:
             log.debug("(%s) Job was resubmitted and is being dispatched immediately", job.id)
             # Reassemble resubmit job destination from persisted value
             jw = self.__recover_job_wrapper(job)
             if jw.is_ready_for_resubmission(job):
-                self.increase_running_job_count(job.user_id, jw.job_destination.id)
+                self.increase_running_job_count(job.user_id, jw.job_destination.id, job.session_id)
                 self.dispatcher.put(jw)
         # Iterate over new and waiting jobs and look for any that are
         # ready to run
         new_waiting_jobs = []
+        ready_job_wrappers = []
         for job in jobs_to_check:
             try:
                 # Check the job's dependencies, requeue if they're not done.
@@ -570,8 +690,7 @@ class JobHandlerQueue(BaseJobHandlerQueue):
                 elif job_state == JOB_INPUT_DELETED:
                     log.info("(%d) Job unable to run: one or more inputs deleted", job.id)
                 elif job_state == JOB_READY:
-                    self.dispatcher.put(self.job_wrappers.pop(job.id))
-                    log.info("(%d) Job dispatched", job.id)
+                    ready_job_wrappers.append(self.job_wrappers.pop(job.id))
                 elif job_state == JOB_DELETED:
                     log.info("(%d) Job deleted by user while still queued", job.id)
                 elif job_state == JOB_ADMIN_DELETED:
@@ -593,12 +712,28 @@ class JobHandlerQueue(BaseJobHandlerQueue):
                     new_waiting_jobs.append(job.id)
             except Exception:
                 log.exception("failure running job %d", job.id)
+        # Dispatch ready jobs together so runners can queue jobs with the same destination in batches, the
+        # dispatcher deals with failures of individual jobs
+        if ready_job_wrappers:
+            self.dispatcher.put_many(ready_job_wrappers)
+            dispatched = len(ready_job_wrappers)
+            for job_wrapper in ready_job_wrappers:
+                log.info("(%d) Job dispatched", job_wrapper.job_id)
+        log.trace(
+            evaluate_timer.to_str(job_count=len(jobs_to_check), dispatched=dispatched, waiting=len(new_waiting_jobs))
+        )
         # Update the waiting list
         if not self.track_jobs_in_database:
             self.waiting_jobs = new_waiting_jobs
-        # Remove cached wrappers for any jobs that are no longer being tracked
-        for id in set(self.job_wrappers.keys()) - set(new_waiting_jobs):
+        # Remove cached wrappers for any jobs that are no longer being tracked. A step that only evaluated notified
+        # jobs can't tell whether the other jobs are still waiting, their wrappers are kept for the next full step.
+        tracked_job_ids = set(self.job_wrappers.keys())
+        if job_ids is not None:
+            tracked_job_ids &= job_ids
+        for id in tracked_job_ids - set(new_waiting_jobs):
             del self.job_wrappers[id]
+            if self.input_prefetcher:
+                self.input_prefetcher.discard(id)
         # Commit updated state
         self.sa_session.commit()
 
@@ -705,6 +840,7 @@ class JobHandlerQueue(BaseJobHandlerQueue):
         job_wrapper = self.job_wrappers.get(job_id, None)
         if not job_wrapper:
             job_wrapper = self.job_wrapper(job)
+            self.static_job_destinations.map(job_wrapper)
             self.job_wrappers[job_id] = job_wrapper
 
         # If state == JOB_READY, assume job_destination also set - otherwise
@@ -712,9 +848,13 @@ class JobHandlerQueue(BaseJobHandlerQueue):
         # destination has been set.
         state, job_destination = self.__verify_job_ready(job, job_wrapper)
 
+        if self.input_prefetcher and job_destination is not None and state in (JOB_READY, JOB_WAIT):
+            # inputs are ready and the job only waits for dispatch or concurrency limits, warm the caches meanwhile
+            self.input_prefetcher.prefetch(job)
+
         if state == JOB_READY:
             # PASS.  increase usage by one job (if caching) so that multiple jobs aren't dispatched on this queue iteration
-            self.increase_running_job_count(job.user_id, job_destination.id)
+            self.increase_running_job_count(job.user_id, job_destination.id, job.session_id)
             for job_to_input_dataset_association in job.input_datasets:
                 # We record the input dataset version, now that we know the inputs are ready
                 if job_to_input_dataset_association.dataset:
@@ -757,36 +897,11 @@ class JobHandlerQueue(BaseJobHandlerQueue):
             state = self.__check_user_jobs(job, job_wrapper)
         # Check total walltime limits
         if state == JOB_READY and "delta" in self.app.job_config.limits.total_walltime:
-            jobs_to_check = self.sa_session.query(model.Job).filter(
-                model.Job.update_time
-                >= datetime.datetime.now() - datetime.timedelta(self.app.job_config.limits.total_walltime["window"]),
-                model.Job.state == "ok",
-            )
-            if job.user_id:
-                jobs_to_check = jobs_to_check.filter(model.Job.user_id == job.user_id)
-            else:
-                jobs_to_check = jobs_to_check.filter(model.Job.session_id == job.session_id)
             time_spent = datetime.timedelta(0)
-            for job in jobs_to_check:
-                # History is job.state_history
-                started = None
-                finished = None
-                for history in sorted(job.state_history, key=lambda h: h.create_time):
-                    if history.state == "running":
-                        started = history.create_time
-                    elif history.state == "ok":
-                        finished = history.create_time
-
-                if started is not None and finished is not None:
-                    time_spent += finished - started
-                else:
-                    log.warning(
-                        "Unable to calculate time spent for job %s; started: %s, finished: %s",
-                        job.id,
-                        started,
-                        finished,
-                    )
-
+            if job.user_id:
+                time_spent = self.user_total_walltime.get(job.user_id, time_spent)
+            elif job.session_id:
+                time_spent = self.session_total_walltime.get(job.session_id, time_spent)
             if time_spent > self.app.job_config.limits.total_walltime["delta"]:
                 return JOB_USER_OVER_TOTAL_WALLTIME, job_destination
 
@@ -831,14 +946,63 @@ class JobHandlerQueue(BaseJobHandlerQueue):
         return None
 
     def __clear_job_count(self):
-        self.user_job_count = None
-        self.user_job_count_per_destination = None
-        self.total_job_count_per_destination = None
+        # Jobs dispatched during the current iteration, added to the counts from the ledger (or the database)
+        self.user_job_count: dict[int, int] = {}
+        self.user_job_count_per_destination: dict[Optional[int], dict[Optional[str], int]] = {}
+        self.total_job_count_per_destination: dict[Optional[str], int] = {}
+        self.session_job_count: dict[int, int] = {}
+        self.user_total_walltime: dict[int, datetime.timedelta] = {}
+        self.session_total_walltime: dict[int, datetime.timedelta] = {}
+
+    def __cache_session_job_count(self, jobs: list[model.Job]):
+        # Anonymous jobs are only subject to the hard limit, fetch the counts for all sessions at once
+        if self.app.job_config.limits.anonymous_user_concurrent_jobs is None:
+            return
+        session_ids = {job.session_id for job in jobs if not job.user_id and job.session_id}
+        self.session_job_count = get_session_active_job_counts(self.sa_session, session_ids)
+
+    def __cache_total_walltime(self, jobs: list[model.Job]):
+        total_walltime = self.app.job_config.limits.total_walltime
+        if "delta" not in total_walltime:
+            return
+        user_ids = {job.user_id for job in jobs if job.user_id}
+        session_ids = {job.session_id for job in jobs if not job.user_id and job.session_id}
+        since = datetime.datetime.now() - datetime.timedelta(total_walltime["window"])
+        self.user_total_walltime, self.session_total_walltime = get_total_walltime_by_owner(
+            self.sa_session, user_ids, session_ids, since
+        )
+
+    def __cache_quotas(self, jobs: list[model.Job]):
+        # Resolve the quotas of all users with jobs to check at once, the quota checks of the individual jobs are then
+        # answered from the quota cache.
+        if not (self.app.config.enable_quotas and self.app.config.quota_cache_ttl > 0):
+            return
+        user_ids = {job.user_id for job in jobs if job.user_id}
+        if not user_ids:
+            return
+        quota_source_map = self.app.object_store.get_quota_source_map()
+        for quota_source_label in {None, *quota_source_map.get_quota_source_labels()}:
+            self.app.quota_agent.get_quotas(user_ids, quota_source_label=quota_source_label)
+
+    def __limits_configured(self) -> bool:
+        limits = self.app.job_config.limits
+        return bool(
+            limits.registered_user_concurrent_jobs
+            or limits.anonymous_user_concurrent_jobs is not None
+            or limits.destination_user_concurrent_jobs
+            or limits.destination_total_concurrent_jobs
+        )
+
+    def __update_job_counts(self):
+        if self.__limits_configured():
+            self.job_count_ledger.update(self.sa_session)
 
     def get_user_job_count(self, user_id):
         # This could have been incremented by a previous job dispatched on this iteration, even if we're not caching
         rval = self.user_job_count.get(user_id, 0)
-        if not self.app.config.cache_user_job_count:
+        if self.app.config.cache_user_job_count:
+            rval += self.job_count_ledger.user_job_count.get(user_id, 0)
+        else:
             result = self.sa_session.execute(
                 select(func.count(model.Job.table.c.id)).where(
                     and_(
@@ -854,38 +1018,18 @@ class JobHandlerQueue(BaseJobHandlerQueue):
                 rval += row[0]
         return rval
 
-    def __cache_user_job_count(self):
-        # Cache the job count if necessary
-        if self.user_job_count is None and self.app.config.cache_user_job_count:
-            self.user_job_count = {}
-            query = self.sa_session.execute(
-                select(model.Job.table.c.user_id, func.count(model.Job.table.c.user_id))
-                .where(
-                    and_(
-                        model.Job.table.c.state.in_(
-                            (model.Job.states.QUEUED, model.Job.states.RUNNING, model.Job.states.RESUBMITTED)
-                        ),
-                        (model.Job.table.c.user_id != null()),
-                    )
-                )
-                .group_by(model.Job.table.c.user_id)
-            )
-            for row in query:
-                self.user_job_count[row[0]] = row[1]
-        elif self.user_job_count is None:
-            self.user_job_count = {}
-
     def get_user_job_count_per_destination(self, user_id):
-        cached = self.user_job_count_per_destination.get(user_id, {})
+        # The count for jobs dispatched on this iteration is always used, it
+        # is incremented when a job is run by this handler to ensure that
+        # multiple jobs can't get past the limits in one iteration of the
+        # queue.
+        rval = dict(self.user_job_count_per_destination.get(user_id, {}))
         if self.app.config.cache_user_job_count:
-            rval = cached
+            for destination_id, job_count in self.job_count_ledger.user_job_count_per_destination.get(
+                user_id, {}
+            ).items():
+                rval[destination_id] = rval.get(destination_id, 0) + job_count
         else:
-            # The cached count is still used even when we're not caching, it is
-            # incremented when a job is run by this handler to ensure that
-            # multiple jobs can't get past the limits in one iteration of the
-            # queue.
-            rval = {}
-            rval.update(cached)
             result = self.sa_session.execute(
                 select(
                     model.Job.table.c.destination_id, func.count(model.Job.table.c.destination_id).label("job_count")
@@ -903,36 +1047,14 @@ class JobHandlerQueue(BaseJobHandlerQueue):
                 rval[row["destination_id"]] = rval.get(row["destination_id"], 0) + row["job_count"]
         return rval
 
-    def __cache_user_job_count_per_destination(self):
-        # Cache the job count if necessary
-        if self.user_job_count_per_destination is None and self.app.config.cache_user_job_count:
-            self.user_job_count_per_destination = {}
-            result = self.sa_session.execute(
-                select(
-                    model.Job.table.c.user_id,
-                    model.Job.table.c.destination_id,
-                    func.count(model.Job.table.c.user_id).label("job_count"),
-                )
-                .where(and_(model.Job.table.c.state.in_((model.Job.states.QUEUED, model.Job.states.RUNNING))))
-                .group_by(model.Job.table.c.user_id, model.Job.table.c.destination_id)
-            )
-            for row in result.mappings():
-                if row["user_id"] not in self.user_job_count_per_destination:
-                    self.user_job_count_per_destination[row["user_id"]] = {}
-                self.user_job_count_per_destination[row["user_id"]][row["destination_id"]] = row["job_count"]
-        elif self.user_job_count_per_destination is None:
-            self.user_job_count_per_destination = {}
-
-    def increase_running_job_count(self, user_id, destination_id):
+    def increase_running_job_count(self, user_id, destination_id, session_id=None):
+        if not user_id and session_id and self.app.job_config.limits.anonymous_user_concurrent_jobs is not None:
+            self.session_job_count[session_id] = self.session_job_count.get(session_id, 0) + 1
         if (
             self.app.job_config.limits.registered_user_concurrent_jobs
             or self.app.job_config.limits.anonymous_user_concurrent_jobs
             or self.app.job_config.limits.destination_user_concurrent_jobs
         ):
-            if self.user_job_count is None:
-                self.user_job_count = {}
-            if self.user_job_count_per_destination is None:
-                self.user_job_count_per_destination = {}
             self.user_job_count[user_id] = self.user_job_count.get(user_id, 0) + 1
             if user_id not in self.user_job_count_per_destination:
                 self.user_job_count_per_destination[user_id] = {}
@@ -940,8 +1062,6 @@ class JobHandlerQueue(BaseJobHandlerQueue):
                 self.user_job_count_per_destination[user_id].get(destination_id, 0) + 1
             )
         if self.app.job_config.limits.destination_total_concurrent_jobs:
-            if self.total_job_count_per_destination is None:
-                self.total_job_count_per_destination = {}
             self.total_job_count_per_destination[destination_id] = (
                 self.total_job_count_per_destination.get(destination_id, 0) + 1
             )
@@ -957,6 +1077,8 @@ class JobHandlerQueue(BaseJobHandlerQueue):
                 # Check the user's number of dispatched jobs against the overall limit
                 if count >= self.app.job_config.limits.registered_user_concurrent_jobs:
                     return JOB_WAIT
+            if not self.app.job_config.limits.destination_user_concurrent_jobs:
+                return JOB_READY
             # If we pass the hard limit, also check the per-destination count
             id = job_wrapper.job_destination.id
             count_per_id = self.get_user_job_count_per_destination(job.user_id)
@@ -977,22 +1099,10 @@ class JobHandlerQueue(BaseJobHandlerQueue):
                             count += count_per_id.get(id, 0)
                         if count >= self.app.job_config.limits.destination_user_concurrent_jobs[tag]:
                             return JOB_WAIT
-        elif job.galaxy_session:
+        elif job.session_id:
             # Anonymous users only get the hard limit
             if self.app.job_config.limits.anonymous_user_concurrent_jobs is not None:
-                count = (
-                    self.sa_session.query(model.Job)
-                    .enable_eagerloads(False)
-                    .filter(
-                        and_(
-                            model.Job.session_id == job.galaxy_session.id,
-                            or_(
-                                model.Job.state == model.Job.states.RUNNING, model.Job.state == model.Job.states.QUEUED
-                            ),
-                        )
-                    )
-                    .count()
-                )
+                count = self.session_job_count.get(job.session_id, 0)
                 if count >= self.app.job_config.limits.anonymous_user_concurrent_jobs:
                     return JOB_WAIT
         else:
@@ -1001,25 +1111,14 @@ class JobHandlerQueue(BaseJobHandlerQueue):
             )
         return JOB_READY
 
-    def __cache_total_job_count_per_destination(self):
-        # Cache the job count if necessary
-        if self.total_job_count_per_destination is None:
-            self.total_job_count_per_destination = {}
-            result = self.sa_session.execute(
-                select(
-                    model.Job.table.c.destination_id, func.count(model.Job.table.c.destination_id).label("job_count")
-                )
-                .where(and_(model.Job.table.c.state.in_((model.Job.states.QUEUED, model.Job.states.RUNNING))))
-                .group_by(model.Job.table.c.destination_id)
-            )
-            for row in result.mappings():
-                self.total_job_count_per_destination[row["destination_id"]] = row["job_count"]
-
     def get_total_job_count_per_destination(self):
-        # Always use caching (at worst a job will have to wait one iteration,
+        # Always use the ledger (at worst a job will have to wait one iteration,
         # and this would be more fair anyway as it ensures FIFO scheduling,
         # insofar as FIFO would be fair...)
-        return self.total_job_count_per_destination
+        rval = dict(self.job_count_ledger.total_job_count_per_destination)
+        for destination_id, job_count in self.total_job_count_per_destination.items():
+            rval[destination_id] = rval.get(destination_id, 0) + job_count
+        return rval
 
     def __check_destination_jobs(self, job, job_wrapper):
         if self.app.job_config.limits.destination_total_concurrent_jobs:
@@ -1063,6 +1162,8 @@ class JobHandlerQueue(BaseJobHandlerQueue):
             # A message could still be received while shutting down, should be ok since they will be picked up on next startup.
             self.sleeper.wake()
             self.shutdown_monitor()
+            if self.input_prefetcher:
+                self.input_prefetcher.shutdown()
             log.info("job handler queue stopped")
             self.dispatcher.shutdown()
 
@@ -1092,11 +1193,12 @@ class JobHandlerStopQueue(BaseJobHandlerQueue):
         time.sleep(10)
         while self.monitor_running:
             try:
+                self._pop_notified_job_ids()
                 self.__monitor_step()
             except Exception:
                 log.exception("Exception in monitor_step")
             # Sleep
-            self._monitor_sleep(1)
+            self._wait_for_notification(1)
 
     def __delete(self, job: model.Job, error_msg: Optional[str]):
         final_state = job.states.DELETED
@@ -1198,6 +1300,22 @@ class JobHandlerStopQueue(BaseJobHandlerQueue):
                 self.dispatcher.stop(job, job_wrapper)
 
 
+def send_job_handler_notification(
+    app: MinimalManagerApp, handler_job_ids: dict[str, list[int]], stop: bool = False
+) -> None:
+    """Ask job handlers in other processes to re-evaluate (or, if ``stop`` is set, stop) their jobs immediately.
+
+    ``handler_job_ids`` maps handler ids to the ids of their jobs. Notifications are sent over the control message
+    queue to the processes of these handlers only. Processes without a control message queue worker (e.g. Celery
+    workers) can't notify other processes, their handlers pick up the jobs in their next full monitor step.
+    """
+    if (queue_worker := getattr(app, "queue_worker", None)) is not None:
+        queue_worker.send_control_task_to_servers(
+            "wake_job_handler",
+            {handler: {"job_ids": job_ids, "stop": stop} for handler, job_ids in handler_job_ids.items()},
+        )
+
+
 class DefaultJobDispatcher:
     def __init__(self, app: MinimalManagerApp):
         self.app = app
@@ -1242,16 +1360,59 @@ class DefaultJobDispatcher:
         return runner
 
     def put(self, job_wrapper):
-        runner = self.get_job_runner(job_wrapper, get_task_runner=True)
+        runner = self.__get_dispatch_runner(job_wrapper)
         if runner is None:
             # Something went wrong, we've already failed the job wrapper
             return
+        runner.put(job_wrapper)
+
+    def put_many(self, job_wrappers):
+        """
+        Dispatch several jobs, the jobs of each runner are passed to the runner at once. If a runner fails
+        to take the whole batch, the jobs it didn't queue yet are dispatched individually, jobs that still
+        can't be dispatched are failed.
+        """
+        runner_job_wrappers = defaultdict(list)
+        for job_wrapper in job_wrappers:
+            try:
+                runner = self.__get_dispatch_runner(job_wrapper)
+            except Exception:
+                self.__fail_dispatch(job_wrapper)
+                continue
+            if runner is not None:
+                runner_job_wrappers[runner].append(job_wrapper)
+        for runner, wrappers in runner_job_wrappers.items():
+            try:
+                runner.put_many(wrappers)
+            except Exception:
+                log.exception(
+                    f"Failure dispatching {len(wrappers)} jobs to {runner.runner_name}, dispatching individually"
+                )
+                for job_wrapper in wrappers:
+                    try:
+                        # Jobs are moved out of the new state once the runner accepted them
+                        if job_wrapper.get_state() == model.Job.states.NEW:
+                            runner.put(job_wrapper)
+                    except Exception:
+                        self.__fail_dispatch(job_wrapper)
+
+    def __fail_dispatch(self, job_wrapper):
+        log.exception(f"({job_wrapper.job_id}) Failure dispatching job")
+        try:
+            job_wrapper.fail(DEFAULT_JOB_RUNNER_FAILURE_MESSAGE, exception=True)
+        except Exception:
+            log.exception(f"({job_wrapper.job_id}) Failure failing job after dispatch error")
+
+    def __get_dispatch_runner(self, job_wrapper):
+        runner = self.get_job_runner(job_wrapper, get_task_runner=True)
+        if runner is None:
+            return None
         if isinstance(job_wrapper, TaskWrapper):
             # DBTODO Refactor
             log.debug(f"({job_wrapper.job_id}) Dispatching task {job_wrapper.task_id} to task runner")
         else:
             log.debug(f"({job_wrapper.job_id}) Dispatching to {job_wrapper.job_destination.runner} runner")
-        runner.put(job_wrapper)
+        return runner
 
     def stop(self, job: model.Job, job_wrapper: JobWrapper) -> None:
         """
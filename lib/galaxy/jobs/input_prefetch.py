@@ -0,0 +1,175 @@
+"""
+Prefetching of job inputs into object store caches while jobs wait to be dispatched, used by job handlers.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor,
+)
+from functools import partial
+from typing import (
+    Optional,
+    TYPE_CHECKING,
+)
+
+from galaxy import model
+
+if TYPE_CHECKING:
+    from galaxy.objectstore import BaseObjectStore
+    from galaxy.web.statsd_client import GalaxyStatsdClient
+
+log = logging.getLogger(__name__)
+
+LEAD_TIME_METRIC = "internals.galaxy.jobs.input_prefetch.lead_time"
+DURATION_METRIC = "internals.galaxy.jobs.input_prefetch.duration"
+# prefetches of jobs that are neither prepared nor discarded within this many seconds are no longer tracked
+PREFETCH_EXPIRY = 3600
+
+
+class PrefetchDataset:
+    """The attributes identifying an input dataset in the object store.
+
+    Prefetch threads use these instead of the model object, which belongs to the job handler's session.
+    """
+
+    def __init__(self, dataset: model.Dataset) -> None:
+        self.id = dataset.id
+        self.uuid = dataset.uuid
+        self.object_store_id = dataset.object_store_id
+
+
+class JobInputPrefetch:
+    """Prefetch of the inputs of a single job."""
+
+    def __init__(self, job_id: int, pending: int) -> None:
+        self.job_id = job_id
+        self.pending = pending
+        self.fetched = 0
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        # time the job wrapper started to prepare the job and needed the inputs
+        self.needed: Optional[float] = None
+
+
+class JobInputPrefetcher:
+    """Fetch the inputs of jobs into object store caches before the jobs are prepared.
+
+    Job handlers hand jobs to the prefetcher as soon as their inputs are ready and the destination is known, including
+    jobs that still wait for concurrency limits, and the input datasets are fetched concurrently on a thread pool.
+    When the job is prepared, the inputs are then read from warm caches. Downloads of an input that is still being
+    prefetched wait for the prefetch instead of fetching the input again.
+
+    The lead time, i.e. the time between the inputs of a job being fetched and the job needing them, is reported as a
+    statsd timing. It is negative if the job had to wait for the prefetch.
+
+    Prefetches are tracked until the job is prepared or discarded. Jobs can also go away without either, e.g. when they
+    are deleted after being dispatched, so prefetches expire after ``PREFETCH_EXPIRY`` seconds. Jobs still waiting by
+    then are prefetched again, which finds their inputs in the caches.
+    """
+
+    def __init__(
+        self,
+        object_store: "BaseObjectStore",
+        concurrency: int,
+        statsd_client: Optional["GalaxyStatsdClient"] = None,
+    ) -> None:
+        self.object_store = object_store
+        self.statsd_client = statsd_client
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="job_input_prefetch")
+        self._prefetches: dict[int, JobInputPrefetch] = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, job: model.Job) -> None:
+        """Start fetching the inputs of ``job``, unless they are being or have been fetched already."""
+        if job.id in self._prefetches:
+            return
+        datasets = self._input_datasets(job)
+        if not datasets:
+            return
+        prefetch = JobInputPrefetch(job.id, len(datasets))
+        with self._lock:
+            self._expire(prefetch.started - PREFETCH_EXPIRY)
+            self._prefetches[job.id] = prefetch
+        log.debug("(%s) Prefetching %d job inputs", job.id, len(datasets))
+        for dataset in datasets:
+            future = self._executor.submit(self.object_store.prefetch, dataset)
+            future.add_done_callback(partial(self._done, prefetch, dataset))
+
+    def inputs_needed(self, job_id: int) -> None:
+        """Record that the job is being prepared and stop tracking its prefetch."""
+        with self._lock:
+            prefetch = self._prefetches.pop(job_id, None)
+            if prefetch is None:
+                return
+            prefetch.needed = time.monotonic()
+            finished = prefetch.finished
+        if finished is not None:
+            self._report_lead_time(prefetch, prefetch.needed - finished)
+
+    def discard(self, job_id: int) -> None:
+        """Stop tracking the prefetch of a job that won't run."""
+        with self._lock:
+            self._prefetches.pop(job_id, None)
+
+    def _expire(self, started_before: float) -> None:
+        # prefetches are tracked in the order they were started
+        while self._prefetches:
+            job_id, prefetch = next(iter(self._prefetches.items()))
+            if prefetch.started >= started_before:
+                break
+            del self._prefetches[job_id]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _input_datasets(job: model.Job) -> list[PrefetchDataset]:
+        datasets: dict[int, PrefetchDataset] = {}
+        for dataset_assoc in job.input_datasets + job.input_library_datasets:
+            dataset_instance = dataset_assoc.dataset
+            if dataset_instance is None:
+                continue
+            dataset = dataset_instance.dataset
+            if dataset is None or dataset.purged or dataset.external_filename or dataset.id in datasets:
+                continue
+            datasets[dataset.id] = PrefetchDataset(dataset)
+        return list(datasets.values())
+
+    def _done(self, prefetch: JobInputPrefetch, dataset: PrefetchDataset, future: "Future[bool]") -> None:
+        if future.cancelled():
+            return
+        exception = future.exception()
+        if exception:
+            log.warning("(%s) Failed to prefetch input dataset %s: %s", prefetch.job_id, dataset.id, exception)
+        with self._lock:
+            if not exception and future.result():
+                prefetch.fetched += 1
+            prefetch.pending -= 1
+            if prefetch.pending:
+                return
+        self._finish(prefetch)
+
+    def _finish(self, prefetch: JobInputPrefetch) -> None:
+        with self._lock:
+            prefetch.finished = time.monotonic()
+            needed = prefetch.needed
+        duration = prefetch.finished - prefetch.started
+        log.debug(
+            "(%s) Prefetched job inputs in %0.3f seconds, %d fetched into cache",
+            prefetch.job_id,
+            duration,
+            prefetch.fetched,
+        )
+        if self.statsd_client:
+            self.statsd_client.timing(DURATION_METRIC, duration * 1000.0)
+        if needed is not None:
+            # the job was prepared before its inputs had been fetched
+            self._report_lead_time(prefetch, needed - prefetch.finished)
+
+    def _report_lead_time(self, prefetch: JobInputPrefetch, lead_time: float) -> None:
+        log.debug("(%s) Job inputs prefetched %0.3f seconds before they were needed", prefetch.job_id, lead_time)
+        if self.statsd_client:
+            self.statsd_client.timing(LEAD_TIME_METRIC, lead_time * 1000.0)
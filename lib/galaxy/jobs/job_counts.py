@@ -0,0 +1,102 @@
+"""
+Incrementally maintained counts of dispatched jobs, used by job handlers to check concurrency limits.
+"""
+
+import datetime
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import scoped_session
+
+from galaxy import model
+from galaxy.model.orm.now import now
+
+log = logging.getLogger(__name__)
+
+# States counted against per-user limits
+USER_COUNTED_STATES = (model.Job.states.QUEUED, model.Job.states.RUNNING, model.Job.states.RESUBMITTED)
+# States counted against per-destination limits
+DESTINATION_COUNTED_STATES = (model.Job.states.QUEUED, model.Job.states.RUNNING)
+
+# Jobs updated within this many seconds before the previous update are read again, so that transactions which were not
+# yet committed at the time of the previous update are not missed.
+DEFAULT_UPDATE_OVERLAP = 60.0
+
+JobCountKey = tuple[Optional[int], Optional[str], str]
+
+
+class JobCountLedger:
+    """Counts of queued and running jobs per user, per user and destination, and per destination.
+
+    Rather than aggregating over the job table whenever counts are needed, the ledger tracks each counted job and is
+    updated from the jobs whose ``update_time`` changed since the previous update. Every ``reconcile_interval``
+    seconds the ledger is rebuilt from all counted jobs to correct any drift.
+    """
+
+    def __init__(self, reconcile_interval: float, update_overlap: float = DEFAULT_UPDATE_OVERLAP) -> None:
+        self.reconcile_interval = reconcile_interval
+        self.update_overlap = datetime.timedelta(seconds=update_overlap)
+        self.user_job_count: dict[int, int] = {}
+        self.user_job_count_per_destination: dict[Optional[int], dict[Optional[str], int]] = {}
+        self.total_job_count_per_destination: dict[Optional[str], int] = {}
+        self._jobs: dict[int, JobCountKey] = {}
+        self._last_update: Optional[datetime.datetime] = None
+        self._next_reconcile = 0.0
+
+    def update(self, sa_session: scoped_session) -> None:
+        """Apply job state changes since the previous update, or rebuild the ledger if reconciliation is due."""
+        update_time = now()
+        if self._last_update is None or time.monotonic() >= self._next_reconcile:
+            self.reconcile(sa_session)
+        else:
+            stmt = select(model.Job.id, model.Job.user_id, model.Job.destination_id, model.Job.state).where(
+                model.Job.update_time >= self._last_update - self.update_overlap
+            )
+            for job_id, user_id, destination_id, state in sa_session.execute(stmt):
+                self.record(job_id, user_id, destination_id, state)
+        self._last_update = update_time
+
+    def reconcile(self, sa_session: scoped_session) -> None:
+        """Rebuild the ledger from all jobs in a counted state."""
+        stmt = select(model.Job.id, model.Job.user_id, model.Job.destination_id, model.Job.state).where(
+            model.Job.state.in_(USER_COUNTED_STATES)
+        )
+        previous_job_count = len(self._jobs)
+        self._jobs = {}
+        self.user_job_count = {}
+        self.user_job_count_per_destination = {}
+        self.total_job_count_per_destination = {}
+        for job_id, user_id, destination_id, state in sa_session.execute(stmt):
+            self.record(job_id, user_id, destination_id, state)
+        self._next_reconcile = time.monotonic() + self.reconcile_interval
+        log.debug("Reconciled job counts, %d counted jobs (previously %d)", len(self._jobs), previous_job_count)
+
+    def record(self, job_id: int, user_id: Optional[int], destination_id: Optional[str], state: str) -> None:
+        """Record the current state of a job, replacing any previously recorded state."""
+        previous = self._jobs.pop(job_id, None)
+        if previous is not None:
+            self._count(*previous, increment=-1)
+        if state in USER_COUNTED_STATES:
+            key = (user_id, destination_id, state)
+            self._jobs[job_id] = key
+            self._count(*key, increment=1)
+
+    def _count(self, user_id: Optional[int], destination_id: Optional[str], state: str, increment: int) -> None:
+        if user_id is not None:
+            _increment(self.user_job_count, user_id, increment)
+        if state in DESTINATION_COUNTED_STATES:
+            user_counts = self.user_job_count_per_destination.setdefault(user_id, {})
+            _increment(user_counts, destination_id, increment)
+            if not user_counts:
+                del self.user_job_count_per_destination[user_id]
+            _increment(self.total_job_count_per_destination, destination_id, increment)
+
+
+def _increment(counts: dict, key, increment: int) -> None:
+    count = counts.get(key, 0) + increment
+    if count > 0:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
@@ -3,6 +3,8 @@ Top-level Galaxy job manager, moves jobs to handler(s)
 """
 
 import logging
+from collections import defaultdict
+from collections.abc import Iterable
 from functools import partial
 from typing import (
     TYPE_CHECKING,
@@ -17,6 +19,7 @@ from galaxy.jobs import (
     handler,
     NoopQueue,
 )
+from galaxy.managers.jobs import get_new_dependent_jobs
 from galaxy.structured_app import MinimalManagerApp
 from galaxy.web_stack.message import JobHandlerMessage
 
@@ -103,6 +106,28 @@ class JobManager:
         :type message:  str
         """
         self.job_handler.job_stop_queue.put(job.id, error_msg=message)
+        if self.app.config.job_handler_notifications and job.handler:
+            self._notify_job_handlers({job.handler: [job.id]}, stop=True)
+
+    def notify_dependent_jobs(self, job_ids: Iterable[int]) -> None:
+        """Wake the handlers of new jobs that consume outputs of the given (finished) jobs.
+
+        Handlers of this process are notified directly, handlers in other processes over the control message queue.
+        """
+        handler_job_ids: dict[str, list[int]] = defaultdict(list)
+        for dependent_job_id, job_handler in get_new_dependent_jobs(self.app.model.context, job_ids):
+            if job_handler:
+                handler_job_ids[job_handler].append(dependent_job_id)
+        if handler_job_ids:
+            self._notify_job_handlers(handler_job_ids)
+
+    def _notify_job_handlers(self, handler_job_ids: dict[str, list[int]], stop: bool = False) -> None:
+        handler_job_ids = dict(handler_job_ids)
+        if local_job_ids := handler_job_ids.pop(self.app.config.server_name, None):
+            queue = self.job_handler.job_stop_queue if stop else self.job_handler.job_queue
+            queue.notify(local_job_ids)
+        if handler_job_ids:
+            handler.send_job_handler_notification(self.app, handler_job_ids, stop=stop)
 
     def shutdown(self):
         self.job_handler.shutdown()
@@ -122,6 +147,9 @@ class NoopManager:
     def stop(self, *args, **kwargs):
         pass
 
+    def notify_dependent_jobs(self, *args, **kwargs):
+        pass
+
 
 class NoopHandler(handler.JobHandlerI):
     """
@@ -2,6 +2,8 @@
 Base classes for job runner plugins.
 """
 
+import asyncio
+import contextvars
 import datetime
 import os
 import string
@@ -11,8 +13,10 @@ import threading
 import time
 import traceback
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from queue import (
     Empty,
+    Full,
     Queue,
 )
 from typing import (
@@ -101,7 +105,12 @@ class BaseJobRunner:
     runner_name = "BaseJobRunner"
 
     start_methods = ["_init_monitor_thread", "_init_worker_threads"]
-    DEFAULT_SPECS = dict(recheck_missing_job_retries=dict(map=int, valid=lambda x: int(x) >= 0, default=0))
+    DEFAULT_SPECS = dict(
+        recheck_missing_job_retries=dict(map=int, valid=lambda x: int(x) >= 0, default=0),
+        finish_workers=dict(map=int, valid=lambda x: int(x) >= 0, default=0),
+        finish_queue_size=dict(map=int, valid=lambda x: int(x) >= 0, default=0),
+        queue_batch_size=dict(map=int, valid=lambda x: int(x) >= 1, default=1),
+    )
 
     def __init__(self, app: "GalaxyManagerApplication", nworkers: int, **kwargs) -> None:
         """Start the job runner"""
@@ -132,6 +141,30 @@ class BaseJobRunner:
             worker.daemon = True
             worker.start()
             self.work_threads.append(worker)
+        self._init_finish_threads()
+
+    def _init_finish_threads(self):
+        """
+        Start the ``finish_workers`` threads that finish and fail jobs, if
+        configured. Otherwise jobs are finished by the job worker threads.
+        """
+        finish_workers = self.runner_params.finish_workers
+        self.finish_threads: list[threading.Thread] = []
+        if not finish_workers:
+            self.finish_queue = self.work_queue
+            return
+        # A bounded finish queue blocks the threads reporting finished jobs
+        # (usually the monitor thread) while the finish workers catch up.
+        self.finish_queue = Queue(maxsize=self.runner_params.finish_queue_size)
+        log.debug(f"Starting {finish_workers} {self.runner_name} finish workers")
+        for i in range(finish_workers):
+            worker = threading.Thread(
+                name=f"{self.runner_name}.finish_thread-{i}", target=self.run_next, args=(self.finish_queue,)
+            )
+            worker.daemon = True
+            worker.start()
+            self.finish_threads.append(worker)
+            self.work_threads.append(worker)
 
     def _alive_worker_threads(self, cycle=False):
         # yield endlessly as long as there are alive threads if cycle is True
@@ -144,19 +177,26 @@ class BaseJobRunner:
                         alive = True
                     yield thread
 
-    def run_next(self) -> None:
+    def run_next(self, work_queue: Optional[Queue] = None) -> None:
         """Run the next item in the work queue (a job waiting to run)"""
+        work_queue = work_queue or self.work_queue
         while self._should_stop is False:
             with self.app.model.session():  # Create a Session instance and ensure it's closed.
                 try:
-                    method, arg = self.work_queue.get(timeout=1)
+                    method, arg = work_queue.get(timeout=1)
                 except Empty:
                     continue
                 if method is STOP_SIGNAL:
                     return
+                if work_queue is not self.work_queue:
+                    self._report_finish_queue_depth()
+                # A batch of jobs is queued with queue_jobs
+                items = arg if isinstance(arg, list) else [arg]
                 # id and name are collected first so that the call of method() is the last exception.
                 try:
-                    if isinstance(arg, AsynchronousJobState):
+                    if isinstance(arg, list):
+                        job_id = ",".join(str(job_wrapper.get_id_tag()) for job_wrapper in arg)
+                    elif isinstance(arg, AsynchronousJobState):
                         job_id = arg.job_wrapper.get_id_tag()
                     else:
                         # arg should be a JobWrapper/TaskWrapper
@@ -169,7 +209,8 @@ class BaseJobRunner:
                     name = UNKNOWN
 
                 # Ensure a Job object belongs to a session
-                self._ensure_db_session(arg)
+                for item in items:
+                    self._ensure_db_session(item)
 
                 try:
                     action_str = f"galaxy.jobs.runners.{self.__class__.__name__.lower()}.{name}"
@@ -180,13 +221,14 @@ class BaseJobRunner:
                     log.trace(action_timer.to_str(job_id=job_id))
                 except Exception:
                     log.exception(f"({job_id}) Unhandled exception calling {name}")
-                    if not isinstance(arg, JobState):
-                        job_state = JobState(job_wrapper=arg, job_destination=JobDestination())
-                    else:
-                        job_state = arg
-                    if method != self.fail_job:
-                        # Prevent fail_job cycle in the work_queue
-                        self.work_queue.put((self.fail_job, job_state))
+                    for item in items:
+                        if not isinstance(item, JobState):
+                            job_state = JobState(job_wrapper=item, job_destination=JobDestination())
+                        else:
+                            job_state = item
+                        if method != self.fail_job:
+                            # Prevent fail_job cycle in the work_queue
+                            self.work_queue.put((self.fail_job, job_state))
 
     def _ensure_db_session(self, arg: Union["JobWrapper", "JobState"]) -> None:
         """Ensure Job object belongs to current session."""
@@ -203,24 +245,94 @@ class BaseJobRunner:
     # Causes a runner's `queue_job` method to be called from a worker thread
     def put(self, job_wrapper: "MinimalJobWrapper") -> None:
         """Add a job to the queue (by job identifier), indicate that the job is ready to run."""
+        if self._enqueue(job_wrapper):
+            self.mark_as_queued(job_wrapper)
+
+    def put_many(self, job_wrappers: list["MinimalJobWrapper"]) -> None:
+        """
+        Add several jobs to the queue. If the ``queue_batch_size`` runner
+        parameter is greater than 1, jobs with the same destination are
+        passed to ``queue_jobs`` in batches of up to that many jobs.
+        """
+        batch_size = self.runner_params.queue_batch_size
+        batches: dict[Optional[str], list[MinimalJobWrapper]] = {}
+        for job_wrapper in job_wrappers:
+            try:
+                queue_job = self._enqueue(job_wrapper)
+            except Exception:
+                log.exception(f"({job_wrapper.get_id_tag()}) Unhandled exception enqueueing job")
+                self.work_queue.put(
+                    (self.fail_job, JobState(job_wrapper=job_wrapper, job_destination=JobDestination()))
+                )
+                continue
+            if not queue_job:
+                continue
+            if batch_size <= 1:
+                self.mark_as_queued(job_wrapper)
+                continue
+            batch = batches.setdefault(job_wrapper.job_destination.id, [])
+            batch.append(job_wrapper)
+            if len(batch) >= batch_size:
+                self.work_queue.put((self.queue_jobs, batches.pop(job_wrapper.job_destination.id)))
+        for batch in batches.values():
+            self.work_queue.put((self.queue_jobs, batch))
+
+    def _enqueue(self, job_wrapper: "MinimalJobWrapper") -> bool:
         put_timer = ExecutionTimer()
         try:
             queue_job = job_wrapper.enqueue()
         except Exception as e:
-            queue_job = False
             # Required for exceptions thrown by object store incompatibility.
             # tested by test/integration/objectstore/test_private_handling.py
             message = e.client_message if hasattr(e, "client_message") else str(e)
             job_wrapper.fail(message, exception=e)
             log.debug(f"Job [{job_wrapper.job_id}] failed to queue {put_timer}")
-            return
+            return False
         if queue_job:
-            self.mark_as_queued(job_wrapper)
             log.debug(f"Job [{job_wrapper.job_id}] queued {put_timer}")
+        return queue_job
 
     def mark_as_queued(self, job_wrapper: "MinimalJobWrapper"):
         self.work_queue.put((self.queue_job, job_wrapper))
 
+    def _put_finishing(self, item: tuple) -> None:
+        if threading.current_thread() in self.finish_threads:
+            # Already finishing this job (e.g. failing it after output collection failed), waiting for the
+            # finish queue from a finish worker could deadlock.
+            method, arg = item
+            method(arg)
+            return
+        if self.finish_queue.full():
+            log.debug(
+                "%s: finish queue is full (%d jobs), waiting for finish workers",
+                self.runner_name,
+                self.finish_queue.qsize(),
+            )
+        while True:
+            try:
+                self.finish_queue.put(item, timeout=1)
+                break
+            except Full:
+                if self._should_stop:
+                    # Finish workers are gone, the job is picked up again by job recovery on restart
+                    method, arg = item
+                    log.warning(
+                        "%s: runner is shutting down, not calling %s for job %s",
+                        self.runner_name,
+                        method.__name__,
+                        arg.job_wrapper.get_id_tag(),
+                    )
+                    return
+        if self.finish_queue is not self.work_queue:
+            self._report_finish_queue_depth()
+
+    def _report_finish_queue_depth(self) -> None:
+        if statsd_client := self.app.execution_timer_factory.galaxy_statsd_client:
+            statsd_client.gauge(
+                f"internals.galaxy.jobs.runners.{self.__class__.__name__.lower()}.finish_queue_depth",
+                self.finish_queue.qsize(),
+            )
+
     def shutdown(self):
         """Attempts to gracefully shut down the worker threads"""
         log.info("%s: Sending stop signal to %s job worker threads", self.runner_name, len(self.work_threads))
@@ -328,6 +440,21 @@ class BaseJobRunner:
     def queue_job(self, job_wrapper: "MinimalJobWrapper") -> None:
         raise NotImplementedError()
 
+    def queue_jobs(self, job_wrappers: list["MinimalJobWrapper"]) -> None:
+        """
+        Queue a batch of jobs with the same destination (see ``put_many``).
+        Runners that can share work between jobs or submit many jobs at once
+        should override this, by default each job is queued with queue_job.
+        """
+        for job_wrapper in job_wrappers:
+            try:
+                self.queue_job(job_wrapper)
+            except Exception:
+                log.exception(f"({job_wrapper.get_id_tag()}) Unhandled exception calling queue_job")
+                self.work_queue.put(
+                    (self.fail_job, JobState(job_wrapper=job_wrapper, job_destination=JobDestination()))
+                )
+
     def stop_job(self, job_wrapper):
         raise NotImplementedError()
 
@@ -585,10 +712,20 @@ class BaseJobRunner:
 
         destination_info = job_wrapper.job_destination.params
         container = self.app.container_finder.find_container(tool_info, destination_info, job_info)
+        self._report_container_resolution_cache_stats()
         if container:
             job_wrapper.set_container(container)
         return container
 
+    def _report_container_resolution_cache_stats(self) -> None:
+        cache = self.app.container_finder.container_resolution_cache
+        if cache is None:
+            return
+        if statsd_client := self.app.execution_timer_factory.galaxy_statsd_client:
+            stats = cache.stats()
+            statsd_client.gauge("internals.galaxy.jobs.container_resolution_cache.hit_rate", stats["hit_rate"])
+            statsd_client.gauge("internals.galaxy.jobs.container_resolution_cache.size", stats["size"])
+
     def _handle_runner_state(self, runner_state, job_state: "JobState"):
         try:
             for handler in self.runner_state_handlers.get(runner_state, []):
@@ -865,6 +1002,10 @@ class AsynchronousJobRunner(BaseJobRunner, Monitors, Generic[T]):
     watched: list[T]
 
     def __init__(self, app: "GalaxyManagerApplication", nworkers: int, **kwargs) -> None:
+        # Copy the specs, some runners pass a module level dictionary
+        runner_param_specs = dict(kwargs.get("runner_param_specs", {}))
+        runner_param_specs["monitor_concurrency"] = dict(map=int, valid=lambda x: int(x) >= 1, default=1)
+        kwargs["runner_param_specs"] = runner_param_specs
         super().__init__(app, nworkers, **kwargs)
         # 'watched' and 'queue' are both used to keep track of jobs to watch.
         # 'queue' is used to add new watched jobs, and can be called from
@@ -887,18 +1028,17 @@ class AsynchronousJobRunner(BaseJobRunner, Monitors, Generic[T]):
         Watches jobs currently in the monitor queue and deals with state
         changes (queued to running) and job completion.
         """
+        if self.runner_params.monitor_concurrency > 1:
+            if self._checks_watched_items_individually():
+                asyncio.run(self.monitor_async())
+                return
+            log.warning(
+                "%s checks watched jobs in bulk, ignoring monitor_concurrency runner parameter", self.runner_name
+            )
         while True:
             # Take any new watched jobs and put them on the monitor list
-            try:
-                while True:
-                    async_job_state = self.monitor_queue.get_nowait()
-                    if async_job_state is STOP_SIGNAL:
-                        # TODO: This is where any cleanup would occur
-                        self.handle_stop()
-                        return
-                    self.watched.append(async_job_state)
-            except Empty:
-                pass
+            if not self._watch_queued_jobs():
+                return
             # Ideally we'd construct a sqlalchemy session now and pass it into `check_watched_items`
             # and have that be the only session being used. The next best thing is to scope
             # the session and discard it after each check_watched_item loop
@@ -915,6 +1055,99 @@ class AsynchronousJobRunner(BaseJobRunner, Monitors, Generic[T]):
             # Sleep a bit before the next state check
             time.sleep(self.monitor_sleep_time)
 
+    async def monitor_async(self) -> None:
+        """
+        Variant of ``monitor`` used if the ``monitor_concurrency`` runner
+        parameter is greater than 1. Up to ``monitor_concurrency`` calls of
+        ``check_watched_item`` run concurrently in a thread pool, each with its
+        own database session. A job whose check has not completed by the end
+        of a monitor iteration stays watched and its pending check is picked
+        up in a later iteration, so a slow call does not hold up the checks of
+        other jobs.
+        """
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(
+            max_workers=self.runner_params.monitor_concurrency, thread_name_prefix=f"{self.runner_name}.monitor"
+        )
+        pending_checks: dict[int, asyncio.Future] = {}
+        try:
+            while self._watch_queued_jobs():
+                scoped_id = str(uuid.uuid4())
+                self.app.model.set_request_id(scoped_id)
+                try:
+                    check_database_connection(self.sa_session)
+                except Exception:
+                    log.exception("Unhandled exception checking database connection")
+                finally:
+                    self.app.model.unset_request_id(scoped_id)
+                for async_job_state in self.watched:
+                    if id(async_job_state) not in pending_checks:
+                        context = contextvars.copy_context()
+                        pending_checks[id(async_job_state)] = loop.run_in_executor(
+                            executor, context.run, self._check_watched_item_scoped, async_job_state
+                        )
+                if pending_checks:
+                    await asyncio.wait(pending_checks.values(), timeout=self.monitor_sleep_time)
+                self.watched = self._collect_watched_item_checks(self.watched, pending_checks)
+                await asyncio.sleep(self.monitor_sleep_time)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _watch_queued_jobs(self) -> bool:
+        """
+        Move new jobs from the monitor queue to the watched jobs, returns
+        False if the monitor has been asked to stop.
+        """
+        try:
+            while True:
+                async_job_state = self.monitor_queue.get_nowait()
+                if async_job_state is STOP_SIGNAL:
+                    # TODO: This is where any cleanup would occur
+                    self.handle_stop()
+                    return False
+                self.watched.append(async_job_state)
+        except Empty:
+            pass
+        return True
+
+    def _checks_watched_items_individually(self) -> bool:
+        runner_class = type(self)
+        return (
+            runner_class.check_watched_items is AsynchronousJobRunner.check_watched_items
+            and runner_class.check_watched_items_bulk is AsynchronousJobRunner.check_watched_items_bulk
+        )
+
+    def _check_watched_item_scoped(self, job_state: T) -> Union[T, None]:
+        scoped_id = str(uuid.uuid4())
+        self.app.model.set_request_id(scoped_id)
+        try:
+            return self.check_watched_item(job_state)
+        finally:
+            self.app.model.unset_request_id(scoped_id)
+
+    def _collect_watched_item_checks(self, job_states: list[T], pending_checks: dict[int, asyncio.Future]) -> list[T]:
+        new_watched = []
+        for async_job_state in job_states:
+            check = pending_checks[id(async_job_state)]
+            if not check.done():
+                new_watched.append(async_job_state)
+                continue
+            del pending_checks[id(async_job_state)]
+            exception = check.exception()
+            if exception is not None:
+                log.error(
+                    "(%s/%s) Unhandled exception checking active job",
+                    async_job_state.job_wrapper.get_id_tag(),
+                    async_job_state.job_id,
+                    exc_info=exception,
+                )
+                new_watched.append(async_job_state)
+                continue
+            new_async_job_state = check.result()
+            if new_async_job_state:
+                new_watched.append(new_async_job_state)
+        return new_watched
+
     @property
     def monitor_sleep_time(self):
         return self.app.config.job_runner_monitor_sleep
@@ -935,15 +1168,26 @@ class AsynchronousJobRunner(BaseJobRunner, Monitors, Generic[T]):
         This method is responsible for iterating over self.watched and handling
         state changes and updating self.watched with a new list of watched job
         states. Subclasses can opt to override this directly (as older job runners will
-        initially) or just override check_watched_item and allow the list processing to
+        initially), override check_watched_items_bulk to check all watched jobs at once,
+        or just override check_watched_item and allow the list processing to
         reuse the logic here.
         """
+        self.watched = self.check_watched_items_bulk(self.watched)
+
+    def check_watched_items_bulk(self, job_states: list[T]) -> list[T]:
+        """
+        Check the given watched jobs and return the job states that should
+        continue to be watched. Runners that can fetch the state of many jobs
+        with a single call to their resource manager (e.g. ``squeue``,
+        ``qstat`` or ``condor_q``) should override this, by default each job is
+        checked individually with check_watched_item.
+        """
         new_watched = []
-        for async_job_state in self.watched:
+        for async_job_state in job_states:
             new_async_job_state = self.check_watched_item(async_job_state)
             if new_async_job_state:
                 new_watched.append(new_async_job_state)
-        self.watched = new_watched
+        return new_watched
 
     # Subclasses should implement this unless they override check_watched_items all together.
     def check_watched_item(self, job_state: T) -> Union[T, None]:
@@ -991,8 +1235,8 @@ class AsynchronousJobRunner(BaseJobRunner, Monitors, Generic[T]):
 
         self._finish_or_resubmit_job(job_state, stdout, stderr, job_id=galaxy_id_tag, external_job_id=external_job_id)
 
-    def mark_as_finished(self, job_state):
-        self.work_queue.put((self.finish_job, job_state))
+    def mark_as_finished(self, job_state: T) -> None:
+        self._put_finishing((self.finish_job, job_state))
 
-    def mark_as_failed(self, job_state):
-        self.work_queue.put((self.fail_job, job_state))
+    def mark_as_failed(self, job_state: T) -> None:
+        self._put_finishing((self.fail_job, job_state))
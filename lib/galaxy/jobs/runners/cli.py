@@ -4,7 +4,10 @@ Job control via a command line interface (e.g. qsub/qstat), possibly over a remo
 
 import logging
 import time
-from typing import TYPE_CHECKING
+from typing import (
+    Optional,
+    TYPE_CHECKING,
+)
 
 from galaxy import model
 from galaxy.jobs.job_destination import JobDestination
@@ -28,6 +31,10 @@ __all__ = ("ShellJobRunner",)
 
 DEFAULT_EMBED_METADATA_IN_JOB = True
 MAX_SUBMIT_RETRY = 3
+# Printed after each submission when submitting several jobs with a single shell command
+SUBMIT_RESULT_MARKER = "__GALAXY_SUBMIT_RESULT__"
+SUBMIT_TIMEOUT = 60
+SUBMIT_TIMEOUT_PER_JOB = 5
 
 
 class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
@@ -37,9 +44,9 @@ class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
 
     runner_name = "ShellRunner"
 
-    def __init__(self, app, nworkers):
+    def __init__(self, app, nworkers, **kwargs):
         """Start the job runner"""
-        super().__init__(app, nworkers)
+        super().__init__(app, nworkers, **kwargs)
 
         self.cli_interface = CliInterface()
 
@@ -62,17 +69,72 @@ class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
 
     def queue_job(self, job_wrapper: "MinimalJobWrapper") -> None:
         """Create job script and submit it to the DRM"""
+        # Get shell and job execution interface
+        shell_params, job_params = self.parse_destination_params(job_wrapper.job_destination.params)
+        shell, job_interface = self.get_cli_plugins(shell_params, job_params)
+
+        if (ajs := self.__prepare_job_script(job_wrapper, job_interface)) is None:
+            return
+
+        galaxy_id_tag = job_wrapper.get_id_tag()
+        log.debug(f"({galaxy_id_tag}) submitting file: {ajs.job_file}")
+
+        returncode, stdout = self.submit(shell, job_interface, ajs.job_file, galaxy_id_tag, retry=MAX_SUBMIT_RETRY)
+        self.__handle_submission(ajs, returncode, stdout)
+
+    def queue_jobs(self, job_wrappers: list["MinimalJobWrapper"]) -> None:
+        """
+        Create the job scripts and submit them to the DRM with a single shell
+        command. Jobs whose submission command failed are submitted
+        individually. Jobs without a submission result (e.g. if the command
+        timed out or its output was cut short) may or may not have been
+        submitted, these are failed rather than risking a duplicate submission.
+        """
+        destination_job_wrappers: dict[str, list[MinimalJobWrapper]] = {}
+        for job_wrapper in job_wrappers:
+            params_key = repr(sorted(job_wrapper.job_destination.params.items()))
+            destination_job_wrappers.setdefault(params_key, []).append(job_wrapper)
+        for wrappers in destination_job_wrappers.values():
+            shell_params, job_params = self.parse_destination_params(wrappers[0].job_destination.params)
+            shell, job_interface = self.get_cli_plugins(shell_params, job_params)
+            job_states = []
+            for job_wrapper in wrappers:
+                try:
+                    ajs = self.__prepare_job_script(job_wrapper, job_interface)
+                except Exception:
+                    log.exception(f"({job_wrapper.get_id_tag()}) failure preparing job")
+                    job_wrapper.fail("failure preparing job", exception=True)
+                    continue
+                if ajs is not None:
+                    job_states.append(ajs)
+            if not job_states:
+                continue
+            log.debug("submitting %d job files: %s", len(job_states), ", ".join(ajs.job_file for ajs in job_states))
+            results = self.submit_many(shell, job_interface, job_states)
+            for ajs, result in zip(job_states, results):
+                galaxy_id_tag = ajs.job_wrapper.get_id_tag()
+                try:
+                    if result is None:
+                        log.error(f"({galaxy_id_tag}) unable to determine whether the job was submitted, failing job")
+                        ajs.job_wrapper.fail("failure submitting job, the submission result is unknown")
+                        continue
+                    if result[0] != 0:
+                        log.info(f"({galaxy_id_tag}) submission with other jobs failed, submitting individually")
+                        result = self.submit(shell, job_interface, ajs.job_file, galaxy_id_tag, retry=MAX_SUBMIT_RETRY)
+                    self.__handle_submission(ajs, *result)
+                except Exception:
+                    log.exception(f"({galaxy_id_tag}) failure submitting job")
+                    self.mark_as_failed(ajs)
+
+    def __prepare_job_script(self, job_wrapper: "MinimalJobWrapper", job_interface) -> Optional[AsynchronousJobState]:
         # prepare the job
         include_metadata = asbool(
             job_wrapper.job_destination.params.get("embed_metadata_in_job", DEFAULT_EMBED_METADATA_IN_JOB)
         )
         if not self.prepare_job(job_wrapper, include_metadata=include_metadata):
-            return
+            return None
 
-        # Get shell and job execution interface
         job_destination = job_wrapper.job_destination
-        shell_params, job_params = self.parse_destination_params(job_destination.params)
-        shell, job_interface = self.get_cli_plugins(shell_params, job_params)
 
         # wrapper.get_id_tag() instead of job_id for compatibility with TaskWrappers.
         galaxy_id_tag = job_wrapper.get_id_tag()
@@ -92,18 +154,19 @@ class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
         except Exception:
             log.exception(f"({galaxy_id_tag}) failure writing job script")
             job_wrapper.fail("failure preparing job script", exception=True)
-            return
+            return None
 
         # job was deleted while we were preparing it
         if job_wrapper.get_state() in (model.Job.states.DELETED, model.Job.states.STOPPED):
             log.debug("(%s) Job deleted/stopped by user before it entered the queue", galaxy_id_tag)
             if job_wrapper.cleanup_job in ("always", "onsuccess"):
                 job_wrapper.cleanup()
-            return
-
-        log.debug(f"({galaxy_id_tag}) submitting file: {ajs.job_file}")
+            return None
+        return ajs
 
-        returncode, stdout = self.submit(shell, job_interface, ajs.job_file, galaxy_id_tag, retry=MAX_SUBMIT_RETRY)
+    def __handle_submission(self, ajs: AsynchronousJobState, returncode: int, stdout: str) -> None:
+        job_wrapper = ajs.job_wrapper
+        galaxy_id_tag = job_wrapper.get_id_tag()
         if returncode != 0:
             job_wrapper.fail("failure submitting job")
             return
@@ -156,6 +219,26 @@ class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
             log.error(stderr)
             return returncode, cmd_out.stdout
 
+    def submit_many(self, shell, job_interface, job_states: list[AsynchronousJobState]):
+        """
+        Submit several job scripts with a single shell command (e.g. over a
+        single ssh connection). Returns the returncode and stdout of each
+        submission, or None for jobs whose submission result is unknown.
+        """
+        cmd = "; ".join(
+            f"{job_interface.submit(ajs.job_file)}; rc=$?; echo; echo {SUBMIT_RESULT_MARKER} $rc" for ajs in job_states
+        )
+        timeout = max(SUBMIT_TIMEOUT, SUBMIT_TIMEOUT_PER_JOB * len(job_states))
+        cmd_out = shell.execute(cmd, timeout=timeout)
+        if cmd_out.returncode != 0:
+            log.warning(
+                "submission of %d jobs returned exit code %s, stderr is: %s",
+                len(job_states),
+                cmd_out.returncode,
+                cmd_out.stderr,
+            )
+        return parse_submit_many_output(cmd_out.stdout, len(job_states))
+
     def check_watched_items(self) -> None:
         """
         Called by the monitor thread to look at each watched job and deal
@@ -206,7 +289,7 @@ class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
                 if external_metadata:
                     self.work_queue.put((self.handle_metadata_externally, ajs))
                 log.debug(f"({id_tag}/{external_job_id}) job execution finished, running job wrapper finish method")
-                self.work_queue.put((self.finish_job, ajs))
+                self.mark_as_finished(ajs)
             else:
                 new_watched.append(ajs)
         # Replace the watch list with the updated version
@@ -302,3 +385,27 @@ class ShellJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
             ajs.old_state = model.Job.states.QUEUED
             ajs.running = False
             self.monitor_queue.put(ajs)
+
+
+def parse_submit_many_output(stdout: str, count: int) -> list[Optional[tuple[int, str]]]:
+    r"""
+    Split the output of ``ShellJobRunner.submit_many`` into the returncode
+    and stdout of each submission.
+
+    >>> parse_submit_many_output("Submitted batch job 1\n\n__GALAXY_SUBMIT_RESULT__ 0\nerror\n\n__GALAXY_SUBMIT_RESULT__ 1\n", 3)
+    [(0, 'Submitted batch job 1\n'), (1, 'error\n'), None]
+    """
+    results: list[Optional[tuple[int, str]]] = []
+    lines: list[str] = []
+    for line in stdout.splitlines():
+        if line.startswith(SUBMIT_RESULT_MARKER):
+            try:
+                returncode = int(line[len(SUBMIT_RESULT_MARKER) :].strip())
+            except ValueError:
+                break
+            results.append((returncode, "\n".join(lines)))
+            lines = []
+        else:
+            lines.append(line)
+    results = results[:count]
+    return results + [None] * (count - len(results))
@@ -217,7 +217,7 @@ class CondorJobRunner(AsynchronousJobRunner[CondorJobState]):
                 log.exception(f"({galaxy_id_tag}/{job_id}) Unable to check job status")
                 log.warning(f"({galaxy_id_tag}/{job_id}) job will now be errored")
                 cjs.fail_message = "Cluster could not complete job"
-                self.work_queue.put((self.fail_job, cjs))
+                self.mark_as_failed(cjs)
                 continue
 
             if job_running:
@@ -240,12 +240,12 @@ class CondorJobRunner(AsynchronousJobRunner[CondorJobState]):
                     if external_metadata:
                         self._handle_metadata_externally(cjs.job_wrapper, resolve_requirements=True)
                     log.debug(f"({galaxy_id_tag}/{job_id}) job has completed")
-                    self.work_queue.put((self.finish_job, cjs))
+                    self.mark_as_finished(cjs)
                 continue
             if job_failed:
                 log.debug(f"({galaxy_id_tag}/{job_id}) job failed")
                 cjs.failed = True
-                self.work_queue.put((self.fail_job, cjs))
+                self.mark_as_failed(cjs)
                 continue
             cjs.running = job_running
             new_watched.append(cjs)
@@ -278,7 +278,7 @@ class CondorJobRunner(AsynchronousJobRunner[CondorJobState]):
                     if external_metadata:
                         self._handle_metadata_externally(cjs.job_wrapper, resolve_requirements=True)
                     log.debug(f"({galaxy_id_tag}/{external_id}) job has completed")
-                    self.work_queue.put((self.finish_job, cjs))
+                    self.mark_as_finished(cjs)
             except Exception as e:
                 log.warning(f"stop_job(): {job.id}: trying to stop container failed. ({e})")
                 try:
@@ -268,17 +268,32 @@ class DRMAAJobRunner(AsynchronousJobRunner[DRMAAJobState]):
             if job_state != model.Job.states.DELETED:
                 ajs.stop_job = False
                 ajs.fail_message = "The cluster DRM system terminated this job"
-                self.work_queue.put((self.fail_job, ajs))
+                self.mark_as_failed(ajs)
         elif drmaa_state == drmaa.JobState.DONE or job_state == model.Job.states.STOPPED:
             # External metadata processing for external runjobs
             external_metadata = not asbool(ajs.job_wrapper.job_destination.params.get("embed_metadata_in_job", True))
             if external_metadata:
                 self._handle_metadata_externally(ajs.job_wrapper, resolve_requirements=True)
             if job_state != model.Job.states.DELETED:
-                self.work_queue.put((self.finish_job, ajs))
+                self.mark_as_finished(ajs)
         return None
 
-    def check_watched_item_drmaa(self, ajs: DRMAAJobState, new_watched: list[DRMAAJobState]) -> Union[str, None]:
+    def get_drmaa_states(self, job_states: list[DRMAAJobState]) -> dict[str, "drmaa_JobState"]:
+        """
+        Fetch the DRMAA states of the given watched jobs at once, keyed by
+        external job id. DRMAA has no such call, so by default this returns an
+        empty dictionary and each job is checked individually. Subclasses that
+        can query their DRM directly should override this, jobs missing from the
+        returned dictionary are still checked individually.
+        """
+        return {}
+
+    def check_watched_item_drmaa(
+        self,
+        ajs: DRMAAJobState,
+        new_watched: list[DRMAAJobState],
+        bulk_state: Union["drmaa_JobState", None] = None,
+    ) -> Union[str, None]:
         """
         look at a single watched job, determine its state, and deal with errors
         that could happen in this process. to be called from check_watched_items()
@@ -297,6 +312,9 @@ class DRMAAJobRunner(AsynchronousJobRunner[DRMAAJobState]):
 
         Note that None is returned in all cases where the loop in check_watched_items
         is to be continued
+
+        If ``bulk_state`` is given (see get_drmaa_states) it is used instead of
+        querying the state of the job with DRMAA
         """
         assert drmaa is not None
         external_job_id = ajs.job_id
@@ -304,7 +322,7 @@ class DRMAAJobRunner(AsynchronousJobRunner[DRMAAJobState]):
         state = None
         try:
             assert external_job_id not in (None, "None"), f"({galaxy_id_tag}/{external_job_id}) Invalid job id"
-            state = self.ds.job_status(external_job_id)
+            state = bulk_state or self.ds.job_status(external_job_id)
             # Reset exception retries
             for retry_exception in RETRY_EXCEPTIONS_LOWER:
                 setattr(ajs, f"{retry_exception}_retries", 0)
@@ -329,10 +347,10 @@ class DRMAAJobRunner(AsynchronousJobRunner[DRMAAJobState]):
                     return None
             if self.runner_params[state_param] == model.Job.states.OK:
                 log.warning("(%s/%s) job will now be finished OK", galaxy_id_tag, external_job_id)
-                self.work_queue.put((self.finish_job, ajs))
+                self.mark_as_finished(ajs)
             elif self.runner_params[state_param] == model.Job.states.ERROR:
                 log.warning("(%s/%s) job will now be errored", galaxy_id_tag, external_job_id)
-                self.work_queue.put((self.fail_job, ajs))
+                self.mark_as_failed(ajs)
             else:
                 raise Exception(
                     "%s is set to an invalid value (%s), this should not be possible. See galaxy.jobs.drmaa.__init__()",
@@ -349,22 +367,24 @@ class DRMAAJobRunner(AsynchronousJobRunner[DRMAAJobState]):
             log.exception(f"({galaxy_id_tag}/{external_job_id}) unable to check job status")
             log.warning(f"({galaxy_id_tag}/{external_job_id}) job will now be errored")
             ajs.fail_message = "Cluster could not complete job"
-            self.work_queue.put((self.fail_job, ajs))
+            self.mark_as_failed(ajs)
             return None
         return state
 
-    def check_watched_items(self) -> None:
+    def check_watched_items_bulk(self, job_states: list[DRMAAJobState]) -> list[DRMAAJobState]:
         """
         Called by the monitor thread to look at each watched job and deal
         with state changes.
         """
         assert drmaa is not None
         new_watched: list[DRMAAJobState] = []
-        for ajs in self.watched:
+        bulk_states = self.get_drmaa_states(job_states)
+        for ajs in job_states:
             external_job_id = ajs.job_id
             galaxy_id_tag = ajs.job_wrapper.get_id_tag()
             old_state = ajs.old_state
-            state = self.check_watched_item_drmaa(ajs, new_watched)
+            bulk_state = bulk_states.get(external_job_id) if external_job_id else None
+            state = self.check_watched_item_drmaa(ajs, new_watched, bulk_state=bulk_state)
             if state is None:
                 continue
             if state != old_state:
@@ -382,12 +402,11 @@ class DRMAAJobRunner(AsynchronousJobRunner[DRMAAJobState]):
                 # TODO: stop checking at some point
                 ajs.job_wrapper.check_for_entry_points()
             if ajs.check_limits():
-                self.work_queue.put((self.fail_job, ajs))
+                self.mark_as_failed(ajs)
                 continue
             ajs.old_state = state
             new_watched.append(ajs)
-        # Replace the watch list with the updated version
-        self.watched = new_watched
+        return new_watched
 
     def stop_job(self, job_wrapper):
         """Attempts to delete a job from the DRM queue"""
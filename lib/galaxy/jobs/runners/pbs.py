@@ -382,7 +382,7 @@ class PBSJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
                     if errno == 15001:
                         # 15001 == job not in queue
                         log.debug(f"({galaxy_job_id}/{job_id}) PBS job has left queue")
-                        self.work_queue.put((self.finish_job, pbs_job_state))
+                        self.mark_as_finished(pbs_job_state)
                     else:
                         # Unhandled error, continue to monitor
                         log.info(
@@ -400,7 +400,7 @@ class PBSJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
                 h, m, s = (int(i) for i in status.resources_used.walltime.split(":"))
                 runtime = timedelta(0, s, 0, 0, m, h)
                 if pbs_job_state.check_limits(runtime=runtime):
-                    self.work_queue.put((self.fail_job, pbs_job_state))
+                    self.mark_as_failed(pbs_job_state)
                     continue
             elif status.job_state == "C":
                 # "keep_completed" is enabled in PBS, so try to check exit status
@@ -416,12 +416,12 @@ class PBSJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
                     pbs_job_state.fail_message = CLUSTER_ERROR_MESSAGE % error_message
                     log.error(f"({galaxy_job_id}/{job_id}) PBS job failed: {error_message}")
                     pbs_job_state.stop_job = False
-                    self.work_queue.put((self.fail_job, pbs_job_state))
+                    self.mark_as_failed(pbs_job_state)
                     continue
                 except AttributeError:
                     # No exit_status, can't verify proper completion so we just have to assume success.
                     log.debug(f"({galaxy_job_id}/{job_id}) PBS job has completed")
-                self.work_queue.put((self.finish_job, pbs_job_state))
+                self.mark_as_finished(pbs_job_state)
                 continue
             pbs_job_state.old_state = status.job_state
             new_watched.append(pbs_job_state)
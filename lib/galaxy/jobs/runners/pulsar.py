@@ -549,7 +549,7 @@ class PulsarJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
                     log.exception("failure preparing job %d", job_wrapper.job_id)
                 job_state = self._job_state(job_wrapper.get_job(), job_wrapper)
                 job_state.fail_message = str(e)
-                self.work_queue.put((self.fail_job, job_state))
+                self.mark_as_failed(job_state)
                 job_prepare_ret = False
             if job_prepare_ret is False:
                 return command_line, client, remote_job_config, compute_environment, remote_container
@@ -613,7 +613,7 @@ class PulsarJobRunner(AsynchronousJobRunner[AsynchronousJobState]):
         fail_or_resubmit = fail_or_resubmit or not command_line
         if fail_or_resubmit:
             job_state = self._job_state(job_wrapper.get_job(), job_wrapper)
-            self.work_queue.put((self.fail_job, job_state))
+            self.mark_as_failed(job_state)
 
         return command_line, client, remote_job_config, compute_environment, remote_container
 
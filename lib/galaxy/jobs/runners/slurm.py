@@ -12,6 +12,7 @@ from typing import (
 from galaxy import model
 from galaxy.jobs.runners.drmaa import DRMAAJobRunner
 from galaxy.util import (
+    asbool,
     commands,
     unicodify,
 )
@@ -42,11 +43,52 @@ SLURM_MEMORY_LIMIT_EXCEEDED_PARTIAL_WARNINGS = [
 OUT_OF_MEMORY_MSG = "This job was terminated because it used more memory than it was allocated."
 PROBABLY_OUT_OF_MEMORY_MSG = "This job was cancelled probably because it used more memory than it was allocated."
 
+# Maximum number of job ids passed to a single squeue call
+SQUEUE_MAX_JOB_IDS = 1000
+
 
 class SlurmJobRunner(DRMAAJobRunner):
     runner_name = "SlurmRunner"
     restrict_job_name_length = False
 
+    def __init__(self, app, nworkers, **kwargs):
+        runner_param_specs = {"bulk_state_check": dict(map=asbool, default=False)}
+        if "runner_param_specs" not in kwargs:
+            kwargs["runner_param_specs"] = {}
+        kwargs["runner_param_specs"].update(runner_param_specs)
+        super().__init__(app, nworkers, **kwargs)
+
+    def get_drmaa_states(self, job_states: list["DRMAAJobState"]) -> dict[str, str]:
+        """
+        Fetch the states of all watched jobs still queued or running with
+        ``squeue`` if the ``bulk_state_check`` runner parameter is set. Jobs
+        that are not listed (e.g. finished or submitted to another cluster)
+        are checked individually through DRMAA.
+        """
+        if not self.runner_params.bulk_state_check:
+            return {}
+        squeue_states = {
+            "PENDING": self.drmaa_job_states.QUEUED_ACTIVE,
+            "CONFIGURING": self.drmaa_job_states.RUNNING,
+            "RUNNING": self.drmaa_job_states.RUNNING,
+            "SUSPENDED": self.drmaa_job_states.USER_SUSPENDED,
+        }
+        job_ids = [ajs.job_id for ajs in job_states if ajs.job_id and "." not in ajs.job_id]
+        states = {}
+        for i in range(0, len(job_ids), SQUEUE_MAX_JOB_IDS):
+            cmd = ["squeue", "-h", "-o", "%i %T", "-t", ",".join(squeue_states)]
+            cmd.extend(["-j", ",".join(job_ids[i : i + SQUEUE_MAX_JOB_IDS])])
+            try:
+                stdout = commands.execute(cmd)
+            except commands.CommandLineException as e:
+                log.warning("Unable to get job states with squeue, falling back to DRMAA: %s", unicodify(e))
+                return {}
+            for line in stdout.splitlines():
+                fields = line.split()
+                if len(fields) == 2 and fields[1] in squeue_states:
+                    states[fields[0]] = squeue_states[fields[1]]
+        return states
+
     def _complete_terminal_job(self, ajs: "DRMAAJobState", drmaa_state: str, **kwargs) -> Union[bool, None]:
         def _get_slurm_state_with_sacct(job_id, cluster):
             cmd = ["sacct", "-n", "-o", "state%-32"]
@@ -196,7 +238,7 @@ class SlurmJobRunner(DRMAAJobRunner):
                 if drmaa_state == self.drmaa_job_states.FAILED:
                     ajs.fail_message += "\nPlease click the bug icon to report this problem if you need help."
                     ajs.stop_job = False
-                    self.work_queue.put((self.fail_job, ajs))
+                    self.mark_as_failed(ajs)
                     return None
         except Exception:
             log.exception(
@@ -65,7 +65,12 @@ class UnivaJobRunner(DRMAAJobRunner):
     # restrict job name length as in the DRMAAJobRunner
     # restrict_job_name_length = 15
 
-    def check_watched_item_drmaa(self, ajs: "DRMAAJobState", new_watched: list["DRMAAJobState"]) -> str:
+    def check_watched_item_drmaa(
+        self,
+        ajs: "DRMAAJobState",
+        new_watched: list["DRMAAJobState"],
+        bulk_state: Union[str, None] = None,
+    ) -> str:
         """
         get state with job_status/qstat
 
@@ -12,6 +12,7 @@ from typing import (
 )
 
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 
 from galaxy import (
     exceptions,
@@ -48,6 +49,9 @@ log = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+# Number of datasets whose files are removed with a single object store call
+PURGE_BATCH_SIZE = 1000
+
 
 class DatasetManager(
     base.ModelManager[Dataset], secured.AccessibleManagerMixin[Dataset], deletable.PurgableManagerMixin
@@ -97,14 +101,34 @@ class DatasetManager(
         They might not be removed if there are still un-purged associations to the dataset.
         """
         self.error_unless_dataset_purge_allowed()
-        for dataset_id in request.dataset_ids:
-            dataset: Optional[Dataset] = self.session().get(Dataset, dataset_id)
-            if dataset and dataset.user_can_purge:
-                try:
-                    dataset.full_delete()
-                except Exception:
-                    log.exception(f"Unable to purge dataset ({dataset.id})")
-        self.session().commit()
+        session = self.session()
+        dataset_ids = request.dataset_ids
+        for start in range(0, len(dataset_ids), PURGE_BATCH_SIZE):
+            batch_ids = dataset_ids[start : start + PURGE_BATCH_SIZE]
+            # load the associations checked by user_can_purge for the whole batch at once
+            stmt = (
+                select(Dataset)
+                .where(Dataset.id.in_(batch_ids))
+                .options(
+                    selectinload(Dataset.library_associations),
+                    selectinload(Dataset.history_associations),
+                    selectinload(Dataset.purged_history_associations),
+                )
+            )
+            datasets = session.scalars(stmt).all()
+            purgeable = [dataset for dataset in datasets if dataset.user_can_purge]
+            try:
+                Dataset.full_delete_many(purgeable)
+            except Exception:
+                log.exception("Unable to purge datasets in bulk, purging them one at a time")
+                for dataset in purgeable:
+                    if dataset.purged:
+                        continue
+                    try:
+                        dataset.full_delete()
+                    except Exception:
+                        log.exception(f"Unable to purge dataset ({dataset.id})")
+            session.commit()
 
     # TODO: this may be more conv. somewhere else
     # TODO: how to allow admin bypass?
@@ -195,6 +219,9 @@ class DatasetManager(
         if hash is None:
             sa_session.add(dataset_hash)
             sa_session.commit()
+            if not extra_files_path:
+                # object stores storing identical contents once can now find this dataset's contents
+                self.app.object_store.deduplicate(dataset)
         else:
             old_hash_value = hash.hash_value
             if old_hash_value != calculated_hash_value:
@@ -8,6 +8,7 @@ from sqlalchemy import select
 from galaxy import model
 from galaxy.exceptions import ObjectNotFound
 from galaxy.managers.context import ProvidesAppContext
+from galaxy.managers.quotas import invalidate_quota_caches
 from galaxy.model import (
     User,
     UserGroupAssociation,
@@ -86,10 +87,12 @@ class GroupUsersManager:
         gra = model.UserGroupAssociation(user, group)
         trans.sa_session.add(gra)
         trans.sa_session.commit()
+        invalidate_quota_caches(self._app)
 
     def _remove_user_from_group(self, trans: ProvidesAppContext, group_user: model.UserGroupAssociation):
         trans.sa_session.delete(group_user)
         trans.sa_session.commit()
+        invalidate_quota_caches(self._app)
 
 
 def get_group_user(session: galaxy_scoped_session, user, group) -> Optional[UserGroupAssociation]:
@@ -11,6 +11,7 @@ from galaxy.exceptions import (
     RequestParameterInvalidException,
 )
 from galaxy.managers.context import ProvidesAppContext
+from galaxy.managers.quotas import invalidate_quota_caches
 from galaxy.model import Group
 from galaxy.model.scoped_session import galaxy_scoped_session
 from galaxy.schema.fields import Security
@@ -67,6 +68,8 @@ class GroupsManager:
             group, user_ids=payload.user_ids, role_ids=role_ids
         )
         sa_session.commit()
+        if payload.user_ids:
+            invalidate_quota_caches(self._app)
 
         encoded_id = Security.security.encode_id(group.id)
         item = group.to_dict(view="element")
@@ -99,6 +102,8 @@ class GroupsManager:
         self._app.security_agent.set_group_user_and_role_associations(
             group, user_ids=payload.user_ids, role_ids=payload.role_ids
         )
+        if payload.user_ids is not None:
+            invalidate_quota_caches(self._app)
 
         encoded_id = Security.security.encode_id(group.id)
         item = group.to_dict(view="element")
@@ -127,6 +132,7 @@ class GroupsManager:
         # Delete the group
         sa_session.delete(group)
         sa_session.commit()
+        invalidate_quota_caches(self._app)
 
     def undelete(self, trans: ProvidesAppContext, group_id: int):
         group = self._get_group(trans.sa_session, group_id)
@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from datetime import (
     date,
     datetime,
+    timedelta,
 )
 from pathlib import Path
 from typing import (
@@ -33,7 +34,10 @@ from sqlalchemy import (
     true,
 )
 from sqlalchemy.dialects.postgresql import aggregate_order_by
-from sqlalchemy.orm import aliased
+from sqlalchemy.orm import (
+    aliased,
+    scoped_session,
+)
 from sqlalchemy.sql import select
 from typing_extensions import TypedDict
 
@@ -69,6 +73,7 @@ from galaxy.model import (
     Job,
     JobMetricNumeric,
     JobParameter,
+    JobStateHistory,
     ToolRequest,
     User,
     Workflow,
@@ -2145,6 +2150,137 @@ def get_jobs_to_check_at_startup(session: galaxy_scoped_session, track_jobs_in_d
     return session.scalars(stmt).all()
 
 
+def get_session_active_job_counts(session: scoped_session, session_ids: Iterable[int]) -> dict[int, int]:
+    """Return the number of queued and running jobs for each of the given (anonymous) session ids."""
+    session_ids = set(session_ids)
+    if not session_ids:
+        return {}
+    stmt = (
+        select(Job.session_id, func.count(Job.id))
+        .where(
+            and_(
+                Job.session_id.in_(session_ids),
+                Job.state.in_((Job.states.QUEUED, Job.states.RUNNING)),
+            )
+        )
+        .group_by(Job.session_id)
+    )
+    return {session_id: count for session_id, count in session.execute(stmt) if session_id is not None}
+
+
+def get_total_walltime_by_owner(
+    session: scoped_session,
+    user_ids: Iterable[int],
+    session_ids: Iterable[int],
+    since: datetime,
+) -> tuple[dict[int, timedelta], dict[int, timedelta]]:
+    """Sum the walltime of successful jobs updated after ``since`` for each of the given users and sessions.
+
+    Walltime for a job is the span between its last ``running`` and last ``ok`` state history entries. All owners are
+    resolved with a single query, returns a tuple of dictionaries mapping user ids and session ids to walltime.
+    """
+    user_ids = set(user_ids)
+    session_ids = set(session_ids)
+    by_user: dict[int, timedelta] = {user_id: timedelta(0) for user_id in user_ids}
+    by_session: dict[int, timedelta] = {session_id: timedelta(0) for session_id in session_ids}
+    owner_conditions = []
+    if user_ids:
+        owner_conditions.append(Job.user_id.in_(user_ids))
+    if session_ids:
+        owner_conditions.append(Job.session_id.in_(session_ids))
+    if not owner_conditions:
+        return by_user, by_session
+    stmt = (
+        select(Job.id, Job.user_id, Job.session_id, JobStateHistory.state, JobStateHistory.create_time)
+        .join(JobStateHistory, JobStateHistory.job_id == Job.id)
+        .where(
+            and_(
+                Job.update_time >= since,
+                Job.state == Job.states.OK,
+                or_(*owner_conditions),
+                JobStateHistory.state.in_((Job.states.RUNNING, Job.states.OK)),
+            )
+        )
+        .order_by(Job.id, JobStateHistory.create_time)
+    )
+    spans: dict[int, dict[str, Any]] = {}
+    for job_id, user_id, session_id, state, create_time in session.execute(stmt):
+        span = spans.setdefault(job_id, {"user_id": user_id, "session_id": session_id})
+        # rows are ordered by create_time, so the last entry for each state wins
+        span[state] = create_time
+    for job_id, span in spans.items():
+        started = span.get(Job.states.RUNNING)
+        finished = span.get(Job.states.OK)
+        if started is None or finished is None:
+            log.warning(
+                "Unable to calculate time spent for job %s; started: %s, finished: %s", job_id, started, finished
+            )
+            continue
+        if span["user_id"] in by_user:
+            by_user[span["user_id"]] += finished - started
+        if span["session_id"] in by_session:
+            by_session[span["session_id"]] += finished - started
+    return by_user, by_session
+
+
+def get_new_dependent_jobs(session: scoped_session, job_ids: Iterable[int]) -> list[tuple[int, Optional[str]]]:
+    """Return ``(job_id, handler)`` for new jobs that consume a dataset produced by any of the given jobs."""
+    job_ids = set(job_ids)
+    if not job_ids:
+        return []
+    output_dataset_ids = (
+        select(model.HistoryDatasetAssociation.dataset_id)
+        .join(
+            model.JobToOutputDatasetAssociation,
+            model.JobToOutputDatasetAssociation.dataset_id == model.HistoryDatasetAssociation.id,
+        )
+        .where(model.JobToOutputDatasetAssociation.job_id.in_(job_ids))
+    )
+    stmt = (
+        select(Job.id, Job.handler)
+        .join(model.JobToInputDatasetAssociation, model.JobToInputDatasetAssociation.job_id == Job.id)
+        .join(
+            model.HistoryDatasetAssociation,
+            model.HistoryDatasetAssociation.id == model.JobToInputDatasetAssociation.dataset_id,
+        )
+        .where(
+            and_(
+                Job.state == Job.states.NEW,
+                model.HistoryDatasetAssociation.dataset_id.in_(output_dataset_ids),
+            )
+        )
+        .distinct()
+    )
+    return list(session.execute(stmt).tuples())
+
+
+def get_active_job_input_datasets(session: galaxy_scoped_session) -> list[model.Dataset]:
+    """Return the datasets read by queued and running jobs, through history or library dataset inputs."""
+    active_states = (Job.states.QUEUED, Job.states.RUNNING)
+    hda_dataset_ids = (
+        select(model.HistoryDatasetAssociation.dataset_id)
+        .join(
+            model.JobToInputDatasetAssociation,
+            model.JobToInputDatasetAssociation.dataset_id == model.HistoryDatasetAssociation.id,
+        )
+        .join(Job, Job.id == model.JobToInputDatasetAssociation.job_id)
+        .where(Job.state.in_(active_states))
+    )
+    ldda_dataset_ids = (
+        select(model.LibraryDatasetDatasetAssociation.dataset_id)
+        .join(
+            model.JobToInputLibraryDatasetAssociation,
+            model.JobToInputLibraryDatasetAssociation.ldda_id == model.LibraryDatasetDatasetAssociation.id,
+        )
+        .join(Job, Job.id == model.JobToInputLibraryDatasetAssociation.job_id)
+        .where(Job.state.in_(active_states))
+    )
+    stmt = select(model.Dataset).where(
+        or_(model.Dataset.id.in_(hda_dataset_ids), model.Dataset.id.in_(ldda_dataset_ids))
+    )
+    return list(session.scalars(stmt))
+
+
 def get_job(session: galaxy_scoped_session, *where_clauses):
     stmt = select(Job).where(*where_clauses).limit(1)
     return session.scalars(stmt).first()
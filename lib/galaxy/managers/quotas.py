@@ -33,11 +33,25 @@ from galaxy.quota._schema import (
     DefaultQuotaValues,
     QuotaOperation,
 )
-from galaxy.structured_app import StructuredApp
+from galaxy.structured_app import (
+    MinimalManagerApp,
+    StructuredApp,
+)
 
 log = logging.getLogger(__name__)
 
 
+def invalidate_quota_caches(app: MinimalManagerApp) -> None:
+    """Clear the cached quotas of this process and of all other Galaxy processes (e.g. job handlers).
+
+    Call this after committing changes to quotas, default quotas or group memberships.
+    """
+    app.quota_agent.invalidate_quota_cache()
+    # Celery workers have no queue worker, their quota caches expire after quota_cache_ttl seconds
+    if (queue_worker := getattr(app, "queue_worker", None)) is not None:
+        queue_worker.send_control_task("invalidate_quota_cache", noop_self=True)
+
+
 class QuotaManager:
     """Interface/service object to interact with Quotas."""
 
@@ -103,6 +117,7 @@ class QuotaManager:
             message = f"Quota '{quota.name}' has been created with {len(in_users)} associated users and {len(in_groups)} associated groups."
 
         self.sa_session.commit()
+        self._invalidate_quota_caches()
 
         return quota, message
 
@@ -148,6 +163,7 @@ class QuotaManager:
             if None in in_groups:
                 raise ActionInputError("One or more invalid group id has been provided.")
             self.quota_agent.set_entity_quota_associations(quotas=[quota], users=in_users, groups=in_groups)
+            self._invalidate_quota_caches()
             self.sa_session.refresh(quota)
             if len(quota.users) != len(in_users) and len(quota.groups) != len(in_groups):
                 return f"Quota '{quota.name}' has been updated with {len(in_users)} associated users and {len(in_groups)} associated groups."
@@ -179,6 +195,7 @@ class QuotaManager:
             quota.operation = params.operation
             self.sa_session.add(quota)
             self.sa_session.commit()
+            self._invalidate_quota_caches()
             if old_display_amount != quota.display_amount or old_operation != quota.operation:
                 return f"Quota '{quota.name}' is now '{quota.operation}{quota.display_amount}'."
             else:
@@ -197,6 +214,7 @@ class QuotaManager:
                 for dqa in quota.default:
                     self.sa_session.delete(dqa)
                 self.sa_session.commit()
+            self._invalidate_quota_caches()
             return message
 
     def unset_quota_default(self, quota: Quota, params=None) -> Optional[str]:
@@ -206,6 +224,7 @@ class QuotaManager:
             for dqa in quota.default:
                 self.sa_session.delete(dqa)
             self.sa_session.commit()
+            self._invalidate_quota_caches()
         return message
 
     def delete_quota(self, quota, params=None) -> str:
@@ -226,6 +245,7 @@ class QuotaManager:
             self.sa_session.add(q)
             names.append(q.name)
         self.sa_session.commit()
+        self._invalidate_quota_caches()
         message += ", ".join(names)
         return message
 
@@ -245,6 +265,7 @@ class QuotaManager:
             self.sa_session.add(q)
             names.append(q.name)
         self.sa_session.commit()
+        self._invalidate_quota_caches()
         message += ", ".join(names)
         return message
 
@@ -274,8 +295,12 @@ class QuotaManager:
                 self.sa_session.delete(gqa)
             names.append(q.name)
         self.sa_session.commit()
+        self._invalidate_quota_caches()
         message += ", ".join(names)
         return message
 
+    def _invalidate_quota_caches(self) -> None:
+        invalidate_quota_caches(self.app)
+
     def get_quota(self, trans, id: int, deleted: Optional[bool] = None) -> model.Quota:
         return base.get_object(trans, id, "Quota", check_ownership=False, check_accessible=False, deleted=deleted)
@@ -77,6 +77,7 @@ from sqlalchemy import (
     ForeignKey,
     func,
     Index,
+    insert,
     inspect,
     Integer,
     join,
@@ -822,6 +823,45 @@ def calculate_disk_usage_per_objectstore(sa_session, user_id: int):
     return sa_session.execute(text(statement), params).all()
 
 
+HISTORY_EXCLUSIVE_DATASET_USAGE_PER_OBJECTSTORE = """
+WITH per_hist_hdas AS (
+    SELECT DISTINCT dataset_id
+    FROM history_dataset_association
+    WHERE NOT purged
+        AND history_id = :history_id
+)
+SELECT SUM(COALESCE(dataset.total_size, dataset.file_size, 0)) as usage, dataset.object_store_id
+FROM dataset
+WHERE dataset.id IN (SELECT dataset_id FROM per_hist_hdas)
+    AND NOT EXISTS (
+        SELECT 1
+        FROM library_dataset_dataset_association
+        WHERE library_dataset_dataset_association.dataset_id = dataset.id
+    )
+    AND NOT EXISTS (
+        SELECT 1
+        FROM history_dataset_association
+        JOIN history ON history_dataset_association.history_id = history.id
+        WHERE history_dataset_association.dataset_id = dataset.id
+            AND history_dataset_association.history_id != :history_id
+            AND NOT history_dataset_association.purged
+            AND history.user_id = :id
+            AND NOT history.purged
+    )
+GROUP BY dataset.object_store_id
+"""
+
+
+def calculate_history_exclusive_disk_usage_per_objectstore(sa_session, user_id: int, history_id: int):
+    """Return the usage of datasets that no other history of the user references, per object store.
+
+    This is the amount purging all HDAs of the history frees up.
+    """
+    statement = HISTORY_EXCLUSIVE_DATASET_USAGE_PER_OBJECTSTORE
+    params = {"id": user_id, "history_id": history_id}
+    return sa_session.execute(text(statement), params).all()
+
+
 # move these to galaxy.schema.schema once galaxy-data depends on
 # galaxy-schema.
 class UserQuotaBasicUsage(BaseModel):
@@ -1148,6 +1188,8 @@ ON CONFLICT
                     "label": quota_source_label,
                 }
                 sa_session.execute(statement, params)
+            if self.id is not None and (object_sa_session := object_session(self)) is not None:
+                UserDiskUsageLedgerEntry.record(object_sa_session, self.id, quota_source_label, int(amount))
 
     def _get_social_auth(self, provider_backend):
         if not self.social_auth:
@@ -4208,6 +4250,93 @@ class UserQuotaSourceUsage(Base, Dictifiable, RepresentById):
     user: Mapped[Optional["User"]] = relationship(back_populates="quota_source_usages")
 
 
+class UserDiskUsageLedgerEntry(Base, RepresentById):
+    """
+    The incremental changes of a user's disk usage in a quota source since the last reconciliation.
+
+    Incremental adjustments (datasets created, purged or moved between quota
+    sources) update the usage counters directly and add their amount to the
+    entry of the user and quota source, so there is one entry per user and
+    quota source. The disk usage reconciler recalculates the usage of users
+    with entries in batches, oldest change first, and removes the entries of
+    the users it recalculated.
+    """
+
+    __tablename__ = "user_disk_usage_ledger"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    update_time: Mapped[datetime] = mapped_column(default=now, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("galaxy_user.id", ondelete="CASCADE"), index=True)
+    quota_source_label: Mapped[Optional[str]] = mapped_column(String(32))
+    delta: Mapped[Decimal] = mapped_column(Numeric(15, 0), default=0)
+
+    @classmethod
+    def record(cls, sa_session, user_id: int, quota_source_label: Optional[str], amount: int) -> None:
+        result = cast(
+            CursorResult,
+            sa_session.execute(
+                update(cls)
+                .where(cls.user_id == user_id, cls.quota_source_label.is_not_distinct_from(quota_source_label))
+                .values(delta=cls.delta + amount, update_time=now())
+            ),
+        )
+        if result.rowcount == 0:
+            sa_session.execute(insert(cls).values(user_id=user_id, quota_source_label=quota_source_label, delta=amount))
+
+    @classmethod
+    def reconcile(cls, sa_session, object_store: "BaseObjectStore", batch_size: int) -> int:
+        """Recalculate the disk usage of users with ledger entries.
+
+        Users with a negative usage counter have drifted and are always
+        recalculated, followed by up to ``batch_size`` other users whose usage
+        changed longest ago. Only the entries of the recalculated users are
+        removed, entries changed while this runs are left for the next run.
+
+        Returns the number of users recalculated.
+        """
+        cutoff = now()
+        pending = select(cls.user_id).where(cls.update_time <= cutoff)
+        drifted = set(sa_session.scalars(select(User.id).where(User.id.in_(pending), User.disk_usage < 0)))
+        drifted.update(
+            sa_session.scalars(
+                select(UserQuotaSourceUsage.user_id).where(
+                    UserQuotaSourceUsage.user_id.in_(pending), UserQuotaSourceUsage.disk_usage < 0
+                )
+            )
+        )
+        oldest = (
+            select(cls.user_id)
+            .where(cls.update_time <= cutoff, cls.user_id.not_in(drifted))
+            .group_by(cls.user_id)
+            .order_by(func.min(cls.update_time))
+            .limit(max(batch_size, 0))
+        )
+        recalculate = sorted(drifted) + list(sa_session.scalars(oldest))
+        for user_id in recalculate:
+            entries = (cls.user_id == user_id, cls.update_time <= cutoff)
+            deltas = {
+                label: int(delta)
+                for label, delta in sa_session.execute(
+                    select(cls.quota_source_label, func.sum(cls.delta)).where(*entries).group_by(cls.quota_source_label)
+                )
+            }
+            user = sa_session.get(User, user_id)
+            if user is not None:
+                tracked_usage = user.disk_usage or 0
+                user.calculate_and_set_disk_usage(object_store)
+                if (drift := (user.disk_usage or 0) - tracked_usage) != 0:
+                    log.info(
+                        "Corrected disk usage of user %s by %s bytes, changes per quota source since the last "
+                        "reconciliation: %s",
+                        user_id,
+                        drift,
+                        deltas,
+                    )
+            sa_session.execute(delete(cls).where(*entries))
+            sa_session.commit()
+        return len(recalculate)
+
+
 class UserQuotaAssociation(Base, Dictifiable, RepresentById):
     __tablename__ = "user_quota_association"
 
@@ -4646,6 +4775,15 @@ class Dataset(Base, StorableObject, Serializable):
         # Make filename absolute
         return os.path.abspath(filename)
 
+    def get_range(self, offset: int, length: int) -> bytes:
+        """Read at most `length` bytes of the contents at `offset`, without fetching the whole file if possible."""
+        if self.external_filename:
+            with open(self.external_filename, "rb") as fh:
+                fh.seek(offset)
+                return fh.read(length)
+        object_store = self._assert_object_store_set()
+        return object_store.get_range(self, offset, length)
+
     @property
     def quota_source_label(self):
         return self.quota_source_info.label
@@ -4814,15 +4952,29 @@ class Dataset(Base, StorableObject, Serializable):
             self.object_store.delete(self)
         except galaxy.exceptions.ObjectNotFound:
             pass
+        self._delete_extra_files()
+        # TODO: purge metadata files
+        self.deleted = True
+        self.purged = True
+
+    @classmethod
+    def full_delete_many(cls, datasets: list["Dataset"]):
+        """Like `full_delete` for many datasets, removing their files with one object store call."""
+        if not datasets:
+            return
+        datasets[0]._assert_object_store_set().delete_many(datasets)
+        for dataset in datasets:
+            dataset._delete_extra_files()
+            dataset.deleted = True
+            dataset.purged = True
+
+    def _delete_extra_files(self):
         if (rel_path := self._extra_files_rel_path) is not None:
             if self.object_store.exists(self, extra_dir=rel_path, dir_only=True):
                 try:
                     self.object_store.delete(self, entire_dir=True, extra_dir=rel_path, dir_only=True)
                 except galaxy.exceptions.ObjectNotFound:
                     pass
-        # TODO: purge metadata files
-        self.deleted = True
-        self.purged = True
 
     def get_access_roles(self, security_agent):
         roles = []
@@ -5359,6 +5511,10 @@ class DatasetInstance(RepresentById, UsesCreateAndUpdateTime, _HasTable):
         assert self.dataset is not None
         return self.dataset.get_file_name(sync_cache=sync_cache)
 
+    def get_range(self, offset: int, length: int) -> bytes:
+        assert self.dataset is not None
+        return self.dataset.get_range(offset, length)
+
     def set_file_name(self, filename: str):
         assert self.dataset is not None
         return self.dataset.set_file_name(filename)
@@ -9597,6 +9753,8 @@ class WorkflowInvocation(Base, UsesCreateAndUpdateTime, Dictifiable, Serializabl
     uuid: Mapped[Optional[Union[UUID]]] = mapped_column(UUIDType())
     history_id: Mapped[Optional[int]] = mapped_column(ForeignKey("history.id"), index=True)
     on_complete: Mapped[Optional[list]] = mapped_column(JSON)
+    # outputs of scheduled steps, see galaxy.workflow.run.WorkflowProgress
+    progress_snapshot: Mapped[Optional[dict]] = mapped_column(JSON)
 
     history = relationship("History", back_populates="workflow_invocations")
     input_parameters = relationship("WorkflowRequestInputParameter", back_populates="workflow_invocation")
@@ -9866,6 +10024,35 @@ class WorkflowInvocation(Base, UsesCreateAndUpdateTime, Dictifiable, Serializabl
 
     @staticmethod
     def poll_active_workflow_ids(engine, scheduler=None, handler=None):
+        stmt = (
+            select(WorkflowInvocation.id)
+            .filter(WorkflowInvocation._active_workflow_condition(scheduler, handler))
+            .order_by(WorkflowInvocation.id.asc())
+        )
+        # Immediately just load all ids into memory so time slicing logic
+        # is relatively intutitive.
+        with engine.connect() as conn:
+            return conn.scalars(stmt).all()
+
+    @staticmethod
+    def poll_active_workflows(
+        engine, scheduler=None, handler=None
+    ) -> list[tuple[int, Optional[int], Optional[int], Optional[str]]]:
+        """Like ``poll_active_workflow_ids`` but return the invocation id, history id, user id and state."""
+        stmt = (
+            select(WorkflowInvocation.id, WorkflowInvocation.history_id, History.user_id, WorkflowInvocation.state)
+            .outerjoin(History, WorkflowInvocation.history_id == History.id)
+            .filter(WorkflowInvocation._active_workflow_condition(scheduler, handler))
+            .order_by(WorkflowInvocation.id.asc())
+        )
+        with engine.connect() as conn:
+            return [
+                (invocation_id, history_id, user_id, state)
+                for invocation_id, history_id, user_id, state in conn.execute(stmt)
+            ]
+
+    @staticmethod
+    def _active_workflow_condition(scheduler=None, handler=None):
         and_conditions = [
             or_(
                 WorkflowInvocation.state == WorkflowInvocation.states.NEW,
@@ -9878,12 +10065,7 @@ class WorkflowInvocation(Base, UsesCreateAndUpdateTime, Dictifiable, Serializabl
             and_conditions.append(WorkflowInvocation.scheduler == scheduler)
         if handler is not None:
             and_conditions.append(WorkflowInvocation.handler == handler)
-
-        stmt = select(WorkflowInvocation.id).filter(and_(*and_conditions)).order_by(WorkflowInvocation.id.asc())
-        # Immediately just load all ids into memory so time slicing logic
-        # is relatively intutitive.
-        with engine.connect() as conn:
-            return conn.scalars(stmt).all()
+        return and_(*and_conditions)
 
     def add_output(self, workflow_output, step, output_object):
         if not hasattr(output_object, "history_content_type"):
@@ -0,0 +1,35 @@
+"""add progress_snapshot column to workflow_invocation table
+
+Revision ID: a3c5e2f81b7d
+Revises: fcefdf715aea
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from sqlalchemy import (
+    Column,
+    JSON,
+)
+
+from galaxy.model.migrations.util import (
+    add_column,
+    drop_column,
+)
+
+# revision identifiers, used by Alembic.
+revision = "a3c5e2f81b7d"
+down_revision = "fcefdf715aea"
+branch_labels = None
+depends_on = None
+
+# database object names used in this revision
+table_name = "workflow_invocation"
+column_name = "progress_snapshot"
+
+
+def upgrade():
+    add_column(table_name, Column(column_name, JSON))
+
+
+def downgrade():
+    drop_column(table_name, column_name)
@@ -0,0 +1,39 @@
+"""add user_disk_usage_ledger table
+
+Revision ID: fcefdf715aea
+Revises: f5e9e4bca542
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from galaxy.model.migrations.util import (
+    create_table,
+    drop_table,
+)
+
+# revision identifiers, used by Alembic.
+revision = "fcefdf715aea"
+down_revision = "f5e9e4bca542"
+branch_labels = None
+depends_on = None
+
+
+# database object names used in this revision
+table_name = "user_disk_usage_ledger"
+
+
+def upgrade():
+    create_table(
+        table_name,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("update_time", sa.DateTime, index=True, nullable=False),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("galaxy_user.id", ondelete="CASCADE"), index=True, nullable=False),
+        sa.Column("quota_source_label", sa.String(32)),
+        sa.Column("delta", sa.Numeric(15, 0), nullable=False),
+    )
+
+
+def downgrade():
+    drop_table(table_name)
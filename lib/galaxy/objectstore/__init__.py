@@ -12,9 +12,16 @@ import random
 import shutil
 import threading
 import time
+from collections import (
+    defaultdict,
+    OrderedDict,
+)
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import (
     Any,
     Dict,
+    Hashable,
     List,
     NamedTuple,
     Optional,
@@ -53,6 +60,7 @@ from galaxy.util.path import (
     safe_walk,
 )
 from galaxy.util.sleeper import Sleeper
+from ._util import read_file_range
 from .badges import (
     BadgeDict,
     read_badges,
@@ -60,6 +68,12 @@ from .badges import (
     StoredBadgeDict,
 )
 from .caching import CacheTarget
+from .placement import (
+    BackendStatistics,
+    build_placement_policy,
+    PlacementPolicy,
+    WeightedPlacementPolicy,
+)
 from .templates import ObjectStoreConfiguration
 
 if TYPE_CHECKING:
@@ -75,6 +89,9 @@ DEFAULT_PRIVATE = False
 DEFAULT_QUOTA_SOURCE = None  # Just track quota right on user object in Galaxy.
 DEFAULT_QUOTA_ENABLED = True  # enable quota tracking in object stores by default
 DEFAULT_DEVICE_ID = None
+DEFAULT_LOCATION_CACHE_SIZE = 10000
+DISK_DELETE_CONCURRENCY = 8
+FILESYSTEM_MONITOR_INTERVAL = 120
 USER_OBJECTS_SCHEME = "user_objects://"
 
 log = logging.getLogger(__name__)
@@ -105,6 +122,10 @@ class BaseUserObjectStoreResolver(UserObjectStoreResolver, metaclass=abc.ABCMeta
         return concrete_object_store(object_store_configuration, self._app_config)
 
 
+# (extra_dir, alt_name, file_name) of a file to update with ObjectStore.update_from_files
+ExtraFileUpdate = Tuple[Optional[str], Optional[str], str]
+
+
 class ObjectStore(metaclass=abc.ABCMeta):
     """ObjectStore interface.
 
@@ -162,6 +183,23 @@ class ObjectStore(metaclass=abc.ABCMeta):
         """Return True if the object identified by `obj` exists, False otherwise."""
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def exists_many(self, objs: List[Any], **kwargs) -> List[bool]:
+        """Return whether each object of `objs` exists, in the same order.
+
+        Takes the same keyword arguments as `exists`. Nested object stores
+        ask each of their backends about all unresolved objects at once.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def locate_many(self, objs: List[Any], **kwargs) -> List[Optional["ConcreteObjectStore"]]:
+        """Return the concrete object store holding each object of `objs`, or None if it is not found.
+
+        Takes the same keyword arguments as `exists`.
+        """
+        raise NotImplementedError()
+
     @abc.abstractmethod
     def construct_path(
         self,
@@ -241,6 +279,37 @@ class ObjectStore(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def delete_many(self, objs: List[Any], **kwargs) -> List[bool]:
+        """Delete each object of `objs` and return whether it was deleted, in the same order.
+
+        Takes the same keyword arguments as `delete`. Object stores delete the
+        objects concurrently or with batch requests where they can. A failure
+        to delete one object is logged and reported as False instead of
+        aborting the others.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def deduplicate(self, obj) -> bool:
+        """Store the contents of `obj` once with any other objects that have identical contents.
+
+        Object stores that share identical contents use the hashes recorded
+        for `obj` to find them and return whether the contents of `obj` are
+        shared afterwards. Other object stores do nothing and return False.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def prefetch(self, obj) -> bool:
+        """Make the contents of `obj` available locally ahead of reading them.
+
+        Object stores caching remote storage pull `obj` into their cache and
+        return whether it had to be fetched. Other object stores do nothing
+        and return False.
+        """
+        raise NotImplementedError()
+
     @abc.abstractmethod
     def get_data(
         self,
@@ -266,6 +335,30 @@ class ObjectStore(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def get_range(
+        self,
+        obj,
+        offset: int,
+        length: int,
+        base_dir=None,
+        extra_dir=None,
+        extra_dir_at_root=False,
+        alt_name=None,
+        obj_dir: bool = False,
+    ) -> bytes:
+        """
+        Fetch at most `length` bytes of the object identified by `obj` starting at byte `offset`.
+
+        Unlike `get_data` and `get_filename`, object stores backed by remote
+        storage fetch only the requested range if the object is not cached,
+        instead of downloading the whole object first. Fewer than `length`
+        bytes are returned at the end of the object.
+
+        If the object does not exist raises `ObjectNotFound`.
+        """
+        raise NotImplementedError()
+
     @abc.abstractmethod
     def get_filename(
         self,
@@ -315,6 +408,24 @@ class ObjectStore(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def update_from_files(
+        self,
+        obj,
+        files: List[ExtraFileUpdate],
+        create: bool = False,
+        preserve_symlinks: bool = False,
+    ) -> None:
+        """
+        Inform the store that several files associated with `obj.id` have been
+        updated, e.g. the extra files of a dataset.
+
+        Equivalent to calling `update_from_file` for each
+        ``(extra_dir, alt_name, file_name)`` entry of `files`, but stores
+        transferring files to remote storage may do so concurrently.
+        """
+        raise NotImplementedError()
+
     @abc.abstractmethod
     def get_object_url(self, obj, extra_dir=None, extra_dir_at_root=False, alt_name=None, obj_dir: bool = False):
         """
@@ -512,6 +623,15 @@ class BaseObjectStore(ObjectStore):
             obj_dir=obj_dir,
         )
 
+    def exists_many(self, objs: List[Any], **kwargs) -> List[bool]:
+        return [location is not None for location in self.locate_many(objs, **kwargs)]
+
+    def locate_many(self, objs: List[Any], **kwargs) -> List[Optional["ConcreteObjectStore"]]:
+        return self._locate_many(list(objs), **kwargs)
+
+    def _locate_many(self, objs: List[Any], **kwargs) -> List[Optional["ConcreteObjectStore"]]:
+        raise NotImplementedError()
+
     def construct_path(
         self,
         obj,
@@ -597,6 +717,36 @@ class BaseObjectStore(ObjectStore):
             obj_dir=obj_dir,
         )
 
+    def delete_many(self, objs: List[Any], **kwargs) -> List[bool]:
+        return self._delete_many(list(objs), **kwargs)
+
+    def _delete(self, obj, **kwargs) -> bool:
+        raise NotImplementedError()
+
+    def _delete_many(self, objs: List[Any], **kwargs) -> List[bool]:
+        return [self._delete_quietly(obj, **kwargs) for obj in objs]
+
+    def deduplicate(self, obj) -> bool:
+        return self._invoke("deduplicate", obj)
+
+    def _deduplicate(self, obj, **kwargs) -> bool:
+        return False
+
+    def prefetch(self, obj) -> bool:
+        return self._invoke("prefetch", obj)
+
+    def _prefetch(self, obj, **kwargs) -> bool:
+        return False
+
+    def _delete_quietly(self, obj, **kwargs) -> bool:
+        try:
+            return self._delete(obj, **kwargs)
+        except ObjectNotFound:
+            return False
+        except Exception:
+            log.exception("Unable to delete %s %s", obj.__class__.__name__, getattr(obj, "id", None))
+            return False
+
     def get_data(
         self,
         obj,
@@ -620,6 +770,34 @@ class BaseObjectStore(ObjectStore):
             obj_dir=obj_dir,
         )
 
+    def get_range(
+        self,
+        obj,
+        offset: int,
+        length: int,
+        base_dir=None,
+        extra_dir=None,
+        extra_dir_at_root=False,
+        alt_name=None,
+        obj_dir: bool = False,
+    ) -> bytes:
+        if offset < 0 or length < 0:
+            raise ValueError(f"Invalid range of {length} bytes at offset {offset}")
+        return self._invoke(
+            "get_range",
+            obj,
+            offset=offset,
+            length=length,
+            base_dir=base_dir,
+            extra_dir=extra_dir,
+            extra_dir_at_root=extra_dir_at_root,
+            alt_name=alt_name,
+            obj_dir=obj_dir,
+        )
+
+    def _get_range(self, obj, offset: int, length: int, **kwargs) -> bytes:
+        raise NotImplementedError()
+
     def get_filename(
         self,
         obj,
@@ -668,6 +846,32 @@ class BaseObjectStore(ObjectStore):
             preserve_symlinks=preserve_symlinks,
         )
 
+    def update_from_files(
+        self,
+        obj,
+        files: List[ExtraFileUpdate],
+        create: bool = False,
+        preserve_symlinks: bool = False,
+    ) -> None:
+        return self._invoke(
+            "update_from_files",
+            obj,
+            files=files,
+            create=create,
+            preserve_symlinks=preserve_symlinks,
+        )
+
+    def _update_from_files(self, obj, files: List[ExtraFileUpdate], create=False, preserve_symlinks=False) -> None:
+        for extra_dir, alt_name, file_name in files:
+            self.update_from_file(
+                obj,
+                extra_dir=extra_dir,
+                alt_name=alt_name,
+                file_name=file_name,
+                create=create,
+                preserve_symlinks=preserve_symlinks,
+            )
+
     def get_object_url(self, obj, extra_dir=None, extra_dir_at_root=False, alt_name=None, obj_dir: bool = False):
         return self._invoke(
             "get_object_url",
@@ -821,6 +1025,9 @@ class ConcreteObjectStore(BaseObjectStore):
         cache_target = self.cache_target
         return [cache_target] if cache_target is not None else []
 
+    def _locate_many(self, objs: List[Any], **kwargs) -> List[Optional["ConcreteObjectStore"]]:
+        return [self if self.exists(obj, **kwargs) else None for obj in objs]
+
     def get_quota_source_map(self):
         quota_source_map = QuotaSourceMap(
             self.quota_source,
@@ -1098,6 +1305,13 @@ class DiskObjectStore(ConcreteObjectStore):
                 log.critical(f"{path} delete error {ex}", exc_info=True)
         return False
 
+    def _delete_many(self, objs: List[Any], **kwargs) -> List[bool]:
+        """Delete the objects concurrently, unlinks are slow on network file systems."""
+        if len(objs) <= 1:
+            return super()._delete_many(objs, **kwargs)
+        with ThreadPoolExecutor(max_workers=DISK_DELETE_CONCURRENCY, thread_name_prefix="disk_delete") as executor:
+            return list(executor.map(partial(self._delete_quietly, **kwargs), objs))
+
     def _get_data(self, obj, start=0, count=-1, **kwargs):
         """Override `ObjectStore`'s stub; retrieve data directly from disk."""
         data_file = open(self._get_filename(obj, **kwargs))  # Should be rb?
@@ -1106,6 +1320,10 @@ class DiskObjectStore(ConcreteObjectStore):
         data_file.close()
         return content
 
+    def _get_range(self, obj, offset: int, length: int, **kwargs) -> bytes:
+        """Override `ObjectStore`'s stub; read the range directly from disk."""
+        return read_file_range(self._get_filename(obj, **kwargs), offset, length)
+
     def _get_filename(self, obj, sync_cache: bool = True, **kwargs) -> str:
         """
         Override `ObjectStore`'s stub.
@@ -1163,19 +1381,86 @@ class DiskObjectStore(ConcreteObjectStore):
         return (float(st.f_blocks - st.f_bavail) / st.f_blocks) * 100
 
 
+class ObjectLocationCache:
+    """Bounded map of objects to the key of the nested object store backend holding them.
+
+    Least recently used entries are dropped once ``max_size`` objects are
+    cached, a ``max_size`` of 0 disables the cache. Objects are identified by
+    their class name and ``id``.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_LOCATION_CACHE_SIZE):
+        self.max_size = max_size
+        self._locations: OrderedDict[Tuple[str, Any], Hashable] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(obj) -> Optional[Tuple[str, Any]]:
+        obj_id = getattr(obj, "id", None)
+        if obj_id is None:
+            return None
+        return (obj.__class__.__name__, obj_id)
+
+    def get(self, obj) -> Optional[Hashable]:
+        key = self._key(obj)
+        if key is None:
+            return None
+        with self._lock:
+            location = self._locations.get(key)
+            if location is not None:
+                self._locations.move_to_end(key)
+            return location
+
+    def set(self, obj, location: Hashable) -> None:
+        key = self._key(obj)
+        if key is None or self.max_size <= 0:
+            return
+        with self._lock:
+            self._locations[key] = location
+            self._locations.move_to_end(key)
+            while len(self._locations) > self.max_size:
+                self._locations.popitem(last=False)
+
+    def discard(self, obj) -> None:
+        key = self._key(obj)
+        if key is not None:
+            with self._lock:
+                self._locations.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._locations.clear()
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+
 class NestedObjectStore(BaseObjectStore):
     """
     Base for ObjectStores that use other ObjectStores.
 
     Example: DistributedObjectStore, HierarchicalObjectStore
+
+    Objects found in (or created in) a backend are remembered in a bounded
+    location cache, so later operations go straight to that backend instead
+    of searching all backends one after another.
+
+    New objects are created in the backend chosen by the store's placement
+    policy, which may use the statistics recorded for each backend.
     """
 
     backends: Dict
+    placement_policy: PlacementPolicy
 
     def __init__(self, config, config_xml=None):
         """Extend `ObjectStore`'s constructor."""
         super().__init__(config)
         self.backends = {}
+        self.location_cache = ObjectLocationCache(
+            getattr(config, "object_store_location_cache_size", DEFAULT_LOCATION_CACHE_SIZE)
+        )
+        self.backend_statistics: Dict[Any, BackendStatistics] = {}
+        self.placement_policy = WeightedPlacementPolicy(self.backend_statistics)
 
     def shutdown(self):
         """For each backend, shuts them down."""
@@ -1188,9 +1473,9 @@ class NestedObjectStore(BaseObjectStore):
         return self._call_method("_exists", obj, False, False, **kwargs)
 
     def _create(self, obj, **kwargs):
-        """Create a backing file in a random backend."""
-        objectstore = random.choice(list(self.backends.values()))
-        return objectstore.create(obj, **kwargs)
+        """Create a backing file in the backend chosen by the placement policy."""
+        backend_id = self.placement_policy.select(list(self.backends.keys()))
+        return self.backends[backend_id].create(obj, **kwargs)
 
     def cache_targets(self) -> List[CacheTarget]:
         cache_targets = []
@@ -1209,12 +1494,49 @@ class NestedObjectStore(BaseObjectStore):
 
     def _delete(self, obj, **kwargs) -> bool:
         """For the first backend that has this `obj`, delete it."""
-        return self._call_method("_delete", obj, False, False, **kwargs)
+        try:
+            return self._call_method("_delete", obj, False, False, **kwargs)
+        finally:
+            self.location_cache.discard(obj)
+
+    def _delete_many(self, objs: List[Any], **kwargs) -> List[bool]:
+        """Delete each object in the backend holding it, with one `delete_many` call per backend."""
+        located = self._locate_many_in_backends(objs, **self._location_kwargs(kwargs))
+        return self._delete_many_in(objs, [location for _, location in located], **kwargs)
+
+    def _delete_many_in(self, objs: List[Any], stores: List[Optional[ObjectStore]], **kwargs) -> List[bool]:
+        """Delete each object of `objs` from the store at the same position in `stores`."""
+        deleted = [False] * len(objs)
+        by_store: Dict[int, Tuple[ObjectStore, List[int]]] = {}
+        for i, store in enumerate(stores):
+            if store is not None:
+                by_store.setdefault(id(store), (store, []))[1].append(i)
+        try:
+            for store, indexes in by_store.values():
+                results = store.delete_many([objs[i] for i in indexes], **kwargs)
+                for i, result in zip(indexes, results):
+                    deleted[i] = result
+        finally:
+            for obj in objs:
+                self.location_cache.discard(obj)
+        return deleted
+
+    def _deduplicate(self, obj, **kwargs) -> bool:
+        """For the first backend that has this `obj`, share its contents."""
+        return self._call_method("_deduplicate", obj, False, False, **kwargs)
+
+    def _prefetch(self, obj, **kwargs) -> bool:
+        """For the first backend that has this `obj`, fetch it ahead of reading it."""
+        return self._call_method("_prefetch", obj, False, False, **kwargs)
 
     def _get_data(self, obj, **kwargs):
         """For the first backend that has this `obj`, get data from it."""
         return self._call_method("_get_data", obj, ObjectNotFound, True, **kwargs)
 
+    def _get_range(self, obj, offset: int, length: int, **kwargs) -> bytes:
+        """For the first backend that has this `obj`, read a range of its data."""
+        return self._call_method("_get_range", obj, ObjectNotFound, True, offset=offset, length=length, **kwargs)
+
     def _get_filename(self, obj, **kwargs) -> str:
         """For the first backend that has this `obj`, get its filename."""
         return self._call_method("_get_filename", obj, ObjectNotFound, True, **kwargs)
@@ -1283,25 +1605,93 @@ class NestedObjectStore(BaseObjectStore):
         except AttributeError:
             return str(obj)
 
+    def _locate(self, obj, **kwargs):
+        """Return the key of the backend holding `obj`, or None.
+
+        The backend remembered in the location cache for the primary file of
+        `obj` is trusted without checking it again, other objects and extra
+        files are searched for in all backends.
+        """
+        if self._is_primary_location(kwargs):
+            cached_key = self.location_cache.get(obj)
+            if cached_key in self.backends:
+                return cached_key
+        return self._search_backends(obj, **kwargs)
+
+    def _search_backends(self, obj, skip_key=None, **kwargs):
+        """Return the key of the first backend other than `skip_key` in which `obj` exists, or None."""
+        location_kwargs = self._location_kwargs(kwargs)
+        for key, store in self.backends.items():
+            if key != skip_key and store.exists(obj, **location_kwargs):
+                if self._is_primary_location(location_kwargs):
+                    self.location_cache.set(obj, key)
+                return key
+        return None
+
+    @staticmethod
+    def _is_primary_location(kwargs) -> bool:
+        """Whether `kwargs` refer to the primary file of an object, the only location remembered for it.
+
+        Extra files and directories of an object may be stored in another backend than its primary file.
+        """
+        return not any(kwargs.get(key) for key in ("dir_only", "extra_dir", "alt_name", "obj_dir"))
+
+    @staticmethod
+    def _location_kwargs(kwargs) -> Dict[str, Any]:
+        """Select the keyword arguments of `kwargs` that `exists` accepts."""
+        return {
+            "base_dir": kwargs.get("base_dir", None),
+            "dir_only": kwargs.get("dir_only", False),
+            "extra_dir": kwargs.get("extra_dir", None),
+            "extra_dir_at_root": kwargs.get("extra_dir_at_root", False),
+            "alt_name": kwargs.get("alt_name", None),
+            "obj_dir": kwargs.get("obj_dir", False),
+        }
+
+    def _locate_many(self, objs: List[Any], **kwargs) -> List[Optional["ConcreteObjectStore"]]:
+        return [location for _, location in self._locate_many_in_backends(objs, **kwargs)]
+
+    def _locate_many_in_backends(
+        self, objs: List[Any], **kwargs
+    ) -> List[Tuple[Optional[Hashable], Optional["ConcreteObjectStore"]]]:
+        """Return ``(backend key, concrete store)`` holding each object, or ``(None, None)``.
+
+        Each backend is asked about all objects not located yet in a single
+        call, starting with the backends remembered in the location cache.
+        """
+        locations: List[Tuple[Optional[Hashable], Optional[ConcreteObjectStore]]] = [(None, None)] * len(objs)
+        cached: Dict[Hashable, List[int]] = defaultdict(list)
+        remember = self._is_primary_location(kwargs)
+        for i, obj in enumerate(objs):
+            cached_key = self.location_cache.get(obj) if remember else None
+            if cached_key in self.backends:
+                cached[cached_key].append(i)
+        for key, indexes in cached.items():
+            found = self.backends[key].locate_many([objs[i] for i in indexes], **kwargs)
+            for i, location in zip(indexes, found):
+                if location is not None:
+                    locations[i] = (key, location)
+        pending = [i for i, (_, location) in enumerate(locations) if location is None]
+        for key, store in self.backends.items():
+            if not pending:
+                break
+            found = store.locate_many([objs[i] for i in pending], **kwargs)
+            still_pending = []
+            for i, location in zip(pending, found):
+                if location is None:
+                    still_pending.append(i)
+                else:
+                    locations[i] = (key, location)
+                    if remember:
+                        self.location_cache.set(objs[i], key)
+            pending = still_pending
+        return locations
+
     def _call_method(self, method, obj, default, default_is_exception, **kwargs):
         """Check all children object stores for the first one with the dataset."""
-        base_dir = kwargs.get("base_dir", None)
-        dir_only = kwargs.get("dir_only", False)
-        extra_dir = kwargs.get("extra_dir", None)
-        extra_dir_at_root = kwargs.get("extra_dir_at_root", False)
-        alt_name = kwargs.get("alt_name", None)
-        obj_dir = kwargs.get("obj_dir", False)
-        for store in self.backends.values():
-            if store.exists(
-                obj,
-                base_dir=base_dir,
-                dir_only=dir_only,
-                extra_dir=extra_dir,
-                extra_dir_at_root=extra_dir_at_root,
-                alt_name=alt_name,
-                obj_dir=obj_dir,
-            ):
-                return store.__getattribute__(method)(obj, **kwargs)
+        key = self._locate(obj, **kwargs)
+        if key is not None:
+            return self.backends[key].__getattribute__(method)(obj, **kwargs)
         if default_is_exception:
             raise default(
                 f"objectstore, _call_method failed: {method} on {self._repr_object_for_exception(obj)}, kwargs: {kwargs}"
@@ -1327,7 +1717,9 @@ class DistributedObjectStore(NestedObjectStore):
 
     When getting objects the first store where the object exists is used.
     When creating objects they are created in a store selected randomly, but
-    with weighting.
+    with weighting. With the ``load_aware`` placement policy the weights are
+    further scaled by the free space, latency and write throughput observed
+    for each backend.
     """
 
     backends: Dict[str, Any]  # BaseObjectStore or ConcreteObjectStore?
@@ -1373,6 +1765,7 @@ class DistributedObjectStore(NestedObjectStore):
             backend = build_object_store_from_config(config, config_dict=backend_def, fsmon=fsmon)
 
             self.backends[backend_id] = backend
+            self.backend_statistics[backend_id] = BackendStatistics()
             self.max_percent_full[backend_id] = maxpctfull
 
             for _ in range(0, weight):
@@ -1382,11 +1775,17 @@ class DistributedObjectStore(NestedObjectStore):
                 self.weighted_backend_ids.append(backend_id)
 
         self.original_weighted_backend_ids = self.weighted_backend_ids
+        self.placement_policy = build_placement_policy(config_dict, self.backend_statistics)
         self.user_object_store_resolver = user_object_store_resolver
         self.user_selection_allowed = user_selection_allowed
         self.allow_user_selection = bool(user_selection_allowed) or (user_object_store_resolver is not None)
         self.sleeper = None
-        if fsmon and (self.global_max_percent_full or [_ for _ in self.max_percent_full.values() if _ != 0.0]):
+        monitor_usage = (
+            self.global_max_percent_full
+            or [_ for _ in self.max_percent_full.values() if _ != 0.0]
+            or self.placement_policy.uses_store_usage
+        )
+        if fsmon and monitor_usage:
             self.sleeper = Sleeper()
             self.filesystem_monitor_thread = threading.Thread(target=self.__filesystem_monitor, args=[self.sleeper])
             self.filesystem_monitor_thread.daemon = True
@@ -1401,11 +1800,14 @@ class DistributedObjectStore(NestedObjectStore):
             backends_root = config_xml.find("backends")
 
         backends: List[Dict[str, Any]] = []
-        config_dict = {
+        config_dict: Dict[str, Any] = {
             "search_for_missing": asbool(backends_root.get("search_for_missing", True)),
             "global_max_percent_full": float(backends_root.get("maxpctfull", 0)),
             "backends": backends,
         }
+        placement_policy = backends_root.get("placement_policy")
+        if placement_policy is not None:
+            config_dict["placement_policy"] = placement_policy
 
         for b in [e for e in backends_root if e.tag == "backend"]:
             store_id = b.get("id")
@@ -1459,6 +1861,7 @@ class DistributedObjectStore(NestedObjectStore):
         as_dict = super().to_dict()
         as_dict["global_max_percent_full"] = self.global_max_percent_full
         as_dict["search_for_missing"] = self.search_for_missing
+        as_dict["placement_policy"] = self.placement_policy.policy_type
         backends: List[Dict[str, Any]] = []
         for backend_id, backend in self.backends.items():
             backend_as_dict = backend.to_dict()
@@ -1497,11 +1900,29 @@ class DistributedObjectStore(NestedObjectStore):
             new_weighted_backend_ids = self.original_weighted_backend_ids
             for id, backend in self.backends.items():
                 maxpct = self.max_percent_full[id] or self.global_max_percent_full
-                pct = backend.get_store_usage_percent()
-                if pct > maxpct:
+                try:
+                    pct = backend.get_store_usage_percent()
+                except Exception:
+                    log.debug("Could not determine usage of object store backend '%s'", id, exc_info=True)
+                    continue
+                self.backend_statistics[id].record_usage(pct)
+                if maxpct and pct > maxpct:
                     new_weighted_backend_ids = [_ for _ in new_weighted_backend_ids if _ != id]
             self.weighted_backend_ids = new_weighted_backend_ids
-            sleeper.sleep(120)  # Test free space every 2 minutes
+            sleeper.sleep(FILESYSTEM_MONITOR_INTERVAL)
+
+    def _record_backend_create(self, object_store_id, start: float) -> None:
+        statistics = self.backend_statistics.get(object_store_id)
+        if statistics is not None:
+            statistics.record_latency(time.monotonic() - start)
+
+    def _record_backend_transfer(self, object_store_id, start: float, file_names) -> None:
+        statistics = self.backend_statistics.get(object_store_id)
+        if statistics is None:
+            # user object stores and unplaced objects
+            return
+        nbytes = sum(os.path.getsize(f) for f in file_names if f and os.path.isfile(f))
+        statistics.record_transfer(time.monotonic() - start, nbytes)
 
     def _construct_path(self, obj, **kwargs) -> str:
         return self._resolve_backend(obj.object_store_id).construct_path(obj, **kwargs)
@@ -1512,7 +1933,7 @@ class DistributedObjectStore(NestedObjectStore):
         if object_store_id is None or not self._exists(obj, **kwargs):
             if object_store_id is None or (object_store_id not in self.backends and "://" not in object_store_id):
                 try:
-                    object_store_id = random.choice(self.weighted_backend_ids)
+                    object_store_id = self.placement_policy.select(self.weighted_backend_ids)
                     obj.object_store_id = object_store_id
                 except IndexError:
                     raise ObjectInvalid(
@@ -1528,10 +1949,50 @@ class DistributedObjectStore(NestedObjectStore):
                     obj.__class__.__name__,
                     obj.id,
                 )
-            return self._resolve_backend(object_store_id).create(obj, **kwargs)
+            start = time.monotonic()
+            created = self._resolve_backend(object_store_id).create(obj, **kwargs)
+            self._record_backend_create(object_store_id, start)
+            return created
         else:
             return self._resolve_backend(object_store_id)
 
+    def _update_from_files(self, obj, files: List[ExtraFileUpdate], create=False, preserve_symlinks=False) -> None:
+        object_store_id = obj.object_store_id
+        if object_store_id is None:
+            return super()._update_from_files(obj, files, create=create, preserve_symlinks=preserve_symlinks)
+        # Let the backend holding the dataset handle all files at once so it can transfer them concurrently
+        start = time.monotonic()
+        self._resolve_backend(object_store_id).update_from_files(
+            obj, files, create=create, preserve_symlinks=preserve_symlinks
+        )
+        self._record_backend_transfer(object_store_id, start, [file_name for _, _, file_name in files])
+
+    def _update_from_file(
+        self,
+        obj,
+        base_dir=None,
+        extra_dir=None,
+        extra_dir_at_root=False,
+        alt_name=None,
+        obj_dir: bool = False,
+        file_name=None,
+        create: bool = False,
+        preserve_symlinks: bool = False,
+    ) -> None:
+        start = time.monotonic()
+        super()._update_from_file(
+            obj,
+            base_dir=base_dir,
+            extra_dir=extra_dir,
+            extra_dir_at_root=extra_dir_at_root,
+            alt_name=alt_name,
+            obj_dir=obj_dir,
+            file_name=file_name,
+            create=create,
+            preserve_symlinks=preserve_symlinks,
+        )
+        self._record_backend_transfer(obj.object_store_id, start, [file_name])
+
     def _call_method(self, method, obj, default, default_is_exception, **kwargs):
         object_store_id = self.__get_store_id_for(obj, **kwargs)
         if object_store_id is not None:
@@ -1598,33 +2059,78 @@ class DistributedObjectStore(NestedObjectStore):
             # if this instance has been switched from a non-distributed to a
             # distributed object store, or if the object's store id is invalid,
             # try to locate the object
-            base_dir = kwargs.get("base_dir", None)
-            dir_only = kwargs.get("dir_only", False)
-            extra_dir = kwargs.get("extra_dir", None)
-            extra_dir_at_root = kwargs.get("extra_dir_at_root", False)
-            alt_name = kwargs.get("alt_name", None)
-            obj_dir = kwargs.get("obj_dir", False)
-            for id, store in self.backends.items():
-                if store.exists(
-                    obj,
-                    base_dir=base_dir,
-                    dir_only=dir_only,
-                    extra_dir=extra_dir,
-                    extra_dir_at_root=extra_dir_at_root,
-                    alt_name=alt_name,
-                    obj_dir=obj_dir,
-                ):
-                    log.warning(
-                        f"{obj.__class__.__name__} object with ID {obj.id} found in backend object store with ID {id}"
-                    )
-                    try:
-                        obj.object_store_id = id
-                    except AttributeError:
-                        # obj is likely a namedtuple (/scripts/cleanup_datasets/pgcleanup.py::RemovesDatasets)
-                        log.info("Unable to set object_store_id on a readonly dataset object: %s", obj)
-                    return id
+            id = self._locate(obj, **kwargs)
+            if id is not None:
+                self.__found_in_backend(obj, id)
+                return id
         return None
 
+    def __found_in_backend(self, obj, id):
+        log.warning(f"{obj.__class__.__name__} object with ID {obj.id} found in backend object store with ID {id}")
+        try:
+            obj.object_store_id = id
+        except AttributeError:
+            # obj is likely a namedtuple (/scripts/cleanup_datasets/pgcleanup.py::RemovesDatasets)
+            log.info("Unable to set object_store_id on a readonly dataset object: %s", obj)
+
+    def _locate_many(self, objs: List[Any], **kwargs) -> List[Optional["ConcreteObjectStore"]]:
+        """Locate objects with an object_store_id in that backend, search all backends for the others."""
+        locations: List[Optional[ConcreteObjectStore]] = [None] * len(objs)
+        by_store_id: Dict[str, List[int]] = defaultdict(list)
+        missing = []
+        for i, obj in enumerate(objs):
+            object_store_id = obj.object_store_id
+            if object_store_id is None:
+                missing.append(i)
+            elif object_store_id in self.backends or is_user_object_store(object_store_id):
+                by_store_id[object_store_id].append(i)
+            else:
+                log.warning(
+                    "The backend object store ID (%s) for %s object with ID %s is invalid",
+                    object_store_id,
+                    obj.__class__.__name__,
+                    obj.id,
+                )
+        for object_store_id, indexes in by_store_id.items():
+            found = self._resolve_backend(object_store_id).locate_many([objs[i] for i in indexes], **kwargs)
+            for i, location in zip(indexes, found):
+                locations[i] = location
+        if missing and self.search_for_missing:
+            found_in_backends = self._locate_many_in_backends([objs[i] for i in missing], **kwargs)
+            for i, (id, location) in zip(missing, found_in_backends):
+                if location is not None:
+                    locations[i] = location
+                    self.__found_in_backend(objs[i], id)
+        return locations
+
+    def _delete_many(self, objs: List[Any], **kwargs) -> List[bool]:
+        """Delete objects in the backend named by their object_store_id, searching for the others."""
+        stores: List[Optional[ObjectStore]] = [None] * len(objs)
+        missing = []
+        for i, obj in enumerate(objs):
+            object_store_id = obj.object_store_id
+            if object_store_id is None:
+                missing.append(i)
+                continue
+            try:
+                stores[i] = self._resolve_backend(object_store_id)
+            except KeyError:
+                log.warning(
+                    "The backend object store ID (%s) for %s object with ID %s is invalid",
+                    object_store_id,
+                    obj.__class__.__name__,
+                    obj.id,
+                )
+        if missing and self.search_for_missing:
+            found_in_backends = self._locate_many_in_backends(
+                [objs[i] for i in missing], **self._location_kwargs(kwargs)
+            )
+            for i, (id, location) in zip(missing, found_in_backends):
+                if location is not None:
+                    stores[i] = location
+                    self.__found_in_backend(objs[i], id)
+        return self._delete_many_in(objs, stores, **kwargs)
+
     def object_store_ids(self, private=None):
         object_store_ids = []
         for backend_id, backend in self.backends.items():
@@ -1727,18 +2233,28 @@ class HierarchicalObjectStore(NestedObjectStore):
         return as_dict
 
     def _exists(self, obj, **kwargs) -> bool:
-        """Check all child object stores."""
-        for store in self.backends.values():
-            if store.exists(obj, **kwargs):
+        """Check all child object stores.
+
+        The backend remembered in the location cache is checked first for the
+        primary file, the others are only searched if the object is no longer
+        there.
+        """
+        cached_key = self.location_cache.get(obj) if self._is_primary_location(kwargs) else None
+        if cached_key in self.backends:
+            if self.backends[cached_key].exists(obj, **kwargs):
                 return True
-        return False
+            self.location_cache.discard(obj)
+        return self._search_backends(obj, skip_key=cached_key, **kwargs) is not None
 
     def _construct_path(self, obj, **kwargs) -> str:
         return self.backends[0].construct_path(obj, **kwargs)
 
     def _create(self, obj, **kwargs):
         """Call the primary object store."""
-        return self.backends[0].create(obj, **kwargs)
+        store = self.backends[0].create(obj, **kwargs)
+        if self._is_primary_location(kwargs):
+            self.location_cache.set(obj, 0)
+        return store
 
     def _is_private(self, obj) -> bool:
         # Unlink the DistributedObjectStore - the HierarchicalObjectStore does not use
@@ -1818,6 +2334,10 @@ def type_to_object_store_class(
     elif store == "hierarchical":
         objectstore_class = HierarchicalObjectStore
         objectstore_constructor_kwds["fsmon"] = fsmon
+    elif store == "content_addressed_disk":
+        from .content_addressed import ContentAddressedDiskObjectStore
+
+        objectstore_class = ContentAddressedDiskObjectStore
     elif store == "irods":
         from .irods import IRODSObjectStore
 
@@ -2141,6 +2661,7 @@ def persist_extra_files_for_dataset(
     dataset: "Dataset",
     extra_files_path_name: str,
 ):
+    extra_files: List[ExtraFileUpdate] = []
     for root, _dirs, files in safe_walk(src_extra_files_path):
         extra_dir = os.path.join(extra_files_path_name, os.path.relpath(root, src_extra_files_path))
         extra_dir = os.path.normpath(extra_dir)
@@ -2148,11 +2669,6 @@ def persist_extra_files_for_dataset(
             if not in_directory(f, src_extra_files_path):
                 # Unclear if this can ever happen if we use safe_walk ... probably not ?
                 raise MalformedContents(f"Invalid dataset path: {f}")
-            object_store.update_from_file(
-                dataset,
-                extra_dir=extra_dir,
-                alt_name=f,
-                file_name=os.path.join(root, f),
-                create=True,
-                preserve_symlinks=True,
-            )
+            extra_files.append((extra_dir, f, os.path.join(root, f)))
+    if extra_files:
+        object_store.update_from_files(dataset, extra_files, create=True, preserve_symlinks=True)
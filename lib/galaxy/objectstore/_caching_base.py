@@ -1,27 +1,45 @@
 import logging
 import os
 import shutil
+import threading
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    wait,
+)
 from contextlib import contextmanager
 from datetime import datetime
+from functools import partial
 from typing import (
     Any,
+    Callable,
     Dict,
+    Iterable,
+    List,
     Optional,
+    Tuple,
 )
 
 from galaxy.exceptions import (
     ObjectInvalid,
     ObjectNotFound,
 )
-from galaxy.objectstore import ConcreteObjectStore
+from galaxy.objectstore import (
+    ConcreteObjectStore,
+    ExtraFileUpdate,
+)
 from galaxy.util import (
     directory_hash_id,
     unlink,
 )
 from galaxy.util.path import safe_relpath
-from ._util import fix_permissions
+from ._util import (
+    fix_permissions,
+    read_file_range,
+)
 from .caching import (
+    CacheIndex,
     CacheTarget,
+    DEFAULT_EVICTION_POLICY,
     InProcessCacheMonitor,
 )
 
@@ -37,6 +55,15 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
     cache_size: int
     cache_monitor: Optional[InProcessCacheMonitor] = None
     cache_monitor_interval: int
+    use_cache_index: bool = False
+    cache_eviction_policy: str = DEFAULT_EVICTION_POLICY
+    _cache_index: Optional[CacheIndex] = None
+    transfer_concurrency: int = 1
+    _transfer_pool: Optional[ThreadPoolExecutor] = None
+    _transfer_pool_lock = threading.Lock()
+    # downloads in progress by cache path, shared by all instances, with the number of threads waiting for each
+    _downloads: Dict[str, Tuple[threading.Lock, int]] = {}
+    _downloads_lock = threading.Lock()
 
     def _ensure_staging_path_writable(self):
         staging_path = self.staging_path
@@ -112,7 +139,55 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
         cache_path = self._get_cache_path(rel_path)
         return os.path.exists(cache_path)
 
+    @property
+    def cache_index(self) -> Optional[CacheIndex]:
+        if not self.use_cache_index:
+            return None
+        if self._cache_index is None:
+            self._cache_index = CacheIndex(self.staging_path)
+        return self._cache_index
+
+    def _record_in_cache_index(self, rel_path: str, tree: bool = False, hit: Optional[bool] = None) -> None:
+        cache_index = self.cache_index
+        if cache_index is not None:
+            cache_path = self._get_cache_path(rel_path)
+            if tree:
+                cache_index.record_tree(cache_path)
+            else:
+                cache_index.record(cache_path, hit=hit)
+
+    def _remove_from_cache_index(self, rel_path: str) -> None:
+        cache_index = self.cache_index
+        if cache_index is not None:
+            cache_index.remove(self._get_cache_path(rel_path))
+
+    @contextmanager
+    def _download_lock(self, rel_path: str):
+        """Serialize downloads of `rel_path` into the cache, e.g. of a job input that is being prefetched."""
+        cache_path = self._get_cache_path(rel_path)
+        with self._downloads_lock:
+            lock, waiting = self._downloads.get(cache_path, (threading.Lock(), 0))
+            self._downloads[cache_path] = (lock, waiting + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._downloads_lock:
+                lock, waiting = self._downloads[cache_path]
+                if waiting == 1:
+                    del self._downloads[cache_path]
+                else:
+                    self._downloads[cache_path] = (lock, waiting - 1)
+
     def _pull_into_cache(self, rel_path, **kwargs) -> bool:
+        with self._download_lock(rel_path):
+            cache_path = self._get_cache_path(rel_path)
+            if self._in_cache(rel_path) and os.path.getsize(cache_path) > 0:
+                # pulled in while waiting for a concurrent download
+                return True
+            return self._pull_into_cache_unlocked(rel_path, **kwargs)
+
+    def _pull_into_cache_unlocked(self, rel_path, **kwargs) -> bool:
         # Ensure the cache directory structure exists (e.g., dataset_#_files/)
         rel_path_dir = os.path.dirname(rel_path)
         if not os.path.exists(self._get_cache_path(rel_path_dir)):
@@ -121,6 +196,7 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
         file_ok = self._download(rel_path)
         if file_ok:
             fix_permissions(self.config, self._get_cache_path(rel_path_dir))
+            self._record_in_cache_index(rel_path, hit=False)
         else:
             unlink(self._get_cache_path(rel_path), ignore_errors=True)
         return file_ok
@@ -130,6 +206,8 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
         # Check cache first and get file if not there
         if not self._in_cache(rel_path):
             self._pull_into_cache(rel_path, **kwargs)
+        else:
+            self._record_in_cache_index(rel_path, hit=True)
         # Read the file content from cache
         data_file = open(self._get_cache_path(rel_path))
         data_file.seek(start)
@@ -137,6 +215,28 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
         data_file.close()
         return content
 
+    def _prefetch(self, obj, **kwargs) -> bool:
+        rel_path = self._construct_path(obj, **kwargs)
+        if self._in_cache(rel_path) and os.path.getsize(self._get_cache_path(rel_path)) > 0:
+            return False
+        if not self._exists_remotely(rel_path):
+            return False
+        return self._pull_into_cache(rel_path, **kwargs)
+
+    def _get_range(self, obj, offset: int, length: int, **kwargs) -> bytes:
+        rel_path = self._construct_path(obj, **kwargs)
+        cache_path = self._get_cache_path(rel_path)
+        if self._in_cache(rel_path):
+            self._record_in_cache_index(rel_path, hit=True)
+            return read_file_range(cache_path, offset, length)
+        # Fetch just the range instead of pulling a potentially huge object into the cache
+        data = self._get_remote_range(rel_path, offset, length)
+        if data is not None:
+            return data
+        if not self._pull_into_cache(rel_path, **kwargs):
+            raise ObjectNotFound(f"objectstore.get_range, object not found: {obj}, kwargs: {kwargs}")
+        return read_file_range(cache_path, offset, length)
+
     def _exists(self, obj, **kwargs) -> bool:
         in_cache = exists_remotely = False
         rel_path = self._construct_path(obj, **kwargs)
@@ -195,6 +295,7 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
             if not dir_only:
                 rel_path = os.path.join(rel_path, alt_name if alt_name else f"dataset_{self._get_object_id(obj)}.dat")
                 open(os.path.join(self.staging_path, rel_path), "w").close()
+                self._record_in_cache_index(rel_path)
                 self._push_to_storage(rel_path, from_string="")
         return self
 
@@ -286,6 +387,7 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
 
         # Check if the file exists in the cache first, always pull if file size in cache is zero
         if not dir_only and self._in_cache(rel_path) and os.path.getsize(self._get_cache_path(rel_path)) > 0:
+            self._record_in_cache_index(rel_path, hit=True)
             return cache_path
 
         # For directories: trust cache if it has files. Individual file accesses
@@ -299,6 +401,7 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
         if self._exists(obj, **kwargs):
             if dir_only:
                 self._download_directory_into_cache(rel_path, cache_path)
+                self._record_in_cache_index(rel_path, tree=True)
                 return cache_path
             else:
                 if self._pull_into_cache(rel_path, **kwargs):
@@ -334,10 +437,12 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
             # but requires iterating through each individual key in S3 and deleing it.
             if entire_dir and extra_dir:
                 shutil.rmtree(self._get_cache_path(rel_path), ignore_errors=True)
+                self._remove_from_cache_index(rel_path)
                 return self._delete_remote_all(rel_path)
             else:
                 # Delete from cache first
                 unlink(self._get_cache_path(rel_path), ignore_errors=True)
+                self._remove_from_cache_index(rel_path)
                 # Delete from S3 as well
                 if self._exists_remotely(rel_path):
                     return self._delete_existing_remote(rel_path)
@@ -345,6 +450,36 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
             log.exception("%s delete error", self._get_filename(obj, **kwargs))
         return False
 
+    def _delete_many(self, objs: List[Any], entire_dir: bool = False, **kwargs) -> List[bool]:
+        if type(self)._delete is not CachingConcreteObjectStore._delete:
+            # object stores replacing _delete don't implement the remote deletion hooks used below
+            return super()._delete_many(objs, entire_dir=entire_dir, **kwargs)
+        if entire_dir or kwargs.get("obj_dir"):
+            return self._transfer_all(
+                partial(self._delete_quietly, obj, entire_dir=entire_dir, **kwargs) for obj in objs
+            )
+        rel_paths = []
+        for obj in objs:
+            rel_path = self._construct_path(obj, **kwargs)
+            unlink(self._get_cache_path(rel_path), ignore_errors=True)
+            self._remove_from_cache_index(rel_path)
+            rel_paths.append(rel_path)
+        return self._delete_existing_remotes(rel_paths)
+
+    def _update_from_files(self, obj, files: List[ExtraFileUpdate], create=False, preserve_symlinks=False) -> None:
+        self._transfer_all(
+            partial(
+                self._update_from_file,
+                obj,
+                extra_dir=extra_dir,
+                alt_name=alt_name,
+                file_name=file_name,
+                create=create,
+                preserve_symlinks=preserve_symlinks,
+            )
+            for extra_dir, alt_name, file_name in files
+        )
+
     def _update_from_file(
         self, obj, file_name=None, create: bool = False, preserve_symlinks: bool = False, **kwargs
     ) -> None:
@@ -363,6 +498,7 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
                         # FIXME? Should this be a `move`?
                         shutil.copy(source_file, cache_file)
                     fix_permissions(self.config, cache_file)
+                    self._record_in_cache_index(rel_path)
                 except OSError:
                     log.exception("Trouble copying source file '%s' to cache '%s'", source_file, cache_file)
             else:
@@ -381,21 +517,92 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
             self.staging_path,
             self.cache_size,
             0.9,
+            self.use_cache_index,
+            self.cache_eviction_policy,
         )
 
     def _shutdown_cache_monitor(self) -> None:
         self.cache_monitor and self.cache_monitor.shutdown()
+        if self._cache_index is not None:
+            # Write cache hits still buffered by this process
+            self._cache_index.flush()
 
     def _start_cache_monitor_if_needed(self):
         if self.enable_cache_monitor:
             self.cache_monitor = InProcessCacheMonitor(self.cache_target, self.cache_monitor_interval)
 
+    @property
+    def _transfer_thread_name_prefix(self) -> str:
+        return f"{self.store_type}-transfer-{id(self)}"
+
+    def _get_transfer_pool(self) -> ThreadPoolExecutor:
+        with self._transfer_pool_lock:
+            if self._transfer_pool is None:
+                self._transfer_pool = ThreadPoolExecutor(
+                    max_workers=self.transfer_concurrency,
+                    thread_name_prefix=self._transfer_thread_name_prefix,
+                )
+            return self._transfer_pool
+
+    def _shutdown_transfer_pool(self) -> None:
+        with self._transfer_pool_lock:
+            if self._transfer_pool is not None:
+                self._transfer_pool.shutdown(wait=True)
+                self._transfer_pool = None
+
+    def _transfer_all(self, transfers: Iterable[Callable[[], Any]]) -> List[Any]:
+        """Run the given transfers and return their results once all of them are done.
+
+        Up to ``transfer_concurrency`` transfers run at the same time. If any of
+        them raised an exception, the first such exception is re-raised.
+        """
+        transfers = list(transfers)
+        in_transfer_thread = threading.current_thread().name.startswith(self._transfer_thread_name_prefix)
+        if self.transfer_concurrency <= 1 or len(transfers) <= 1 or in_transfer_thread:
+            # Transfers started from the pool itself run inline so they can't wait on a busy pool.
+            return [transfer() for transfer in transfers]
+        futures = [self._get_transfer_pool().submit(transfer) for transfer in transfers]
+        wait(futures)
+        return [future.result() for future in futures]
+
+    def _download_files_into_cache(
+        self,
+        rel_path: str,
+        cache_path: str,
+        remote_files: Iterable[Tuple[str, Any]],
+        download: Callable[[Any, str], Any],
+    ) -> None:
+        """Download ``(remote_path, remote_file)`` pairs below ``rel_path`` into ``cache_path``.
+
+        ``download(remote_file, local_path)`` transfers a single file, files are
+        downloaded concurrently using the transfer pool.
+        """
+
+        def download_file(remote_path: str, remote_file: Any) -> None:
+            local_file_path = os.path.join(cache_path, os.path.relpath(remote_path, rel_path))
+            os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
+            with self._atomic_download(local_file_path) as tmp:
+                download(remote_file, tmp)
+
+        self._transfer_all(
+            partial(download_file, remote_path, remote_file) for remote_path, remote_file in remote_files
+        )
+
     def _get_remote_size(self, rel_path: str) -> int:
         raise NotImplementedError()
 
     def _exists_remotely(self, rel_path: str) -> bool:
         raise NotImplementedError()
 
+    def _get_remote_range(self, rel_path: str, offset: int, length: int) -> Optional[bytes]:
+        """Fetch `length` bytes at `offset` of the remote object at `rel_path`.
+
+        Return None if the remote storage can't serve ranges, the object is then
+        pulled into the cache instead. Raise `ObjectNotFound` if the object
+        doesn't exist remotely.
+        """
+        return None
+
     @contextmanager
     def _atomic_download(self, cache_path):
         """Download to a temp file then atomically rename to prevent serving partial files.
@@ -428,6 +635,21 @@ class CachingConcreteObjectStore(ConcreteObjectStore):
     def _delete_remote_all(self, rel_path) -> bool:
         raise NotImplementedError()
 
+    def _delete_existing_remotes(self, rel_paths: List[str]) -> List[bool]:
+        """Delete the given keys from remote storage and return whether each was deleted.
+
+        Deletes the keys one by one on the transfer pool, object stores with a
+        batch delete API should override this.
+        """
+        return self._transfer_all(partial(self._delete_remote_if_exists, rel_path) for rel_path in rel_paths)
+
+    def _delete_remote_if_exists(self, rel_path: str) -> bool:
+        try:
+            return self._exists_remotely(rel_path) and self._delete_existing_remote(rel_path)
+        except Exception:
+            log.exception("Could not delete '%s' from remote storage", rel_path)
+            return False
+
     # Do not need to override these if instead replacing _push_to_storage
     def _push_string_to_path(self, rel_path: str, from_string: str) -> bool:
         raise NotImplementedError()
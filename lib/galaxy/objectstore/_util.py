@@ -20,6 +20,25 @@ def fix_permissions(config, rel_path: str):
             umask_fix_perms(path, config.umask, 0o666, config.gid)
 
 
+def read_file_range(path: str, offset: int, length: int) -> bytes:
+    """Read at most `length` bytes at `offset` from the file at `path`, without reading anything else."""
+    if length <= 0:
+        return b""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        chunks = []
+        while length > 0:
+            chunk = os.pread(fd, length, offset)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+            length -= len(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
 class UsesAxel:
     use_axel: bool
 
@@ -3,11 +3,15 @@ Object Store plugin for the Microsoft Azure Block Blob Storage system
 """
 
 import logging
-import os
 from datetime import (
     datetime,
     timedelta,
 )
+from functools import partial
+from typing import (
+    List,
+    Optional,
+)
 
 try:
     from azure.common import AzureHttpError
@@ -19,12 +23,19 @@ try:
 except ImportError:
     BlobServiceClient = None  # type: ignore[assignment,unused-ignore,misc]
 
+from galaxy.exceptions import ObjectNotFound
 from ._caching_base import CachingConcreteObjectStore
 from .caching import (
+    configured_cache_index,
+    configured_eviction_policy,
+    configured_transfer_concurrency,
     enable_cache_monitor,
     parse_caching_config_dict_from_xml,
 )
 
+# Maximum number of sub-requests Azure accepts in a single blob batch request
+DELETE_BLOBS_BATCH_SIZE = 256
+
 NO_BLOBSERVICE_ERROR_MESSAGE = (
     "ObjectStore configured, but no azure.storage.blob dependency available."
     "Please install and properly configure azure.storage.blob or modify Object Store configuration."
@@ -141,6 +152,9 @@ class AzureBlobObjectStore(CachingConcreteObjectStore):
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
         self.cache_updated_data = cache_dict.get("cache_updated_data", True)
+        self.transfer_concurrency = configured_transfer_concurrency(config, config_dict)
+        self.use_cache_index = configured_cache_index(config, config_dict)
+        self.cache_eviction_policy = configured_eviction_policy(config, config_dict, self.use_cache_index)
 
         self._initialize()
 
@@ -171,6 +185,9 @@ class AzureBlobObjectStore(CachingConcreteObjectStore):
                     "size": self.cache_size,
                     "path": self.staging_path,
                     "cache_updated_data": self.cache_updated_data,
+                    "transfer_concurrency": self.transfer_concurrency,
+                    "index": self.use_cache_index,
+                    "eviction_policy": self.cache_eviction_policy,
                 },
             }
         )
@@ -238,6 +255,21 @@ class AzureBlobObjectStore(CachingConcreteObjectStore):
     def _blob_client(self, rel_path: str):
         return self.service.get_blob_client(self.container_name, rel_path)
 
+    def _get_remote_range(self, rel_path: str, offset: int, length: int) -> Optional[bytes]:
+        if length == 0:
+            return b""
+        try:
+            return self._blob_client(rel_path).download_blob(offset=offset, length=length).readall()
+        except AzureHttpError as e:
+            status_code = getattr(e, "status_code", None)
+            if status_code == 416:
+                # range starts beyond the end of the blob
+                return b""
+            if status_code == 404:
+                raise ObjectNotFound(f"Blob '{rel_path}' not found in Azure")
+            log.exception("Could not read range of blob '%s' from Azure", rel_path)
+            return None
+
     def _download(self, rel_path):
         local_destination = self._get_cache_path(rel_path)
         try:
@@ -264,12 +296,9 @@ class AzureBlobObjectStore(CachingConcreteObjectStore):
 
     def _download_directory_into_cache(self, rel_path, cache_path):
         blobs = self._blobs_from(rel_path)
-        for blob in blobs:
-            key = blob.name
-            local_file_path = os.path.join(cache_path, os.path.relpath(key, rel_path))
-            os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
-            with self._atomic_download(local_file_path) as tmp:
-                self._download_to_file(key, tmp)
+        self._download_files_into_cache(
+            rel_path, cache_path, ((blob.name, blob.name) for blob in blobs), self._download_to_file
+        )
 
     def _push_string_to_path(self, rel_path: str, from_string: str) -> bool:
         try:
@@ -313,6 +342,29 @@ class AzureBlobObjectStore(CachingConcreteObjectStore):
             log.exception("Could not delete blob '%s' from Azure", rel_path)
             return False
 
+    def _delete_existing_remotes(self, rel_paths: List[str]) -> List[bool]:
+        """Delete blobs with batch requests of up to 256 blobs each."""
+        container_client = self.service.get_container_client(self.container_name)
+        deleted: List[bool] = []
+        for start in range(0, len(rel_paths), DELETE_BLOBS_BATCH_SIZE):
+            batch = rel_paths[start : start + DELETE_BLOBS_BATCH_SIZE]
+            try:
+                status_codes = [
+                    response.status_code
+                    for response in container_client.delete_blobs(*batch, raise_on_any_failure=False)
+                ]
+            except AzureHttpError:
+                log.warning("Batch delete from Azure failed, deleting %d blobs one by one", len(batch), exc_info=True)
+                deleted.extend(self._transfer_all(partial(self._delete_existing_remote, key) for key in batch))
+                continue
+            for rel_path, status_code in zip(batch, status_codes):
+                # a blob that no longer exists (404) has been deleted already
+                ok = status_code in (200, 202, 404)
+                if not ok:
+                    log.error("Could not delete blob '%s' from Azure: %s", rel_path, status_code)
+                deleted.append(ok)
+        return deleted
+
     def _get_object_url(self, obj, **kwargs):
         if self._exists(obj, **kwargs):
             rel_path = self._construct_path(obj, **kwargs)
@@ -339,3 +391,4 @@ class AzureBlobObjectStore(CachingConcreteObjectStore):
 
     def shutdown(self):
         self._shutdown_cache_monitor()
+        self._shutdown_transfer_pool()
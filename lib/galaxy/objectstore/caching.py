@@ -2,12 +2,18 @@
 
 import logging
 import os
+import sqlite3
 import threading
 import time
+from contextlib import contextmanager
 from math import inf
 from typing import (
+    Dict,
+    Iterable,
+    Iterator,
     List,
     Optional,
+    Set,
     Tuple,
 )
 
@@ -16,6 +22,7 @@ from typing_extensions import NamedTuple
 from galaxy.util import (
     nice_size,
     string_as_bool,
+    unlink,
 )
 from galaxy.util.sleeper import Sleeper
 
@@ -24,6 +31,26 @@ log = logging.getLogger(__name__)
 
 ONE_GIGA_BYTE = 1024 * 1024 * 1024
 
+# SQLite database kept at the root of a cache directory (see CacheIndex),
+# its journal files share this prefix.
+CACHE_INDEX_FILENAME = ".galaxy_cache_index.sqlite"
+CACHE_INDEX_VERSION = 2
+CACHE_INDEX_TIMEOUT = 60
+CACHE_INDEX_BATCH_SIZE = 1000
+# Cache hits are written to the index at most this often (in seconds)
+CACHE_INDEX_FLUSH_INTERVAL = 10
+
+# Order in which each eviction policy deletes indexed cache files.
+EVICTION_POLICY_ORDER = {
+    # least recently used files first
+    "lru": "atime",
+    # least frequently used files first, least recently used among those
+    "lfu": "accesses, atime",
+    # GreedyDual-Size-Frequency: lowest (inflation + accesses / size) first, i.e. large
+    # and rarely used files go before small and frequently used ones
+    "greedy_dual_size": "priority, atime",
+}
+DEFAULT_EVICTION_POLICY = "lru"
 
 FileListT = List[Tuple[time.struct_time, str, int]]
 
@@ -32,6 +59,8 @@ class CacheTarget(NamedTuple):
     path: str
     size: int  # cache size in gigabytes
     limit: float  # cache limit as a percent
+    indexed: bool = False  # track cache contents with a CacheIndex instead of walking the cache
+    eviction_policy: str = DEFAULT_EVICTION_POLICY  # key of EVICTION_POLICY_ORDER, needs indexed unless "lru"
 
     def fits_in_cache(self, bytes: int) -> bool:
         # if we don't have a positive cache size - interpret it as an unbounded
@@ -48,16 +77,29 @@ class CacheTarget(NamedTuple):
         return f"{self.limit} percent of {self.size} gigabytes"
 
 
-def check_caches(targets: List[CacheTarget]):
+def check_caches(targets: List[CacheTarget], pinned_paths: Optional[Iterable[str]] = None):
+    pinned_paths = set(pinned_paths or [])
     for target in targets:
-        check_cache(target)
+        check_cache(target, pinned_paths)
 
 
-def check_cache(cache_target: CacheTarget):
-    """Run a step of the cache monitor."""
-    total_size, file_list = _get_cache_size_files(cache_target.path)
-    # Sort the file list (based on access time)
-    file_list.sort()
+def check_cache(cache_target: CacheTarget, pinned_paths: Optional[Iterable[str]] = None):
+    """Run a step of the cache monitor.
+
+    Files at or below any of ``pinned_paths`` (e.g. the inputs of running jobs)
+    are never evicted.
+    """
+    pinned = _pinned_rel_paths(cache_target.path, pinned_paths or [])
+    cache_index: Optional[CacheIndex] = None
+    file_list: FileListT = []
+    if cache_target.indexed:
+        cache_index = CacheIndex(cache_target.path)
+        if not cache_index.is_current():
+            cache_index.rebuild()
+        total_size = cache_index.total_size()
+        _log_cache_statistics(cache_target, cache_index.statistics())
+    else:
+        total_size, file_list = _get_cache_size_files(cache_target.path)
     # Initiate cleaning once we reach cache_monitor_cache_limit percentage of the defined cache size?
     # Convert GBs to bytes for comparison
     cache_size_in_gb = cache_target.size * ONE_GIGA_BYTE
@@ -73,12 +115,56 @@ def check_cache(cache_target: CacheTarget):
         # the limit - maybe delete additional #%?
         # For now, delete enough to leave at least 10% of the total cache free
         delete_this_much = total_size - cache_limit
-        _clean_cache(file_list, delete_this_much)
+        if cache_index is not None:
+            cache_index.evict(delete_this_much, cache_target.eviction_policy, pinned)
+        else:
+            # Sort the file list (based on access time)
+            file_list.sort()
+            if pinned:
+                file_list = [
+                    entry for entry in file_list if not _is_pinned(os.path.relpath(entry[1], cache_target.path), pinned)
+                ]
+            _clean_cache(file_list, delete_this_much)
 
 
 def reset_cache(cache_target: CacheTarget):
     _, file_list = _get_cache_size_files(cache_target.path)
     _clean_cache(file_list, inf)
+    if cache_target.indexed:
+        CacheIndex(cache_target.path).clear()
+
+
+def _pinned_rel_paths(cache_path: str, pinned_paths: Iterable[str]) -> Set[str]:
+    cache_path = os.path.abspath(cache_path)
+    pinned = set()
+    for pinned_path in pinned_paths:
+        rel_path = os.path.relpath(os.path.abspath(pinned_path), cache_path)
+        if not rel_path.startswith(os.pardir):
+            pinned.add(rel_path)
+    return pinned
+
+
+def _is_pinned(rel_path: str, pinned: Set[str]) -> bool:
+    # a file is pinned if it, or any directory containing it, is pinned
+    while rel_path:
+        if rel_path in pinned:
+            return True
+        rel_path = os.path.dirname(rel_path)
+    return False
+
+
+def _log_cache_statistics(cache_target: CacheTarget, statistics: Dict[str, int]) -> None:
+    hits = statistics["hits"]
+    misses = statistics["misses"]
+    requests = hits + misses
+    log.info(
+        "Object store cache '%s': %d hits, %d misses (hit ratio %.2f), %s downloaded on misses",
+        cache_target.path,
+        hits,
+        misses,
+        hits / requests if requests else 0.0,
+        nice_size(statistics["miss_bytes"]),
+    )
 
 
 def _clean_cache(file_list: FileListT, delete_this_much: float) -> None:
@@ -115,6 +201,8 @@ def _get_cache_size_files(cache_path) -> Tuple[int, FileListT]:
 
     for dirpath, _, filenames in os.walk(cache_path):
         for filename in filenames:
+            if _is_cache_index_file(filename):
+                continue
             file_path = os.path.join(dirpath, filename)
             file_size = os.path.getsize(file_path)
             cache_size += file_size
@@ -126,6 +214,315 @@ def _get_cache_size_files(cache_path) -> Tuple[int, FileListT]:
     return cache_size, file_list
 
 
+def _is_cache_index_file(filename: str) -> bool:
+    return filename.startswith(CACHE_INDEX_FILENAME)
+
+
+class CacheIndex:
+    """Persistent record of the files held in an object store cache.
+
+    The size, last access time and access count of cached files are kept in
+    a SQLite database at the root of the cache directory. Caching object
+    stores record files as they write and read them, so the cache monitor
+    can compute the cache size and pick the files to evict (see
+    ``EVICTION_POLICY_ORDER``) without walking the whole cache. An index
+    that is missing or was written by another version of Galaxy is rebuilt
+    from disk.
+
+    The index also counts cache hits and misses across all Galaxy processes
+    sharing the cache, which helps sizing the cache against the cost of
+    downloading data from the object store. Cache hits are collected in
+    memory and written to the index every ``CACHE_INDEX_FLUSH_INTERVAL``
+    seconds, so that serving a file from the cache doesn't need a write
+    transaction. Each thread reuses its connection to the index.
+
+    Errors updating the index are logged and otherwise ignored, the index
+    is an optimization and must not break dataset operations.
+    """
+
+    def __init__(self, cache_path: str):
+        self.cache_path = os.path.abspath(cache_path)
+        self.index_path = os.path.join(self.cache_path, CACHE_INDEX_FILENAME)
+        self._local = threading.local()
+        # cache relative path -> [last access time, number of accesses] of buffered cache hits
+        self._pending_hits: Dict[str, List[float]] = {}
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.index_path)
+
+    def is_current(self) -> bool:
+        if not self.exists():
+            return False
+        try:
+            with self._connection() as conn:
+                return conn.execute("PRAGMA user_version").fetchone()[0] == CACHE_INDEX_VERSION
+        except sqlite3.DatabaseError:
+            log.warning("Cache index '%s' is not readable", self.index_path, exc_info=True)
+            return False
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Yield this thread's connection to the index, changes are committed when the block exits."""
+        conn = self._thread_connection()
+        try:
+            with conn:
+                yield conn
+        except sqlite3.DatabaseError:
+            # The index may have been replaced or damaged, reconnect next time.
+            self._close_thread_connection()
+            raise
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        try:
+            inode = os.stat(self.index_path).st_ino
+        except OSError:
+            inode = None
+        if conn is not None and inode is not None and inode != self._local.inode:
+            # The index was rebuilt by another process.
+            self._close_thread_connection()
+            conn = None
+        if conn is None:
+            conn = sqlite3.connect(self.index_path, timeout=CACHE_INDEX_TIMEOUT)
+            self._local.conn = conn
+            self._local.inode = inode if inode is not None else os.stat(self.index_path).st_ino
+        return conn
+
+    def _close_thread_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE cache_file (path TEXT PRIMARY KEY, size INTEGER NOT NULL, atime REAL NOT NULL, "
+            "accesses INTEGER NOT NULL, priority REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX ix_cache_file_atime ON cache_file (atime)")
+        conn.execute("CREATE INDEX ix_cache_file_accesses ON cache_file (accesses, atime)")
+        conn.execute("CREATE INDEX ix_cache_file_priority ON cache_file (priority, atime)")
+        # inflation is the GreedyDual "L" value, the priority of the last evicted file
+        conn.execute("CREATE TABLE cache_meta (key TEXT PRIMARY KEY, value REAL NOT NULL)")
+        conn.executemany(
+            "INSERT INTO cache_meta (key, value) VALUES (?, 0)",
+            [("inflation",), ("hits",), ("misses",), ("miss_bytes",)],
+        )
+        conn.execute(f"PRAGMA user_version = {CACHE_INDEX_VERSION}")
+
+    def _rel_path(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.cache_path)
+
+    def record(self, path: str, hit: Optional[bool] = None) -> None:
+        """Record that the cache file at ``path`` has just been written or read.
+
+        ``hit`` tells whether a read was served from the cache (``True``) or
+        had to download the file first (``False``), ``None`` for writes.
+        """
+        if not self.exists():
+            # The cache monitor will build the index from disk.
+            return
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        rel_path = self._rel_path(path)
+        if hit is True:
+            self._record_hit(rel_path)
+            return
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO cache_file (path, size, atime, accesses, priority) VALUES (?, ?, ?, 0, 0)",
+                    (rel_path, size, time.time()),
+                )
+                conn.execute(
+                    "UPDATE cache_file SET size = ?, atime = ?, accesses = accesses + 1, "
+                    "priority = (SELECT value FROM cache_meta WHERE key = 'inflation') + (accesses + 1.0) / ? "
+                    "WHERE path = ?",
+                    (size, time.time(), max(size, 1), rel_path),
+                )
+                if hit is False:
+                    conn.execute("UPDATE cache_meta SET value = value + 1 WHERE key = 'misses'")
+                    conn.execute("UPDATE cache_meta SET value = value + ? WHERE key = 'miss_bytes'", (size,))
+        except sqlite3.Error:
+            log.warning("Failed to record '%s' in cache index '%s'", path, self.index_path, exc_info=True)
+
+    def _record_hit(self, rel_path: str) -> None:
+        with self._pending_lock:
+            pending = self._pending_hits.setdefault(rel_path, [0.0, 0])
+            pending[0] = time.time()
+            pending[1] += 1
+            flush = (
+                len(self._pending_hits) >= CACHE_INDEX_BATCH_SIZE
+                or time.monotonic() - self._last_flush >= CACHE_INDEX_FLUSH_INTERVAL
+            )
+        if flush:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered cache hits to the index."""
+        with self._pending_lock:
+            pending_hits = self._pending_hits
+            self._pending_hits = {}
+            self._last_flush = time.monotonic()
+        if not pending_hits or not self.exists():
+            return
+        try:
+            with self._connection() as conn:
+                # Files evicted in the meantime (possibly by another process) are not added back.
+                conn.executemany(
+                    "UPDATE cache_file SET atime = MAX(atime, ?), accesses = accesses + ?, "
+                    "priority = (SELECT value FROM cache_meta WHERE key = 'inflation') + (accesses + ?) / MAX(size, 1) "
+                    "WHERE path = ?",
+                    [
+                        (atime, accesses, float(accesses), rel_path)
+                        for rel_path, (atime, accesses) in pending_hits.items()
+                    ],
+                )
+                hits = sum(accesses for _, accesses in pending_hits.values())
+                conn.execute("UPDATE cache_meta SET value = value + ? WHERE key = 'hits'", (hits,))
+        except sqlite3.Error:
+            log.warning("Failed to record cache hits in cache index '%s'", self.index_path, exc_info=True)
+
+    def record_tree(self, path: str) -> None:
+        """Record all files below the cache directory ``path``."""
+        if not self.exists():
+            return
+        try:
+            self._insert_tree(path, "INSERT OR REPLACE")
+        except sqlite3.Error:
+            log.warning("Failed to record '%s' in cache index '%s'", path, self.index_path, exc_info=True)
+
+    def remove(self, path: str) -> None:
+        """Forget the cache file or directory at ``path``."""
+        if not self.exists():
+            return
+        rel_path = self._rel_path(path)
+        with self._pending_lock:
+            self._pending_hits = {
+                pending_path: pending
+                for pending_path, pending in self._pending_hits.items()
+                if not _is_pinned(pending_path, {rel_path})
+            }
+        try:
+            with self._connection() as conn:
+                # Paths below a directory sort between "<dir>/" and "<dir>0" ("0" follows "/").
+                conn.execute(
+                    "DELETE FROM cache_file WHERE path = ? OR (path > ? AND path < ?)",
+                    (rel_path, f"{rel_path}/", f"{rel_path}0"),
+                )
+        except sqlite3.Error:
+            log.warning("Failed to remove '%s' from cache index '%s'", path, self.index_path, exc_info=True)
+
+    def rebuild(self) -> None:
+        """Replace the contents of the index with the files currently in the cache."""
+        log.info("Building cache index '%s' from the contents of the cache", self.index_path)
+        os.makedirs(self.cache_path, exist_ok=True)
+        self._close_thread_connection()
+        for suffix in ("", "-journal", "-wal", "-shm"):
+            unlink(f"{self.index_path}{suffix}", ignore_errors=True)
+        with self._connection() as conn:
+            self._create_tables(conn)
+        # Files recorded while walking the cache are newer, keep them.
+        self._insert_tree(self.cache_path, "INSERT OR IGNORE")
+
+    def _insert_tree(self, path: str, insert: str) -> None:
+        """Add the files below ``path``, committing every ``CACHE_INDEX_BATCH_SIZE`` files so that
+        other processes aren't locked out of the index while walking a large cache."""
+        statement = f"{insert} INTO cache_file (path, size, atime, accesses, priority) VALUES (?, ?, ?, 1, ?)"
+        with self._connection() as conn:
+            inflation = self._inflation(conn)
+        rows = []
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                if _is_cache_index_file(filename):
+                    continue
+                file_path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                priority = inflation + 1.0 / max(stat.st_size, 1)
+                rows.append((self._rel_path(file_path), stat.st_size, stat.st_atime, priority))
+                if len(rows) >= CACHE_INDEX_BATCH_SIZE:
+                    with self._connection() as conn:
+                        conn.executemany(statement, rows)
+                    rows = []
+        with self._connection() as conn:
+            conn.executemany(statement, rows)
+
+    def _inflation(self, conn: sqlite3.Connection) -> float:
+        return conn.execute("SELECT value FROM cache_meta WHERE key = 'inflation'").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._pending_lock:
+            self._pending_hits = {}
+        if self.exists():
+            with self._connection() as conn:
+                conn.execute("DELETE FROM cache_file")
+
+    def total_size(self) -> int:
+        self.flush()
+        with self._connection() as conn:
+            return conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_file").fetchone()[0]
+
+    def statistics(self) -> Dict[str, int]:
+        """Return the ``hits``, ``misses`` and ``miss_bytes`` counted since the index was built."""
+        self.flush()
+        with self._connection() as conn:
+            rows = conn.execute("SELECT key, value FROM cache_meta WHERE key != 'inflation'").fetchall()
+        return {key: int(value) for key, value in rows}
+
+    def evict(
+        self,
+        delete_this_much: float,
+        eviction_policy: str = DEFAULT_EVICTION_POLICY,
+        pinned: Optional[Set[str]] = None,
+    ) -> int:
+        """Delete files in ``eviction_policy`` order until ``delete_this_much`` bytes are freed.
+
+        Files at or below the cache relative paths in ``pinned`` are kept.
+        Returns the number of bytes deleted.
+        """
+        self.flush()
+        order = EVICTION_POLICY_ORDER[eviction_policy]
+        pinned = pinned or set()
+        deleted_amount = 0
+        skipped = 0
+        while deleted_amount < delete_this_much:
+            with self._connection() as conn:
+                candidates = conn.execute(
+                    f"SELECT path, size, priority FROM cache_file ORDER BY {order} LIMIT ? OFFSET ?",
+                    (CACHE_INDEX_BATCH_SIZE, skipped),
+                ).fetchall()
+            if not candidates:
+                break
+            evicted = []
+            inflation = None
+            for rel_path, size, priority in candidates:
+                if deleted_amount >= delete_this_much:
+                    break
+                if _is_pinned(rel_path, pinned):
+                    skipped += 1
+                    continue
+                unlink(os.path.join(self.cache_path, rel_path), ignore_errors=True)
+                deleted_amount += size
+                evicted.append((rel_path,))
+                inflation = priority if inflation is None else max(inflation, priority)
+            with self._connection() as conn:
+                conn.executemany("DELETE FROM cache_file WHERE path = ?", evicted)
+                if inflation is not None and eviction_policy == "greedy_dual_size":
+                    conn.execute(
+                        "UPDATE cache_meta SET value = MAX(value, ?) WHERE key = 'inflation'",
+                        (inflation,),
+                    )
+        log.debug("Cache cleaning done. Total space freed: %s", nice_size(deleted_amount))
+        return deleted_amount
+
+
 def parse_caching_config_dict_from_xml(config_xml):
     cache_els = config_xml.findall("cache")
     if len(cache_els) > 0:
@@ -141,6 +538,15 @@ def parse_caching_config_dict_from_xml(config_xml):
             "monitor": monitor,
             "cache_updated_data": cache_updated_data,
         }
+        index = c_xml.get("index", None)
+        if index is not None:
+            cache_dict["index"] = string_as_bool(index)
+        eviction_policy = c_xml.get("eviction_policy", None)
+        if eviction_policy is not None:
+            cache_dict["eviction_policy"] = eviction_policy
+        transfer_concurrency = c_xml.get("transfer_concurrency", None)
+        if transfer_concurrency is not None:
+            cache_dict["transfer_concurrency"] = int(transfer_concurrency)
     else:
         cache_dict = {}
     return cache_dict
@@ -155,6 +561,38 @@ def configured_cache_size(config, config_dict) -> int:
     return cache_size
 
 
+def configured_transfer_concurrency(config, config_dict) -> int:
+    cache_config_dict = config_dict.get("cache") or {}
+    default_concurrency = getattr(config, "object_store_transfer_concurrency", 1)
+    return int(cache_config_dict.get("transfer_concurrency") or default_concurrency)
+
+
+def configured_cache_index(config, config_dict) -> bool:
+    cache_config_dict = config_dict.get("cache") or {}
+    index = cache_config_dict.get("index")
+    if index is None:
+        index = getattr(config, "object_store_cache_index", False)
+    return string_as_bool(index)
+
+
+def configured_eviction_policy(config, config_dict, indexed: bool) -> str:
+    cache_config_dict = config_dict.get("cache") or {}
+    default_policy = getattr(config, "object_store_cache_eviction_policy", DEFAULT_EVICTION_POLICY)
+    eviction_policy = cache_config_dict.get("eviction_policy") or default_policy
+    if eviction_policy not in EVICTION_POLICY_ORDER:
+        raise Exception(
+            f"Unknown cache eviction policy '{eviction_policy}', must be one of {', '.join(EVICTION_POLICY_ORDER)}"
+        )
+    if eviction_policy != DEFAULT_EVICTION_POLICY and not indexed:
+        log.warning(
+            "Cache eviction policy '%s' requires the cache index, falling back to '%s'",
+            eviction_policy,
+            DEFAULT_EVICTION_POLICY,
+        )
+        eviction_policy = DEFAULT_EVICTION_POLICY
+    return eviction_policy
+
+
 def enable_cache_monitor(config, config_dict) -> Tuple[bool, int]:
     cache_config_dict = config_dict.get("cache") or {}
     default_interval = getattr(config, "object_store_cache_monitor_interval", 600)
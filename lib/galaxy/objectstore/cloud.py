@@ -8,7 +8,12 @@ import os.path
 
 from ._caching_base import CachingConcreteObjectStore
 from ._util import UsesAxel
-from .caching import enable_cache_monitor
+from .caching import (
+    configured_cache_index,
+    configured_eviction_policy,
+    configured_transfer_concurrency,
+    enable_cache_monitor,
+)
 from .s3 import parse_config_xml
 
 try:
@@ -54,6 +59,9 @@ class Cloud(CachingConcreteObjectStore, UsesAxel):
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
         self.cache_updated_data = cache_dict.get("cache_updated_data", True)
+        self.transfer_concurrency = configured_transfer_concurrency(config, config_dict)
+        self.use_cache_index = configured_cache_index(config, config_dict)
+        self.cache_eviction_policy = configured_eviction_policy(config, config_dict, self.use_cache_index)
 
         self._initialize()
 
@@ -202,6 +210,9 @@ class Cloud(CachingConcreteObjectStore, UsesAxel):
                 "size": self.cache_size,
                 "path": self.staging_path,
                 "cache_updated_data": self.cache_updated_data,
+                "transfer_concurrency": self.transfer_concurrency,
+                "index": self.use_cache_index,
+                "eviction_policy": self.cache_eviction_policy,
             },
         }
 
@@ -266,12 +277,7 @@ class Cloud(CachingConcreteObjectStore, UsesAxel):
 
     def _download_directory_into_cache(self, rel_path, cache_path):
         objects = self.bucket.objects.list(prefix=rel_path)
-        for obj in objects:
-            remote_file_path = obj.name
-            local_file_path = os.path.join(cache_path, os.path.relpath(remote_file_path, rel_path))
-            os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
-            with self._atomic_download(local_file_path) as tmp:
-                self._download_to(obj, tmp)
+        self._download_files_into_cache(rel_path, cache_path, ((obj.name, obj) for obj in objects), self._download_to)
 
     def _download_to(self, key, local_destination):
         if self.use_axel:
@@ -341,3 +347,4 @@ class Cloud(CachingConcreteObjectStore, UsesAxel):
 
     def shutdown(self):
         self._shutdown_cache_monitor()
+        self._shutdown_transfer_pool()
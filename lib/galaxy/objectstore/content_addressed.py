@@ -0,0 +1,216 @@
+"""Disk object store storing identical dataset contents once.
+
+Datasets are stored exactly like in :class:`DiskObjectStore`. Once hashes of
+a dataset's contents are known (e.g. computed by the ``compute_dataset_hash``
+task or verified while fetching the data), its file is hard linked into a
+content directory under ``<hash function>/<hash value>``, and the files of
+datasets with identical contents are replaced by hard links to that copy.
+
+The file system keeps the reference count: purging a dataset unlinks its
+file and the copy in the content directory is removed once no dataset links
+to it anymore. Contents are always compared before they are shared, so hashes
+are only used to find candidates, and shared files are made read-only so they
+can't be modified in place through one of the datasets.
+
+Sizes reported for datasets are unchanged, so each user is charged for their
+datasets exactly as before, only the disk space is shared.
+"""
+
+import filecmp
+import logging
+import os
+import re
+import stat
+import uuid
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+)
+
+from galaxy.exceptions import ObjectNotFound
+from galaxy.util import (
+    safe_makedirs,
+    umask_fix_perms,
+)
+from galaxy.util.hash_util import HASH_NAMES
+from . import DiskObjectStore
+
+log = logging.getLogger(__name__)
+
+# directory of the shared contents, relative to the files directory by default
+DEFAULT_CONTENT_DIR_NAME = "_content"
+HASH_VALUE_PATTERN = re.compile(r"^[0-9a-fA-F]{32,128}$")
+# path keyword arguments addressing anything but the primary file of an object
+NON_PRIMARY_FILE_KWARGS = ("base_dir", "dir_only", "extra_dir", "alt_name", "obj_dir")
+
+
+class ContentAddressedDiskObjectStore(DiskObjectStore):
+    """
+    Disk object store sharing a single copy of identical dataset contents.
+
+    >>> from galaxy.util.bunch import Bunch
+    >>> import tempfile
+    >>> file_path = tempfile.mkdtemp()
+    >>> config = Bunch(umask=0o077, jobs_directory=file_path, new_file_path=file_path, object_store_check_old_style=False, enable_quotas=True)
+    >>> s = ContentAddressedDiskObjectStore(config, dict(files_dir=file_path))
+    >>> assert s.content_dir == file_path + '/_content'
+    """
+
+    store_type = "content_addressed_disk"
+
+    def __init__(self, config, config_dict):
+        super().__init__(config, config_dict)
+        self.content_dir = os.path.abspath(
+            config_dict.get("content_dir") or os.path.join(self.file_path, DEFAULT_CONTENT_DIR_NAME)
+        )
+
+    @classmethod
+    def parse_xml(clazz, config_xml):
+        config_dict = super().parse_xml(config_xml)
+        if config_xml is not None and (content_dir := config_xml.find("content_dir")) is not None:
+            config_dict["content_dir"] = content_dir.get("path")
+            # parsed as an untyped extra directory by the disk object store
+            config_dict["extra_dirs"] = [e for e in config_dict["extra_dirs"] if e["type"] is not None]
+        return config_dict
+
+    def to_dict(self):
+        as_dict = super().to_dict()
+        as_dict["content_dir"] = self.content_dir
+        return as_dict
+
+    def _content_path(self, hash_function: Optional[str], hash_value: Optional[str]) -> Optional[str]:
+        if not hash_function or hash_function not in HASH_NAMES:
+            return None
+        if not hash_value or not HASH_VALUE_PATTERN.match(hash_value):
+            return None
+        hash_value = hash_value.lower()
+        return os.path.join(self.content_dir, hash_function, hash_value[0:2], hash_value[2:4], hash_value)
+
+    def _content_paths(self, obj) -> List[str]:
+        """Return the content directory paths the primary file of `obj` is or could be shared under."""
+        content_paths = []
+        for dataset_hash in getattr(obj, "hashes", None) or []:
+            if dataset_hash.extra_files_path:
+                continue
+            content_path = self._content_path(dataset_hash.hash_function, dataset_hash.hash_value)
+            if content_path and content_path not in content_paths:
+                content_paths.append(content_path)
+        return content_paths
+
+    @staticmethod
+    def _is_primary_file(kwargs: Dict[str, Any]) -> bool:
+        return not any(kwargs.get(key) for key in NON_PRIMARY_FILE_KWARGS)
+
+    def _deduplicate(self, obj, **kwargs) -> bool:
+        content_paths = self._content_paths(obj)
+        if not content_paths:
+            return False
+        try:
+            path = self._get_filename(obj)
+        except ObjectNotFound:
+            return False
+        for content_path in content_paths:
+            try:
+                if self._share(path, content_path):
+                    return True
+            except OSError:
+                log.exception("Unable to share contents of %s", path)
+        return False
+
+    def _share(self, path: str, content_path: str) -> bool:
+        """Share the file at `path` with the contents stored at `content_path`."""
+        try:
+            content_stat = os.stat(content_path)
+        except FileNotFoundError:
+            # first copy of these contents, the file becomes the shared copy
+            safe_makedirs(os.path.dirname(content_path))
+            self._make_read_only(path)
+            try:
+                os.link(path, content_path)
+                return True
+            except FileExistsError:
+                # another object with the same contents was shared concurrently
+                return self._share(path, content_path)
+            except OSError:
+                log.warning("Unable to share contents of %s under %s", path, content_path, exc_info=True)
+                return False
+        path_stat = os.stat(path)
+        if os.path.samestat(path_stat, content_stat):
+            return True
+        if path_stat.st_size != content_stat.st_size or not filecmp.cmp(path, content_path, shallow=False):
+            log.warning("Contents of %s differ from contents stored with the same hash at %s", path, content_path)
+            return False
+        return self._replace_with_link(content_path, path)
+
+    def _replace_with_link(self, content_path: str, path: str) -> bool:
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.link(content_path, tmp_path)
+            os.replace(tmp_path, path)
+            return True
+        except OSError:
+            # e.g. the shared copy has just been released, keep the object's own copy
+            log.debug("Unable to link %s to %s", path, content_path, exc_info=True)
+            if os.path.lexists(tmp_path):
+                os.unlink(tmp_path)
+            return False
+
+    @staticmethod
+    def _make_read_only(path: str) -> None:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+        os.chmod(path, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+    def _unshare(self, path: str) -> None:
+        """Give the object at `path` its own, empty file again if its contents are or have been shared."""
+        path_stat = os.stat(path)
+        if path_stat.st_nlink > 1 or not path_stat.st_mode & stat.S_IWUSR:
+            os.unlink(path)
+            open(path, "w").close()
+            umask_fix_perms(path, self.config.umask, 0o666)
+
+    def _update_from_file(
+        self, obj, file_name=None, create: bool = False, preserve_symlinks: bool = False, **kwargs
+    ) -> None:
+        if file_name and self._is_primary_file(kwargs) and not (preserve_symlinks and os.path.islink(file_name)):
+            if create:
+                self._create(obj)
+            if self._exists(obj):
+                path = self._get_filename(obj)
+                if os.path.exists(file_name) and os.path.samefile(file_name, path):
+                    return
+                # shared contents must not be overwritten in place
+                self._unshare(path)
+                # if identical contents are stored already, link them instead of copying the file
+                for content_path in self._content_paths(obj):
+                    if self._link_if_identical(file_name, content_path, path):
+                        return
+        super()._update_from_file(
+            obj, file_name=file_name, create=create, preserve_symlinks=preserve_symlinks, **kwargs
+        )
+
+    def _link_if_identical(self, file_name: str, content_path: str, path: str) -> bool:
+        try:
+            if os.path.getsize(file_name) != os.path.getsize(content_path):
+                return False
+        except OSError:
+            return False
+        if not filecmp.cmp(file_name, content_path, shallow=False):
+            return False
+        return self._replace_with_link(content_path, path)
+
+    def _delete(self, obj, entire_dir: bool = False, **kwargs) -> bool:
+        deleted = super()._delete(obj, entire_dir=entire_dir, **kwargs)
+        if deleted and self._is_primary_file(kwargs):
+            for content_path in self._content_paths(obj):
+                self._release(content_path)
+        return deleted
+
+    def _release(self, content_path: str) -> None:
+        """Remove the shared copy at `content_path` once no object links to it anymore."""
+        try:
+            if os.stat(content_path).st_nlink == 1:
+                os.unlink(content_path)
+        except FileNotFoundError:
+            pass
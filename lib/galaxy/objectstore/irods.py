@@ -27,6 +27,11 @@ from galaxy.util import (
     unlink,
 )
 from ._caching_base import CachingConcreteObjectStore
+from .caching import (
+    configured_cache_index,
+    configured_eviction_policy,
+    configured_transfer_concurrency,
+)
 
 IRODS_IMPORT_MESSAGE = "The Python irods package is required to use this feature, please install it"
 # 1 MB
@@ -104,6 +109,20 @@ def parse_config_xml(config_xml):
         cache_size = float(c_xml[0].get("size", -1))
         staging_path = c_xml[0].get("path", None)
         cache_updated_data = string_as_bool(c_xml[0].get("cache_updated_data", "True"))
+        cache_dict = {
+            "size": cache_size,
+            "path": staging_path,
+            "cache_updated_data": cache_updated_data,
+        }
+        transfer_concurrency = c_xml[0].get("transfer_concurrency", None)
+        if transfer_concurrency is not None:
+            cache_dict["transfer_concurrency"] = int(transfer_concurrency)
+        index = c_xml[0].get("index", None)
+        if index is not None:
+            cache_dict["index"] = string_as_bool(index)
+        eviction_policy = c_xml[0].get("eviction_policy", None)
+        if eviction_policy is not None:
+            cache_dict["eviction_policy"] = eviction_policy
 
         attrs = ("type", "path")
         e_xml = config_xml.findall("extra_dir")
@@ -142,11 +161,7 @@ def parse_config_xml(config_xml):
             "logical": {
                 "path": logical_path,
             },
-            "cache": {
-                "size": cache_size,
-                "path": staging_path,
-                "cache_updated_data": cache_updated_data,
-            },
+            "cache": cache_dict,
             "extra_dirs": extra_dirs,
             "private": CachingConcreteObjectStore.parse_private_from_config_xml(config_xml),
         }
@@ -230,6 +245,9 @@ class IRODSObjectStore(CachingConcreteObjectStore):
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_path
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
         self.cache_updated_data = cache_dict.get("cache_updated_data", True)
+        self.transfer_concurrency = configured_transfer_concurrency(config, config_dict)
+        self.use_cache_index = configured_cache_index(config, config_dict)
+        self.cache_eviction_policy = configured_eviction_policy(config, config_dict, self.use_cache_index)
         extra_dirs = {e["type"]: e["path"] for e in config_dict.get("extra_dirs", [])}
         self.extra_dirs.update(extra_dirs)
 
@@ -275,6 +293,7 @@ class IRODSObjectStore(CachingConcreteObjectStore):
         # This call will cleanup all the connections in the connection pool
         # OSError sometimes happens on GitHub Actions, after the test has successfully completed. Ignore it if it happens.
         ipt_timer = ExecutionTimer()
+        self._shutdown_transfer_pool()
         try:
             self.session.cleanup()
         except OSError:
@@ -372,6 +391,9 @@ class IRODSObjectStore(CachingConcreteObjectStore):
                 "size": self.cache_size,
                 "path": self.staging_path,
                 "cache_updated_data": self.cache_updated_data,
+                "transfer_concurrency": self.transfer_concurrency,
+                "index": self.use_cache_index,
+                "eviction_policy": self.cache_eviction_policy,
             },
         }
 
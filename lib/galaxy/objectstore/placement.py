@@ -0,0 +1,151 @@
+"""Placement policies choosing the backend new objects are created in.
+
+Nested object stores record the free space, write throughput and latency of
+their backends in :class:`BackendStatistics` and ask their placement policy to
+pick a backend whenever a new object is created.
+"""
+
+import abc
+import logging
+import random
+import threading
+from collections import Counter
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Type,
+)
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PLACEMENT_POLICY = "weighted"
+# weight given to the newest observation in the moving averages
+STATISTICS_SMOOTHING = 0.2
+# fraction of its configured weight a backend keeps however full or slow it is,
+# so it keeps receiving some writes and its statistics stay current
+MINIMUM_SHARE = 0.05
+
+
+def _moving_average(current: Optional[float], value: float) -> float:
+    if current is None:
+        return value
+    return current + STATISTICS_SMOOTHING * (value - current)
+
+
+class BackendStatistics:
+    """Recently observed free space, write throughput and latency of a backend."""
+
+    def __init__(self):
+        self.usage_percent: Optional[float] = None
+        self.throughput: Optional[float] = None
+        self.latency: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record_usage(self, usage_percent: float) -> None:
+        self.usage_percent = usage_percent
+
+    def record_latency(self, seconds: float) -> None:
+        """Record a create, which transfers no data, taking ``seconds``."""
+        with self._lock:
+            self.latency = _moving_average(self.latency, seconds)
+
+    def record_transfer(self, seconds: float, nbytes: int) -> None:
+        """Record a write of ``nbytes`` taking ``seconds``."""
+        if not nbytes or seconds <= 0:
+            return
+        with self._lock:
+            self.throughput = _moving_average(self.throughput, nbytes / seconds)
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            "usage_percent": self.usage_percent,
+            "throughput": self.throughput,
+            "latency": self.latency,
+        }
+
+
+class PlacementPolicy(metaclass=abc.ABCMeta):
+    """Choose the backend a new object is created in."""
+
+    policy_type: str
+    # whether the policy needs the free space of backends to be monitored
+    uses_store_usage = False
+
+    def __init__(self, statistics: Dict[str, BackendStatistics]):
+        self.statistics = statistics
+
+    @abc.abstractmethod
+    def select(self, weighted_backend_ids: List[str]) -> str:
+        """Select a backend id from the eligible ``weighted_backend_ids``.
+
+        Backend ids appear once per unit of their configured weight. Raises
+        ``IndexError`` if there are no eligible backends.
+        """
+
+
+class WeightedPlacementPolicy(PlacementPolicy):
+    """Select backends randomly, in proportion to their configured weight."""
+
+    policy_type = "weighted"
+
+    def select(self, weighted_backend_ids: List[str]) -> str:
+        return random.choice(weighted_backend_ids)
+
+
+class LoadAwarePlacementPolicy(PlacementPolicy):
+    """Select backends randomly, favouring emptier and faster ones.
+
+    The configured weight of each backend is scaled by its free space fraction,
+    its create latency relative to the fastest backend and its write throughput
+    relative to the best backend. Latency is only measured on creates, so the
+    time spent transferring data only counts against a backend's throughput. Shares are recomputed from the latest
+    statistics on every selection, so new objects move away from backends as
+    they fill up or slow down and back once they recover.
+    """
+
+    policy_type = "load_aware"
+    uses_store_usage = True
+
+    def select(self, weighted_backend_ids: List[str]) -> str:
+        if not weighted_backend_ids:
+            raise IndexError("No backends to select from")
+        shares = self.shares(Counter(weighted_backend_ids))
+        return random.choices(list(shares.keys()), weights=list(shares.values()))[0]
+
+    def shares(self, weights: Dict[str, int]) -> Dict[str, float]:
+        """Return the share of new objects each backend should receive."""
+        statistics = {backend_id: self.statistics.get(backend_id) or BackendStatistics() for backend_id in weights}
+        latencies = [s.latency for s in statistics.values() if s.latency]
+        throughputs = [s.throughput for s in statistics.values() if s.throughput]
+        lowest_latency = min(latencies) if latencies else None
+        highest_throughput = max(throughputs) if throughputs else None
+
+        shares = {}
+        for backend_id, weight in weights.items():
+            backend_statistics = statistics[backend_id]
+            factor = 1.0
+            if backend_statistics.usage_percent is not None:
+                factor *= max(100.0 - backend_statistics.usage_percent, 0.0) / 100.0
+            if lowest_latency and backend_statistics.latency:
+                factor *= lowest_latency / backend_statistics.latency
+            if highest_throughput and backend_statistics.throughput:
+                factor *= backend_statistics.throughput / highest_throughput
+            shares[backend_id] = weight * max(factor, MINIMUM_SHARE)
+        return shares
+
+
+PLACEMENT_POLICIES: Dict[str, Type[PlacementPolicy]] = {
+    WeightedPlacementPolicy.policy_type: WeightedPlacementPolicy,
+    LoadAwarePlacementPolicy.policy_type: LoadAwarePlacementPolicy,
+}
+
+
+def build_placement_policy(config_dict: Dict[str, Any], statistics: Dict[str, BackendStatistics]) -> PlacementPolicy:
+    policy_type = config_dict.get("placement_policy") or DEFAULT_PLACEMENT_POLICY
+    if policy_type not in PLACEMENT_POLICIES:
+        raise Exception(
+            f"Unknown object store placement policy '{policy_type}', must be one of {', '.join(PLACEMENT_POLICIES)}"
+        )
+    return PLACEMENT_POLICIES[policy_type](statistics)
@@ -34,6 +34,9 @@ from galaxy.util import (
 )
 from ._caching_base import CachingConcreteObjectStore
 from .caching import (
+    configured_cache_index,
+    configured_eviction_policy,
+    configured_transfer_concurrency,
     enable_cache_monitor,
     parse_caching_config_dict_from_xml,
 )
@@ -331,6 +334,9 @@ class RucioObjectStore(CachingConcreteObjectStore):
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
         self.cache_updated_data = cache_dict.get("cache_updated_data", True)
+        self.transfer_concurrency = configured_transfer_concurrency(config, config_dict)
+        self.use_cache_index = configured_cache_index(config, config_dict)
+        self.cache_eviction_policy = configured_eviction_policy(config, config_dict, self.use_cache_index)
         self.cache_config = cache_dict
         self._initialize()
 
@@ -596,3 +602,4 @@ class RucioObjectStore(CachingConcreteObjectStore):
 
     def shutdown(self):
         self._shutdown_cache_monitor()
+        self._shutdown_transfer_pool()
@@ -20,6 +20,9 @@ from galaxy.util import string_as_bool
 from ._caching_base import CachingConcreteObjectStore
 from ._util import UsesAxel
 from .caching import (
+    configured_cache_index,
+    configured_eviction_policy,
+    configured_transfer_concurrency,
     enable_cache_monitor,
     parse_caching_config_dict_from_xml,
 )
@@ -141,6 +144,9 @@ class CloudConfigMixin:
                 "size": self.cache_size,
                 "path": self.staging_path,
                 "cache_updated_data": self.cache_updated_data,
+                "transfer_concurrency": self.transfer_concurrency,
+                "index": self.use_cache_index,
+                "eviction_policy": self.cache_eviction_policy,
             },
         }
 
@@ -184,6 +190,9 @@ class S3ObjectStore(CachingConcreteObjectStore, CloudConfigMixin, UsesAxel):
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
         self.cache_updated_data = cache_dict.get("cache_updated_data", True)
+        self.transfer_concurrency = configured_transfer_concurrency(config, config_dict)
+        self.use_cache_index = configured_cache_index(config, config_dict)
+        self.cache_eviction_policy = configured_eviction_policy(config, config_dict, self.use_cache_index)
 
         extra_dirs = {e["type"]: e["path"] for e in config_dict.get("extra_dirs", [])}
         self.extra_dirs.update(extra_dirs)
@@ -423,6 +432,7 @@ class S3ObjectStore(CachingConcreteObjectStore, CloudConfigMixin, UsesAxel):
 
     def shutdown(self):
         self._shutdown_cache_monitor()
+        self._shutdown_transfer_pool()
 
 
 class GenericS3ObjectStore(S3ObjectStore):
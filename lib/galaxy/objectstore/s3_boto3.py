@@ -1,11 +1,14 @@
 """A more modern version of the S3 object store based on boto3 instead of boto."""
 
 import logging
-import os
+from functools import partial
 from typing import (
     Any,
     Callable,
     Dict,
+    List,
+    Optional,
+    Set,
     TYPE_CHECKING,
 )
 
@@ -27,9 +30,13 @@ except ImportError:
     boto3 = None  # type: ignore[assignment,unused-ignore]
     TransferConfig = None  # type: ignore[assignment,unused-ignore,misc]
 
+from galaxy.exceptions import ObjectNotFound
 from galaxy.util import asbool
 from ._caching_base import CachingConcreteObjectStore
 from .caching import (
+    configured_cache_index,
+    configured_eviction_policy,
+    configured_transfer_concurrency,
     enable_cache_monitor,
     parse_caching_config_dict_from_xml,
 )
@@ -40,6 +47,8 @@ NO_BOTO_ERROR_MESSAGE = (
 )
 
 log = logging.getLogger(__name__)
+# Maximum number of keys S3 accepts in a single DeleteObjects request
+DELETE_OBJECTS_BATCH_SIZE = 1000
 # This object store generates a lot of logging by default, fairly sure it is an anti-pattern
 # to just disable library logging.
 # logging.getLogger("botocore").setLevel(logging.INFO)
@@ -200,6 +209,9 @@ class S3ObjectStore(CachingConcreteObjectStore):
         self.cache_size = cache_dict.get("size") or self.config.object_store_cache_size
         self.staging_path = cache_dict.get("path") or self.config.object_store_cache_path
         self.cache_updated_data = cache_dict.get("cache_updated_data", True)
+        self.transfer_concurrency = configured_transfer_concurrency(config, config_dict)
+        self.use_cache_index = configured_cache_index(config, config_dict)
+        self.cache_eviction_policy = configured_eviction_policy(config, config_dict, self.use_cache_index)
 
         extra_dirs = {e["type"]: e["path"] for e in config_dict.get("extra_dirs", [])}
         self.extra_dirs.update(extra_dirs)
@@ -285,6 +297,9 @@ class S3ObjectStore(CachingConcreteObjectStore):
                 "size": self.cache_size,
                 "path": self.staging_path,
                 "cache_updated_data": self.cache_updated_data,
+                "transfer_concurrency": self.transfer_concurrency,
+                "index": self.use_cache_index,
+                "eviction_policy": self.cache_eviction_policy,
             },
         }
 
@@ -313,6 +328,23 @@ class S3ObjectStore(CachingConcreteObjectStore):
                 return False
             raise
 
+    def _get_remote_range(self, rel_path: str, offset: int, length: int) -> Optional[bytes]:
+        if length == 0:
+            return b""
+        try:
+            response = self._client.get_object(
+                Bucket=self.bucket, Key=rel_path, Range=f"bytes={offset}-{offset + length - 1}"
+            )
+            return response["Body"].read()
+        except ClientError as e:
+            code = e.response["Error"]["Code"]
+            if code == "InvalidRange":
+                # range starts beyond the end of the object
+                return b""
+            if code in ("404", "NoSuchKey"):
+                raise ObjectNotFound(f"Object '{rel_path}' not found in S3")
+            raise
+
     def _download(self, rel_path: str) -> bool:
         local_destination = self._get_cache_path(rel_path)
         try:
@@ -346,9 +378,7 @@ class S3ObjectStore(CachingConcreteObjectStore):
 
     def _delete_remote_all(self, rel_path: str) -> bool:
         try:
-            for key in self._keys(rel_path):
-                self._client.delete_object(Bucket=self.bucket, Key=key)
-            return True
+            return not self._delete_keys(list(self._keys(rel_path)))
         except ClientError:
             log.exception("Could not delete blob '%s' from S3", rel_path)
             return False
@@ -361,6 +391,31 @@ class S3ObjectStore(CachingConcreteObjectStore):
             log.exception("Could not delete blob '%s' from S3", rel_path)
             return False
 
+    def _delete_existing_remotes(self, rel_paths: List[str]) -> List[bool]:
+        failed = self._delete_keys(rel_paths)
+        return [rel_path not in failed for rel_path in rel_paths]
+
+    def _delete_keys(self, keys: List[str]) -> Set[str]:
+        """Delete keys with multi-object DeleteObjects requests and return the keys that could not be deleted."""
+        failed: Set[str] = set()
+        for start in range(0, len(keys), DELETE_OBJECTS_BATCH_SIZE):
+            batch = keys[start : start + DELETE_OBJECTS_BATCH_SIZE]
+            try:
+                response = self._client.delete_objects(
+                    Bucket=self.bucket,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+                )
+            except ClientError:
+                # Not every S3 compatible service implements DeleteObjects (e.g. Google Cloud Storage)
+                log.warning("Batch delete from S3 failed, deleting %d keys one by one", len(batch), exc_info=True)
+                deleted = self._transfer_all(partial(self._delete_existing_remote, key) for key in batch)
+                failed.update(key for key, ok in zip(batch, deleted) if not ok)
+                continue
+            for error in response.get("Errors", []):
+                log.error("Could not delete blob '%s' from S3: %s", error["Key"], error.get("Message"))
+                failed.add(error["Key"])
+        return failed
+
     # https://stackoverflow.com/questions/30249069/listing-contents-of-a-bucket-with-boto3
     def _keys(self, prefix="/", delimiter="/", start_after=""):
         s3_paginator = self._client.get_paginator("list_objects_v2")
@@ -371,11 +426,10 @@ class S3ObjectStore(CachingConcreteObjectStore):
                 yield content["Key"]
 
     def _download_directory_into_cache(self, rel_path, cache_path):
-        for key in self._keys(rel_path):
-            local_file_path = os.path.join(cache_path, os.path.relpath(key, rel_path))
-            os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
-            with self._atomic_download(local_file_path) as tmp:
-                self._client.download_file(self.bucket, key, tmp)
+        def download(key: str, local_path: str) -> None:
+            self._client.download_file(self.bucket, key, local_path)
+
+        self._download_files_into_cache(rel_path, cache_path, ((key, key) for key in self._keys(rel_path)), download)
 
     def _get_object_url(self, obj, **kwargs):
         try:
@@ -419,3 +473,4 @@ class S3ObjectStore(CachingConcreteObjectStore):
 
     def shutdown(self):
         self._shutdown_cache_monitor()
+        self._shutdown_transfer_pool()
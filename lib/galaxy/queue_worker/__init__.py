@@ -76,6 +76,29 @@ def send_control_task(app, task, noop_self=False, get_response=False, routing_ke
     return control_task.send_task(payload=payload, routing_key=routing_key, get_response=get_response)
 
 
+def send_control_task_to_servers(app, task, server_kwargs):
+    """
+    This sends a control task only to the processes running as one of the
+    given server names, e.g. to the job handlers owning a set of jobs.
+    ``server_kwargs`` maps server names to the kwargs of the task sent to
+    their processes. Processes are looked up in the database heartbeat.
+    """
+    control_task = ControlTask(app.queue_worker)
+    for process in app.database_heartbeat.get_active_processes():
+        kwargs = server_kwargs.get(process.server_name)
+        if kwargs is None:
+            continue
+        process_name = f"{process.server_name}@{process.hostname}"
+        log.info(f"Sending {task} control task to {process_name}.")
+        queue = galaxy.queues.direct_control_queue(process_name)
+        control_task.send_task(
+            payload={"task": task, "kwargs": kwargs},
+            routing_key=queue.routing_key,
+            local=True,
+            declare_queues=[queue],
+        )
+
+
 class ControlTask:
     def __init__(self, queue_worker):
         self.queue_worker = queue_worker
@@ -107,11 +130,12 @@ class ControlTask:
         if message.properties["correlation_id"] == self.correlation_id:
             self.response = message.payload["result"]
 
-    def send_task(self, payload, routing_key, local=False, get_response=False, timeout=10):
-        if local:
-            declare_queues = self.control_queues
-        else:
-            declare_queues = self.declare_queues
+    def send_task(self, payload, routing_key, local=False, get_response=False, timeout=10, declare_queues=None):
+        if declare_queues is None:
+            if local:
+                declare_queues = self.control_queues
+            else:
+                declare_queues = self.declare_queues
         reply_to = None
         callback_queue = []
         if get_response:
@@ -237,6 +261,11 @@ def recalculate_user_disk_usage(app, **kwargs):
         log.error("Recalculate user disk usage task received without user_id.")
 
 
+def invalidate_quota_cache(app, **kwargs):
+    log.debug("Executing invalidate quota cache control task.")
+    app.quota_agent.invalidate_quota_cache()
+
+
 def reload_tool_data_tables(app, **kwargs):
     path = kwargs.get("path")
     table_name = kwargs.get("table_name")
@@ -301,6 +330,15 @@ def job_rule_modules(app: "MinimalManagerApp"):
     return rules_module_list
 
 
+def wake_job_handler(app, **kwargs):
+    job_ids = kwargs.get("job_ids", [])
+    job_handler = app.job_manager.job_handler
+    if kwargs.get("stop", False):
+        job_handler.job_stop_queue.notify(job_ids)
+    else:
+        job_handler.job_queue.notify(job_ids)
+
+
 def admin_job_lock(app, **kwargs):
     job_lock = kwargs.get("job_lock", False)
     # job_queue is exposed in the root app, but this will be 'fixed' at some
@@ -318,8 +356,10 @@ control_message_to_task = {
     "reload_tool_data_tables": reload_tool_data_tables,
     "reload_job_rules": reload_job_rules,
     "admin_job_lock": admin_job_lock,
+    "wake_job_handler": wake_job_handler,
     "reload_sanitize_allowlist": reload_sanitize_allowlist,
     "recalculate_user_disk_usage": recalculate_user_disk_usage,
+    "invalidate_quota_cache": invalidate_quota_cache,
     "rebuild_toolbox_search_index": rebuild_toolbox_search_index,
     "reconfigure_watcher": reconfigure_watcher,
     "reload_tour": reload_tour,
@@ -367,6 +407,9 @@ class GalaxyQueueWorker(ConsumerProducerMixin, threading.Thread):
     def send_local_control_task(self, task, get_response=False, kwargs=None):
         return send_local_control_task(app=self.app, get_response=get_response, task=task, kwargs=kwargs)
 
+    def send_control_task_to_servers(self, task, server_kwargs):
+        return send_control_task_to_servers(app=self.app, task=task, server_kwargs=server_kwargs)
+
     @property
     def declare_queues(self):
         # dynamically produce queues, allows addressing all known processes at a given time
@@ -37,10 +37,18 @@ def control_queues_from_config(config):
     hostname = socket.gethostname()
     process_name = f"{config.server_name}@{hostname}"
     exchange_queue = Queue(f"control.{process_name}", galaxy_exchange, routing_key="control.*")
-    non_exchange_queue = Queue(f"control.{process_name}", routing_key=f"control.{process_name}")
+    non_exchange_queue = direct_control_queue(process_name)
     return exchange_queue, non_exchange_queue
 
 
+def direct_control_queue(process_name):
+    """
+    Returns a Queue instance receiving the messages addressed to the galaxy
+    process ``process_name`` (``<server_name>@<hostname>``) only
+    """
+    return Queue(f"control.{process_name}", routing_key=f"control.{process_name}")
+
+
 def connection_from_config(config) -> Optional[Connection]:
     if config.amqp_internal_connection:
         return Connection(config.amqp_internal_connection)
@@ -1,9 +1,15 @@
 """Galaxy Quotas"""
 
 import logging
+import threading
+import time
+from collections.abc import Iterable
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import (
+    bindparam,
+    select,
+)
 from sqlalchemy.sql import text
 
 import galaxy.util
@@ -11,6 +17,9 @@ from galaxy.objectstore import is_user_object_store
 
 log = logging.getLogger(__name__)
 
+# maximum number of users whose quotas are resolved in a single query
+QUOTA_QUERY_BATCH_SIZE = 250
+
 
 class QuotaAgent:  # metaclass=abc.ABCMeta
     """Abstraction around querying Galaxy for quota available and used.
@@ -37,6 +46,14 @@ class QuotaAgent:  # metaclass=abc.ABCMeta
     def get_quota(self, user, quota_source_label=None) -> Optional[int]:
         """Return quota in bytes or None if no quota is set."""
 
+    # TODO: make abstractmethod after they work better with mypy
+    def get_quotas(self, user_ids: Iterable[int], quota_source_label=None) -> dict[int, Optional[int]]:
+        """Return the quota in bytes (or None if no quota is set) of each of the registered users."""
+        return {}
+
+    def invalidate_quota_cache(self) -> None:
+        """Forget any cached quotas, called when quotas or group memberships change."""
+
     def get_quota_nice_size(self, user, quota_source_label=None) -> Optional[str]:
         """Return quota as a human-readable string or 'unlimited' if no quota is set."""
         quota_bytes = self.get_quota(user, quota_source_label=quota_source_label)
@@ -84,6 +101,9 @@ class NoQuotaAgent(QuotaAgent):
     def get_quota(self, user, quota_source_label=None) -> Optional[int]:
         return None
 
+    def get_quotas(self, user_ids: Iterable[int], quota_source_label=None) -> dict[int, Optional[int]]:
+        return dict.fromkeys(user_ids)
+
     def relabel_quota_for_dataset(self, dataset, from_label: Optional[str], to_label: Optional[str]):
         return None
 
@@ -101,11 +121,23 @@ class NoQuotaAgent(QuotaAgent):
 
 
 class DatabaseQuotaAgent(QuotaAgent):
-    """Class that handles galaxy quotas"""
+    """Class that handles galaxy quotas
+
+    If ``cache_ttl`` is greater than 0, resolved quotas are cached for that
+    many seconds. Code changing quotas, default quotas or group memberships
+    has to call ``invalidate_quota_cache``, the quota and group managers do so
+    in all Galaxy processes with ``galaxy.managers.quotas.invalidate_quota_caches``.
+    """
 
-    def __init__(self, model):
+    def __init__(self, model, cache_ttl: int = 0):
         self.model = model
         self.sa_session = model.context
+        self.cache_ttl = cache_ttl
+        # (user id or None for anonymous users, quota source label) -> (expiration time, quota)
+        self._quota_cache: dict[tuple[Optional[int], Optional[str]], tuple[float, Optional[int]]] = {}
+        # incremented on every invalidation, so quotas resolved before an invalidation are not cached after it
+        self._quota_cache_generation = 0
+        self._quota_cache_lock = threading.Lock()
 
     def get_quota(self, user, quota_source_label=None) -> Optional[int]:
         """
@@ -120,9 +152,42 @@ class DatabaseQuotaAgent(QuotaAgent):
                quotas.
         """
         if not user:
-            return self._default_unregistered_quota(quota_source_label)
+            key = (None, quota_source_label)
+            generation = self._quota_cache_generation
+            if (cached := self._get_cached_quota(key)) is not None:
+                return cached[1]
+            quota = self._default_unregistered_quota(quota_source_label)
+            self._cache_quotas({key: quota}, generation)
+            return quota
+        return self.get_quotas([user.id], quota_source_label=quota_source_label)[user.id]
+
+    def get_quotas(self, user_ids: Iterable[int], quota_source_label=None) -> dict[int, Optional[int]]:
+        """Return the quota of each of the registered users, see ``get_quota``.
+
+        Quotas that are not cached are resolved with one query per
+        ``QUOTA_QUERY_BATCH_SIZE`` users.
+        """
+        quotas: dict[int, Optional[int]] = {}
+        missing_user_ids = []
+        for user_id in set(user_ids):
+            if (cached := self._get_cached_quota((user_id, quota_source_label))) is not None:
+                quotas[user_id] = cached[1]
+            else:
+                missing_user_ids.append(user_id)
+        for i in range(0, len(missing_user_ids), QUOTA_QUERY_BATCH_SIZE):
+            batch = missing_user_ids[i : i + QUOTA_QUERY_BATCH_SIZE]
+            generation = self._quota_cache_generation
+            resolved = self._query_quotas(batch, quota_source_label)
+            batch_quotas = {user_id: resolved.get(user_id) for user_id in batch}
+            quotas.update(batch_quotas)
+            self._cache_quotas(
+                {(user_id, quota_source_label): quota for user_id, quota in batch_quotas.items()}, generation
+            )
+        return quotas
+
+    def _query_quotas(self, user_ids: list[int], quota_source_label: Optional[str]) -> dict[int, Optional[int]]:
         query = text("""
-SELECT (
+SELECT guser.id, (
         COALESCE(MAX(CASE WHEN union_quota.operation = '='
                           THEN union_quota.bytes
                           ELSE NULL
@@ -147,33 +212,52 @@ SELECT (
                      END
               ), 0))
        )
-FROM (
-    SELECT user_quota.operation as operation, user_quota.bytes as bytes
-    FROM galaxy_user as guser
-        LEFT JOIN user_quota_association as uqa on guser.id = uqa.user_id
-        LEFT JOIN quota as user_quota on user_quota.id = uqa.quota_id
+FROM galaxy_user as guser
+LEFT JOIN (
+    SELECT uqa.user_id as user_id, user_quota.operation as operation, user_quota.bytes as bytes
+    FROM user_quota_association as uqa
+        JOIN quota as user_quota on user_quota.id = uqa.quota_id
     WHERE user_quota.deleted != :is_true
         AND user_quota.quota_source_label {label_cond}
-        AND guser.id = :user_id
+        AND uqa.user_id IN :user_ids
     UNION ALL
-    SELECT group_quota.operation as operation, group_quota.bytes as bytes
-    FROM galaxy_user as guser
-        LEFT JOIN user_group_association as uga on guser.id = uga.user_id
-        LEFT JOIN galaxy_group on galaxy_group.id = uga.group_id
-        LEFT JOIN group_quota_association as gqa on galaxy_group.id = gqa.group_id
-        LEFT JOIN quota as group_quota on group_quota.id = gqa.quota_id
+    SELECT uga.user_id as user_id, group_quota.operation as operation, group_quota.bytes as bytes
+    FROM user_group_association as uga
+        JOIN galaxy_group on galaxy_group.id = uga.group_id
+        JOIN group_quota_association as gqa on galaxy_group.id = gqa.group_id
+        JOIN quota as group_quota on group_quota.id = gqa.quota_id
     WHERE group_quota.deleted != :is_true
         AND group_quota.quota_source_label {label_cond}
-        AND guser.id = :user_id
-) as union_quota
-""".format(label_cond="IS NULL" if quota_source_label is None else " = :label"))
+        AND uga.user_id IN :user_ids
+) as union_quota on union_quota.user_id = guser.id
+WHERE guser.id IN :user_ids
+GROUP BY guser.id
+""".format(label_cond="IS NULL" if quota_source_label is None else " = :label")).bindparams(
+            bindparam("user_ids", expanding=True)
+        )
         engine = self.sa_session.get_bind()
         with engine.connect() as conn:
-            res = conn.execute(query, {"is_true": True, "user_id": user.id, "label": quota_source_label}).fetchone()
-            if res:
-                return int(res[0]) if res[0] else None
-            else:
-                return None
+            res = conn.execute(query, {"is_true": True, "user_ids": user_ids, "label": quota_source_label})
+            return {user_id: int(quota) if quota else None for user_id, quota in res}
+
+    def _get_cached_quota(self, key: tuple[Optional[int], Optional[str]]) -> Optional[tuple[float, Optional[int]]]:
+        cached = self._quota_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached
+        return None
+
+    def _cache_quotas(self, quotas: dict[tuple[Optional[int], Optional[str]], Optional[int]], generation: int):
+        if self.cache_ttl <= 0:
+            return
+        expires = time.monotonic() + self.cache_ttl
+        with self._quota_cache_lock:
+            if generation == self._quota_cache_generation:
+                self._quota_cache.update((key, (expires, quota)) for key, quota in quotas.items())
+
+    def invalidate_quota_cache(self) -> None:
+        with self._quota_cache_lock:
+            self._quota_cache_generation += 1
+            self._quota_cache.clear()
 
     def relabel_quota_for_dataset(self, dataset, from_label: Optional[str], to_label: Optional[str]):
         adjust = dataset.get_total_size()
@@ -315,6 +399,7 @@ WHERE default_quota_association.type = :default_type
             target_default = self.model.DefaultQuotaAssociation(default_type, quota)
         self.sa_session.add(target_default)
         self.sa_session.commit()
+        self.invalidate_quota_cache()
 
     def get_percent(
         self, trans=None, user=False, history=False, usage=False, quota=False, quota_source_label=None
@@ -362,6 +447,7 @@ WHERE default_quota_association.type = :default_type
                 gqa = self.model.GroupQuotaAssociation(group, quota)
                 self.sa_session.add(gqa)
             self.sa_session.commit()
+        self.invalidate_quota_cache()
 
     def is_over_quota(self, quota_source_map, job):
         if is_user_object_store(job.object_store_id):
@@ -383,7 +469,7 @@ WHERE default_quota_association.type = :default_type
 def get_quota_agent(config, model) -> QuotaAgent:
     quota_agent: QuotaAgent
     if config.enable_quotas:
-        quota_agent = galaxy.quota.DatabaseQuotaAgent(model)
+        quota_agent = galaxy.quota.DatabaseQuotaAgent(model, cache_ttl=config.quota_cache_ttl)
     else:
         quota_agent = galaxy.quota.NoQuotaAgent()
     return quota_agent
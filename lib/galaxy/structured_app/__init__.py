@@ -41,6 +41,7 @@ from galaxy.webhooks import WebhooksRegistry
 from galaxy.workflow.trs_proxy import TrsProxy
 
 if TYPE_CHECKING:
+    from galaxy.app import ExecutionTimerFactory
     from galaxy.config_watchers import ConfigWatchers
     from galaxy.jobs import JobConfiguration
     from galaxy.jobs.manager import JobManager
@@ -140,6 +141,7 @@ class MinimalManagerApp(MinimalApp):
     dynamic_tool_manager: "DynamicToolManager"
     genomes: "Genomes"
     error_reports: "ErrorReports"
+    execution_timer_factory: "ExecutionTimerFactory"
     notification_manager: Any  # 'galaxy.managers.notification.NotificationManager'
     object_store: BaseObjectStore
     tool_shed_registry: ToolShedRegistry
@@ -2,15 +2,21 @@
 Dependency management for tools.
 """
 
+import collections
+import copy
 import json
 import logging
 import os.path
 import shutil
+import threading
+import time
 from typing import (
     Any,
     Dict,
+    Hashable,
     List,
     Optional,
+    Tuple,
     Type,
     TYPE_CHECKING,
 )
@@ -32,6 +38,7 @@ from .requirements import (
 )
 from .resolvers import (
     ContainerDependency,
+    Dependency,
     NullDependency,
 )
 from .resolvers.tool_shed_packages import ToolShedPackageDependencyResolver
@@ -43,6 +50,9 @@ log = logging.getLogger(__name__)
 
 CONFIG_VAL_NOT_FOUND = object()
 
+DEFAULT_DEPENDENCY_RESOLUTION_CACHE_SIZE = 1000
+DEFAULT_DEPENDENCY_RESOLUTION_CACHE_EXPIRE = 300
+
 
 def build_dependency_manager(
     app_config_dict: Optional[Dict[str, Any]] = None,
@@ -109,6 +119,52 @@ class DestinationProtocol(Protocol):
     params: DestinationParametersType
 
 
+CachedResolution = List[Tuple[int, Dependency]]
+
+
+class DependencyResolutionCache:
+    """Thread-safe LRU cache of the dependencies resolved for sets of requirements.
+
+    Entries expire ``expire`` seconds after they were added, so that dependencies
+    installed or removed outside of Galaxy are eventually picked up.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_DEPENDENCY_RESOLUTION_CACHE_SIZE,
+        expire: float = DEFAULT_DEPENDENCY_RESOLUTION_CACHE_EXPIRE,
+    ) -> None:
+        self.max_size = max_size
+        self.expire = expire
+        self._entries: collections.OrderedDict[Hashable, Tuple[float, CachedResolution]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[CachedResolution]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] >= self.expire:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, resolution: CachedResolution) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), resolution)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class DependencyManager:
     """
     A DependencyManager attempts to resolve named and versioned dependencies by
@@ -150,6 +206,19 @@ class DependencyManager:
         self.dependency_resolvers = self.__parse_resolver_conf_plugins(plugin_source)
         self._enabled_container_types: List[str] = []
         self._destination_for_container_type = {}
+        self.resolution_cache: Optional[DependencyResolutionCache] = None
+        resolution_cache_size = int(
+            self.get_app_option("dependency_resolution_cache_size", DEFAULT_DEPENDENCY_RESOLUTION_CACHE_SIZE)
+        )
+        if resolution_cache_size > 0:
+            self.resolution_cache = DependencyResolutionCache(
+                max_size=resolution_cache_size,
+                expire=float(
+                    self.get_app_option(
+                        "dependency_resolution_cache_expire", DEFAULT_DEPENDENCY_RESOLUTION_CACHE_EXPIRE
+                    )
+                ),
+            )
 
     def set_enabled_container_types(
         self, container_types_to_destinations: Dict[ContainerType, List[DestinationProtocol]]
@@ -226,8 +295,87 @@ class DependencyManager:
 
         return requirement_to_dependency
 
+    def clear_resolution_cache(self) -> None:
+        """Forget previously resolved dependencies, e.g. after (un)installing some."""
+        if self.resolution_cache is not None:
+            self.resolution_cache.clear()
+
+    def _resolution_cache_key(self, requirements: ToolRequirements, search: bool, kwds: Dict[str, Any]):
+        """Key for the dependencies resolved for ``requirements``, or None if they should not be cached.
+
+        The cache belongs to this manager, so the key does not need to account for the resolver
+        configuration - reloading the dependency resolvers builds a new manager with an empty cache.
+        """
+        if self.resolution_cache is None or search or kwds.get("install"):
+            return None
+        if kwds.get("installed_tool_dependencies"):
+            # Tool shed repository records may change without the requirements changing.
+            return None
+        kwds_key = []
+        for key, value in sorted(kwds.items()):
+            if key == "installed_tool_dependencies":
+                continue
+            if key == "job_directory":
+                # Job specific dependencies are moved to the job directory of the lookup in _cached_resolution
+                value = bool(value)
+            elif key == "tool_instance":
+                value = (value.id, value.version)
+            elif not isinstance(value, (str, int, float, bool, type(None))):
+                return None
+            kwds_key.append((key, value))
+        return (
+            json.dumps([r.to_dict() for r in requirements.resolvable], sort_keys=True),
+            tuple(self.enabled_container_types),
+            tuple(kwds_key),
+        )
+
+    def _cached_resolution(
+        self, cache_key, requirements: ToolRequirements, job_directory: Optional[str]
+    ) -> Optional[Dict[ToolRequirement, Any]]:
+        assert self.resolution_cache is not None
+        cached = self.resolution_cache.get(cache_key)
+        if cached is None:
+            return None
+        resolvable_requirements = list(requirements.resolvable)
+        requirement_to_dependency = {}
+        for i, dependency in cached:
+            # Copy dependencies so that per-job state (e.g. cache paths) isn't shared between callers.
+            dependency = copy.copy(dependency)
+            if dependency.job_specific and job_directory:
+                dependency.set_job_directory(job_directory)
+            requirement_to_dependency[resolvable_requirements[i]] = dependency
+        return requirement_to_dependency
+
+    def _cache_resolution(
+        self, cache_key, requirements: ToolRequirements, requirement_to_dependency: Dict[ToolRequirement, Any]
+    ) -> None:
+        assert self.resolution_cache is not None
+        resolvable_requirements = list(requirements.resolvable)
+        if len(requirement_to_dependency) != len(resolvable_requirements):
+            # Unresolved requirements might be installed (e.g. by conda_auto_install) on the next attempt.
+            return
+        dependencies = requirement_to_dependency.values()
+        if any(isinstance(dependency, NullDependency) for dependency in dependencies):
+            return
+        resolution = [
+            (resolvable_requirements.index(requirement), dependency)
+            for requirement, dependency in requirement_to_dependency.items()
+        ]
+        self.resolution_cache.set(cache_key, resolution)
+
     def _requirements_to_dependencies_dict(self, requirements, search=False, **kwds):
         """Build simple requirements to dependencies dict for resolution."""
+        cache_key = self._resolution_cache_key(requirements, search, kwds)
+        if cache_key is not None:
+            cached = self._cached_resolution(cache_key, requirements, kwds.get("job_directory"))
+            if cached is not None:
+                return cached
+        requirement_to_dependency = self._resolve_requirements_to_dependencies_dict(requirements, search, **kwds)
+        if cache_key is not None:
+            self._cache_resolution(cache_key, requirements, requirement_to_dependency)
+        return requirement_to_dependency
+
+    def _resolve_requirements_to_dependencies_dict(self, requirements, search=False, **kwds):
         requirement_to_dependency = {}
         index = kwds.get("index")
         install = kwds.get("install", False)
@@ -470,6 +618,7 @@ class NullDependencyManager(DependencyManager):
         self._enabled_container_types = []
         self._destination_for_container_type = {}
         self.default_base_path = None
+        self.resolution_cache = None
 
     def uses_tool_shed_dependencies(self):
         return False
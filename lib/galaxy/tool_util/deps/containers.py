@@ -1,12 +1,17 @@
 import collections
+import json
 import logging
 import os
+import threading
+import time
 from typing import (
     Any,
     Container as TypingContainer,
     Dict,
+    Hashable,
     List,
     Optional,
+    Tuple,
     Type,
     TYPE_CHECKING,
 )
@@ -57,17 +62,99 @@ log = logging.getLogger(__name__)
 DEFAULT_CONTAINER_TYPE = DOCKER_CONTAINER_TYPE
 ALL_CONTAINER_TYPES = [DOCKER_CONTAINER_TYPE, SINGULARITY_CONTAINER_TYPE]
 
+DEFAULT_CONTAINER_RESOLUTION_CACHE_SIZE = 1000
+DEFAULT_CONTAINER_RESOLUTION_CACHE_EXPIRE = 300
+
 ResolvedContainerDescription = collections.namedtuple(
     "ResolvedContainerDescription", ["container_resolver", "container_description"]
 )
 
 
+class ContainerResolutionCache:
+    """Thread-safe LRU cache of the container descriptions found for tools.
+
+    Entries expire ``expire`` seconds after they were added, so that containers
+    that become available later (e.g. once pulled into an image cache) are found.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_CONTAINER_RESOLUTION_CACHE_SIZE,
+        expire: float = DEFAULT_CONTAINER_RESOLUTION_CACHE_EXPIRE,
+    ) -> None:
+        self.max_size = max_size
+        self.expire = expire
+        self.hits = 0
+        self.misses = 0
+        self._entries: collections.OrderedDict[Hashable, Tuple[float, Optional[ContainerDescription]]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Optional[ContainerDescription]]:
+        """Return whether ``key`` is cached and the cached container description."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.expire:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Hashable, container_description: Optional[ContainerDescription]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), container_description)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def container_resolution_cache_key(enabled_container_types: List[str], tool_info: "ToolInfo") -> Tuple[Hashable, ...]:
+    """Key for the container description found for a tool, independent of the job it is resolved for."""
+    return (
+        tuple(enabled_container_types),
+        tool_info.tool_id,
+        tool_info.tool_version,
+        tool_info.requires_galaxy_python_environment,
+        json.dumps([r.to_dict() for r in tool_info.requirements], sort_keys=True),
+        json.dumps([c.to_dict() for c in tool_info.container_descriptions], sort_keys=True),
+    )
+
+
 class ContainerFinder:
-    def __init__(self, app_info: "AppInfo", mulled_resolution_cache: Optional["Cache"] = None) -> None:
+    def __init__(
+        self,
+        app_info: "AppInfo",
+        mulled_resolution_cache: Optional["Cache"] = None,
+        container_resolution_cache_size: int = 0,
+        container_resolution_cache_expire: float = DEFAULT_CONTAINER_RESOLUTION_CACHE_EXPIRE,
+    ) -> None:
         self.app_info = app_info
         self.mulled_resolution_cache = mulled_resolution_cache
         self.default_container_registry = ContainerRegistry(app_info, mulled_resolution_cache=mulled_resolution_cache)
         self.destination_container_registeries: Dict[str, ContainerRegistry] = {}
+        self.container_resolution_cache: Optional[ContainerResolutionCache] = None
+        if container_resolution_cache_size > 0:
+            self.container_resolution_cache = ContainerResolutionCache(
+                max_size=container_resolution_cache_size, expire=container_resolution_cache_expire
+            )
 
     def _enabled_container_types(self, destination_info: Dict[str, Any]) -> List[str]:
         return [t for t in ALL_CONTAINER_TYPES if self.__container_type_enabled(t, destination_info)]
@@ -176,8 +263,9 @@ class ContainerFinder:
                     return container
 
         # Otherwise lets see if we can find container for the tool.
-        container_registry = self._container_registry_for_destination(destination_info)
-        container_description = container_registry.find_best_container_description(enabled_container_types, tool_info)
+        container_description = self._find_best_container_description_for_destination(
+            enabled_container_types, tool_info, destination_info
+        )
         container = __destination_container(container_description)
         if container:
             return container
@@ -198,6 +286,40 @@ class ContainerFinder:
 
         return None
 
+    def _find_best_container_description_for_destination(
+        self, enabled_container_types: List[str], tool_info: "ToolInfo", destination_info: Dict[str, Any]
+    ) -> Optional[ContainerDescription]:
+        container_registry = self._container_registry_for_destination(destination_info)
+        destination_id = destination_info.get("id")
+        if container_registry is self.default_container_registry:
+            registry_key = None
+        elif destination_id and container_registry is self.destination_container_registeries.get(destination_id):
+            registry_key = destination_id
+        else:
+            # Destination without id, its registry is rebuilt on every call
+            return container_registry.find_best_container_description(enabled_container_types, tool_info)
+        cache = self.container_resolution_cache
+        if cache is None:
+            return container_registry.find_best_container_description(enabled_container_types, tool_info)
+        key = (registry_key, container_resolution_cache_key(enabled_container_types, tool_info))
+        cached, container_description = cache.get(key)
+        if not cached:
+            try:
+                resolved_container_description = container_registry.resolve(enabled_container_types, tool_info)
+            except Exception:
+                # Not cached, resolution errors may be transient
+                log.exception("Could not get container description for tool '%s'", tool_info.tool_id)
+                return None
+            if resolved_container_description is not None:
+                container_description = resolved_container_description.container_description
+            cache.set(key, container_description)
+        return container_description
+
+    def clear_container_resolution_cache(self) -> None:
+        """Forget cached container descriptions, e.g. after containers have been installed."""
+        if self.container_resolution_cache is not None:
+            self.container_resolution_cache.clear()
+
     def resolution_cache(self) -> ResolutionCache:
         return self.default_container_registry.get_resolution_cache()
 
@@ -266,6 +388,8 @@ class ContainerFinder:
 
 
 class NullContainerFinder:
+    container_resolution_cache = None
+
     def find_container(self, tool_info: "ToolInfo", destination_info: Dict[str, Any], job_info: "JobInfo") -> None:
         return None
 
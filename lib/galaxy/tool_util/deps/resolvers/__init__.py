@@ -268,6 +268,8 @@ class SpecificationPatternDependencyResolver(SpecificationAwareDependencyResolve
 class Dependency(Dictifiable, metaclass=ABCMeta):
     dict_collection_visible_keys = ["dependency_type", "exact", "name", "version", "cacheable"]
     cacheable = False
+    # Whether the dependency refers to state in the job directory it was resolved for, see set_job_directory.
+    job_specific = False
 
     @abstractmethod
     def shell_commands(self):
@@ -289,6 +291,14 @@ class Dependency(Dictifiable, metaclass=ABCMeta):
         """
         return f"Using dependency {self.name} version {self.version} of type {self.dependency_type}"
 
+    def set_job_directory(self, job_directory: str) -> None:
+        """
+        Use a job specific dependency in another job's directory.
+
+        Only called for dependencies that are ``job_specific``, others don't
+        refer to a job directory and are used as they are.
+        """
+
 
 class ContainerDependency(Dependency):
     dict_collection_visible_keys = Dependency.dict_collection_visible_keys + [
@@ -329,6 +329,7 @@ class CondaDependencyResolver(
             version,
             preserve_python_environment=preserve_python_environment,
             dependency_resolver=self,
+            job_specific=bool(job_directory),
         )
 
     def _expand_requirement(self, requirement):
@@ -467,7 +468,10 @@ class CondaDependency(Dependency):
         version: Optional[str] = None,
         preserve_python_environment: bool = False,
         dependency_resolver: Optional[DependencyResolver] = None,
+        job_specific: bool = False,
     ) -> None:
+        # The environment is built in the job directory
+        self.job_specific = job_specific
         self.activate = conda_context.activate
         self.conda_context = conda_context
         self.environment_path = environment_path
@@ -490,6 +494,9 @@ class CondaDependency(Dependency):
     def version(self):
         return self._version
 
+    def set_job_directory(self, job_directory: str) -> None:
+        self.environment_path = os.path.join(job_directory, os.path.basename(self.environment_path))
+
     def build_cache(self, cache_path):
         self.set_cache_path(cache_path)
         self.build_environment()
@@ -91,6 +91,13 @@ class DependencyResolversView:
         requirements = payload.get("requirements")
         if not requirements:
             return None
+        try:
+            return self._uninstall_dependencies(requirements, index, resolver_type, container_type)
+        finally:
+            # Jobs should no longer use resolutions of the uninstalled dependencies
+            self._dependency_manager.clear_resolution_cache()
+
+    def _uninstall_dependencies(self, requirements, index, resolver_type, container_type):
         if index:
             resolver = self._dependency_resolvers[index]
             if resolver.can_uninstall_dependencies:
@@ -134,6 +141,7 @@ class DependencyResolversView:
                 unused_dependencies = resolver.unused_dependency_paths(toolbox_requirements_status)
                 can_remove = envs_to_remove & set(unused_dependencies)
                 exit_code = resolver.uninstall_environments(can_remove)
+                self._dependency_manager.clear_resolution_cache()
                 if exit_code == 0:
                     removed_environments = removed_environments.union(can_remove)
                     envs_to_remove = envs_to_remove.difference(can_remove)
@@ -141,7 +149,10 @@ class DependencyResolversView:
 
     def install_dependencies(self, requirements, **kwds):
         kwds["install"] = True
-        return self._dependency_manager._requirements_to_dependencies_dict(requirements, **kwds)
+        dependencies = self._dependency_manager._requirements_to_dependencies_dict(requirements, **kwds)
+        # Dependencies may have been installed, jobs should no longer use cached resolutions
+        self._dependency_manager.clear_resolution_cache()
+        return dependencies
 
     def install_dependency(self, index=None, **payload):
         """
@@ -175,7 +186,9 @@ class DependencyResolversView:
             raise exceptions.RequestParameterInvalidException("Attempted to install on a disabled dependency resolver.")
 
         name, version, type, extra_kwds = self._parse_dependency_info(payload)
-        return resolver.install_dependency(name=name, version=version, type=type, **extra_kwds)
+        installed = resolver.install_dependency(name=name, version=version, type=type, **extra_kwds)
+        self._dependency_manager.clear_resolution_cache()
+        return installed
 
     def _dependency(self, index=None, **kwds):
         if index is not None:
@@ -404,6 +417,9 @@ class ContainerResolutionView:
 
         # Consider implementing 'search' to match dependency resolution API.
         resolved_container_description = self._app.container_finder.resolve(**find_best_kwds)
+        if find_best_kwds["install"]:
+            # Containers may have been installed, jobs should no longer use cached resolutions
+            self._app.container_finder.clear_container_resolution_cache()
         if resolved_container_description:
             status = ContainerDependency(
                 resolved_container_description.container_description,
@@ -1283,6 +1283,13 @@ class Tool(UsesDictVisibleKeys, MaybeToolParameterBundle):
         """
         return self.__get_job_tool_configuration().handler
 
+    def get_configured_job_destination(self) -> Union[str, None]:
+        """Get the configured job destination ID or tag for this `Tool`.
+
+        :returns: str or None -- The configured destination ID or tag, None for the default destination
+        """
+        return self.__get_job_tool_configuration().destination
+
     def get_job_destination(self, job_params: Union[dict, None] = None) -> "JobDestination":
         """
         :returns: The destination definition and runner parameters.
@@ -742,7 +742,11 @@ class DefaultToolAction(ToolAction):
             if name not in incoming and name not in child_dataset_names:
                 # don't add already existing datasets, i.e. async created
                 history.stage_addition(data)
-        history.add_pending_items(set_output_hid=set_output_hid)
+        if execution_cache.defer_history_additions and set_output_hid:
+            if history not in execution_cache.histories_with_pending_additions:
+                execution_cache.histories_with_pending_additions.append(history)
+        else:
+            history.add_pending_items(set_output_hid=set_output_hid)
 
         log.info(add_datasets_timer)
         job_setup_timer = ExecutionTimer()
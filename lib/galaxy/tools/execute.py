@@ -292,6 +292,8 @@ def _execute(
     has_remaining_jobs = False
     execution_slice = None
     job_datasets: dict[str, list[model.DatasetInstance]] = {}  # job: list of dataset instances created by job
+    # allocate the history ids of all outputs at once below instead of once per job
+    execution_cache.defer_history_additions = job_count > 1
 
     for i, execution_slice in enumerate(execution_tracker.new_execution_slices()):
         if max_num_jobs is not None and jobs_executed >= max_num_jobs:
@@ -307,6 +309,7 @@ def _execute(
             history = execution_slice.history or history
             jobs_executed += 1
 
+    execution_cache.add_pending_items()
     if execution_slice and history:
         history.add_pending_items()
     # Make sure collections, implicit jobs etc are flushed even if there are no precreated output datasets
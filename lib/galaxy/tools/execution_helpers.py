@@ -22,6 +22,10 @@ class ToolExecutionCache:
         self.current_user_roles = trans.get_current_user_roles()
         self.chrom_info = {}
         self.cached_collection_elements = {}
+        # When executing a batch of jobs, add the outputs of all jobs to their histories at once
+        # instead of allocating history ids for every job separately.
+        self.defer_history_additions = False
+        self.histories_with_pending_additions: list = []
 
     def get_chrom_info(self, tool_id, input_dbkey):
         genome_builds = self.trans.app.genome_builds
@@ -39,6 +43,12 @@ class ToolExecutionCache:
 
         return chrom_info_pair
 
+    def add_pending_items(self) -> None:
+        """Add the outputs deferred by ``defer_history_additions`` to their histories."""
+        for history in self.histories_with_pending_additions:
+            history.add_pending_items()
+        self.histories_with_pending_additions = []
+
 
 def filter_output(tool, output, incoming):
     for filter in output.filters:
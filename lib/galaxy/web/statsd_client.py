@@ -37,6 +37,10 @@ class VanillaGalaxyStatsdClient:
         infix = self._effective_infix(path, tags)
         self.statsd_client.incr(infix + path, n)
 
+    def gauge(self, path, value, tags=None):
+        infix = self._effective_infix(path, tags)
+        self.statsd_client.gauge(infix + path, value)
+
     def _effective_infix(self, path, tags):
         tags = tags or {}
         if self.statsd_influxdb and tags:
@@ -68,6 +72,14 @@ class PyTestGalaxyStatsdClient(VanillaGalaxyStatsdClient):
             counter[path].append({"n": n, "tags": tags})
         super().incr(path, n=n, tags=tags)
 
+    def gauge(self, path, value, tags=None):
+        if (metrics := CURRENT_TEST_METRICS) is not None:
+            gauge = metrics["gauge"]
+            if path not in gauge:
+                gauge[path] = []
+            gauge[path].append({"value": value, "tags": tags})
+        super().gauge(path, value, tags=tags)
+
     def _effective_infix(self, path, tags):
         if (current_test := CURRENT_TEST) is not None:
             tags = tags or {}
@@ -82,6 +94,9 @@ class MockStatsClient:
     def incr(self, path, n=1, tags=None):
         pass
 
+    def gauge(self, path, value, tags=None):
+        pass
+
 
 # Replace stats collector if in pytest environment
 if "pytest" in sys.modules:
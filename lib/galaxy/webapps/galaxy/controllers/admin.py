@@ -16,7 +16,10 @@ from galaxy.exceptions import (
     ActionInputError,
     RequestParameterInvalidException,
 )
-from galaxy.managers.quotas import QuotaManager
+from galaxy.managers.quotas import (
+    invalidate_quota_caches,
+    QuotaManager,
+)
 from galaxy.model.index_filter_util import (
     raw_text_column_filter,
     text_column_filter,
@@ -844,6 +847,7 @@ class AdminGalaxy(controller.BaseUIController):
                 trans.app.security_agent.set_user_group_and_role_associations(
                     user, group_ids=group_ids, role_ids=role_ids
                 )
+                invalidate_quota_caches(trans.app)
                 return {
                     "message": f"User '{user.email}' has been updated with {len(role_ids)} associated roles and {len(group_ids)} associated groups (private roles are not displayed)."
                 }
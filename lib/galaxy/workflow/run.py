@@ -1,4 +1,5 @@
 import logging
+import time
 import uuid
 from collections.abc import MutableMapping
 from typing import (
@@ -9,6 +10,8 @@ from typing import (
 )
 
 from boltons.iterutils import get_path
+from sqlalchemy import select
+from sqlalchemy.orm import object_session
 from typing_extensions import Protocol
 
 from galaxy import model
@@ -165,6 +168,8 @@ class WorkflowInvoker:
         self.trans = trans
         self.workflow = workflow
         self.workflow_invocation: WorkflowInvocation
+        # subworkflows are scheduled as steps of the invocation of the parent workflow
+        self.is_subworkflow_invoker = progress is not None
         if progress is not None:
             assert workflow_invocation is None
             workflow_invocation = progress.workflow_invocation
@@ -224,6 +229,11 @@ class WorkflowInvoker:
         remaining_steps = self.progress.remaining_steps()
         delayed_steps = False
         max_jobs_per_iteration_reached = False
+        time_slice_exhausted = False
+        maximum_seconds = getattr(config, "maximum_workflow_scheduling_seconds_per_iteration", -1)
+        scheduling_deadline = None
+        if maximum_seconds > 0 and not self.is_subworkflow_invoker:
+            scheduling_deadline = time.monotonic() + maximum_seconds
 
         # Pre-populate outputs for all input steps so subworkflows can access them
         for step in self.workflow_invocation.workflow.steps:
@@ -235,9 +245,22 @@ class WorkflowInvoker:
             if max_jobs_to_schedule is not None and max_jobs_to_schedule <= 0:
                 max_jobs_per_iteration_reached = True
                 break
+            if scheduling_deadline is not None and time.monotonic() >= scheduling_deadline:
+                # leave the remaining steps to the next iteration, so other invocations get scheduled meanwhile
+                log.debug(
+                    f"Workflow invocation [{workflow_invocation.id}] used its scheduling time of {maximum_seconds} seconds for this iteration"
+                )
+                time_slice_exhausted = True
+                break
             step_delayed = False
             step_timer = ExecutionTimer()
             try:
+                # steps waiting for steps delayed in this iteration are delayed without being evaluated
+                delayed_step_id = self.progress.delayed_dependency(step)
+                if delayed_step_id is not None:
+                    delayed_why = f"depends on step [{delayed_step_id}] which has been delayed"
+                    raise modules.DelayedWorkflowEvaluation(why=delayed_why)
+
                 self.__check_implicitly_dependent_steps(step)
 
                 if not workflow_invocation_step:
@@ -249,6 +272,7 @@ class WorkflowInvoker:
 
                     workflow_invocation.steps.append(workflow_invocation_step)
 
+                self.progress.ensure_runtime_state(step)
                 incomplete_or_none = self._invoke_step(workflow_invocation_step)
                 if incomplete_or_none is False:
                     step_delayed = delayed_steps = True
@@ -256,6 +280,7 @@ class WorkflowInvoker:
                     self.progress.mark_step_outputs_delayed(step, why="Not all jobs scheduled for state.")
                 else:
                     workflow_invocation_step.state = "scheduled"
+                    self.progress.record_step_outputs(step)
             except modules.DelayedWorkflowEvaluation as de:
                 step_delayed = delayed_steps = True
                 self.progress.mark_step_outputs_delayed(step, why=de.why)
@@ -307,11 +332,12 @@ class WorkflowInvoker:
             if not step_delayed:
                 log.debug(f"Workflow step {step.id} of invocation {workflow_invocation.id} invoked {step_timer}")
 
-        if delayed_steps or max_jobs_per_iteration_reached:
+        if delayed_steps or max_jobs_per_iteration_reached or time_slice_exhausted:
             state = model.WorkflowInvocation.states.READY
         else:
             state = model.WorkflowInvocation.states.SCHEDULED
         workflow_invocation.set_state(state)
+        self.progress.persist_snapshot()
 
         # All jobs ran successfully, so we can save now
         self.trans.sa_session.add(workflow_invocation)
@@ -373,6 +399,8 @@ class WorkflowInvoker:
 
 
 STEP_OUTPUT_DELAYED = object()
+# steps whose outputs are recovered from the history contents recorded for the invocation step
+SNAPSHOT_STEP_TYPES = ("tool", "subworkflow")
 
 
 class ModuleInjector(Protocol):
@@ -416,6 +444,13 @@ class WorkflowProgress:
         self.subworkflow_collection_info = subworkflow_collection_info
         self.subworkflow_structure = subworkflow_collection_info.structure if subworkflow_collection_info else None
         self.when_values = when_values
+        self.step_states: dict[int, model.WorkflowRequestStepState] = {}
+        self.steps_with_module: set[int] = set()
+        self.steps_with_runtime_state: set[int] = set()
+        self.snapshot_steps: dict[str, dict[str, dict[str, Any]]] = dict(
+            (workflow_invocation.progress_snapshot or {}).get("steps", {})
+        )
+        self.snapshot_changed = False
 
     @property
     def maximum_jobs_to_schedule_or_none(self) -> Optional[int]:
@@ -430,35 +465,151 @@ class WorkflowProgress:
     def remaining_steps(
         self,
     ) -> list[tuple["WorkflowStep", Optional[WorkflowInvocationStep]]]:
+        """Recover the outputs of scheduled steps and return the steps remaining to be scheduled.
+
+        The module and runtime state of remaining steps other than inputs are
+        set up by :meth:`ensure_runtime_state` once a step is evaluated, so
+        steps that can't make progress yet don't pay for it.
+        """
         # Previously computed and persisted step states.
         step_states = self.workflow_invocation.step_states_by_step_id()
+        self.step_states = step_states
         steps = self.workflow_invocation.workflow.steps
 
-        # TODO: Wouldn't a generator be much better here so we don't have to reason about
-        # steps we are no where near ready to schedule?
         remaining_steps = []
         step_invocations_by_id = self.workflow_invocation.step_invocations_by_step_id()
-        self.module_injector.inject_all(self.workflow_invocation.workflow, param_map=self.param_map)
+        snapshot_outputs = self._load_snapshot_outputs(step_invocations_by_id)
         for step in steps:
             step_id = step.id
-            step_args = self.param_map.get(step_id, {})
-            self.module_injector.compute_runtime_state(step, step_args=step_args)
             if step_id not in step_states:
                 # Can this ever happen?
                 public_message = f"Workflow invocation has no step state for step {step.order_index + 1}"
                 log.error(f"{public_message}. State is known for these step ids: {list(step_states.keys())}.")
                 raise MessageException(public_message)
-            runtime_state = step_states[step_id].value
-            assert step.module
-            step.state = step.module.decode_runtime_state(step, runtime_state)
 
             invocation_step = step_invocations_by_id.get(step_id, None)
             if invocation_step and invocation_step.state == "scheduled":
+                if step_id in snapshot_outputs:
+                    self.outputs[step_id] = snapshot_outputs[step_id]
+                    continue
+                self.ensure_runtime_state(step)
                 self._recover_mapping(invocation_step)
+                self.record_step_outputs(step)
             else:
+                if step.is_input_type:
+                    # outputs of input steps are populated before any step is invoked
+                    self.ensure_runtime_state(step)
                 remaining_steps.append((step, invocation_step))
         return remaining_steps
 
+    def _load_snapshot_outputs(
+        self, step_invocations_by_id: dict[int, WorkflowInvocationStep]
+    ) -> dict[int, dict[str, Any]]:
+        """Load the outputs of scheduled steps recorded in the invocation's progress snapshot.
+
+        The history contents of all recorded steps are loaded at once instead of through the output
+        associations of each invocation step.
+        """
+        recorded: dict[int, dict[str, dict[str, Any]]] = {}
+        for step_id_str, step_outputs in self.snapshot_steps.items():
+            step_id = int(step_id_str)
+            invocation_step = step_invocations_by_id.get(step_id)
+            if invocation_step and invocation_step.state == "scheduled":
+                recorded[step_id] = step_outputs
+        session = object_session(self.workflow_invocation)
+        if not recorded or session is None:
+            return {}
+
+        ids_by_src: dict[str, set[int]] = {"hda": set(), "hdca": set()}
+        for step_outputs in recorded.values():
+            for output in step_outputs.values():
+                ids_by_src[output["src"]].add(output["id"])
+        contents: dict[tuple[str, int], Any] = {}
+        if ids_by_src["hda"]:
+            hda_stmt = select(model.HistoryDatasetAssociation).where(
+                model.HistoryDatasetAssociation.id.in_(ids_by_src["hda"])
+            )
+            for hda in session.scalars(hda_stmt):
+                contents[("hda", hda.id)] = hda
+        if ids_by_src["hdca"]:
+            hdca_stmt = select(model.HistoryDatasetCollectionAssociation).where(
+                model.HistoryDatasetCollectionAssociation.id.in_(ids_by_src["hdca"])
+            )
+            for hdca in session.scalars(hdca_stmt):
+                contents[("hdca", hdca.id)] = hdca
+
+        outputs: dict[int, dict[str, Any]] = {}
+        for step_id, step_outputs in recorded.items():
+            try:
+                outputs[step_id] = {
+                    output_name: contents[(output["src"], output["id"])] for output_name, output in step_outputs.items()
+                }
+            except KeyError:
+                # recover outputs from the invocation step instead
+                continue
+        return outputs
+
+    def record_step_outputs(self, step: "WorkflowStep") -> None:
+        """Record the outputs of a scheduled step in the progress snapshot, if they can be restored from it."""
+        outputs = self.outputs.get(step.id)
+        if step.type not in SNAPSHOT_STEP_TYPES or not isinstance(outputs, dict):
+            return
+        step_outputs = {}
+        for output_name, output in outputs.items():
+            if isinstance(output, model.HistoryDatasetAssociation) and output.id:
+                step_outputs[output_name] = {"src": "hda", "id": output.id}
+            elif isinstance(output, model.HistoryDatasetCollectionAssociation) and output.id:
+                step_outputs[output_name] = {"src": "hdca", "id": output.id}
+            else:
+                # parameter values and contents that haven't been flushed yet are recovered from the invocation step
+                return
+        self.snapshot_steps[str(step.id)] = step_outputs
+        self.snapshot_changed = True
+
+    def persist_snapshot(self) -> None:
+        """Store the outputs recorded for scheduled steps with the workflow invocation."""
+        if self.snapshot_changed:
+            self.workflow_invocation.progress_snapshot = {"steps": dict(self.snapshot_steps)}
+            self.snapshot_changed = False
+
+    def ensure_module(self, step: "WorkflowStep") -> None:
+        """Inject the module of ``step``, unless this has been done already."""
+        if step.id in self.steps_with_module:
+            return
+        self.module_injector.inject(
+            step, steps=self.workflow_invocation.workflow.steps, step_args=self.param_map.get(step.id, {})
+        )
+        self.steps_with_module.add(step.id)
+
+    def ensure_runtime_state(self, step: "WorkflowStep") -> None:
+        """Compute the runtime state of ``step`` from its persisted step state, unless this has been done already."""
+        step_id = step.id
+        if step_id in self.steps_with_runtime_state:
+            return
+        self.ensure_module(step)
+        if step.is_input_type:
+            # the runtime inputs of input steps depend on the modules of the steps they are connected to
+            for output_connection in step.output_connections:
+                if output_connection.input_step:
+                    self.ensure_module(output_connection.input_step)
+        step_args = self.param_map.get(step_id, {})
+        self.module_injector.compute_runtime_state(step, step_args=step_args)
+        runtime_state = self.step_states[step_id].value
+        assert step.module
+        step.state = step.module.decode_runtime_state(step, runtime_state)
+        self.steps_with_runtime_state.add(step_id)
+
+    def delayed_dependency(self, step: "WorkflowStep") -> Optional[int]:
+        """Return the id of a step ``step`` is connected to whose outputs have been delayed, if there is one.
+
+        Steps are invoked in order, so such a step can't be invoked before the next scheduling iteration.
+        """
+        for input_connection in step.input_connections:
+            output_step_id = input_connection.output_step.id
+            if self.outputs.get(output_step_id) is STEP_OUTPUT_DELAYED:
+                return output_step_id
+        return None
+
     def replacement_for_input(self, trans, step: "WorkflowStep", input_dict: dict[str, Any]):
         replacement: Union[
             NoReplacement,
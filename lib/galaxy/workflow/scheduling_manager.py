@@ -1,10 +1,14 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import (
     datetime,
     timedelta,
 )
 from functools import partial
+from itertools import zip_longest
 from typing import (
+    NamedTuple,
     Optional,
     TYPE_CHECKING,
     Union,
@@ -62,6 +66,58 @@ EXCEPTION_MESSAGE_DUPLICATE_SCHEDULERS = (
 )
 EXCEPTION_MESSAGE_SERIALIZE = "Parallelization is not desired but handler assignment methods are non-deterministic. Set DB_PREASSIGN in workflow_schedulers_conf.xml."
 
+SCHEDULING_POLICY_FIFO = "fifo"
+SCHEDULING_POLICY_FAIR_SHARE = "fair_share"
+QUEUE_TIME_METRIC = "internal.galaxy.workflows.scheduling_manager.invocation_queue_time"
+HELD_BACK_METRIC = "internal.galaxy.workflows.scheduling_manager.held_back_invocations"
+
+
+class ActiveInvocation(NamedTuple):
+    id: int
+    history_id: Optional[int]
+    user_id: Optional[int]
+    state: Optional[str]
+
+
+def order_active_invocations(
+    active_invocations: list[ActiveInvocation],
+    policy: str = SCHEDULING_POLICY_FIFO,
+    maximum_per_user: int = 0,
+) -> tuple[list[ActiveInvocation], int]:
+    """Return the active invocations in the order to schedule them and the number of invocations held back.
+
+    ``active_invocations`` are expected in id order. With the ``fair_share`` policy, the invocations of different
+    users are interleaved, users taking turns in the order of their oldest active invocation. If
+    ``maximum_per_user`` is positive, only that many of the oldest active invocations of each user are scheduled,
+    the others are held back until the user's earlier invocations are scheduled completely. Invocations being
+    cancelled are never held back. Anonymous invocations are treated as invocations of a user per history.
+    """
+    by_owner: dict[tuple[str, Optional[int]], list[ActiveInvocation]] = {}
+    held_back = 0
+    for invocation in active_invocations:
+        owner: tuple[str, Optional[int]]
+        if invocation.user_id is not None:
+            owner = ("user", invocation.user_id)
+        else:
+            owner = ("history", invocation.history_id)
+        owner_invocations = by_owner.setdefault(owner, [])
+        if maximum_per_user > 0 and invocation.state != InvocationState.CANCELLING:
+            counted = sum(1 for i in owner_invocations if i.state != InvocationState.CANCELLING)
+            if counted >= maximum_per_user:
+                held_back += 1
+                continue
+        owner_invocations.append(invocation)
+    if policy == SCHEDULING_POLICY_FAIR_SHARE:
+        ordered = [
+            invocation
+            for scheduling_round in zip_longest(*by_owner.values())
+            for invocation in scheduling_round
+            if invocation is not None
+        ]
+    else:
+        ordered = sorted((i for owner_invocations in by_owner.values() for i in owner_invocations), key=lambda i: i.id)
+    return ordered, held_back
+
 
 class WorkflowSchedulingManager(ConfiguresHandlers):
     """A workflow scheduling manager based loosely on pattern established by
@@ -318,6 +374,15 @@ class WorkflowRequestMonitor(Monitors):
         )
         self.invocation_grabber = None
         self.update_time_tracking_dict: dict[int, datetime] = {}
+        self.scheduling_executor: Optional[ThreadPoolExecutor] = None
+        if app.config.workflow_scheduling_workers > 1:
+            self.scheduling_executor = ThreadPoolExecutor(
+                max_workers=app.config.workflow_scheduling_workers,
+                thread_name_prefix="WorkflowRequestMonitor.scheduling_worker",
+            )
+        # Keys of the invocation groups queued for or being scheduled by the worker pool
+        self._scheduling_keys: set[tuple[str, Optional[int]]] = set()
+        self._scheduling_keys_lock = threading.Lock()
         backfill_seconds = (
             min(app.config.maximum_workflow_invocation_duration, DEFAULT_SCHEDULER_BACKFILL_SECONDS)
             if app.config.maximum_workflow_invocation_duration > 0
@@ -383,13 +448,71 @@ class WorkflowRequestMonitor(Monitors):
             self._monitor_sleep(self.app.config.workflow_monitor_sleep)
 
     def __schedule(self, workflow_scheduler_id, workflow_scheduler):
-        invocation_ids = self.__active_invocation_ids(workflow_scheduler_id)
-        for invocation_id in invocation_ids:
-            log.debug("Attempting to schedule workflow invocation [%s]", invocation_id)
-            self.__attempt_schedule(invocation_id, workflow_scheduler)
+        if self.scheduling_executor is not None:
+            self.__schedule_concurrently(workflow_scheduler_id, workflow_scheduler)
+            return
+        for invocation in self.__active_invocations(workflow_scheduler_id):
+            log.debug("Attempting to schedule workflow invocation [%s]", invocation.id)
+            self.__timed_attempt_schedule(invocation.id, workflow_scheduler)
             if not self.monitor_running:
                 return
 
+    def __schedule_concurrently(self, workflow_scheduler_id, workflow_scheduler):
+        """Hand the active invocations to the worker pool.
+
+        Invocations of the same history are scheduled one after the other in a single task, so their order is the
+        same as when scheduling serially, unless ``parallelize_workflow_scheduling_within_histories`` is set. Groups
+        of invocations that are still queued or being scheduled are skipped until their task is complete, so a
+        long running invocation doesn't hold up the others and is never scheduled by two workers at once.
+        """
+        assert self.scheduling_executor is not None
+        groups: dict[tuple[str, Optional[int]], list[int]] = {}
+        for invocation in self.__active_invocations(workflow_scheduler_id):
+            key: tuple[str, Optional[int]]
+            if self.app.config.parallelize_workflow_scheduling_within_histories:
+                key = ("invocation", invocation.id)
+            else:
+                key = ("history", invocation.history_id)
+            groups.setdefault(key, []).append(invocation.id)
+        for key, invocation_ids in groups.items():
+            with self._scheduling_keys_lock:
+                if key in self._scheduling_keys:
+                    continue
+                self._scheduling_keys.add(key)
+            # Time each invocation waits for a worker and for the invocations of the history scheduled before it
+            wait_timers = [
+                self.app.execution_timer_factory.get_timer(
+                    "internal.galaxy.workflows.scheduling_manager.invocation_wait",
+                    f"Workflow invocation [{invocation_id}] waited for scheduling.",
+                )
+                for invocation_id in invocation_ids
+            ]
+            self.scheduling_executor.submit(self.__schedule_group, key, invocation_ids, wait_timers, workflow_scheduler)
+
+    def __schedule_group(self, key, invocation_ids, wait_timers, workflow_scheduler):
+        try:
+            for invocation_id, wait_timer in zip(invocation_ids, wait_timers):
+                if not self.monitor_running:
+                    return
+                log.trace(wait_timer.to_str())
+                log.debug("Attempting to schedule workflow invocation [%s]", invocation_id)
+                self.__timed_attempt_schedule(invocation_id, workflow_scheduler)
+        except Exception:
+            log.exception("An exception occured scheduling while scheduling workflows")
+        finally:
+            with self._scheduling_keys_lock:
+                self._scheduling_keys.discard(key)
+
+    def __timed_attempt_schedule(self, invocation_id, workflow_scheduler):
+        attempt_timer = self.app.execution_timer_factory.get_timer(
+            "internal.galaxy.workflows.scheduling_manager.attempt_schedule",
+            f"Attempted to schedule workflow invocation [{invocation_id}].",
+        )
+        try:
+            return self.__attempt_schedule(invocation_id, workflow_scheduler)
+        finally:
+            log.trace(attempt_timer.to_str())
+
     def __attempt_materialize(self, workflow_invocation: model.WorkflowInvocation, session: Session) -> bool:
         try:
             inputs_to_materialize = workflow_invocation.inputs_requiring_materialization()
@@ -435,7 +558,11 @@ class WorkflowRequestMonitor(Monitors):
         with self.app.model.context() as session:
             check_database_connection(session)
             workflow_invocation = session.get(model.WorkflowInvocation, invocation_id)
+            # the time spent queued is reported once, when the invocation first leaves its initial state
+            queue_time_reported = False
             if workflow_invocation.state == workflow_invocation.states.REQUIRES_MATERIALIZATION:
+                self.__report_queue_time(workflow_invocation)
+                queue_time_reported = True
                 if not self.__attempt_materialize(workflow_invocation, session):
                     return None
                 if self.app.config.workflow_scheduling_separate_materialization_iteration:
@@ -460,6 +587,8 @@ class WorkflowRequestMonitor(Monitors):
                         if i.active and i.id < workflow_invocation.id:
                             return False
                 if self.ready_to_schedule_more(workflow_invocation):
+                    if not queue_time_reported and workflow_invocation.state == workflow_invocation.states.NEW:
+                        self.__report_queue_time(workflow_invocation)
                     self.update_time_tracking_dict[invocation_id] = now()
                     workflow_scheduler.schedule(workflow_invocation)
                     log.debug("Workflow invocation [%s] scheduled", invocation_id)
@@ -472,16 +601,38 @@ class WorkflowRequestMonitor(Monitors):
         # A workflow was obtained and scheduled...
         return True
 
-    def __active_invocation_ids(self, scheduler_id):
+    def __active_invocations(self, scheduler_id) -> list[ActiveInvocation]:
         handler = self.app.config.server_name
-        return model.WorkflowInvocation.poll_active_workflow_ids(
-            self.app.model.engine,
-            scheduler=scheduler_id,
-            handler=handler,
+        active_invocations = [
+            ActiveInvocation(*row)
+            for row in model.WorkflowInvocation.poll_active_workflows(
+                self.app.model.engine,
+                scheduler=scheduler_id,
+                handler=handler,
+            )
+        ]
+        invocations, held_back = order_active_invocations(
+            active_invocations,
+            policy=self.app.config.workflow_scheduling_policy,
+            maximum_per_user=self.app.config.maximum_active_workflow_invocations_per_user,
         )
+        if held_back:
+            log.debug("Holding back %d workflow invocations of users with too many active invocations", held_back)
+        if statsd_client := self.app.execution_timer_factory.galaxy_statsd_client:
+            statsd_client.gauge(HELD_BACK_METRIC, held_back)
+        return invocations
+
+    def __report_queue_time(self, workflow_invocation: model.WorkflowInvocation) -> None:
+        queue_time = workflow_invocation.seconds_since_created
+        log.debug("Workflow invocation [%s] waited %0.3f seconds to be scheduled", workflow_invocation.id, queue_time)
+        if statsd_client := self.app.execution_timer_factory.galaxy_statsd_client:
+            statsd_client.timing(QUEUE_TIME_METRIC, queue_time * 1000.0)
 
     def start(self):
         self.monitor_thread.start()
 
     def shutdown(self):
         self.shutdown_monitor()
+        if self.scheduling_executor is not None:
+            # invocations being scheduled are completed, queued ones are picked up again after a restart
+            self.scheduling_executor.shutdown(wait=True, cancel_futures=True)
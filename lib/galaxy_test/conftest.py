@@ -67,7 +67,7 @@ class JsonReportHooks:
     def pytest_json_runtest_metadata(self, item, call):
         if call.when == "setup":
             statsd.CURRENT_TEST = str(uuid.uuid4())
-            statsd.CURRENT_TEST_METRICS = {"timing": {}, "counter": {}}
+            statsd.CURRENT_TEST_METRICS = {"timing": {}, "counter": {}, "gauge": {}}
             return {}
         if call.when == "teardown":
             statsd.CURRENT_TEST = None
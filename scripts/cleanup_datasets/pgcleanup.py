@@ -37,6 +37,7 @@ from galaxy.util.script import (
 )
 
 DEFAULT_LOG_DIR = os.path.join(galaxy_root, "scripts", "cleanup_datasets")
+LOCATE_BATCH_SIZE = 1000
 
 log = logging.getLogger(__name__)
 
@@ -278,8 +279,16 @@ class RemovesObjects:
             self.objects_to_remove.add(self.object_class(object_id, row.object_store_id, object_uuid))
 
     def remove_objects(self):
-        for object_to_remove in sorted(self.objects_to_remove):
-            self.remove_object(object_to_remove)
+        objects_to_remove = sorted(self.objects_to_remove)
+        for start in range(0, len(objects_to_remove), LOCATE_BATCH_SIZE):
+            batch = objects_to_remove[start : start + LOCATE_BATCH_SIZE]
+            self.locate_objects(batch)
+            for object_to_remove in batch:
+                self.remove_object(object_to_remove)
+
+    def locate_objects(self, objects_to_remove):
+        """Optionally resolve where a batch of objects is stored before they are removed one by one."""
+        pass
 
     def remove_from_object_store(self, object_to_remove, object_store_kwargs, entire_dir=False, check_exists=False):
         # only remove the "object store path" - if it's at an external_filename, that file will be untouched anyway
@@ -439,6 +448,14 @@ class RemovesDatasets(RemovesObjects):
     id_column = "purged_dataset_id"
     uuid_column = "purged_dataset_uuid"
 
+    def locate_objects(self, datasets):
+        # Datasets without an object_store_id are searched for in every backend of a distributed object store,
+        # do that with one call per backend so the object store's location cache answers the lookups made while
+        # removing them.
+        unplaced = [dataset for dataset in datasets if dataset.object_store_id is None]
+        if unplaced:
+            self.object_store.locate_many(unplaced)
+
     def remove_object(self, dataset):
         store_by = self.object_store.get_store_by(dataset)
         if store_by == "uuid":
@@ -0,0 +1,133 @@
+from typing import (
+    cast,
+    TYPE_CHECKING,
+)
+
+from galaxy.jobs import MinimalJobWrapper
+from galaxy.jobs.handler import (
+    BaseJobHandlerQueue,
+    DefaultJobDispatcher,
+)
+from galaxy.jobs.manager import JobManager
+from galaxy.managers.jobs import get_new_dependent_jobs
+from galaxy.model import (
+    HistoryDatasetAssociation,
+    Job,
+)
+from galaxy.model.unittest_utils import GalaxyDataTestApp
+
+if TYPE_CHECKING:
+    from galaxy.structured_app import MinimalManagerApp
+
+
+class NotifiedQueue(BaseJobHandlerQueue):
+    def __init__(self, app):
+        super().__init__(app, cast(DefaultJobDispatcher, None))
+        self._init_monitor_thread("test_monitor_thread", target=lambda: None)
+
+    def put(self, *args, **kwargs):
+        return
+
+    def shutdown(self):
+        return
+
+
+class RecordingQueueWorker:
+    def __init__(self):
+        self.sent = []
+
+    def send_control_task_to_servers(self, task, server_kwargs):
+        self.sent.append((task, server_kwargs))
+
+
+class NotificationsApp(GalaxyDataTestApp):
+    def __init__(self):
+        super().__init__(track_jobs_in_database=True, job_handler_notifications=True)
+        self.config.server_name = "handler0"
+        self.queue_worker = RecordingQueueWorker()
+        self.job_manager = JobManager(cast("MinimalManagerApp", self))
+        self.job_manager.job_handler.job_queue = NotifiedQueue(self)
+        self.job_manager.job_handler.job_stop_queue = NotifiedQueue(self)
+
+
+def create_job(session, state="new", handler="handler0"):
+    job = Job()
+    job.state = state
+    job.handler = handler
+    session.add(job)
+    return job
+
+
+def create_dependent_jobs(session):
+    output_hda = HistoryDatasetAssociation(sa_session=session, create_dataset=True)
+    copied_hda = HistoryDatasetAssociation(sa_session=session, dataset=output_hda.dataset)
+    unrelated_hda = HistoryDatasetAssociation(sa_session=session, create_dataset=True)
+    session.add_all([output_hda, copied_hda, unrelated_hda])
+
+    producer = create_job(session, state="ok")
+    producer.add_output_dataset("out", output_hda)
+    direct = create_job(session)
+    direct.add_input_dataset("input", output_hda)
+    via_copy = create_job(session, handler="handler1")
+    via_copy.add_input_dataset("input", copied_hda)
+    already_queued = create_job(session, state="queued")
+    already_queued.add_input_dataset("input", output_hda)
+    unrelated = create_job(session)
+    unrelated.add_input_dataset("input", unrelated_hda)
+    session.commit()
+    return producer, direct, via_copy
+
+
+def test_get_new_dependent_jobs():
+    app = GalaxyDataTestApp()
+    session = app.model.session
+    producer, direct, via_copy = create_dependent_jobs(session)
+
+    dependent_jobs = get_new_dependent_jobs(session, [producer.id])
+    assert sorted(dependent_jobs) == [(direct.id, "handler0"), (via_copy.id, "handler1")]
+    assert get_new_dependent_jobs(session, []) == []
+
+
+def test_notify_collects_job_ids():
+    app = GalaxyDataTestApp(track_jobs_in_database=True)
+    queue = NotifiedQueue(app)
+    assert queue._pop_notified_job_ids() is None
+
+    queue.notify([1, 2])
+    queue.notify([2, 3])
+    assert queue._pop_notified_job_ids() == {1, 2, 3}
+    assert queue._pop_notified_job_ids() is None
+
+    # A notification without job ids still wakes the queue
+    queue.notify([])
+    assert queue._pop_notified_job_ids() == set()
+
+
+def test_minimal_job_wrapper_notifies_dependent_jobs():
+    # Celery finishes jobs with a MinimalJobWrapper, which isn't attached to a job handler queue
+    app = NotificationsApp()
+    producer, direct, via_copy = create_dependent_jobs(app.model.session)
+    job_wrapper = MinimalJobWrapper(producer, cast("MinimalManagerApp", app))
+    job_wrapper._notify_dependent_jobs(producer)
+
+    job_queue = cast(NotifiedQueue, app.job_manager.job_handler.job_queue)
+    assert job_queue._pop_notified_job_ids() == {direct.id}
+    # only the handler owning the other dependent job is notified
+    assert app.queue_worker.sent == [("wake_job_handler", {"handler1": {"job_ids": [via_copy.id], "stop": False}})]
+
+
+def test_stop_notifies_owning_handler():
+    app = NotificationsApp()
+    session = app.model.session
+    local_job = create_job(session, state="running")
+    remote_job = create_job(session, state="running", handler="handler1")
+    session.commit()
+
+    app.job_manager.stop(local_job)
+    stop_queue = cast(NotifiedQueue, app.job_manager.job_handler.job_stop_queue)
+    assert stop_queue._pop_notified_job_ids() == {local_job.id}
+    assert app.queue_worker.sent == []
+
+    app.job_manager.stop(remote_job)
+    assert stop_queue._pop_notified_job_ids() is None
+    assert app.queue_worker.sent == [("wake_job_handler", {"handler1": {"job_ids": [remote_job.id], "stop": True}})]
@@ -0,0 +1,116 @@
+import threading
+
+from galaxy.jobs.input_prefetch import (
+    DURATION_METRIC,
+    JobInputPrefetcher,
+    LEAD_TIME_METRIC,
+    PREFETCH_EXPIRY,
+)
+from galaxy.model import (
+    HistoryDatasetAssociation,
+    Job,
+)
+from galaxy.model.unittest_utils import GalaxyDataTestApp
+
+
+class BlockingObjectStore:
+    def __init__(self):
+        self.prefetched = []
+        self.release = threading.Event()
+
+    def prefetch(self, obj):
+        self.release.wait(10)
+        self.prefetched.append(obj.id)
+        return True
+
+
+class RecordingStatsdClient:
+    def __init__(self):
+        self.timings = []
+
+    def timing(self, path, time, tags=None):
+        self.timings.append((path, time))
+
+
+def create_job_with_inputs(session):
+    hda = HistoryDatasetAssociation(sa_session=session, create_dataset=True)
+    copied_hda = HistoryDatasetAssociation(sa_session=session, dataset=hda.dataset)
+    other_hda = HistoryDatasetAssociation(sa_session=session, create_dataset=True)
+    job = Job()
+    job.add_input_dataset("input1", hda)
+    job.add_input_dataset("input2", copied_hda)
+    job.add_input_dataset("input3", other_hda)
+    session.add_all([hda, copied_hda, other_hda, job])
+    session.commit()
+    assert hda.dataset and other_hda.dataset
+    return job, [hda.dataset.id, other_hda.dataset.id]
+
+
+def test_prefetch_before_inputs_needed():
+    app = GalaxyDataTestApp()
+    job, dataset_ids = create_job_with_inputs(app.model.session)
+    object_store = BlockingObjectStore()
+    statsd_client = RecordingStatsdClient()
+    prefetcher = JobInputPrefetcher(object_store, 2, statsd_client)  # type: ignore[arg-type]
+    object_store.release.set()
+    prefetcher.prefetch(job)
+    prefetcher._executor.shutdown(wait=True)
+    # inputs shared by several job parameters are fetched once
+    assert sorted(object_store.prefetched) == sorted(dataset_ids)
+    assert [path for path, _ in statsd_client.timings] == [DURATION_METRIC]
+
+    prefetcher.inputs_needed(job.id)
+    path, lead_time = statsd_client.timings[-1]
+    assert path == LEAD_TIME_METRIC
+    assert lead_time >= 0
+    # not tracked anymore once the job is prepared
+    prefetcher.inputs_needed(job.id)
+    assert len(statsd_client.timings) == 2
+
+
+def test_inputs_needed_before_prefetch_finished():
+    app = GalaxyDataTestApp()
+    job, dataset_ids = create_job_with_inputs(app.model.session)
+    object_store = BlockingObjectStore()
+    statsd_client = RecordingStatsdClient()
+    prefetcher = JobInputPrefetcher(object_store, 2, statsd_client)  # type: ignore[arg-type]
+    prefetcher.prefetch(job)
+    # jobs still waiting are not prefetched again
+    prefetcher.prefetch(job)
+    prefetcher.inputs_needed(job.id)
+    assert statsd_client.timings == []
+    object_store.release.set()
+    prefetcher._executor.shutdown(wait=True)
+    assert sorted(object_store.prefetched) == sorted(dataset_ids)
+    timings = dict(statsd_client.timings)
+    assert timings[LEAD_TIME_METRIC] <= 0
+
+
+def test_discard():
+    app = GalaxyDataTestApp()
+    job, _ = create_job_with_inputs(app.model.session)
+    object_store = BlockingObjectStore()
+    statsd_client = RecordingStatsdClient()
+    prefetcher = JobInputPrefetcher(object_store, 2, statsd_client)  # type: ignore[arg-type]
+    prefetcher.prefetch(job)
+    prefetcher.discard(job.id)
+    object_store.release.set()
+    prefetcher._executor.shutdown(wait=True)
+    prefetcher.inputs_needed(job.id)
+    assert [path for path, _ in statsd_client.timings] == [DURATION_METRIC]
+
+
+def test_prefetches_expire():
+    app = GalaxyDataTestApp()
+    job, _ = create_job_with_inputs(app.model.session)
+    other_job, _ = create_job_with_inputs(app.model.session)
+    object_store = BlockingObjectStore()
+    statsd_client = RecordingStatsdClient()
+    prefetcher = JobInputPrefetcher(object_store, 2, statsd_client)  # type: ignore[arg-type]
+    object_store.release.set()
+    prefetcher.prefetch(job)
+    # e.g. the job got deleted without being prepared or discarded
+    prefetcher._prefetches[job.id].started -= PREFETCH_EXPIRY + 1
+    prefetcher.prefetch(other_job)
+    prefetcher._executor.shutdown(wait=True)
+    assert list(prefetcher._prefetches) == [other_job.id]
@@ -0,0 +1,63 @@
+import datetime
+
+from galaxy.jobs.job_counts import JobCountLedger
+from galaxy.model import Job
+from galaxy.model.unittest_utils import GalaxyDataTestApp
+
+
+def create_job(session, user_id=None, destination_id=None, state="queued"):
+    job = Job()
+    job.user_id = user_id
+    job.destination_id = destination_id
+    job.state = state
+    session.add(job)
+    session.commit()
+    return job
+
+
+def test_record():
+    ledger = JobCountLedger(reconcile_interval=300)
+    ledger.record(1, 1, "local", "queued")
+    ledger.record(2, 1, "cluster", "running")
+    ledger.record(3, None, "local", "running")
+    ledger.record(4, 2, "local", "resubmitted")
+    assert ledger.user_job_count == {1: 2, 2: 1}
+    assert ledger.user_job_count_per_destination == {1: {"local": 1, "cluster": 1}, None: {"local": 1}}
+    assert ledger.total_job_count_per_destination == {"local": 2, "cluster": 1}
+
+    # Recording the same state again is a no-op
+    ledger.record(1, 1, "local", "queued")
+    assert ledger.user_job_count == {1: 2, 2: 1}
+
+    ledger.record(1, 1, "local", "ok")
+    ledger.record(4, 2, "cluster", "queued")
+    assert ledger.user_job_count == {1: 1, 2: 1}
+    assert ledger.user_job_count_per_destination == {1: {"cluster": 1}, 2: {"cluster": 1}, None: {"local": 1}}
+    assert ledger.total_job_count_per_destination == {"local": 1, "cluster": 2}
+
+
+def test_update_and_reconcile():
+    app = GalaxyDataTestApp()
+    session = app.model.session
+    ledger = JobCountLedger(reconcile_interval=300)
+    running = create_job(session, user_id=1, destination_id="local", state="running")
+    create_job(session, user_id=1, destination_id="local", state="new")
+    ledger.update(session)
+    assert ledger.user_job_count == {1: 1}
+
+    queued = create_job(session, user_id=2, destination_id="local", state="queued")
+    running.state = "ok"
+    session.commit()
+    ledger.update(session)
+    assert ledger.user_job_count == {2: 1}
+    assert ledger.total_job_count_per_destination == {"local": 1}
+
+    # Changes missed by incremental updates are corrected on reconciliation
+    queued.state = "ok"
+    queued.update_time = datetime.datetime(2000, 1, 1)
+    session.commit()
+    ledger.update(session)
+    assert ledger.user_job_count == {2: 1}
+    ledger.reconcile(session)
+    assert ledger.user_job_count == {}
+    assert ledger.total_job_count_per_destination == {}
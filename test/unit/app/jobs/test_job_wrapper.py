@@ -125,6 +125,8 @@ class MockEvaluator:
 
 
 class MockJobQueue:
+    input_prefetcher = None
+
     def __init__(self, app):
         self.app = app
         self.dispatcher = MockJobDispatcher(app)
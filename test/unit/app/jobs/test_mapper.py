@@ -4,7 +4,11 @@ from typing import (
     TYPE_CHECKING,
 )
 
-from galaxy.jobs import HasResourceParameters
+from galaxy.jobs import (
+    HasResourceParameters,
+    JobToolConfiguration,
+)
+from galaxy.jobs.handler import StaticJobDestinations
 from galaxy.jobs.job_destination import JobDestination
 from galaxy.jobs.mapper import (
     ERROR_MESSAGE_NO_RULE_FUNCTION,
@@ -132,6 +136,55 @@ def test_dynamic_mapping_externally_set_job_destination():
     assert mapper.job_config.rule_response == "local_runner"
 
 
+def test_static_job_destinations():
+    local = JobDestination(id="local", runner="local")
+    destinations = {
+        "local": [local],
+        "dynamic_rule": [__dynamic_destination(dict(function="upload"))],
+        "cluster": [JobDestination(id="cluster1", runner="drmaa"), JobDestination(id="cluster2", runner="drmaa")],
+    }
+    requested = []
+
+    def get_destinations(id_or_tag):
+        requested.append(id_or_tag)
+        return destinations.get(id_or_tag, [])
+
+    job_config = bunch.Bunch(default_destination_id="local", get_destinations=get_destinations)
+    static_job_destinations = StaticJobDestinations(cast("JobConfiguration", job_config))
+    job_wrappers = [MockConfiguredJobWrapper(id_or_tag) for id_or_tag in [None, "local", "dynamic_rule", "cluster"]]
+    mapped = [static_job_destinations.map(cast("JobWrapper", job_wrapper)) for job_wrapper in job_wrappers * 2]
+    assert mapped == [True, True, False, False] * 2
+    # the default and the local destination are resolved once and copied for each job
+    assert requested == ["local", "dynamic_rule", "cluster"]
+    mapped_destinations = [job_wrapper.cached_job_destination for job_wrapper in job_wrappers[:2]]
+    assert all(d is not None and d is not local and d.id == "local" for d in mapped_destinations)
+    assert job_wrappers[2].cached_job_destination is None
+
+    static_job_destinations.clear()
+    static_job_destinations.map(cast("JobWrapper", job_wrappers[0]))
+    assert requested[-1] == "local"
+
+
+def test_static_job_destinations_skip_tools_configured_by_params():
+    requested = []
+
+    def get_destinations(id_or_tag):
+        requested.append(id_or_tag)
+        return [JobDestination(id=id_or_tag, runner="local")]
+
+    job_config = bunch.Bunch(default_destination_id="local", get_destinations=get_destinations)
+    static_job_destinations = StaticJobDestinations(cast("JobConfiguration", job_config))
+    job_tool_configurations = [
+        JobToolConfiguration(destination="local"),
+        JobToolConfiguration(destination="trackster", params={"source": "trackster"}),
+    ]
+    job_wrapper = MockConfiguredJobWrapper("local", job_tool_configurations)
+    # the destination depends on the params of the job, which the job wrapper's mapper resolves
+    assert not static_job_destinations.map(cast("JobWrapper", job_wrapper))
+    assert job_wrapper.cached_job_destination is None
+    assert requested == []
+
+
 def __assert_mapper_errors_with_message(mapper, message):
     exception = None
     try:
@@ -190,6 +243,20 @@ class MockJobWrapper(HasResourceParameters):
         )
 
 
+class MockConfiguredJobWrapper:
+    def __init__(self, configured_destination, job_tool_configurations=None):
+        self.tool = bunch.Bunch(
+            get_configured_job_destination=lambda: configured_destination,
+            job_tool_configurations=job_tool_configurations
+            or [JobToolConfiguration(destination=configured_destination)],
+        )
+        self.cached_job_destination = None
+
+    def set_cached_job_destination(self, job_destination):
+        self.cached_job_destination = job_destination
+        return job_destination
+
+
 class MockTool:
     def __init__(self, tool_job_destination):
         self.id = "testtoolshed/devteam/tool1/23abcd13123"
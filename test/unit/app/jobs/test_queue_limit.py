@@ -1,3 +1,4 @@
+import datetime
 from typing import Optional
 from unittest.mock import Mock
 
@@ -5,9 +6,14 @@ from galaxy.jobs import (
     JobConfigurationLimits,
     MinimalJobWrapper,
 )
+from galaxy.managers.jobs import (
+    get_session_active_job_counts,
+    get_total_walltime_by_owner,
+)
 from galaxy.model import (
     GalaxySession,
     Job,
+    JobStateHistory,
 )
 from galaxy.model.unittest_utils import GalaxyDataTestApp
 from galaxy.model.unittest_utils.data_app import GalaxyDataTestConfig
@@ -136,3 +142,35 @@ def test_destination_tag_limit():
     # Test at limit
     result = job_wrapper.queue_with_limit(job, job_destination_mock)
     assert result is False
+
+
+def test_session_active_job_counts():
+    app = create_mock_app()
+    create_mock_job(app, session_id=1, state="running")
+    create_mock_job(app, session_id=1, state="queued")
+    create_mock_job(app, session_id=1, state="ok")
+    create_mock_job(app, session_id=2, state="new")
+    create_mock_job(app, session_id=3, state="queued")
+
+    counts = get_session_active_job_counts(app.model.session, [1, 2])
+    assert counts == {1: 2}
+    assert get_session_active_job_counts(app.model.session, []) == {}
+
+
+def test_total_walltime_by_owner():
+    app = create_mock_app()
+    start = datetime.datetime.now() - datetime.timedelta(hours=1)
+    for user_id, session_id, minutes in [(1, None, 10), (1, None, 5), (None, 7, 3), (2, None, 1)]:
+        job = create_mock_job(app, user_id=user_id, session_id=session_id, state="ok")
+        for state, offset in [("running", 0), ("ok", minutes)]:
+            history = JobStateHistory(job)
+            history.state = state
+            history.create_time = start + datetime.timedelta(minutes=offset)
+            app.model.session.add(history)
+    app.model.session.commit()
+
+    by_user, by_session = get_total_walltime_by_owner(
+        app.model.session, [1, 3], [7], datetime.datetime.now() - datetime.timedelta(days=1)
+    )
+    assert by_user == {1: datetime.timedelta(minutes=15), 3: datetime.timedelta(0)}
+    assert by_session == {7: datetime.timedelta(minutes=3)}
@@ -0,0 +1,94 @@
+import threading
+import time
+
+from galaxy.app_unittest_utils.galaxy_mock import MockApp
+from galaxy.jobs.runners import AsynchronousJobRunner
+from galaxy.util.bunch import Bunch
+
+
+class FinishRecordingJobRunner(AsynchronousJobRunner):
+    runner_name = "FinishRecordingRunner"
+
+    def __init__(self, app, nworkers, **kwargs):
+        super().__init__(app, nworkers, **kwargs)
+        self.finished = []
+        self.release = threading.Event()
+
+    def queue_job(self, job_wrapper):
+        self.finished.append(("queued", job_wrapper.name, threading.current_thread().name))
+
+    def finish_job(self, job_state):
+        self.release.wait(5)
+        self.finished.append(("finished", job_state.name, threading.current_thread().name))
+
+
+def _job(name):
+    job_wrapper = Bunch(_job_io=None, get_id_tag=lambda: name)
+    return Bunch(name=name, _job_io=None, get_id_tag=lambda: name, job_wrapper=job_wrapper)
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_finish_on_work_threads_by_default():
+    runner = FinishRecordingJobRunner(MockApp(), 1)
+    runner._init_worker_threads()
+    try:
+        assert runner.finish_queue is runner.work_queue
+        runner.release.set()
+        runner.mark_as_finished(_job("job"))
+        _wait_for(lambda: runner.finished)
+        assert runner.finished == [("finished", "job", "FinishRecordingRunner.work_thread-0")]
+    finally:
+        runner._should_stop = True
+
+
+def test_finish_workers_do_not_block_submission():
+    runner = FinishRecordingJobRunner(MockApp(), 1, finish_workers="1", finish_queue_size="2")
+    runner._init_worker_threads()
+    try:
+        assert runner.finish_queue is not runner.work_queue
+        # The finish worker is blocked finishing the first job, the next two fill the finish queue.
+        for job in ("job1", "job2", "job3"):
+            runner.mark_as_finished(_job(job))
+        _wait_for(runner.finish_queue.full)
+        runner.mark_as_queued(_job("new_job"))
+        _wait_for(lambda: runner.finished)
+        assert runner.finished == [("queued", "new_job", "FinishRecordingRunner.work_thread-0")]
+        # A full finish queue blocks whoever reports a finished job until finish workers catch up.
+        blocked = threading.Thread(target=runner.mark_as_finished, args=(_job("job4"),), daemon=True)
+        blocked.start()
+        blocked.join(0.1)
+        assert blocked.is_alive()
+        runner.release.set()
+        blocked.join(5)
+        assert not blocked.is_alive()
+        _wait_for(lambda: len(runner.finished) == 5)
+        assert [job for _, job, _ in runner.finished[1:]] == ["job1", "job2", "job3", "job4"]
+        assert {thread for _, _, thread in runner.finished[1:]} == {"FinishRecordingRunner.finish_thread-0"}
+    finally:
+        runner._should_stop = True
+
+
+def test_full_finish_queue_does_not_block_shutdown():
+    runner = FinishRecordingJobRunner(MockApp(), 1, finish_workers="1", finish_queue_size="1")
+    runner._init_worker_threads()
+    try:
+        for job in ("job1", "job2"):
+            runner.mark_as_finished(_job(job))
+        _wait_for(runner.finish_queue.full)
+        blocked = threading.Thread(target=runner.mark_as_finished, args=(_job("job3"),), daemon=True)
+        blocked.start()
+        blocked.join(0.1)
+        assert blocked.is_alive()
+        runner._should_stop = True
+        blocked.join(5)
+        assert not blocked.is_alive()
+        assert runner.finish_queue.qsize() == 1
+    finally:
+        runner._should_stop = True
+        runner.release.set()
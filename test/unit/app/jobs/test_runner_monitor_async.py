@@ -0,0 +1,124 @@
+import threading
+import time
+from typing import (
+    cast,
+    TYPE_CHECKING,
+)
+
+from galaxy.app_unittest_utils.galaxy_mock import MockApp
+from galaxy.jobs.job_destination import JobDestination
+from galaxy.jobs.runners import (
+    AsynchronousJobRunner,
+    AsynchronousJobState,
+    STOP_SIGNAL,
+)
+from galaxy.util import bunch
+
+if TYPE_CHECKING:
+    from galaxy.jobs import MinimalJobWrapper
+
+
+class FakeBackendJobRunner(AsynchronousJobRunner):
+    """Runner checking jobs against an in-memory backend, some state checks block until released."""
+
+    runner_name = "FakeBackendRunner"
+
+    def __init__(self, app, nworkers, **kwargs):
+        super().__init__(app, nworkers, **kwargs)
+        self.states = {}
+        self.slow_job_ids = set()
+        self.release = threading.Event()
+        self.finished = []
+        self.active_checks = 0
+        self.max_active_checks = 0
+        self.lock = threading.Lock()
+
+    @property
+    def monitor_sleep_time(self):
+        return 0.05
+
+    def check_watched_item(self, job_state):
+        with self.lock:
+            self.active_checks += 1
+            self.max_active_checks = max(self.max_active_checks, self.active_checks)
+        try:
+            if job_state.job_id in self.slow_job_ids:
+                self.release.wait(5)
+            else:
+                time.sleep(0.01)
+            if self.states[job_state.job_id] == "done":
+                self.finished.append(job_state.job_id)
+                return None
+            return job_state
+        finally:
+            with self.lock:
+                self.active_checks -= 1
+
+
+def _job_state(runner, job_id):
+    job_wrapper = bunch.Bunch(app=runner.app, tool=bunch.Bunch(old_id="fake"), user=None, get_id_tag=lambda: job_id)
+    return AsynchronousJobState(
+        job_wrapper=cast("MinimalJobWrapper", job_wrapper), job_id=job_id, job_destination=JobDestination()
+    )
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def _start_runner(**kwargs):
+    runner = FakeBackendJobRunner(MockApp(), 1, **kwargs)
+    runner.monitor_thread = threading.Thread(target=runner.monitor, daemon=True)
+    runner.monitor_thread.start()
+    return runner
+
+
+def _stop_runner(runner):
+    runner.release.set()
+    runner.monitor_queue.put(STOP_SIGNAL)
+    runner.monitor_thread.join(5)
+    assert not runner.monitor_thread.is_alive()
+
+
+def test_monitor_concurrency_parameter():
+    runner = FakeBackendJobRunner(MockApp(), 1, monitor_concurrency="4")
+    assert runner.runner_params.monitor_concurrency == 4
+    assert FakeBackendJobRunner(MockApp(), 1).runner_params.monitor_concurrency == 1
+
+
+def test_monitor_async_checks_concurrently():
+    runner = _start_runner(monitor_concurrency="4")
+    try:
+        for i in range(20):
+            job_id = str(i)
+            runner.states[job_id] = "running"
+            runner.monitor_job(_job_state(runner, job_id))
+        _wait_for(lambda: len(runner.watched) == 20)
+        for job_id in runner.states:
+            runner.states[job_id] = "done"
+        _wait_for(lambda: len(runner.finished) == 20)
+        assert sorted(runner.finished, key=int) == [str(i) for i in range(20)]
+        assert 1 < runner.max_active_checks <= 4
+    finally:
+        _stop_runner(runner)
+
+
+def test_monitor_async_slow_check_does_not_stall():
+    runner = _start_runner(monitor_concurrency="2")
+    try:
+        runner.slow_job_ids.add("slow")
+        runner.states["slow"] = "done"
+        runner.monitor_job(_job_state(runner, "slow"))
+        for job_id in ("1", "2", "3"):
+            runner.states[job_id] = "done"
+            runner.monitor_job(_job_state(runner, job_id))
+        _wait_for(lambda: [job_state.job_id for job_state in runner.watched] == ["slow"])
+        assert sorted(runner.finished) == ["1", "2", "3"]
+        runner.release.set()
+        _wait_for(lambda: "slow" in runner.finished)
+        _wait_for(lambda: not runner.watched)
+    finally:
+        _stop_runner(runner)
@@ -0,0 +1,203 @@
+from galaxy.app_unittest_utils.galaxy_mock import MockApp
+from galaxy.jobs.handler import DefaultJobDispatcher
+from galaxy.jobs.runners import BaseJobRunner
+from galaxy.jobs.runners.cli import (
+    ShellJobRunner,
+    SUBMIT_RESULT_MARKER,
+)
+from galaxy.jobs.runners.util.cli.shell.local import (
+    TIMEOUT_ERROR_MESSAGE,
+    TIMEOUT_RETURN_CODE,
+)
+from galaxy.model import Job
+from galaxy.util.bunch import Bunch
+
+
+class RecordingJobRunner(BaseJobRunner):
+    runner_name = "RecordingRunner"
+
+    def __init__(self, app, nworkers, **kwargs):
+        super().__init__(app, nworkers, **kwargs)
+        self.queued = []
+
+    def queue_job(self, job_wrapper):
+        if job_wrapper.job_id == "broken":
+            raise Exception("Failed to queue job")
+        self.queued.append(job_wrapper.job_id)
+
+    def fail_job(self, job_state, exception=False, message="Job failed", full_status=None):
+        pass
+
+
+def _job_wrapper(job_id, destination_id, ready=True):
+    return Bunch(
+        job_id=job_id,
+        job_destination=Bunch(id=destination_id),
+        enqueue=lambda: ready,
+        get_id_tag=lambda: job_id,
+        app=Bunch(config=Bunch(redact_email_in_job_name=True)),
+    )
+
+
+def _work_items(runner):
+    items = []
+    while not runner.work_queue.empty():
+        items.append(runner.work_queue.get_nowait())
+    return items
+
+
+def test_put_many_queues_jobs_individually_by_default():
+    runner = RecordingJobRunner(MockApp(), 0)
+    runner._init_worker_threads()
+    runner.put_many([_job_wrapper("1", "a"), _job_wrapper("2", "a"), _job_wrapper("3", "a", ready=False)])
+    items = _work_items(runner)
+    assert [(method.__name__, arg.job_id) for method, arg in items] == [("queue_job", "1"), ("queue_job", "2")]
+
+
+def test_put_many_batches_jobs_by_destination():
+    runner = RecordingJobRunner(MockApp(), 0, queue_batch_size="2")
+    runner._init_worker_threads()
+    runner.put_many(
+        [
+            _job_wrapper("1", "a"),
+            _job_wrapper("2", "b"),
+            _job_wrapper("3", "a"),
+            _job_wrapper("4", "a", ready=False),
+            _job_wrapper("5", "a"),
+        ]
+    )
+    items = _work_items(runner)
+    assert [(method.__name__, [jw.job_id for jw in arg]) for method, arg in items] == [
+        ("queue_jobs", ["1", "3"]),
+        ("queue_jobs", ["2"]),
+        ("queue_jobs", ["5"]),
+    ]
+
+
+def test_queue_jobs_fails_only_broken_jobs():
+    runner = RecordingJobRunner(MockApp(), 0, queue_batch_size="3")
+    runner._init_worker_threads()
+    runner.queue_jobs([_job_wrapper("1", "a"), _job_wrapper("broken", "a"), _job_wrapper("3", "a")])
+    assert runner.queued == ["1", "3"]
+    items = _work_items(runner)
+    assert [(method.__name__, job_state.job_wrapper.job_id) for method, job_state in items] == [("fail_job", "broken")]
+
+
+class BrokenBatchJobRunner(RecordingJobRunner):
+    """Accepts the first job of a batch, then fails."""
+
+    def put_many(self, job_wrappers):
+        job_wrappers[0].state = Job.states.QUEUED
+        self.queued.append(job_wrappers[0].job_id)
+        raise Exception("Failed to queue batch")
+
+    def put(self, job_wrapper):
+        self.queue_job(job_wrapper)
+
+
+def _dispatched_job_wrapper(job_id):
+    job_wrapper = _job_wrapper(job_id, "a")
+    job_wrapper.job_destination.runner = "broken_batch"
+    job_wrapper.state = Job.states.NEW
+    job_wrapper.failed = False
+    job_wrapper.can_split = lambda: False
+    job_wrapper.get_state = lambda: job_wrapper.state
+
+    def fail(message, exception=False):
+        job_wrapper.failed = True
+
+    job_wrapper.fail = fail
+    return job_wrapper
+
+
+def test_dispatcher_put_many_isolates_failing_jobs():
+    dispatcher = DefaultJobDispatcher.__new__(DefaultJobDispatcher)
+    runner = BrokenBatchJobRunner(MockApp(), 0)
+    dispatcher.job_runners = {"broken_batch": runner}
+    job_wrappers = [_dispatched_job_wrapper(job_id) for job_id in ("1", "broken", "3")]
+    dispatcher.put_many(job_wrappers)
+    # The job accepted before the batch failed isn't queued again, the others are dispatched individually
+    assert runner.queued == ["1", "3"]
+    assert [job_wrapper.failed for job_wrapper in job_wrappers] == [False, True, False]
+
+
+class RecordingShell:
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.commands = []
+
+    def execute(self, cmd, timeout=60):
+        self.commands.append(cmd)
+        return self.outputs.pop(0)
+
+
+class SubmitJobInterface:
+    def submit(self, script_file):
+        return f"submit {script_file}"
+
+
+class PreparedShellJobRunner(ShellJobRunner):
+    """Submits already prepared job scripts through a recording shell."""
+
+    def __init__(self, app, nworkers, shell, job_states, **kwargs):
+        super().__init__(app, nworkers, **kwargs)
+        self.shell = shell
+        self.prepared = {ajs.job_wrapper.job_id: ajs for ajs in job_states}
+
+    def get_cli_plugins(self, shell_params, job_params):
+        return self.shell, SubmitJobInterface()
+
+    def _ShellJobRunner__prepare_job_script(self, job_wrapper, job_interface):
+        return self.prepared[job_wrapper.job_id]
+
+
+def _shell_runner(shell, job_states):
+    return PreparedShellJobRunner(MockApp(), 0, shell, job_states, queue_batch_size="3")
+
+
+def _shell_job_state(job_id):
+    job_wrapper = _job_wrapper(job_id, "a")
+    job_wrapper.job_destination.params = {}
+    job_wrapper.failed = None
+    job_wrapper.external_id = None
+
+    def fail(message, exception=False):
+        job_wrapper.failed = message
+
+    def set_external_id(external_id):
+        job_wrapper.external_id = external_id
+
+    job_wrapper.fail = fail
+    job_wrapper.set_external_id = set_external_id
+    return Bunch(job_wrapper=job_wrapper, job_file=f"{job_id}.sh")
+
+
+def _submit_result(stdout, returncode):
+    return f"{stdout}\n\n{SUBMIT_RESULT_MARKER} {returncode}\n"
+
+
+def test_cli_queue_jobs_fails_jobs_with_unknown_submission_result():
+    job_states = [_shell_job_state(job_id) for job_id in ("1", "2", "3")]
+    batch_stdout = _submit_result("Submitted batch job 11", 0) + _submit_result("sbatch: error", 1) + "Submitted"
+    shell = RecordingShell(
+        [
+            Bunch(stdout=batch_stdout, stderr="connection lost", returncode=255),
+            Bunch(stdout="Submitted batch job 12\n", stderr="", returncode=0),
+        ]
+    )
+    runner = _shell_runner(shell, job_states)
+    runner.queue_jobs([ajs.job_wrapper for ajs in job_states])
+    # The job whose submit command failed is submitted again, the one with a truncated result is not
+    assert shell.commands[1:] == ["submit 2.sh"]
+    assert [ajs.job_wrapper.external_id for ajs in job_states] == ["11", "12", None]
+    assert [bool(ajs.job_wrapper.failed) for ajs in job_states] == [False, False, True]
+
+
+def test_cli_queue_jobs_timeout():
+    job_states = [_shell_job_state(job_id) for job_id in ("1", "2")]
+    shell = RecordingShell([Bunch(stdout="", stderr=TIMEOUT_ERROR_MESSAGE, returncode=TIMEOUT_RETURN_CODE)])
+    runner = _shell_runner(shell, job_states)
+    runner.queue_jobs([ajs.job_wrapper for ajs in job_states])
+    assert len(shell.commands) == 1
+    assert all(ajs.job_wrapper.failed for ajs in job_states)
+    assert all(ajs.job_wrapper.external_id is None for ajs in job_states)
@@ -0,0 +1,145 @@
+from typing import (
+    cast,
+    TYPE_CHECKING,
+)
+
+import pytest
+
+from galaxy.app_unittest_utils.galaxy_mock import MockApp
+from galaxy.jobs.job_destination import JobDestination
+from galaxy.jobs.runners import (
+    drmaa as drmaa_runner,
+    RunnerParams,
+    slurm,
+)
+from galaxy.jobs.runners.drmaa import DRMAAJobState
+from galaxy.jobs.runners.slurm import SlurmJobRunner
+from galaxy.util import (
+    asbool,
+    bunch,
+    commands,
+)
+
+if TYPE_CHECKING:
+    from galaxy.app import GalaxyManagerApplication
+    from galaxy.jobs import MinimalJobWrapper
+
+
+class JobState:
+    QUEUED_ACTIVE = "queued_active"
+    RUNNING = "running"
+    USER_SUSPENDED = "user_suspended"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class MockDrmaa:
+    """Stands in for the drmaa module, which needs a DRMAA library to import."""
+
+    JobState = JobState
+
+    class InternalException(Exception):
+        pass
+
+    class InvalidJobException(Exception):
+        pass
+
+    class DrmCommunicationException(Exception):
+        pass
+
+
+class MockDrmaaSession:
+    def __init__(self, states):
+        self.states = states
+        self.checked = []
+
+    def job_status(self, job_id):
+        self.checked.append(job_id)
+        return self.states[job_id]
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    monkeypatch.setattr(drmaa_runner, "drmaa", MockDrmaa)
+    # DRMAAJobRunner.__init__ loads the DRMAA library, only set up what checking job states needs
+    runner = SlurmJobRunner.__new__(SlurmJobRunner)
+    runner.app = cast("GalaxyManagerApplication", MockApp())
+    runner.runner_params = _runner_params(bulk_state_check=True)
+    runner.drmaa_job_states = JobState
+    runner.drmaa_job_state_strings = {JobState.QUEUED_ACTIVE: "queued", JobState.RUNNING: "running"}
+    return runner
+
+
+def _runner_params(bulk_state_check):
+    specs = {"bulk_state_check": dict(map=asbool, default=False)}
+    return RunnerParams(specs=specs, params={"bulk_state_check": bulk_state_check})
+
+
+def _job_state(runner, job_id):
+    job_wrapper = bunch.Bunch(
+        app=runner.app,
+        tool=bunch.Bunch(old_id="fake"),
+        user=None,
+        get_id_tag=lambda: job_id,
+        has_limits=lambda: False,
+        change_state=lambda state: None,
+        check_for_entry_points=lambda: None,
+    )
+    return DRMAAJobState(
+        job_wrapper=cast("MinimalJobWrapper", job_wrapper), job_id=job_id, job_destination=JobDestination()
+    )
+
+
+def test_get_drmaa_states_squeue(runner, monkeypatch):
+    commands_run = []
+
+    def execute(cmd):
+        commands_run.append(cmd)
+        return "1 RUNNING\n2 PENDING\n3 SUSPENDED\n4 COMPLETING\nunexpected output\n"
+
+    monkeypatch.setattr(commands, "execute", execute)
+    job_states = [_job_state(runner, job_id) for job_id in ("1", "2", "3", "4", "5", "6.0")]
+    states = runner.get_drmaa_states(job_states)
+    assert states == {"1": JobState.RUNNING, "2": JobState.QUEUED_ACTIVE, "3": JobState.USER_SUSPENDED}
+    assert len(commands_run) == 1
+    # job steps are not listed by squeue -j and are left to DRMAA
+    assert commands_run[0][-2:] == ["-j", "1,2,3,4,5"]
+
+
+def test_get_drmaa_states_batches_squeue_calls(runner, monkeypatch):
+    commands_run = []
+
+    def execute(cmd):
+        commands_run.append(cmd)
+        return "\n".join(f"{job_id} RUNNING" for job_id in cmd[-1].split(","))
+
+    monkeypatch.setattr(slurm, "SQUEUE_MAX_JOB_IDS", 2)
+    monkeypatch.setattr(commands, "execute", execute)
+    job_states = [_job_state(runner, str(job_id)) for job_id in range(5)]
+    states = runner.get_drmaa_states(job_states)
+    assert len(states) == 5
+    assert [cmd[-1] for cmd in commands_run] == ["0,1", "2,3", "4"]
+
+
+def test_get_drmaa_states_disabled_or_failing(runner, monkeypatch):
+    def execute(cmd):
+        raise commands.CommandLineException(" ".join(cmd), "", "squeue: error: Invalid job id specified", 1)
+
+    monkeypatch.setattr(commands, "execute", execute)
+    job_states = [_job_state(runner, "1")]
+    assert runner.get_drmaa_states(job_states) == {}
+    runner.runner_params = _runner_params(bulk_state_check=False)
+    monkeypatch.setattr(commands, "execute", lambda cmd: pytest.fail("squeue should not be called"))
+    assert runner.get_drmaa_states(job_states) == {}
+
+
+def test_check_watched_items_bulk_falls_back_to_drmaa(runner, monkeypatch):
+    monkeypatch.setattr(commands, "execute", lambda cmd: "1 RUNNING\n")
+    runner.ds = MockDrmaaSession({"2": JobState.QUEUED_ACTIVE})
+    job_states = [_job_state(runner, "1"), _job_state(runner, "2")]
+    watched = runner.check_watched_items_bulk(job_states)
+    assert watched == job_states
+    # only the job missing from the squeue output is checked through DRMAA
+    assert runner.ds.checked == ["2"]
+    assert [ajs.old_state for ajs in watched] == [JobState.RUNNING, JobState.QUEUED_ACTIVE]
+    assert watched[0].running and not watched[1].running
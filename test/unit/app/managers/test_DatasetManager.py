@@ -16,6 +16,7 @@ from galaxy.managers.datasets import (
     DatasetSerializer,
 )
 from galaxy.managers.roles import RoleManager
+from galaxy.schema.tasks import PurgeDatasetsTaskRequest
 from .base import BaseTestCase
 
 # =============================================================================
@@ -85,6 +86,28 @@ class TestDatasetManager(BaseTestCase):
         self.log("should delete a dataset when purging")
         assert item1.deleted
 
+    def test_purge_datasets(self):
+        self.trans.app.config.allow_user_dataset_purge = True
+        datasets = [self.dataset_manager.create() for _ in range(3)]
+        already_purged = self.dataset_manager.create()
+        already_purged.purged = True
+        self.trans.sa_session.commit()
+
+        self.log("should remove the files of purgeable datasets in batches")
+        dataset_ids = [dataset.id for dataset in datasets] + [already_purged.id]
+        object_store = model.Dataset.object_store
+        with (
+            mock.patch("galaxy.managers.datasets.PURGE_BATCH_SIZE", 2),
+            mock.patch.object(object_store, "delete_many", wraps=object_store.delete_many) as delete_many,
+        ):
+            self.dataset_manager.purge_datasets(PurgeDatasetsTaskRequest(dataset_ids=dataset_ids))
+        assert delete_many.call_count == 2
+        deleted_ids = sorted(d.id for call in delete_many.call_args_list for d in call.args[0])
+        assert deleted_ids == sorted(dataset.id for dataset in datasets)
+        for dataset in datasets:
+            assert dataset.purged
+            assert dataset.deleted
+
     def test_purge_not_allowed(self):
         self.trans.app.config.allow_user_dataset_purge = False
         item1 = self.dataset_manager.create()
@@ -6,7 +6,9 @@ import pytest
 
 from galaxy import model
 from galaxy.exceptions import ActionInputError
+from galaxy.managers.group_users import GroupUsersManager
 from galaxy.managers.quotas import QuotaManager
+from galaxy.util.bunch import Bunch
 from .base import BaseTestCase
 
 user1_data = dict(email="user1@example.org", username="user1", password="123456")
@@ -206,3 +208,28 @@ class TestQuotaManager(BaseTestCase):
         message = self.quota_manager.unset_quota_default(quota)
         assert message is not None
         assert not quota.default
+
+    def test_changes_invalidate_cached_quotas(self):
+        user1 = self.user_manager.create(**user1_data)
+        quota_agent = self.quota_manager.quota_agent
+        quota_agent.cache_ttl = 60
+        sent_tasks: list = []
+        self.app.queue_worker = Bunch(send_control_task=lambda task, **kwargs: sent_tasks.append(task))
+        assert quota_agent.get_quota(user1) is None
+
+        quota, _ = self.quota_manager.create_quota(_create_payload(name="cached", in_users=[str(user1.id)]))
+        assert quota_agent.get_quota(user1) == 100_000_000
+        # other Galaxy processes are told to forget their cached quotas too
+        assert sent_tasks == ["invalidate_quota_cache"]
+
+        group = model.Group(name="cached quota group")
+        self.trans.sa_session.add(group)
+        self.trans.sa_session.commit()
+        self.quota_manager.create_quota(
+            _create_payload(name="cached group", amount="10 MB", operation="+", in_groups=[str(group.id)])
+        )
+        assert quota_agent.get_quota(user1) == 100_000_000
+        self.app[GroupUsersManager].update(self.trans, user1.id, group.id)
+        assert quota_agent.get_quota(user1) == 110_000_000
+        self.app[GroupUsersManager].delete(self.trans, user1.id, group.id)
+        assert quota_agent.get_quota(user1) == 100_000_000
@@ -8,6 +8,7 @@ from galaxy.model.database_heartbeat import DatabaseHeartbeat
 from galaxy.queue_worker import (
     GalaxyQueueWorker,
     send_control_task,
+    send_control_task_to_servers,
     send_local_control_task,
 )
 from galaxy.queues import connection_from_config
@@ -114,6 +115,19 @@ def test_send_control_task_noop_self(queue_worker_factory):
     assert len(app.tasks_executed) == 0
 
 
+def test_send_control_task_to_servers(queue_worker_factory):
+    app1 = queue_worker_factory()
+    app2 = queue_worker_factory()
+    app3 = queue_worker_factory()
+    send_control_task_to_servers(app=app1, task="echo", server_kwargs={app2.config.server_name: {}})
+    wait_for_var(app2, "some_var", "bar")
+    time.sleep(0.5)
+    assert len(app2.tasks_executed) == 1
+    for app in [app1, app3]:
+        assert app.some_var == "foo"
+        assert len(app.tasks_executed) == 0
+
+
 def wait_for_var(obj, var, value, tries=10, sleep=0.25):
     while getattr(obj, var) != value and tries >= 0:
         tries -= 1
@@ -1,16 +1,29 @@
 from galaxy.app_unittest_utils.galaxy_mock import MockApp
 from galaxy.celery.tasks import clean_object_store_caches
+from galaxy.model import (
+    HistoryDatasetAssociation,
+    Job,
+)
 from galaxy.objectstore import BaseObjectStore
 from galaxy.objectstore.caching import CacheTarget
 
 
 class MockObjectStore:
-    def __init__(self, cache_targets: list[CacheTarget]):
+    def __init__(self, cache_targets: list[CacheTarget], cache_dir=None):
         self._cache_targets = cache_targets
+        self._cache_dir = cache_dir
+        self.broken_dataset_ids: set[int] = set()
 
     def cache_targets(self) -> list[CacheTarget]:
         return self._cache_targets
 
+    def get_filename(self, obj, dir_only=False, extra_dir=None, sync_cache=True):
+        if obj.id in self.broken_dataset_ids:
+            raise Exception("Backend unavailable")
+        if dir_only:
+            return str(self._cache_dir / extra_dir)
+        return str(self._cache_dir / f"dataset_{obj.id}.dat")
+
 
 def test_clean_object_store_caches(tmp_path):
     container = MockApp()
@@ -34,3 +47,33 @@ def test_clean_object_store_caches(tmp_path):
     clean_object_store_caches()
 
     assert not path.exists()
+
+
+def test_clean_object_store_caches_keeps_active_job_inputs(tmp_path):
+    container = MockApp()
+    cache_dir = tmp_path
+    object_store = MockObjectStore([CacheTarget(cache_dir, 1, 0.000000001)], cache_dir)
+    container[BaseObjectStore] = object_store  # type: ignore[assignment]
+    session = container.model.session
+    running_input = HistoryDatasetAssociation(sa_session=session, create_dataset=True)
+    finished_input = HistoryDatasetAssociation(sa_session=session, create_dataset=True)
+    broken_input = HistoryDatasetAssociation(sa_session=session, create_dataset=True)
+    for state, hda in [("running", running_input), ("ok", finished_input), ("queued", broken_input)]:
+        job = Job()
+        job.state = state
+        job.add_input_dataset("input", hda)
+        session.add_all([hda, job])
+    session.commit()
+
+    # failing to locate one input doesn't stop pruning the cache
+    assert broken_input.dataset_id
+    object_store.broken_dataset_ids.add(broken_input.dataset_id)
+    running_input_path = cache_dir / f"dataset_{running_input.dataset_id}.dat"
+    finished_input_path = cache_dir / f"dataset_{finished_input.dataset_id}.dat"
+    for path in [running_input_path, finished_input_path]:
+        path.write_text("this is an example file")
+
+    clean_object_store_caches()
+
+    assert running_input_path.exists()
+    assert not finished_input_path.exists()
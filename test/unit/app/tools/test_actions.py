@@ -17,6 +17,7 @@ from galaxy.tools.actions import (
 from galaxy.tools.execution_helpers import (
     on_text_for_dataset_and_collections,
     on_text_for_numeric_ids,
+    ToolExecutionCache,
 )
 from galaxy.util import XML
 from galaxy.util.unittest import TestCase
@@ -124,6 +125,28 @@ class TestDefaultToolAction(TestCase, tools_support.UsesTools):
         assert output["out1"].name == "Output (moo)"
         assert output["out2"].name == "Output 2 (moo)"
 
+    def test_deferred_history_additions(self):
+        self._init_tool(TWO_OUTPUTS)
+        execution_cache = ToolExecutionCache(self.trans)
+        execution_cache.defer_history_additions = True
+        outputs: list[model.HistoryDatasetAssociation] = []
+        for param1 in ["a", "b", "c"]:
+            _, out_data, *_ = self.action.execute(
+                tool=self.tool,
+                trans=self.trans,
+                history=self.history,
+                incoming=dict(param1=param1),
+                execution_cache=execution_cache,
+                flush_job=False,
+            )
+            outputs.extend(cast(model.HistoryDatasetAssociation, out_data[name]) for name in ["out1", "out2"])
+        # history ids are only allocated once all jobs have been created
+        assert all(output.hid is None for output in outputs)
+        assert execution_cache.histories_with_pending_additions == [self.history]
+        execution_cache.add_pending_items()
+        assert [output.hid for output in outputs] == list(range(1, 7))
+        assert not execution_cache.histories_with_pending_additions
+
     def test_params_wrapped(self):
         hda1 = self.__add_dataset()
         _, output = self._simple_execute(
@@ -2,6 +2,7 @@ import os
 
 import pytest
 
+from galaxy.datatypes import tabular
 from galaxy.datatypes.tabular import ConnectivityTable
 from galaxy.util import galaxy_directory
 
@@ -48,3 +49,42 @@ def test_get_chunk_with_offset(dataset, make_trans):
     # reads chunk_size chars from offset 5 (line 1) to the end of line 2
     chunk = dt.get_chunk(trans, dataset, 5)
     assert chunk == '{"ck_data": "mRNA\\n1\\tG\\t0\\t2\\t359\\t1", "offset": 24, "data_line_offset": 0}'
+
+
+@pytest.fixture
+def ranged_dataset():
+    class MockRangedDataset:
+        def get_file_name(self, sync_cache=True):
+            raise AssertionError("chunks of datasets supporting ranges should not require the file")
+
+        def get_range(self, offset, length):
+            with open(os.path.join(galaxy_directory(), "test-data/1.ct"), "rb") as fh:
+                fh.seek(offset)
+                return fh.read(length)
+
+    return MockRangedDataset()
+
+
+@pytest.mark.parametrize("offset,chunk_size", [(0, 1000), (5, 10), (24, 3), (0, 1)])
+def test_get_chunk_from_range(dataset, ranged_dataset, make_trans, offset, chunk_size):
+    dt = ConnectivityTable()
+    trans = make_trans(chunk_size)
+    assert dt.get_chunk(trans, ranged_dataset, offset) == dt.get_chunk(trans, dataset, offset)
+
+
+def test_get_chunk_checks_compression_once(ranged_dataset, make_trans, monkeypatch):
+    monkeypatch.setattr(tabular, "_compressed_dataset_ids", {})
+    reads = []
+    get_range = ranged_dataset.get_range
+
+    def recording_get_range(offset, length):
+        reads.append((offset, length))
+        return get_range(offset, length)
+
+    ranged_dataset.id = 1
+    ranged_dataset.get_range = recording_get_range
+    dt = ConnectivityTable()
+    trans = make_trans(10)
+    for offset in (0, 5, 24):
+        dt.get_chunk(trans, ranged_dataset, offset)
+    assert reads.count((0, 6)) == 1
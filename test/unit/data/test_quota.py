@@ -2,6 +2,11 @@ import uuid
 from decimal import Decimal
 from typing import cast
 
+from sqlalchemy import (
+    select,
+    text,
+)
+
 from galaxy import model
 from galaxy.model.unittest_utils.utils import random_email
 from galaxy.objectstore import (
@@ -354,6 +359,94 @@ class TestCalculateUsage(BaseModelTestCase):
         self._refresh_user_and_assert_disk_usage_is(25, "alt_source")
         self._refresh_user_and_assert_disk_usage_is(0, None)
 
+    def test_adjust_usage_records_ledger_entries(self):
+        u = self.u
+
+        u.adjust_total_disk_usage(10, None)
+        u.adjust_total_disk_usage(5, "alt_source")
+        u.adjust_total_disk_usage(-3, None)
+        u.adjust_total_disk_usage(0, None)
+        self.model.session.commit()
+
+        # changes are summed up per quota source
+        assert self._ledger_deltas() == {None: 7, "alt_source": 5}
+
+    def test_reconcile_corrects_negative_usage(self):
+        u = self.u
+
+        self._add_dataset(10)
+        u.calculate_and_set_disk_usage(self.object_store)
+        # simulate an incremental update drifting below zero
+        u.adjust_total_disk_usage(-25, None)
+        self.model.session.commit()
+        self._refresh_user_and_assert_disk_usage_is(-15)
+
+        # users with a negative usage are recalculated even if the batch is empty
+        assert model.UserDiskUsageLedgerEntry.reconcile(self.model.session, self.object_store, 0) >= 1
+        self._refresh_user_and_assert_disk_usage_is(10)
+        assert self._ledger_deltas() == {}
+
+    def test_reconcile_works_through_users_in_batches(self):
+        u = self.u
+        # other tests share the database, start with an empty ledger
+        while model.UserDiskUsageLedgerEntry.reconcile(self.model.session, self.object_store, 1000):
+            pass
+
+        self._add_dataset(10)
+        u.calculate_and_set_disk_usage(self.object_store)
+        other = model.User(email=f"calc_usage{uuid.uuid1()}@example.com", password="password")
+        self.persist(other)
+        other_history = model.History(name="Other History for Calculated Usage", user=other)
+        self.persist(other_history)
+        self.persist(
+            model.HistoryDatasetAssociation(
+                extension="txt", history=other_history, create_dataset=True, sa_session=self.model.session
+            )
+        )
+        # simulate incremental updates drifting from the actual usage, oldest change first
+        u.adjust_total_disk_usage(25, None)
+        self.model.session.commit()
+        other.adjust_total_disk_usage(5, None)
+        self.model.session.commit()
+
+        # only the user whose usage changed longest ago is recalculated
+        assert model.UserDiskUsageLedgerEntry.reconcile(self.model.session, self.object_store, 1) == 1
+        self._refresh_user_and_assert_disk_usage_is(10)
+        assert self._ledger_deltas() == {}
+        self.model.context.refresh(other)
+        assert other.disk_usage == 5
+        assert self._ledger_deltas(other) == {None: 5}
+
+        # the other user is left for the next run
+        assert model.UserDiskUsageLedgerEntry.reconcile(self.model.session, self.object_store, 1) == 1
+        self.model.context.refresh(other)
+        assert other.disk_usage == 0
+        assert self._ledger_deltas(other) == {}
+        assert model.UserDiskUsageLedgerEntry.reconcile(self.model.session, self.object_store, 1) == 0
+
+    def test_history_exclusive_usage(self):
+        u = self.u
+
+        shared = self._add_dataset(10)
+        self._add_dataset(15)
+        h2 = model.History(name="Second usage history", user=u)
+        self.persist(h2)
+        self.persist(model.HistoryDatasetAssociation(extension="txt", history=h2, dataset=shared.dataset))
+
+        rows = model.calculate_history_exclusive_disk_usage_per_objectstore(self.model.session, u.id, self.h.id)
+        assert [(row.object_store_id, int(row.usage)) for row in rows] == [(None, 15)]
+
+        # once the other history is purged the shared dataset is released too
+        h2.purged = True
+        self.persist(h2)
+        rows = model.calculate_history_exclusive_disk_usage_per_objectstore(self.model.session, u.id, self.h.id)
+        assert [(row.object_store_id, int(row.usage)) for row in rows] == [(None, 25)]
+
+    def _ledger_deltas(self, user=None):
+        entry = model.UserDiskUsageLedgerEntry
+        stmt = select(entry.quota_source_label, entry.delta).where(entry.user_id == (user or self.u).id)
+        return {label: int(delta) for label, delta in self.model.session.execute(stmt)}
+
     def _refresh_user_and_assert_disk_usage_is(self, usage, label=None):
         u = self.u
         self.model.context.refresh(u)
@@ -410,6 +503,7 @@ class TestQuota(BaseModelTestCase):
 
         quota.deleted = True
         self.persist(quota)
+        self._quotas_changed()
         self._assert_user_quota_is(u, 97)
 
         quota = model.Quota(name="group quota unlimited", amount=-1, operation="=")
@@ -441,11 +535,16 @@ class TestQuota(BaseModelTestCase):
         uga = model.UserGroupAssociation(user, group)
         gqa = model.GroupQuotaAssociation(group=group, quota=quota)
         self.persist(group, uga, quota, gqa, user)
+        self._quotas_changed()
 
     def _add_user_quota(self, user, quota):
         uqa = model.UserQuotaAssociation(user=user, quota=quota)
         user.quotas.append(uqa)
         self.persist(quota, uqa, user)
+        self._quotas_changed()
+
+    def _quotas_changed(self):
+        pass
 
     def _assert_user_quota_is(self, user, amount, quota_source_label=None):
         actual_quota = self.quota_agent.get_quota(user, quota_source_label=quota_source_label)
@@ -466,6 +565,45 @@ class TestQuota(BaseModelTestCase):
                 assert self.quota_agent.is_over_quota(quota_source_map, job)
 
 
+class TestCachedQuota(TestQuota):
+    # runs the quota tests above with caching enabled, changing quotas has to invalidate cached quotas
+
+    def setUp(self):
+        super().setUp()
+        self.quota_agent = DatabaseQuotaAgent(self.model, cache_ttl=60)
+
+    def _quotas_changed(self):
+        # the quota and group managers invalidate cached quotas after changing quotas or group memberships
+        self.quota_agent.invalidate_quota_cache()
+
+    def test_get_quotas(self):
+        label = "get_quotas_label"
+        users = [model.User(email=random_email(), password="password") for _ in range(3)]
+        self.persist(*users)
+        quota = model.Quota(name="user quota batch", amount=40, operation="=", quota_source_label=label)
+        self._add_user_quota(users[0], quota)
+        quota = model.Quota(name="group quota batch", amount=5, operation="+", quota_source_label=label)
+        self._add_group_quota(users[1], quota)
+
+        user_ids = [user.id for user in users]
+        expected = {users[0].id: 40, users[1].id: None, users[2].id: None}
+        assert self.quota_agent.get_quotas(user_ids, quota_source_label=label) == expected
+        assert self.quota_agent.get_quota(users[0], quota_source_label=label) == 40
+
+        # changes are only picked up once the cache is invalidated
+        self.model.session.execute(text("UPDATE quota SET bytes = 50 WHERE name = :name"), {"name": "user quota batch"})
+        self.model.session.commit()
+        assert self.quota_agent.get_quotas(user_ids, quota_source_label=label) == expected
+        self.quota_agent.invalidate_quota_cache()
+        expected[users[0].id] = 50
+        assert self.quota_agent.get_quotas(user_ids, quota_source_label=label) == expected
+
+        default_quota = model.Quota(name="default registered batch", amount=10, quota_source_label=label)
+        self.quota_agent.set_default_quota(model.DefaultQuotaAssociation.types.REGISTERED, default_quota)
+        expected = {users[0].id: 50, users[1].id: 15, users[2].id: 10}
+        assert self.quota_agent.get_quotas(user_ids, quota_source_label=label) == expected
+
+
 class TestQuotaObjectStore(BaseModelTestCase):
     def setUp(self):
         super().setUp()
@@ -1,11 +1,18 @@
+import hashlib
 import os
 import shutil
+import threading
 import time
 from functools import wraps
 from tempfile import (
     mkdtemp,
     mkstemp,
 )
+from types import SimpleNamespace
+from typing import (
+    Optional,
+    Set,
+)
 from unittest.mock import (
     MagicMock,
     patch,
@@ -15,18 +22,36 @@ from uuid import uuid4
 import pytest
 from requests import get
 
-from galaxy.exceptions import ObjectInvalid
-from galaxy.objectstore import persist_extra_files_for_dataset
+from galaxy.exceptions import (
+    ObjectInvalid,
+    ObjectNotFound,
+)
+from galaxy.objectstore import (
+    ObjectLocationCache,
+    persist_extra_files_for_dataset,
+)
+from galaxy.objectstore._caching_base import CachingConcreteObjectStore
+from galaxy.objectstore._util import read_file_range
 from galaxy.objectstore.azure_blob import AzureBlobObjectStore
 from galaxy.objectstore.caching import (
+    CACHE_INDEX_FILENAME,
+    CacheIndex,
     CacheTarget,
     check_cache,
+    configured_cache_index,
+    configured_eviction_policy,
+    configured_transfer_concurrency,
     InProcessCacheMonitor,
     reset_cache,
 )
 from galaxy.objectstore.cloud import Cloud
 from galaxy.objectstore.examples import get_example
 from galaxy.objectstore.pithos import PithosObjectStore
+from galaxy.objectstore.placement import (
+    BackendStatistics,
+    LoadAwarePlacementPolicy,
+    MINIMUM_SHARE,
+)
 from galaxy.objectstore.s3 import S3ObjectStore
 from galaxy.objectstore.s3_boto3 import S3ObjectStore as Boto3ObjectStore
 from galaxy.objectstore.unittest_utils import (
@@ -263,6 +288,111 @@ def test_disk_store_alt_name_abspath():
             pass
 
 
+CONTENT_ADDRESSED_TEST_CONFIG = """<?xml version="1.0"?>
+<object_store type="content_addressed_disk">
+    <files_dir path="${temp_directory}/files1"/>
+    <content_dir path="${temp_directory}/files1/content"/>
+    <extra_dir type="temp" path="${temp_directory}/tmp1"/>
+    <extra_dir type="job_work" path="${temp_directory}/job_working_directory1"/>
+</object_store>
+"""
+
+CONTENT_ADDRESSED_TEST_CONFIG_YAML = """
+type: content_addressed_disk
+files_dir: "${temp_directory}/files1"
+content_dir: "${temp_directory}/files1/content"
+extra_dirs:
+  - type: temp
+    path: "${temp_directory}/tmp1"
+  - type: job_work
+    path: "${temp_directory}/job_working_directory1"
+"""
+
+
+def _hashed_dataset(id, contents):
+    dataset = MockDataset(id)
+    hash_value = hashlib.sha256(contents.encode()).hexdigest()
+    dataset.hashes = [SimpleNamespace(hash_function="SHA-256", hash_value=hash_value, extra_files_path=None)]
+    return dataset
+
+
+def test_content_addressed_disk_store():
+    for config_str in [CONTENT_ADDRESSED_TEST_CONFIG, CONTENT_ADDRESSED_TEST_CONFIG_YAML]:
+        with TestConfig(config_str) as (directory, object_store):
+            assert object_store.content_dir == os.path.join(directory.temp_directory, "files1", "content")
+            assert set(object_store.extra_dirs) == {"temp", "job_work"}
+
+            first = _hashed_dataset(1, "Hello World!")
+            second = _hashed_dataset(2, "Hello World!")
+            first_path = directory.write("Hello World!", "files1/000/dataset_1.dat")
+            second_path = directory.write("Hello World!", "files1/000/dataset_2.dat")
+            assert object_store.deduplicate(first)
+            assert object_store.deduplicate(second)
+            assert os.path.samefile(first_path, second_path)
+            assert os.stat(first_path).st_nlink == 3
+            # shared contents can't be modified in place
+            assert not os.stat(first_path).st_mode & 0o222
+
+            # identical contents are linked instead of copied
+            imported = _hashed_dataset(3, "Hello World!")
+            imported_file = directory.write("Hello World!", "job_working_directory1/imported")
+            object_store.update_from_file(imported, file_name=imported_file, create=True)
+            assert os.path.samefile(object_store.get_filename(imported), first_path)
+
+            # different contents claiming the same hash are not shared
+            forged = _hashed_dataset(4, "Hello World!")
+            forged_file = directory.write("Hello Wrold!", "job_working_directory1/forged")
+            object_store.update_from_file(forged, file_name=forged_file, create=True)
+            assert object_store.get_data(forged) == "Hello Wrold!"
+            assert not object_store.deduplicate(forged)
+            assert object_store.get_data(forged) == "Hello Wrold!"
+
+            # updating a shared object gives it its own copy
+            object_store.update_from_file(second, file_name=forged_file)
+            assert object_store.get_data(second) == "Hello Wrold!"
+            assert object_store.get_data(first) == "Hello World!"
+
+            # the shared copy is removed with the last object referencing it
+            content_path = os.path.join(
+                object_store.content_dir, "SHA-256", first.hashes[0].hash_value[0:2], first.hashes[0].hash_value[2:4]
+            )
+            content_path = os.path.join(content_path, first.hashes[0].hash_value)
+            assert object_store.delete(first)
+            assert os.path.exists(content_path)
+            assert object_store.delete_many([second, imported]) == [True, True]
+            assert not os.path.exists(content_path)
+
+            # objects without (valid) hashes are stored as usual
+            unhashed = MockDataset(5)
+            directory.write("Hello World!", "files1/000/dataset_5.dat")
+            assert not object_store.deduplicate(unhashed)
+            invalid = _hashed_dataset(6, "Hello World!")
+            invalid.hashes[0].hash_value = "../../etc"
+            directory.write("Hello World!", "files1/000/dataset_6.dat")
+            assert not object_store.deduplicate(invalid)
+
+
+def test_disk_store_does_not_deduplicate():
+    with TestConfig(DISK_TEST_CONFIG) as (directory, object_store):
+        dataset = _hashed_dataset(1, "Hello World!")
+        directory.write("Hello World!", "files1/000/dataset_1.dat")
+        assert not object_store.deduplicate(dataset)
+
+
+def test_disk_store_get_range():
+    with TestConfig(DISK_TEST_CONFIG) as (directory, object_store):
+        dataset = MockDataset(1)
+        directory.write("Hello World!", "files1/000/dataset_1.dat")
+        assert object_store.get_range(dataset, 0, 5) == b"Hello"
+        assert object_store.get_range(dataset, 6, 100) == b"World!"
+        assert object_store.get_range(dataset, 100, 5) == b""
+        assert object_store.get_range(dataset, 3, 0) == b""
+        with pytest.raises(ValueError):
+            object_store.get_range(dataset, -1, 5)
+        with pytest.raises(ObjectNotFound):
+            object_store.get_range(MockDataset(2), 0, 5)
+
+
 HIERARCHICAL_TEST_CONFIG = get_example("hierarchical_simple.xml")
 HIERARCHICAL_TEST_CONFIG_YAML = get_example("hierarchical_simple.yml")
 
@@ -305,6 +435,113 @@ def test_hierarchical_store():
             _assert_key_has_value(as_dict, "type", "hierarchical")
 
 
+def test_hierarchical_store_get_range():
+    with TestConfig(HIERARCHICAL_TEST_CONFIG_YAML) as (directory, object_store):
+        directory.write("Hello World!", "files2/000/dataset_2.dat")
+        assert object_store.get_range(MockDataset(2), 6, 5) == b"World"
+        with pytest.raises(ObjectNotFound):
+            object_store.get_range(MockDataset(1), 0, 5)
+
+
+def test_hierarchical_store_location_cache():
+    with TestConfig(HIERARCHICAL_TEST_CONFIG_YAML) as (directory, object_store):
+        dataset = MockDataset(2)
+        directory.write("Hello World!", "files2/000/dataset_2.dat")
+        assert object_store.exists(dataset)
+        assert object_store.location_cache.get(dataset) == 1
+
+        # later lookups go straight to the backend holding the dataset
+        with patch.object(object_store.backends[0], "exists", wraps=object_store.backends[0].exists) as first_exists:
+            assert object_store.get_data(dataset) == "Hello World!"
+            assert object_store.size(dataset) == 12
+            assert first_exists.call_count == 0
+
+        object_store.delete(dataset)
+        assert object_store.location_cache.get(dataset) is None
+        assert not object_store.exists(dataset)
+
+        created = MockDataset(3)
+        object_store.create(created)
+        assert object_store.location_cache.get(created) == 0
+
+
+def test_hierarchical_store_locate_many():
+    with TestConfig(HIERARCHICAL_TEST_CONFIG_YAML) as (directory, object_store):
+        directory.write("", "files1/000/dataset_1.dat")
+        directory.write("", "files2/000/dataset_2.dat")
+        datasets = [MockDataset(1), MockDataset(2), MockDataset(3)]
+        with patch.object(
+            object_store.backends[1], "locate_many", wraps=object_store.backends[1].locate_many
+        ) as second_locate_many:
+            locations = object_store.locate_many(datasets)
+            # the second backend is only asked once, about the datasets not in the first one
+            second_locate_many.assert_called_once()
+            assert [d.id for d in second_locate_many.call_args[0][0]] == [2, 3]
+        assert locations == [object_store.backends[0], object_store.backends[1], None]
+        assert object_store.exists_many(datasets) == [True, True, False]
+        assert object_store.location_cache.get(datasets[1]) == 1
+
+
+def test_hierarchical_store_trusts_located_backend():
+    with TestConfig(HIERARCHICAL_TEST_CONFIG_YAML) as (directory, object_store):
+        directory.write("Hello World!", "files2/000/dataset_2.dat")
+        dataset = MockDataset(2)
+        object_store.locate_many([dataset])
+        second = object_store.backends[1]
+        with patch.object(second, "exists", wraps=second.exists) as second_exists:
+            assert object_store.size(dataset) == 12
+            assert object_store.get_data(dataset) == "Hello World!"
+            assert second_exists.call_count == 0
+            assert object_store.exists(dataset)
+            assert second_exists.call_count == 1
+
+        # a dataset moved to another backend is searched for again by exists
+        directory.write("Hello World!", "files1/000/dataset_2.dat")
+        os.remove(object_store.get_filename(dataset))
+        assert object_store.exists(dataset)
+        assert object_store.location_cache.get(dataset) == 0
+
+
+def test_hierarchical_store_extra_files_dont_move_primary_file():
+    with TestConfig(HIERARCHICAL_TEST_CONFIG_YAML) as (directory, object_store):
+        directory.write("Hello World!", "files2/000/dataset_2.dat")
+        dataset = MockDataset(2)
+        object_store.create(dataset, extra_dir="dataset_2_files", alt_name="x.txt")
+        assert object_store.get_filename(dataset).endswith("files2/000/dataset_2.dat")
+        assert object_store.size(dataset) == 12
+        assert object_store.location_cache.get(dataset) == 1
+
+
+def test_hierarchical_store_delete_many():
+    with TestConfig(HIERARCHICAL_TEST_CONFIG_YAML) as (directory, object_store):
+        path_1 = directory.write("", "files1/000/dataset_1.dat")
+        path_2 = directory.write("", "files2/000/dataset_2.dat")
+        datasets = [MockDataset(1), MockDataset(2), MockDataset(3)]
+        object_store.locate_many(datasets)
+        with patch.object(
+            object_store.backends[1], "delete_many", wraps=object_store.backends[1].delete_many
+        ) as second_delete_many:
+            assert object_store.delete_many(datasets) == [True, True, False]
+            second_delete_many.assert_called_once()
+        assert not os.path.exists(path_1)
+        assert not os.path.exists(path_2)
+        assert all(object_store.location_cache.get(dataset) is None for dataset in datasets)
+
+
+def test_object_location_cache_is_bounded():
+    location_cache = ObjectLocationCache(max_size=2)
+    datasets = [MockDataset(i) for i in range(3)]
+    for i, dataset in enumerate(datasets):
+        location_cache.set(dataset, i)
+    assert len(location_cache) == 2
+    assert location_cache.get(datasets[0]) is None
+    assert location_cache.get(datasets[2]) == 2
+
+    disabled = ObjectLocationCache(max_size=0)
+    disabled.set(datasets[0], 0)
+    assert disabled.get(datasets[0]) is None
+
+
 def test_concrete_name_without_objectstore_id():
     for config_str in [HIERARCHICAL_TEST_CONFIG, HIERARCHICAL_TEST_CONFIG_YAML]:
         with TestConfig(config_str) as (directory, object_store):
@@ -504,6 +741,94 @@ def test_distributed_store():
             assert device_source_map.get_device_id("files2") == "primary_disk"
 
 
+def test_distributed_store_locate_many():
+    with TestConfig(DISTRIBUTED_TEST_CONFIG_YAML) as (directory, object_store):
+        created = MockDataset(1)
+        object_store.create(created)
+        unplaced = MockDataset(2)
+        directory.write("", "files2/000/dataset_2.dat")
+        missing = MockDataset(3)
+        locations = object_store.locate_many([created, unplaced, missing])
+        assert locations == [object_store.backends[created.object_store_id], object_store.backends["files2"], None]
+        # datasets found by searching the backends get their object_store_id set
+        assert unplaced.object_store_id == "files2"
+        assert missing.object_store_id is None
+        assert object_store.exists_many([created, unplaced, missing]) == [True, True, False]
+
+
+def test_distributed_store_delete_many():
+    with TestConfig(DISTRIBUTED_TEST_CONFIG_YAML) as (directory, object_store):
+        created = [MockDataset(i) for i in range(1, 5)]
+        for dataset in created:
+            object_store.create(dataset)
+        unplaced = MockDataset(5)
+        directory.write("", "files2/000/dataset_5.dat")
+        missing = MockDataset(6)
+        datasets = created + [unplaced, missing]
+        assert object_store.delete_many(datasets) == [True, True, True, True, True, False]
+        assert unplaced.object_store_id == "files2"
+        assert object_store.exists_many(datasets) == [False] * 6
+
+
+def test_distributed_store_load_aware_placement():
+    for config_str in [DISTRIBUTED_TEST_CONFIG, DISTRIBUTED_TEST_CONFIG_YAML]:
+        if config_str.startswith("<"):
+            config_str = config_str.replace("<backends", '<backends placement_policy="load_aware"', 1)
+        else:
+            config_str = config_str.replace("type: distributed\n", "type: distributed\nplacement_policy: load_aware\n")
+        with TestConfig(config_str) as (directory, object_store):
+            assert isinstance(object_store.placement_policy, LoadAwarePlacementPolicy)
+            assert object_store.to_dict()["placement_policy"] == "load_aware"
+
+            dataset = MockDataset(1)
+            object_store.create(dataset)
+            statistics = object_store.backend_statistics[dataset.object_store_id]
+            assert statistics.latency is not None
+            assert statistics.throughput is None
+            output_path = directory.write("NEW CONTENTS", "job_working_directory1/example_output")
+            object_store.update_from_file(dataset, file_name=output_path)
+            assert statistics.throughput is not None
+
+
+def test_distributed_store_unknown_placement_policy():
+    config_str = DISTRIBUTED_TEST_CONFIG_YAML.replace(
+        "type: distributed\n", "type: distributed\nplacement_policy: fastest\n"
+    )
+    with pytest.raises(Exception, match="Unknown object store placement policy 'fastest'"):
+        with TestConfig(config_str):
+            pass
+
+
+def test_load_aware_placement_policy_favours_empty_and_fast_backends():
+    backend_ids = ["full", "empty", "slow_creates", "slow_writes"]
+    statistics = {backend_id: BackendStatistics() for backend_id in backend_ids}
+    statistics["full"].record_usage(99.0)
+    for backend_id in ["empty", "slow_creates", "slow_writes"]:
+        statistics[backend_id].record_usage(20.0)
+    statistics["empty"].record_latency(0.1)
+    statistics["empty"].record_transfer(0.1, 1000)
+    statistics["slow_creates"].record_latency(0.2)
+    statistics["slow_creates"].record_transfer(0.1, 1000)
+    statistics["slow_writes"].record_latency(0.1)
+    statistics["slow_writes"].record_transfer(0.2, 1000)
+    policy = LoadAwarePlacementPolicy(statistics)
+
+    shares = policy.shares(dict.fromkeys(backend_ids, 1))
+    assert shares["empty"] == pytest.approx(0.8)
+    # twice the latency of the fastest backend
+    assert shares["slow_creates"] == pytest.approx(0.4)
+    # half the throughput of the best backend, the time spent writing doesn't count as latency
+    assert statistics["slow_writes"].latency == pytest.approx(0.1)
+    assert shares["slow_writes"] == pytest.approx(0.4)
+    # nearly full backends keep a minimal share
+    assert shares["full"] == pytest.approx(MINIMUM_SHARE)
+
+    selected = [policy.select(["full", "empty", "empty"]) for _ in range(200)]
+    assert selected.count("empty") > selected.count("full")
+    with pytest.raises(IndexError):
+        policy.select([])
+
+
 def test_distributed_store_empty_cache_targets():
     for config_str in [DISTRIBUTED_TEST_CONFIG, DISTRIBUTED_TEST_CONFIG_YAML]:
         with TestConfig(config_str) as (directory, object_store):
@@ -703,6 +1028,41 @@ def test_config_parse_boto3():
             assert len(extra_dirs) == 2
 
 
+class MockS3Client:
+    def __init__(self, failing_keys=(), reject_batches=False):
+        self.failing_keys = set(failing_keys)
+        self.reject_batches = reject_batches
+        self.batches = []
+        self.deleted = []
+
+    def delete_objects(self, Bucket, Delete):
+        if self.reject_batches:
+            from botocore.exceptions import ClientError
+
+            raise ClientError({"Error": {"Code": "NotImplemented"}}, "DeleteObjects")
+        keys = [o["Key"] for o in Delete["Objects"]]
+        self.batches.append(keys)
+        return {"Errors": [{"Key": key, "Message": "Access Denied"} for key in keys if key in self.failing_keys]}
+
+    def delete_object(self, Bucket, Key):
+        self.deleted.append(Key)
+
+
+@patch_object_stores_to_skip_initialize
+def test_boto3_delete_existing_remotes():
+    pytest.importorskip("botocore")
+    with TestConfig(get_example("boto3_simple.yml")) as (_, object_store):
+        object_store._client = MockS3Client(failing_keys=["c"])
+        with patch("galaxy.objectstore.s3_boto3.DELETE_OBJECTS_BATCH_SIZE", 2):
+            assert object_store._delete_existing_remotes(["a", "b", "c"]) == [True, True, False]
+        assert object_store._client.batches == [["a", "b"], ["c"]]
+
+        # services without DeleteObjects fall back to deleting keys one by one
+        object_store._client = MockS3Client(reject_batches=True)
+        assert object_store._delete_existing_remotes(["a", "b"]) == [True, True]
+        assert sorted(object_store._client.deleted) == ["a", "b"]
+
+
 @patch_object_stores_to_skip_initialize
 def test_config_parse_boto3_custom_connection():
     for config_str in [get_example("boto3_custom_connection.xml"), get_example("boto3_custom_connection.yml")]:
@@ -928,6 +1288,29 @@ def test_config_parse_azure():
             assert len(extra_dirs) == 2
 
 
+class MockAzureContainerClient:
+    def __init__(self, status_codes):
+        self.status_codes = status_codes
+        self.batches = []
+
+    def delete_blobs(self, *blobs, raise_on_any_failure=True):
+        assert not raise_on_any_failure
+        self.batches.append(list(blobs))
+        return [SimpleNamespace(status_code=self.status_codes[blob]) for blob in blobs]
+
+
+@patch_object_stores_to_skip_initialize
+def test_azure_delete_existing_remotes():
+    with TestConfig(AZURE_BLOB_TEST_CONFIG_YAML) as (_, object_store):
+        container_client = MockAzureContainerClient({"a": 202, "b": 200, "gone": 404, "denied": 403})
+        object_store.service = SimpleNamespace(get_container_client=lambda container_name: container_client)
+        with patch("galaxy.objectstore.azure_blob.DELETE_BLOBS_BATCH_SIZE", 2):
+            deleted = object_store._delete_existing_remotes(["a", "b", "gone", "denied"])
+        # blobs that no longer exist count as deleted
+        assert deleted == [True, True, True, False]
+        assert container_client.batches == [["a", "b"], ["gone", "denied"]]
+
+
 @patch_object_stores_to_skip_initialize
 def test_config_parse_azure_transfer():
     for config_str in [get_example("azure_transfer.xml"), get_example("azure_transfer.yml")]:
@@ -978,6 +1361,172 @@ def test_check_cache_sanity(tmp_path):
     assert not path.exists()
 
 
+def test_check_cache_with_index(tmp_path):
+    cache_dir = tmp_path
+    path = cache_dir / "000" / "a_file_0"
+    path.parent.mkdir()
+    path.write_text("this is an example file")
+    big_cache_target = CacheTarget(cache_dir, 1, 0.2, indexed=True)
+    check_cache(big_cache_target)
+    # the missing index was rebuilt from the cache contents
+    assert (cache_dir / CACHE_INDEX_FILENAME).exists()
+    assert CacheIndex(cache_dir).total_size() == len("this is an example file")
+    assert path.exists()
+    small_cache_target = CacheTarget(cache_dir, 1, 0.000000001, indexed=True)
+    check_cache(small_cache_target)
+    assert not path.exists()
+    assert (cache_dir / CACHE_INDEX_FILENAME).exists()
+    assert CacheIndex(cache_dir).total_size() == 0
+
+
+def test_cache_index_evicts_least_recently_used(tmp_path):
+    cache_dir = tmp_path
+    paths = []
+    for i in range(4):
+        path = cache_dir / f"a_file_{i}"
+        path.write_text("0123456789")
+        os.utime(path, (1000 + i, 1000 + i))
+        paths.append(path)
+    index = CacheIndex(cache_dir)
+    index.rebuild()
+    assert index.total_size() == 40
+
+    # reading the oldest file makes it the most recently used one
+    index.record(str(paths[0]))
+    assert index.evict(15) == 20
+    assert paths[0].exists()
+    assert not paths[1].exists()
+    assert not paths[2].exists()
+    assert paths[3].exists()
+    assert index.total_size() == 20
+
+    index.remove(str(paths[3]))
+    assert index.total_size() == 10
+
+
+def _populate_cache_index(cache_dir, sizes):
+    paths = []
+    for i, size in enumerate(sizes):
+        path = cache_dir / f"a_file_{i}"
+        path.write_text("x" * size)
+        os.utime(path, (1000 + i, 1000 + i))
+        paths.append(path)
+    index = CacheIndex(cache_dir)
+    index.rebuild()
+    return index, paths
+
+
+def test_cache_index_evicts_least_frequently_used(tmp_path):
+    index, paths = _populate_cache_index(tmp_path, [10, 10, 10])
+    # a_file_0 is the oldest file, but used three times; a_file_2 is used once more
+    for _ in range(2):
+        index.record(str(paths[0]), hit=True)
+    index.record(str(paths[1]), hit=True)
+    index.record(str(paths[1]), hit=True)
+    index.record(str(paths[2]), hit=True)
+    assert index.evict(5, "lfu") == 10
+    assert paths[0].exists()
+    assert paths[1].exists()
+    assert not paths[2].exists()
+
+
+def test_cache_index_greedy_dual_size_evicts_large_files_first(tmp_path):
+    index, paths = _populate_cache_index(tmp_path, [10, 1000, 10])
+    # the large file is the most recently used one, but it goes first
+    index.record(str(paths[1]))
+    assert index.evict(5, "greedy_dual_size") == 1000
+    assert paths[0].exists()
+    assert not paths[1].exists()
+    assert paths[2].exists()
+    # evicting raised the inflation value, so files used from now on outrank the untouched ones
+    index.record(str(paths[2]))
+    assert index.evict(5, "greedy_dual_size") == 10
+    assert not paths[0].exists()
+    assert paths[2].exists()
+
+
+def test_cache_index_buffers_hits(tmp_path):
+    index, paths = _populate_cache_index(tmp_path, [10, 10])
+    other_index = CacheIndex(tmp_path)
+    for _ in range(3):
+        index.record(str(paths[0]), hit=True)
+    index.record(str(paths[1]), hit=True)
+    # hits are kept in memory until flushed
+    assert other_index.statistics()["hits"] == 0
+    index.remove(str(paths[1]))
+    index.flush()
+    assert other_index.statistics()["hits"] == 3
+    with other_index._connection() as conn:
+        rows = conn.execute("SELECT path, accesses FROM cache_file").fetchall()
+    # removed files are not added back by buffered hits
+    assert rows == [("a_file_0", 4)]
+
+
+def test_cache_index_flushes_hits_periodically(tmp_path, monkeypatch):
+    index, paths = _populate_cache_index(tmp_path, [10])
+    monkeypatch.setattr("galaxy.objectstore.caching.CACHE_INDEX_FLUSH_INTERVAL", 0)
+    index.record(str(paths[0]), hit=True)
+    assert CacheIndex(tmp_path).statistics()["hits"] == 1
+
+
+def test_cache_index_reuses_connections(tmp_path):
+    index, _ = _populate_cache_index(tmp_path, [10])
+    with index._connection() as conn:
+        pass
+    with index._connection() as other_conn:
+        assert other_conn is conn
+    # another process rebuilding the index replaces the database file
+    CacheIndex(tmp_path).rebuild()
+    with index._connection() as new_conn:
+        assert new_conn is not conn
+        assert new_conn.execute("SELECT COUNT(*) FROM cache_file").fetchone()[0] == 1
+
+
+def test_cache_index_rebuild_commits_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr("galaxy.objectstore.caching.CACHE_INDEX_BATCH_SIZE", 2)
+    index, _ = _populate_cache_index(tmp_path, [1, 2, 3, 4, 5])
+    executed = []
+    connection = index._connection
+
+    def recording_connection():
+        executed.append(True)
+        return connection()
+
+    monkeypatch.setattr(index, "_connection", recording_connection)
+    index.record_tree(str(tmp_path))
+    # one transaction to read the inflation value, then one per batch of files
+    assert len(executed) == 4
+    assert index.total_size() == 15
+
+
+def test_check_cache_keeps_pinned_files(tmp_path):
+    for indexed in [False, True]:
+        cache_dir = tmp_path / f"cache_{indexed}"
+        (cache_dir / "000" / "dataset_1_files").mkdir(parents=True)
+        pinned_file = cache_dir / "000" / "dataset_1.dat"
+        pinned_extra_file = cache_dir / "000" / "dataset_1_files" / "extra.txt"
+        other_file = cache_dir / "000" / "dataset_2.dat"
+        for path in [pinned_file, pinned_extra_file, other_file]:
+            path.write_text("this is an example file")
+        cache_target = CacheTarget(cache_dir, 1, 0.000000001, indexed=indexed)
+        check_cache(cache_target, [str(pinned_file), str(cache_dir / "000" / "dataset_1_files"), "/elsewhere"])
+        assert pinned_file.exists()
+        assert pinned_extra_file.exists()
+        assert not other_file.exists()
+
+
+def test_configured_eviction_policy():
+    config = SimpleNamespace()
+    assert configured_eviction_policy(config, {}, False) == "lru"
+    assert configured_eviction_policy(config, {"cache": {"eviction_policy": "lfu"}}, True) == "lfu"
+    # policies other than lru need the cache index
+    assert configured_eviction_policy(config, {"cache": {"eviction_policy": "lfu"}}, False) == "lru"
+    config.object_store_cache_eviction_policy = "greedy_dual_size"
+    assert configured_eviction_policy(config, {}, True) == "greedy_dual_size"
+    with pytest.raises(Exception, match="Unknown cache eviction policy"):
+        configured_eviction_policy(config, {"cache": {"eviction_policy": "fifo"}}, True)
+
+
 def test_fits_in_cache_check(tmp_path):
     cache_dir = tmp_path
     big_cache_target = CacheTarget(cache_dir, 1, 0.2)
@@ -988,6 +1537,275 @@ def test_fits_in_cache_check(tmp_path):
     assert noop_cache_target.fits_in_cache(1024 * 1024 * 1024 * 100)
 
 
+class LocalRemoteCachingObjectStore(CachingConcreteObjectStore):
+    """Caching object store whose "remote" storage is just another local directory."""
+
+    store_type = "local_remote"
+
+    def __init__(self, config, config_dict):
+        super().__init__(config, config_dict)
+        cache_dict = config_dict["cache"]
+        self.remote_path = config_dict["remote_path"]
+        self.staging_path = cache_dict["path"]
+        self.cache_size = cache_dict.get("size") or -1
+        self.cache_updated_data = True
+        self.enable_cache_monitor = False
+        self.transfer_concurrency = configured_transfer_concurrency(config, config_dict)
+        self.use_cache_index = configured_cache_index(config, config_dict)
+        self.cache_eviction_policy = configured_eviction_policy(config, config_dict, self.use_cache_index)
+        self.transfer_threads: Set[str] = set()
+        self.range_requests = config_dict.get("range_requests", True)
+        self.range_reads = 0
+        self._ensure_staging_path_writable()
+
+    def _remote(self, rel_path: str) -> str:
+        return os.path.join(self.remote_path, rel_path)
+
+    def _record_transfer(self):
+        self.transfer_threads.add(threading.current_thread().name)
+        # give other transfers a chance to overlap
+        time.sleep(0.01)
+
+    def _exists_remotely(self, rel_path: str) -> bool:
+        return os.path.exists(self._remote(rel_path))
+
+    def _get_remote_size(self, rel_path: str) -> int:
+        return os.path.getsize(self._remote(rel_path))
+
+    def _get_remote_range(self, rel_path: str, offset: int, length: int) -> Optional[bytes]:
+        if not self.range_requests:
+            return None
+        if not self._exists_remotely(rel_path):
+            raise ObjectNotFound()
+        self.range_reads += 1
+        return read_file_range(self._remote(rel_path), offset, length)
+
+    def _download(self, rel_path: str) -> bool:
+        self._record_transfer()
+        with self._atomic_download(self._get_cache_path(rel_path)) as tmp:
+            shutil.copy(self._remote(rel_path), tmp)
+        return True
+
+    def _download_directory_into_cache(self, rel_path, cache_path):
+        remote_dir = self._remote(rel_path)
+        remote_files = [
+            (os.path.join(rel_path, os.path.relpath(os.path.join(root, f), remote_dir)), os.path.join(root, f))
+            for root, _, files in os.walk(remote_dir)
+            for f in files
+        ]
+
+        def download(remote_file, local_path):
+            self._record_transfer()
+            shutil.copy(remote_file, local_path)
+
+        self._download_files_into_cache(rel_path, cache_path, remote_files, download)
+
+    def _push_string_to_path(self, rel_path: str, from_string: str) -> bool:
+        os.makedirs(os.path.dirname(self._remote(rel_path)), exist_ok=True)
+        with open(self._remote(rel_path), "w") as f:
+            f.write(from_string)
+        return True
+
+    def _push_file_to_path(self, rel_path: str, source_file: str) -> bool:
+        self._record_transfer()
+        os.makedirs(os.path.dirname(self._remote(rel_path)), exist_ok=True)
+        shutil.copy(source_file, self._remote(rel_path))
+        return True
+
+    def _delete_existing_remote(self, rel_path) -> bool:
+        os.remove(self._remote(rel_path))
+        return True
+
+    def _delete_remote_all(self, rel_path) -> bool:
+        shutil.rmtree(self._remote(rel_path), ignore_errors=True)
+        return True
+
+    def _get_object_url(self, obj, **kwargs):
+        return None
+
+    def _get_store_usage_percent(self, obj):
+        return 0.0
+
+    def shutdown(self):
+        self._shutdown_transfer_pool()
+
+
+LOCAL_REMOTE_CACHING_TEST_CONFIG_YAML = """
+type: local_remote
+remote_path: "${temp_directory}/remote"
+cache:
+  path: "${temp_directory}/cache"
+  size: 1
+  transfer_concurrency: 4
+"""
+
+
+def _local_remote_caching_config(tmp_path) -> str:
+    # TestConfig only expands ${temp_directory} for the config it writes out, not for the dict given to clazz
+    return LOCAL_REMOTE_CACHING_TEST_CONFIG_YAML.replace("${temp_directory}", str(tmp_path))
+
+
+def test_caching_object_store_transfer_pool(tmp_path):
+    with TestConfig(_local_remote_caching_config(tmp_path), clazz=LocalRemoteCachingObjectStore) as (_, object_store):
+        assert object_store.transfer_concurrency == 4
+        verify_caching_object_store_functionality(tmp_path, object_store, check_get_url=False)
+
+        dataset = MockDataset(8)
+        object_store.create(dataset)
+        extra = tmp_path / "many_extra"
+        (extra / "sub").mkdir(parents=True)
+        for i in range(8):
+            (extra / "sub" / f"file_{i}.txt").write_text(f"value {i}")
+
+        object_store.transfer_threads.clear()
+        persist_extra_files_for_dataset(
+            object_store,
+            extra,
+            dataset,  # type: ignore[arg-type,unused-ignore]
+            dataset._extra_files_rel_path,
+        )
+        # uploads ran on more than one pool thread
+        assert len(object_store.transfer_threads) > 1
+        assert all(name.startswith(object_store._transfer_thread_name_prefix) for name in object_store.transfer_threads)
+
+        shutil.rmtree(object_store.cache_target.path)
+        os.makedirs(object_store.cache_target.path)
+        object_store.transfer_threads.clear()
+        extra_path = _extra_file_path(object_store, dataset)
+        for i in range(8):
+            assert open(os.path.join(extra_path, "sub", f"file_{i}.txt")).read() == f"value {i}"
+        assert len(object_store.transfer_threads) > 1
+
+        object_store.shutdown()
+        assert object_store._transfer_pool is None
+
+
+def test_caching_object_store_transfer_errors_raised(tmp_path):
+    with TestConfig(_local_remote_caching_config(tmp_path), clazz=LocalRemoteCachingObjectStore) as (_, object_store):
+
+        def fail():
+            raise Exception("transfer failed")
+
+        with pytest.raises(Exception, match="transfer failed"):
+            object_store._transfer_all([lambda: True, fail, lambda: True])
+        object_store.shutdown()
+
+
+def test_caching_object_store_cache_index(tmp_path):
+    config_yaml = _local_remote_caching_config(tmp_path) + "  index: true\n"
+    with TestConfig(config_yaml, clazz=LocalRemoteCachingObjectStore) as (_, object_store):
+        cache_target = object_store.cache_target
+        assert cache_target.indexed
+        check_cache(cache_target)
+        cache_index = object_store.cache_index
+        assert cache_index.exists()
+
+        dataset = MockDataset(3)
+        object_store.create(dataset)
+        source = tmp_path / "source.txt"
+        source.write_text("some content")
+        object_store.update_from_file(dataset, file_name=str(source))
+        assert cache_index.total_size() == len("some content")
+
+        # files pulled back into the cache are recorded as well
+        reset_cache(cache_target)
+        assert cache_index.total_size() == 0
+        assert object_store.get_data(dataset) == "some content"
+        assert cache_index.total_size() == len("some content")
+        object_store.get_filename(dataset)
+        assert cache_index.statistics() == {"hits": 1, "misses": 1, "miss_bytes": len("some content")}
+
+        object_store.delete(dataset)
+        assert cache_index.total_size() == 0
+        object_store.shutdown()
+
+
+def test_caching_object_store_delete_many(tmp_path):
+    config_yaml = _local_remote_caching_config(tmp_path) + "  index: true\n"
+    with TestConfig(config_yaml, clazz=LocalRemoteCachingObjectStore) as (_, object_store):
+        check_cache(object_store.cache_target)
+        datasets = [MockDataset(i) for i in range(1, 4)]
+        source = tmp_path / "source.txt"
+        source.write_text("some content")
+        for dataset in datasets[:2]:
+            object_store.create(dataset)
+            object_store.update_from_file(dataset, file_name=str(source))
+        assert object_store.cache_index.total_size() == 2 * len("some content")
+
+        with patch.object(
+            object_store, "_delete_existing_remotes", wraps=object_store._delete_existing_remotes
+        ) as delete_existing_remotes:
+            assert object_store.delete_many(datasets) == [True, True, False]
+            # all remote deletions are handed to the object store at once
+            delete_existing_remotes.assert_called_once()
+        assert object_store.exists_many(datasets) == [False, False, False]
+        assert object_store.cache_index.total_size() == 0
+        object_store.shutdown()
+
+
+def test_caching_object_store_get_range(tmp_path):
+    with TestConfig(_local_remote_caching_config(tmp_path), clazz=LocalRemoteCachingObjectStore) as (_, object_store):
+        dataset = MockDataset(4)
+        object_store.create(dataset)
+        source = tmp_path / "source.txt"
+        source.write_text("Hello World!")
+        object_store.update_from_file(dataset, file_name=str(source))
+        cache_path = object_store.get_filename(dataset)
+
+        # served from the cache while cached
+        assert object_store.get_range(dataset, 6, 5) == b"World"
+        assert object_store.range_reads == 0
+
+        # only the range is fetched from remote storage otherwise
+        reset_cache(object_store.cache_target)
+        assert object_store.get_range(dataset, 0, 5) == b"Hello"
+        assert object_store.get_range(dataset, 20, 5) == b""
+        assert object_store.range_reads == 2
+        assert not os.path.exists(cache_path)
+        with pytest.raises(ObjectNotFound):
+            object_store.get_range(MockDataset(5), 0, 5)
+
+        # remote storage without range requests pulls the object into the cache
+        object_store.range_requests = False
+        assert object_store.get_range(dataset, 6, 5) == b"World"
+        assert os.path.exists(cache_path)
+        object_store.shutdown()
+
+
+def test_caching_object_store_prefetch(tmp_path):
+    with TestConfig(_local_remote_caching_config(tmp_path), clazz=LocalRemoteCachingObjectStore) as (_, object_store):
+        dataset = MockDataset(6)
+        object_store.create(dataset)
+        source = tmp_path / "source.txt"
+        source.write_text("Hello World!")
+        object_store.update_from_file(dataset, file_name=str(source))
+        cache_path = object_store.get_filename(dataset)
+        assert not object_store.prefetch(dataset)
+
+        reset_cache(object_store.cache_target)
+        assert object_store.prefetch(dataset)
+        assert open(cache_path).read() == "Hello World!"
+        assert not object_store.prefetch(MockDataset(7))
+
+        # concurrent reads of an object being fetched wait for the download instead of fetching it again
+        reset_cache(object_store.cache_target)
+        object_store.transfer_threads.clear()
+        threads = [threading.Thread(target=object_store.prefetch, args=(dataset,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        assert object_store.get_data(dataset) == "Hello World!"
+        for thread in threads:
+            thread.join()
+        assert len(object_store.transfer_threads) == 1
+        object_store.shutdown()
+
+
+def test_disk_store_prefetch():
+    with TestConfig(DISK_TEST_CONFIG) as (directory, object_store):
+        directory.write("Hello World!", "files1/000/dataset_1.dat")
+        assert not object_store.prefetch(MockDataset(1))
+
+
 AZURE_BLOB_NO_CACHE_TEST_CONFIG = get_example("azure_default_cache.xml")
 AZURE_BLOB_NO_CACHE_TEST_CONFIG_YAML = get_example("azure_default_cache.yml")
 
@@ -1310,6 +2128,7 @@ class MockDataset:
         self.object_store_id = None
         self.uuid = uuid4()
         self.tags = []
+        self.hashes: list = []
 
     def rel_path_for_uuid_test(self):
         rel_path = os.path.join(*directory_hash_id(self.uuid))
@@ -8,12 +8,19 @@ from galaxy.tool_util.deps.container_resolvers.mulled import (
     CachedMulledSingularityContainerResolver,
     MulledDockerContainerResolver,
 )
-from galaxy.tool_util.deps.containers import ContainerRegistry
+from galaxy.tool_util.deps.containers import (
+    ContainerFinder,
+    ContainerRegistry,
+    ContainerResolutionCache,
+)
 from galaxy.tool_util.deps.dependencies import (
     AppInfo,
     ToolInfo,
 )
-from galaxy.tool_util.deps.requirements import ToolRequirement
+from galaxy.tool_util.deps.requirements import (
+    ContainerDescription,
+    ToolRequirement,
+)
 
 SINGULARITY_IMAGES = (
     "foo:1.0--bar",
@@ -148,3 +155,53 @@ def test_cached_singularity_container_resolver_dir_mtime_cached(mocker):
         container_description.identifier
         == "/singularity/mulled/mulled-v2-fe8a3b846bc50d24e5df78fa0b562c43477fe9ce:9f946d13f673ab2903cb0da849ad42916d619d18-0"
     )
+
+
+def test_container_resolution_cache_lru_and_expire(mocker):
+    cache = ContainerResolutionCache(max_size=2, expire=10)
+    monotonic = mocker.patch("galaxy.tool_util.deps.containers.time.monotonic", return_value=100.0)
+    cache.set("a", None)
+    cache.set("b", ContainerDescription("quay.io/biocontainers/b:1.0"))
+    assert cache.get("a") == (True, None)
+    cache.set("c", ContainerDescription("quay.io/biocontainers/c:1.0"))
+    # b was used least recently
+    assert cache.get("b") == (False, None)
+    monotonic.return_value = 110.0
+    assert cache.get("c") == (False, None)
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 2, "hit_rate": 1 / 3}
+
+
+def test_container_finder_caches_resolution(mocker):
+    app_info = AppInfo(container_resolvers_config_dict=[{"type": "explicit"}])
+    container_finder = ContainerFinder(app_info, container_resolution_cache_size=10)
+    resolve = mocker.spy(container_finder.default_container_registry, "resolve")
+    tool_info = ToolInfo(
+        container_descriptions=[ContainerDescription("quay.io/biocontainers/samtools:1.10")],
+        requirements=[ToolRequirement(name="samtools", version="1.10", type="package")],
+        tool_id="samtools",
+        tool_version="1.10",
+    )
+    for _ in range(3):
+        container_description = container_finder._find_best_container_description_for_destination(
+            [DOCKER_CONTAINER_TYPE], tool_info, {"docker_enabled": True}
+        )
+        assert container_description
+        assert container_description.identifier == "quay.io/biocontainers/samtools:1.10"
+    assert resolve.call_count == 1
+    other_version = ToolInfo(
+        requirements=[ToolRequirement(name="samtools", version="1.11", type="package")],
+        tool_id="samtools",
+        tool_version="1.11",
+    )
+    assert (
+        container_finder._find_best_container_description_for_destination(
+            [DOCKER_CONTAINER_TYPE], other_version, {"docker_enabled": True}
+        )
+        is None
+    )
+    assert resolve.call_count == 2
+    container_finder.clear_container_resolution_cache()
+    container_finder._find_best_container_description_for_destination(
+        [DOCKER_CONTAINER_TYPE], tool_info, {"docker_enabled": True}
+    )
+    assert resolve.call_count == 3
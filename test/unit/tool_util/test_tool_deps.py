@@ -609,6 +609,85 @@ def test_shell_commands_built():
         __assert_foo_exported(commands)
 
 
+def test_dependency_resolution_cached():
+    with __test_base_path() as base_path:
+        dm = __dependency_manager_for_base_path(default_base_path=base_path)
+        env_path = __setup_galaxy_package_dep(base_path, TEST_REPO_NAME, TEST_VERSION, contents='export FOO="bar"')
+        requirements = ToolRequirements([{"type": "package", "version": TEST_VERSION, "name": TEST_REPO_NAME}])
+        dependency = next(iter(dm.requirements_to_dependencies(requirements).values()))
+        assert dependency.script == env_path
+
+        # Cached resolutions don't need to find the dependency on disk again.
+        rmtree(os.path.join(base_path, TEST_REPO_NAME))
+        cached_dependency = next(iter(dm.requirements_to_dependencies(requirements).values()))
+        assert cached_dependency.script == env_path
+        assert cached_dependency is not dependency
+
+        dm.clear_resolution_cache()
+        assert dm.requirements_to_dependencies(requirements) == {}
+
+
+def test_dependency_resolution_unresolved_not_cached():
+    with __test_base_path() as base_path:
+        dm = __dependency_manager_for_base_path(default_base_path=base_path)
+        requirements = ToolRequirements([{"type": "package", "version": TEST_VERSION, "name": TEST_REPO_NAME}])
+        dependencies = dm.requirements_to_dependencies(requirements, return_null=True)
+        assert isinstance(next(iter(dependencies.values())), NullDependency)
+
+        env_path = __setup_galaxy_package_dep(base_path, TEST_REPO_NAME, TEST_VERSION)
+        dependency = next(iter(dm.requirements_to_dependencies(requirements, return_null=True).values()))
+        assert dependency.script == env_path
+
+
+def test_dependency_resolution_cache_disabled():
+    with __test_base_path() as base_path:
+        dm = DependencyManager(default_base_path=base_path, app_config={"dependency_resolution_cache_size": 0})
+        assert dm.resolution_cache is None
+        __setup_galaxy_package_dep(base_path, TEST_REPO_NAME, TEST_VERSION)
+        requirements = ToolRequirements([{"type": "package", "version": TEST_VERSION, "name": TEST_REPO_NAME}])
+        assert len(dm.requirements_to_dependencies(requirements)) == 1
+        rmtree(os.path.join(base_path, TEST_REPO_NAME))
+        assert dm.requirements_to_dependencies(requirements) == {}
+
+
+def test_dependency_resolution_cached_with_job_directory():
+    with __test_base_path() as base_path:
+        dm = DependencyManager(default_base_path=base_path, app_config={"conda_auto_init": False})
+        conda_resolver = [r for r in dm.dependency_resolvers if r.resolver_type == "conda"][0]
+        conda_prefix = conda_resolver.conda_context.conda_prefix
+        # Both packages are installed, but not in a merged environment, so an environment is built in the job directory
+        for install_environment in ("__samtools@1.10", "__bwa@0.7.17"):
+            makedirs(os.path.join(conda_prefix, "envs", install_environment))
+        requirements = ToolRequirements(
+            [
+                {"type": "package", "version": "1.10", "name": "samtools"},
+                {"type": "package", "version": "0.7.17", "name": "bwa"},
+            ]
+        )
+        resolve = conda_resolver.resolve
+        resolved = []
+
+        def recording_resolve(requirement, **kwds):
+            resolved.append((requirement.name, kwds.get("job_directory")))
+            return resolve(requirement, **kwds)
+
+        conda_resolver.resolve = recording_resolve
+        for job in ("job1", "job2"):
+            job_directory = os.path.join(base_path, job)
+            dependencies = dm.requirements_to_dependencies(requirements, job_directory=job_directory)
+            assert len(dependencies) == 2
+            for dependency in dependencies.values():
+                assert dependency.job_specific
+                assert dependency.environment_path == os.path.join(job_directory, "conda-env")
+        job1_directory = os.path.join(base_path, "job1")
+        assert resolved == [("samtools", job1_directory), ("bwa", job1_directory)]
+
+        # Resolutions for a job directory aren't used without one
+        dependencies = dm.requirements_to_dependencies(requirements)
+        assert not any(dependency.job_specific for dependency in dependencies.values())
+        assert len(resolved) == 4
+
+
 def __assert_foo_exported(commands):
     command = ["bash", "-c", '{}; echo "$FOO"'.format("".join(commands))]
     process = Popen(command, stdout=PIPE)
@@ -0,0 +1,126 @@
+import threading
+
+from galaxy.util import StructuredExecutionTimer
+from galaxy.util.bunch import Bunch
+from galaxy.workflow.scheduling_manager import (
+    ActiveInvocation,
+    order_active_invocations,
+    SCHEDULING_POLICY_FAIR_SHARE,
+    WorkflowRequestMonitor,
+)
+
+
+def _monitor(workers=4, parallelize_within_histories=False):
+    app = Bunch(
+        config=Bunch(
+            maximum_workflow_invocation_duration=-1,
+            workflow_scheduling_workers=workers,
+            parallelize_workflow_scheduling_within_histories=parallelize_within_histories,
+            workflow_monitor_sleep=1,
+            monitor_thread_join_timeout=0,
+            server_name="main",
+        ),
+        job_config=Bunch(self_handler_tags=[]),
+        execution_timer_factory=Bunch(get_timer=StructuredExecutionTimer, galaxy_statsd_client=None),
+    )
+    manager = Bunch(default_handler_id="main", handler_assignment_methods=[], handler_max_grab=None)
+    return WorkflowRequestMonitor(app, manager)  # type: ignore[arg-type]
+
+
+class RecordingScheduler:
+    def __init__(self, monitor, active):
+        self.attempts = []
+        self.lock = threading.Lock()
+        self.release = {invocation_id: threading.Event() for invocation_id, _ in active}
+        self.started = {invocation_id: threading.Event() for invocation_id, _ in active}
+        invocations = [ActiveInvocation(invocation_id, history_id, None, "new") for invocation_id, history_id in active]
+        monitor._WorkflowRequestMonitor__active_invocations = lambda scheduler_id: invocations
+        monitor._WorkflowRequestMonitor__attempt_schedule = self.attempt_schedule
+
+    def attempt_schedule(self, invocation_id, workflow_scheduler):
+        with self.lock:
+            self.attempts.append(invocation_id)
+        self.started[invocation_id].set()
+        assert self.release[invocation_id].wait(10)
+        return True
+
+
+def test_concurrent_scheduling():
+    monitor = _monitor()
+    scheduler = RecordingScheduler(monitor, [(1, 10), (2, 10), (3, 11)])
+    monitor._WorkflowRequestMonitor__schedule("default", None)
+    # invocation 3 is scheduled while invocation 1 of another history is still being scheduled
+    assert scheduler.started[1].wait(10)
+    assert scheduler.started[3].wait(10)
+    # invocations of the same history are scheduled one after the other
+    assert not scheduler.started[2].is_set()
+
+    # invocations still being scheduled are not handed to the workers again
+    monitor._WorkflowRequestMonitor__schedule("default", None)
+    scheduler.release[3].set()
+    scheduler.release[1].set()
+    assert scheduler.started[2].wait(10)
+    scheduler.release[2].set()
+    monitor.shutdown()
+    assert sorted(scheduler.attempts) == [1, 2, 3]
+    assert scheduler.attempts.index(1) < scheduler.attempts.index(2)
+
+
+def test_concurrent_scheduling_within_histories():
+    monitor = _monitor(parallelize_within_histories=True)
+    scheduler = RecordingScheduler(monitor, [(1, 10), (2, 10)])
+    monitor._WorkflowRequestMonitor__schedule("default", None)
+    assert scheduler.started[1].wait(10)
+    assert scheduler.started[2].wait(10)
+    scheduler.release[1].set()
+    scheduler.release[2].set()
+    monitor.shutdown()
+    assert sorted(scheduler.attempts) == [1, 2]
+
+
+def test_serial_scheduling():
+    monitor = _monitor(workers=1)
+    assert monitor.scheduling_executor is None
+    scheduler = RecordingScheduler(monitor, [(1, 10), (2, 11)])
+    for event in scheduler.release.values():
+        event.set()
+    monitor._WorkflowRequestMonitor__schedule("default", None)
+    assert scheduler.attempts == [1, 2]
+    monitor.shutdown()
+
+
+def _active(*invocations):
+    return [ActiveInvocation(invocation_id, user_id, user_id, state) for invocation_id, user_id, state in invocations]
+
+
+def test_order_active_invocations_fifo():
+    active = _active((1, 1, "ready"), (2, 1, "new"), (3, 2, "new"), (4, 1, "new"), (5, 3, "new"))
+    ordered, held_back = order_active_invocations(active)
+    assert [i.id for i in ordered] == [1, 2, 3, 4, 5]
+    assert held_back == 0
+
+
+def test_order_active_invocations_fair_share():
+    active = _active((1, 1, "ready"), (2, 1, "new"), (3, 1, "new"), (4, 2, "new"), (5, 1, "new"), (6, 3, "new"))
+    ordered, held_back = order_active_invocations(active, policy=SCHEDULING_POLICY_FAIR_SHARE)
+    assert [i.id for i in ordered] == [1, 4, 6, 2, 3, 5]
+    assert held_back == 0
+
+
+def test_order_active_invocations_anonymous():
+    active = [
+        ActiveInvocation(1, 10, None, "new"),
+        ActiveInvocation(2, 10, None, "new"),
+        ActiveInvocation(3, 11, None, "new"),
+    ]
+    ordered, _ = order_active_invocations(active, policy=SCHEDULING_POLICY_FAIR_SHARE)
+    assert [i.id for i in ordered] == [1, 3, 2]
+
+
+def test_order_active_invocations_maximum_per_user():
+    active = _active(
+        (1, 1, "ready"), (2, 1, "cancelling"), (3, 1, "new"), (4, 2, "new"), (5, 1, "new"), (6, 1, "cancelling")
+    )
+    ordered, held_back = order_active_invocations(active, policy=SCHEDULING_POLICY_FAIR_SHARE, maximum_per_user=2)
+    assert [i.id for i in ordered] == [1, 4, 2, 3, 6]
+    assert held_back == 1
@@ -178,6 +178,74 @@ class TestWorkflowProgress(TestCase):
         replacement = progress.replacement_for_input(None, self._step(4), step_dict)
         assert replacement is hda3
 
+    def test_remaining_steps_runtime_state(self):
+        self._setup_workflow(TEST_WORKFLOW_YAML)
+        self._set_previous_progress(
+            [
+                (100, {"output": model.HistoryDatasetAssociation()}),
+                (101, UNSCHEDULED_STEP),
+                (102, {"out_file1": model.HistoryDatasetAssociation()}),
+                (103, UNSCHEDULED_STEP),
+                (104, UNSCHEDULED_STEP),
+            ]
+        )
+        progress = self._new_workflow_progress()
+        steps = progress.remaining_steps()
+        assert [step.id for step, _ in steps] == [101, 103, 104]
+        # runtime state of remaining tool steps is only computed when they are evaluated
+        assert progress.steps_with_runtime_state == {100, 101, 102}
+        # modules are injected for these and for the steps connected to inputs
+        assert progress.steps_with_module == {100, 101, 102, 103}
+        progress.ensure_runtime_state(self._step(3))
+        assert self._step(3).state is True
+        assert progress.steps_with_runtime_state == {100, 101, 102, 103}
+        progress.ensure_runtime_state(self._step(4))
+        assert progress.steps_with_module == {100, 101, 102, 103, 104}
+
+    def test_delayed_dependency(self):
+        self._setup_workflow(TEST_WORKFLOW_YAML)
+        progress = self._new_workflow_progress()
+        progress.set_outputs_for_input(self._invocation_step(0), {"output": model.HistoryDatasetAssociation()})
+        progress.mark_step_outputs_delayed(self._step(2))
+        assert progress.delayed_dependency(self._step(2)) is None
+        assert progress.delayed_dependency(self._step(3)) is None
+        assert progress.delayed_dependency(self._step(4)) == 102
+
+    def test_remaining_steps_from_snapshot(self):
+        self._setup_workflow(TEST_WORKFLOW_YAML)
+        hda = model.HistoryDatasetAssociation()
+        self._set_previous_progress(
+            [
+                (100, {"output": model.HistoryDatasetAssociation()}),
+                (101, {"output": model.HistoryDatasetAssociation()}),
+                (102, {"out_file1": model.HistoryDatasetAssociation()}),
+                (103, {"out_file1": model.HistoryDatasetAssociation()}),
+                (104, UNSCHEDULED_STEP),
+            ]
+        )
+        session = self.app.model.session
+        session.add(hda)
+        session.add(self.invocation)
+        session.commit()
+        progress = self._new_workflow_progress()
+        progress.set_step_outputs(self._invocation_step(2), {"out_file1": hda})
+        progress.record_step_outputs(self._step(2))
+        # outputs of input steps are always recovered from the invocation step
+        progress.set_outputs_for_input(self._invocation_step(0), {"output": hda})
+        progress.record_step_outputs(self._step(0))
+        progress.persist_snapshot()
+        assert self.invocation.progress_snapshot == {"steps": {"102": {"out_file1": {"src": "hda", "id": hda.id}}}}
+        session.commit()
+
+        progress = self._new_workflow_progress()
+        steps = progress.remaining_steps()
+        assert [step.id for step, _ in steps] == [104]
+        assert progress.outputs[102] == {"out_file1": hda}
+        assert 102 not in progress.steps_with_runtime_state
+        # outputs of steps missing from the snapshot are recovered from the invocation step
+        assert progress.outputs[103]["out_file1"] is self.progress[103]["out_file1"]
+        assert 103 in progress.steps_with_runtime_state
+
     # TODO: Replace multiple true HDA with HDCA
     # TODO: Test explicit delay
     # TODO: Test cancel on collection invalid